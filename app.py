@@ -1,19 +1,61 @@
 from flask import Flask, render_template, url_for, request, jsonify, redirect, session
 import os
 import sys
-from datetime import datetime
-from database.init_db import init_database
+from datetime import datetime, timedelta
+from database.migrate import migrate_all
+from config import Config
+from database.connection import get_connection
 from routes.auth import auth_bp
 from routes.dashboard import dashboard_bp
+from routes.kyc import kyc_bp
+from routes.recommendations import recommendations_bp
+from routes.events import events_bp
+from routes.fees import fees_bp
+from routes.exports import exports_bp
+from routes.uploads import uploads_bp
+from routes.jobs import jobs_bp
+from utils.aggregates import get_dashboard_aggregates
+from utils.assets import build_assets, init_assets, missing_vendor_files
+from utils.compression import CompressionMiddleware
+from utils.data_processor import get_feature_store
+from utils.event_store import get_event_log
+from utils.jobs import start_workers
+from utils.password_hasher import get_password_hasher
+from utils.predictor import get_predictor
+from utils.response_cache import get_response_cache
+from utils.search_index import get_search_index
+from utils.segmentation import get_segmentation
+from utils.session_store import SqliteSessionInterface
 import sqlite3
 
 
 app = Flask(__name__)
-app.secret_key = 'your-secret-key-for-testing'  # Change this in production
+app.secret_key = Config.SECRET_KEY
+# Caps every request body; uploads arrive in smaller chunks
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+
+# Sessions live server-side in user_sessions; the cookie only carries a token
+app.session_interface = SqliteSessionInterface()
+app.permanent_session_lifetime = timedelta(hours=Config.SESSION_LIFETIME_HOURS)
+
+# url_for('static', ...) resolves to fingerprinted, precompressed builds
+init_assets(app)
+
+# gzip/brotli for responses, and precompressed .gz/.br siblings for static files
+if Config.COMPRESSION_ENABLED:
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, static_folder=app.static_folder,
+                                         static_url_path=app.static_url_path)
 
 # Register blueprints
 app.register_blueprint(auth_bp)
 app.register_blueprint(dashboard_bp)
+app.register_blueprint(kyc_bp)
+app.register_blueprint(recommendations_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(fees_bp)
+app.register_blueprint(exports_bp)
+app.register_blueprint(uploads_bp)
+app.register_blueprint(jobs_bp)
 
 
 def get_current_user():
@@ -30,11 +72,9 @@ def get_current_user():
     return {'is_authenticated': False}
 
 def get_db_connection():
-    """Get database connection with proper error handling"""
+    """Get a pooled database connection with proper error handling"""
     try:
-        conn = sqlite3.connect('database/users.db')
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_connection(Config.DASHBOARD_DATABASE_PATH)
     except sqlite3.Error as e:
         print(f"Database connection error: {e}")
         return None
@@ -44,58 +84,6 @@ def inject_user():
     """Make current_user available in all templates"""
     return {'current_user': get_current_user()}
 
-def init_user_tables(cursor):
-    """Initialize only essential user tables if they don't exist"""
-    try:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user_activities (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                activity_type VARCHAR(50) NOT NULL,
-                description TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Add more tables for dashboard features
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS dashboard_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                metric_name VARCHAR(100) NOT NULL,
-                metric_value REAL NOT NULL,
-                recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS customer_segments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                segment_name VARCHAR(100) NOT NULL,
-                customer_count INTEGER DEFAULT 0,
-                retention_rate REAL DEFAULT 0.0,
-                avg_revenue REAL DEFAULT 0.0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS ai_recommendations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_id VARCHAR(50) NOT NULL,
-                recommendation_type VARCHAR(100) NOT NULL,
-                recommendation_text TEXT NOT NULL,
-                confidence_score REAL DEFAULT 0.0,
-                risk_score REAL DEFAULT 0.0,
-                status VARCHAR(50) DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        cursor.connection.commit()
-        
-    except Exception as e:
-        print(f"Error initializing user tables: {e}")
-
 # Decorator to require authentication
 def login_required(f):
     """Decorator to require login for routes"""
@@ -173,16 +161,18 @@ def update_user_profile():
 def dashboard_overview():
     """API endpoint for dashboard overview data"""
     try:
-        # Simulate dashboard overview data
+        stats = get_dashboard_aggregates().snapshot()
         overview_data = {
-            'total_customers': 15847,
-            'active_segments': 12,
-            'ai_recommendations': 247,
-            'pending_issues': 23,
-            'model_accuracy': 94.2,
-            'retention_rate': 87.6,
-            'monthly_growth': 12.4,
-            'satisfaction_score': 4.3
+            'total_customers': stats['total_customers'],
+            'active_customers': stats['active_customers'],
+            'active_segments': stats['customer_segments'],
+            'high_risk_customers': stats.get('high_risk_customers'),
+            'open_complaints': stats['open_complaints'],
+            'model_accuracy': stats.get('model_accuracy'),
+            'churn_rate': stats['churn_rate'],
+            'retention_rate': stats['retention_rate'],
+            'satisfaction_score': stats['customer_satisfaction'],
+            'data_version': stats['data_version']
         }
         
         return jsonify({
@@ -215,6 +205,18 @@ def health_check():
     
     return jsonify(health_status)
 
+@app.route('/api/health/metrics')
+@login_required
+def health_metrics():
+    """Internal pool and cache metrics (kept off the public health check)"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'password_hashing': get_password_hasher().metrics(),
+            'response_cache': get_response_cache().stats()
+        }
+    })
+
 # Error handlers (keeping existing ones)
 @app.errorhandler(404)
 def not_found_error(error):
@@ -258,74 +260,6 @@ def create_static_dirs():
         dir_path = os.path.join(app.root_path, directory)
         os.makedirs(dir_path, exist_ok=True)
 
-def initialize_dashboard_data():
-    """Initialize sample dashboard data in database"""
-    try:
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            
-            # Initialize user tables
-            init_user_tables(cursor)
-            
-            # Insert sample dashboard stats if not exists
-            cursor.execute("SELECT COUNT(*) FROM dashboard_stats")
-            if cursor.fetchone()[0] == 0:
-                sample_stats = [
-                    ('model_accuracy', 94.2),
-                    ('active_customers', 15847),
-                    ('retention_rate', 87.6),
-                    ('avg_response_time', 2.3),
-                    ('customer_satisfaction', 4.3)
-                ]
-                
-                for metric_name, metric_value in sample_stats:
-                    cursor.execute("""
-                        INSERT INTO dashboard_stats (metric_name, metric_value)
-                        VALUES (?, ?)
-                    """, (metric_name, metric_value))
-            
-            # Insert sample customer segments if not exists
-            cursor.execute("SELECT COUNT(*) FROM customer_segments")
-            if cursor.fetchone()[0] == 0:
-                sample_segments = [
-                    ('High Value Loyalists', 2341, 96.7, 1250.0),
-                    ('At-Risk Premium', 856, 73.2, 980.0),
-                    ('New Adopters', 1847, 82.4, 420.0),
-                    ('Occasional Users', 3245, 68.9, 180.0)
-                ]
-                
-                for name, count, retention, revenue in sample_segments:
-                    cursor.execute("""
-                        INSERT INTO customer_segments 
-                        (segment_name, customer_count, retention_rate, avg_revenue)
-                        VALUES (?, ?, ?, ?)
-                    """, (name, count, retention, revenue))
-            
-            # Insert sample AI recommendations if not exists
-            cursor.execute("SELECT COUNT(*) FROM ai_recommendations")
-            if cursor.fetchone()[0] == 0:
-                sample_recommendations = [
-                    ('CUST001', 'Churn Prevention', 'Immediate intervention required - offer personalized discount', 0.94, 0.87),
-                    ('CUST002', 'Upselling', 'Engage with premium features promotion', 0.89, 0.72),
-                    ('CUST003', 'Engagement', 'Send satisfaction survey and follow up', 0.81, 0.65),
-                    ('CUST004', 'Retention', 'Provide loyalty rewards and benefits', 0.76, 0.58)
-                ]
-                
-                for customer_id, rec_type, rec_text, confidence, risk in sample_recommendations:
-                    cursor.execute("""
-                        INSERT INTO ai_recommendations 
-                        (customer_id, recommendation_type, recommendation_text, confidence_score, risk_score)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (customer_id, rec_type, rec_text, confidence, risk))
-            
-            conn.commit()
-            conn.close()
-            print("✓ Dashboard data initialized successfully")
-            
-    except Exception as e:
-        print(f"✗ Error initializing dashboard data: {e}")
-
 # Initialize application
 def create_app():
     """Application factory function"""
@@ -333,15 +267,76 @@ def create_app():
     # Create necessary directories
     create_static_dirs()
     
-    # Initialize database
+    # Bring both databases up to the latest schema version
+    if Config.MIGRATE_ON_STARTUP:
+        try:
+            applied = migrate_all()
+            print(f"✓ Database schema up to date ({sum(map(len, applied.values()))} migrations applied)")
+        except Exception as e:
+            print(f"✗ Database migration failed: {e}")
+    
+    # Minify, fingerprint and precompress static assets
+    if Config.ASSET_BUILD_ON_STARTUP:
+        try:
+            manifest = build_assets()
+            print(f"✓ Static assets built ({len(manifest)} files)")
+        except Exception as e:
+            print(f"✗ Static asset build failed: {e}")
+    for path in missing_vendor_files():
+        print(f"✗ static/{path} is not vendored yet (run python -m utils.assets --vendor)")
+    
+    # Map the columnar customer feature store (built from the CSV on first run)
+    try:
+        store = get_feature_store()
+        print(f"✓ Feature store {store.version} mapped ({len(store)} customers)")
+    except Exception as e:
+        print(f"✗ Feature store unavailable: {e}")
+    
+    # Load the customer event backlog for the customer-360 view
     try:
-        init_database()
-        print("✓ Database initialized successfully")
+        event_log = get_event_log()
+        print(f"✓ Event log loaded ({event_log.total_events} events)")
     except Exception as e:
-        print(f"✗ Database initialization failed: {e}")
+        print(f"✗ Event log unavailable: {e}")
     
-    # Initialize dashboard data
-    initialize_dashboard_data()
+    # Build the search index before the first query arrives
+    try:
+        search_index = get_search_index()
+        print(f"✓ Search index built ({len(search_index)} documents)")
+    except Exception as e:
+        print(f"✗ Search index unavailable: {e}")
+    
+    # Load the churn model once so the first request doesn't pay for it
+    try:
+        get_predictor()
+        print("✓ Churn model loaded successfully")
+    except Exception as e:
+        print(f"✗ Churn model failed to load: {e}")
+    
+    # Load (or fit on first run) the segmentation model and fold in changed customers
+    try:
+        segmentation = get_segmentation()
+        print(f"✓ Segmentation loaded ({', '.join(segmentation.names)})")
+    except Exception as e:
+        print(f"✗ Segmentation unavailable: {e}")
+    
+    # Compute and materialize the dashboard aggregates
+    try:
+        stats = get_dashboard_aggregates().snapshot()
+        print(f"✓ Dashboard aggregates computed ({stats['data_version']})")
+    except Exception as e:
+        print(f"✗ Dashboard aggregates unavailable: {e}")
+    
+    # Start the background job workers (one app process per host owns them)
+    if Config.JOB_WORKERS_ON_STARTUP:
+        try:
+            pool = start_workers()
+            if pool is not None:
+                print(f"✓ Job workers started ({len(pool.processes)} processes)")
+            else:
+                print("✓ Job workers already running on this host")
+        except Exception as e:
+            print(f"✗ Job workers failed to start: {e}")
     
     return app
 
@@ -382,6 +377,13 @@ if __name__ == '__main__':
     print("  📊 Sample Data: Loaded")
     print("-" * 70)
     print("Model Status:")
+    try:
+        predictor = get_predictor()
+        print(f"  🤖 Churn model: loaded ({len(predictor.feature_columns)} features, "
+              f"accuracy {predictor.accuracy:.1%})")
+    except Exception as e:
+        print(f"  🤖 Churn model: unavailable ({e})")
+    print("=" * 70)
 
     
     # Start the development server
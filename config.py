@@ -11,6 +11,124 @@ class Config:
     # Model configuration
     MODEL_PATH = os.environ.get('MODEL_PATH') or 'models/trained_model.pkl'
     DATA_PATH = os.environ.get('DATA_PATH') or 'data/raw/newone.csv'
+    FEATURE_STORE_PATH = os.environ.get('FEATURE_STORE_PATH') or 'data/processed/feature_store'
+    # Seconds between checks for a feature store version published by another worker
+    FEATURE_STORE_CHECK_INTERVAL = float(os.environ.get('FEATURE_STORE_CHECK_INTERVAL', 5))
+    EVENTS_PATH = os.environ.get('EVENTS_PATH') or 'templates/user_events.csv'
+    EVENT_LOG_PATH = os.environ.get('EVENT_LOG_PATH') or 'data/events/ingested_events.csv'
+    EVENT_HALF_LIFE_DAYS = float(os.environ.get('EVENT_HALF_LIFE_DAYS', 90))
+    # Seconds an event timestamp may lie ahead of the server clock before the event is rejected
+    EVENT_MAX_CLOCK_SKEW = float(os.environ.get('EVENT_MAX_CLOCK_SKEW', 300))
+    # Restart snapshot of the event table and ingest-log offset, rewritten every N applied events
+    EVENT_SNAPSHOT_PATH = os.environ.get('EVENT_SNAPSHOT_PATH') or 'data/events/event_log.snapshot'
+    EVENT_SNAPSHOT_EVERY = int(os.environ.get('EVENT_SNAPSHOT_EVERY', 10000))
+    COMPLAINTS_PATH = os.environ.get('COMPLAINTS_PATH') or 'models/bank_complaints_complete_analysis.pkl'
+    COMPLAINTS_STORE_PATH = os.environ.get('COMPLAINTS_STORE_PATH') or 'data/processed/complaints'
+    
+    # Database configuration
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'database/retention_app.db'
+    DASHBOARD_DATABASE_PATH = os.environ.get('DASHBOARD_DATABASE_PATH') or 'database/users.db'
+    # Apply pending schema migrations in create_app (or run python -m database.migrate at deploy)
+    MIGRATE_ON_STARTUP = os.environ.get('MIGRATE_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+    # Seconds to wait for a free pooled connection before failing the request
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 5000))
+    DB_CACHE_SIZE_KB = int(os.environ.get('DB_CACHE_SIZE_KB', 16384))
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', 256 * 1024 * 1024))
+    DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 256))
+    
+    # Activity logging (batched background writes to user_activities)
+    ACTIVITY_BATCH_SIZE = int(os.environ.get('ACTIVITY_BATCH_SIZE', 200))
+    ACTIVITY_FLUSH_INTERVAL = float(os.environ.get('ACTIVITY_FLUSH_INTERVAL', 1.0))
+    ACTIVITY_QUEUE_SIZE = int(os.environ.get('ACTIVITY_QUEUE_SIZE', 10000))
+    ACTIVITY_ENQUEUE_TIMEOUT = float(os.environ.get('ACTIVITY_ENQUEUE_TIMEOUT', 0.05))
+    ACTIVITY_RETRY_DELAY = float(os.environ.get('ACTIVITY_RETRY_DELAY', 0.5))
+    
+    # Dashboard aggregates: seconds between source-version checks
+    AGGREGATE_TTL_SECONDS = float(os.environ.get('AGGREGATE_TTL_SECONDS', 30))
+    
+    # Maintenance-fee simulator
+    SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', os.cpu_count() or 1))
+    SIMULATION_MAX_SCENARIOS = int(os.environ.get('SIMULATION_MAX_SCENARIOS', 20000))
+    # Scenario x simulation x month cells run inside a request; bigger sweeps become fee_sweep jobs
+    SIMULATION_INLINE_CELLS = int(os.environ.get('SIMULATION_INLINE_CELLS', 500000))
+    
+    # Live dashboard updates (server-sent events)
+    LIVE_UPDATE_INTERVAL = float(os.environ.get('LIVE_UPDATE_INTERVAL', 5))
+    LIVE_UPDATE_HEARTBEAT = float(os.environ.get('LIVE_UPDATE_HEARTBEAT', 15))
+    LIVE_UPDATE_QUEUE_SIZE = int(os.environ.get('LIVE_UPDATE_QUEUE_SIZE', 100))
+    LIVE_UPDATE_RETRY_MS = int(os.environ.get('LIVE_UPDATE_RETRY_MS', 3000))
+    # Each open stream holds a worker thread; more than this per process get a 503
+    LIVE_UPDATE_MAX_STREAMS = int(os.environ.get('LIVE_UPDATE_MAX_STREAMS', 64))
+    
+    # Password hashing (scrypt cost and login concurrency cap)
+    PASSWORD_SCRYPT_N = int(os.environ.get('PASSWORD_SCRYPT_N', 2 ** 14))
+    PASSWORD_SCRYPT_R = int(os.environ.get('PASSWORD_SCRYPT_R', 8))
+    PASSWORD_SCRYPT_P = int(os.environ.get('PASSWORD_SCRYPT_P', 1))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    
+    # Seconds between flushes of buffered per-user timestamp updates
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get('WRITE_BEHIND_FLUSH_INTERVAL', 2.0))
+    
+    # Server-side sessions
+    SESSION_LIFETIME_HOURS = float(os.environ.get('SESSION_LIFETIME_HOURS', 12))
+    SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 10000))
+    SESSION_CACHE_TTL = float(os.environ.get('SESSION_CACHE_TTL', 5))
+    SESSION_SWEEP_INTERVAL = float(os.environ.get('SESSION_SWEEP_INTERVAL', 300))
+    SESSION_SWEEP_BATCH = int(os.environ.get('SESSION_SWEEP_BATCH', 500))
+    
+    # Dashboard response/fragment cache (also cleared whenever the data version changes)
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    
+    # Static assets: fingerprinted builds in static/dist (python -m utils.assets)
+    ASSET_BUILD_ON_STARTUP = os.environ.get('ASSET_BUILD_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+    ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 365 * 24 * 3600))
+    
+    # Response compression (gzip level 1-9, brotli quality 0-11; brotli needs the brotli package)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+    
+    # Customer segmentation (scaling + PCA + k-means; nightly: python -m utils.segmentation --refit)
+    SEGMENT_MODEL_PATH = os.environ.get('SEGMENT_MODEL_PATH') or 'models/segmentation.pkl'
+    SEGMENT_COUNT = int(os.environ.get('SEGMENT_COUNT', 5))
+    SEGMENT_PCA_COMPONENTS = int(os.environ.get('SEGMENT_PCA_COMPONENTS', 8))
+    SEGMENT_REFIT_INITS = int(os.environ.get('SEGMENT_REFIT_INITS', 8))
+    SEGMENT_REFIT_WORKERS = int(os.environ.get('SEGMENT_REFIT_WORKERS', os.cpu_count() or 1))
+    SEGMENT_MAX_ITER = int(os.environ.get('SEGMENT_MAX_ITER', 300))
+    SEGMENT_BATCH_SIZE = int(os.environ.get('SEGMENT_BATCH_SIZE', 1024))
+    
+    # Streaming exports (background jobs and their files live in EXPORT_DIR)
+    EXPORT_DIR = os.environ.get('EXPORT_DIR') or 'data/exports'
+    EXPORT_MAX_CONCURRENT = int(os.environ.get('EXPORT_MAX_CONCURRENT', 2))
+    EXPORT_TTL_HOURS = float(os.environ.get('EXPORT_TTL_HOURS', 24))
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 64 * 1024))
+    EXPORT_ROW_GROUP_SIZE = int(os.environ.get('EXPORT_ROW_GROUP_SIZE', 50000))
+    
+    # Resumable data uploads (kept out of static/ so raw extracts are never served)
+    UPLOAD_DATA_DIR = os.environ.get('UPLOAD_DATA_DIR') or 'data/uploads'
+    UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+    UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 2 * 1024 ** 3))
+    UPLOAD_VALIDATE_ROWS = int(os.environ.get('UPLOAD_VALIDATE_ROWS', 10000))
+    UPLOAD_TTL_HOURS = float(os.environ.get('UPLOAD_TTL_HOURS', 72))
+    
+    # Background jobs (SQLite queue in the dashboard database, served by worker processes)
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_WORKERS_ON_STARTUP = os.environ.get('JOB_WORKERS_ON_STARTUP', 'true').lower() in ('1', 'true', 'yes')
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+    JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', 60))
+    JOB_RETRY_DELAY = float(os.environ.get('JOB_RETRY_DELAY', 5))
+    JOB_POOL_LOCK = os.environ.get('JOB_POOL_LOCK') or 'data/jobs/workers.lock'
+    
+    # Chart data (pre-binned, downsampled payloads cached per data version)
+    CHART_MAX_POINTS = int(os.environ.get('CHART_MAX_POINTS', 200))
+    CHART_CACHE_SIZE = int(os.environ.get('CHART_CACHE_SIZE', 128))
+    # Event timeline buckets before outlying timestamps are clamped to the edges
+    CHART_MAX_BUCKETS = int(os.environ.get('CHART_MAX_BUCKETS', 100000))
     
     # Flask configuration
     DEBUG = os.environ.get('FLASK_DEBUG') or True
@@ -0,0 +1,177 @@
+"""Shared SQLite connection pool.
+
+Every module gets its connections from here instead of calling
+``sqlite3.connect`` per query.  Connections are opened once with WAL
+journaling and tuned pragmas and then reused; ``close()`` on a pooled
+connection hands it back to the pool (rolling back anything uncommitted)
+instead of closing it.  Reuse also keeps each connection's prepared
+statement cache warm, so repeated queries skip SQL compilation.
+
+At most ``Config.DB_POOL_SIZE`` connections per database are checked out
+at once; further callers wait up to ``Config.DB_POOL_TIMEOUT`` seconds and
+then get ``PoolTimeout``.  Connections go back only through ``close()`` or
+the ``connection()`` context manager, so always use one of them.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import Config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('foreign_keys', 'ON'),
+    ('temp_store', 'MEMORY'),
+)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No pooled connection became free within DB_POOL_TIMEOUT"""
+
+
+def resolve_db_path(path):
+    """Resolve a database path relative to the project root"""
+    if path == ':memory:' or os.path.isabs(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
+
+def open_connection(path):
+    """Open a raw connection with the tuned pragmas applied"""
+    conn = sqlite3.connect(
+        path,
+        timeout=Config.DB_BUSY_TIMEOUT_MS / 1000.0,
+        check_same_thread=False,
+        cached_statements=Config.DB_STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    for name, value in PRAGMAS:
+        conn.execute(f'PRAGMA {name}={value}')
+    conn.execute(f'PRAGMA busy_timeout={int(Config.DB_BUSY_TIMEOUT_MS)}')
+    conn.execute(f'PRAGMA cache_size={-int(Config.DB_CACHE_SIZE_KB)}')
+    conn.execute(f'PRAGMA mmap_size={int(Config.DB_MMAP_SIZE)}')
+    return conn
+
+
+class PooledConnection:
+    """A pooled sqlite3 connection; close() returns it to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError('Cannot operate on a closed connection.')
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    @property
+    def raw(self):
+        """The underlying sqlite3.Connection"""
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """Bounded pool of connections to one database file"""
+
+    def __init__(self, path, size, timeout=None):
+        self.path = path
+        self.size = size
+        self.timeout = Config.DB_POOL_TIMEOUT if timeout is None else timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+        self._pid = os.getpid()
+        self.created = 0
+
+    def acquire(self, timeout=None):
+        """Check out a connection, waiting for a free slot up to timeout seconds"""
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"No database connection free after {timeout}s ({self.size} in use)")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = open_connection(self.path)
+                self.created += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        # Connections must not cross a fork; the child builds its own pool
+        if os.getpid() != self._pid:
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None):
+    """Pool for a database file, created on first use in each process"""
+    path = resolve_db_path(db_path or Config.DATABASE_PATH)
+    key = (os.getpid(), path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(path, Config.DB_POOL_SIZE)
+    return pool
+
+
+def get_connection(db_path=None):
+    """Borrow a pooled connection; call close() to give it back"""
+    return get_pool(db_path).acquire()
+
+
+@contextmanager
+def connection(db_path=None):
+    """Borrow a pooled connection for the duration of a with block"""
+    conn = get_connection(db_path)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_all_connections():
+    """Close every idle pooled connection in this process"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
@@ -0,0 +1,155 @@
+"""Versioned schema migrations for both SQLite databases.
+
+Migrations are plain SQL files under ``database/migrations/<database>/``
+named ``NNNN_description.sql`` and applied in version order.  Each database
+records what it has applied in a ``schema_version`` table, so a run that
+finds nothing pending costs one query per database.
+
+Run them at deploy time with ``python -m database.migrate`` (``--status``
+lists applied and pending versions); ``create_app`` also runs them once at
+startup unless ``MIGRATE_ON_STARTUP`` is off.  Each migration runs in its
+own ``BEGIN IMMEDIATE`` transaction together with its ``schema_version``
+row, so workers booting at the same time apply it exactly once and a
+failing script leaves the database at the previous version.
+"""
+import os
+import re
+import sqlite3
+import sys
+
+from config import Config
+from database.connection import open_connection, resolve_db_path
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Migration directory -> database path
+DATABASES = {
+    'main': Config.DATABASE_PATH,
+    'dashboard': Config.DASHBOARD_DATABASE_PATH,
+}
+
+_FILENAME = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+class MigrationError(Exception):
+    """Raised when a migration script fails"""
+
+
+def load_migrations(database):
+    """Sorted (version, name, sql) tuples for one database"""
+    directory = os.path.join(MIGRATIONS_DIR, database)
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding='utf-8') as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration version in {directory}")
+    return migrations
+
+
+def split_statements(sql):
+    """Split a script into complete statements"""
+    statements, current = [], ''
+    for line in sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statement = current.strip()
+            if statement.rstrip(';').strip() and not _is_comment(statement):
+                statements.append(statement)
+            current = ''
+    if current.strip() and not _is_comment(current.strip()):
+        raise MigrationError(f"Incomplete SQL statement: {current.strip()[:80]}")
+    return statements
+
+
+def _is_comment(text):
+    return all(not line.strip() or line.strip().startswith('--') for line in text.splitlines())
+
+
+def _ensure_version_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(conn):
+    row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return row[0]
+
+
+def migrate(database, target=None):
+    """Apply pending migrations to one database; returns the versions applied"""
+    path = resolve_db_path(DATABASES[database])
+    migrations = load_migrations(database)
+    conn = open_connection(path)
+    conn.isolation_level = None
+    applied = []
+    try:
+        _ensure_version_table(conn)
+        latest = migrations[-1][0] if migrations else 0
+        if current_version(conn) >= (latest if target is None else target):
+            return applied
+
+        for version, name, sql in migrations:
+            if target is not None and version > target:
+                break
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Re-check under the write lock: another worker may have won
+                if current_version(conn) >= version:
+                    conn.execute('ROLLBACK')
+                    continue
+                for statement in split_statements(sql):
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (version, name))
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                conn.execute('ROLLBACK')
+                raise MigrationError(f"{database} migration {version:04d}_{name} failed: {e}") from e
+            applied.append(version)
+            print(f"Applied {database} migration {version:04d}_{name}")
+    finally:
+        conn.close()
+    return applied
+
+
+def migrate_all():
+    """Apply pending migrations to every database"""
+    return {database: migrate(database) for database in DATABASES}
+
+
+def status():
+    """Applied and pending versions per database"""
+    result = {}
+    for database, path in DATABASES.items():
+        conn = open_connection(resolve_db_path(path))
+        try:
+            _ensure_version_table(conn)
+            conn.commit()
+            applied = {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+        finally:
+            conn.close()
+        migrations = load_migrations(database)
+        result[database] = {
+            'applied': sorted(applied),
+            'pending': [f"{version:04d}_{name}" for version, name, _ in migrations if version not in applied],
+        }
+    return result
+
+
+if __name__ == '__main__':
+    if '--status' in sys.argv[1:]:
+        for database, info in status().items():
+            print(f"{database}: applied {info['applied'] or 'none'}, pending {info['pending'] or 'none'}")
+    else:
+        for database, applied in migrate_all().items():
+            print(f"{database}: {len(applied)} migration(s) applied")
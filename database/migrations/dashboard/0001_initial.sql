@@ -0,0 +1,56 @@
+-- Dashboard tables, as previously created by app.init_user_tables
+CREATE TABLE IF NOT EXISTS user_activities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    activity_type VARCHAR(50) NOT NULL,
+    description TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    type VARCHAR(50) DEFAULT 'info',
+    is_read BOOLEAN DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customer_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    customer_id VARCHAR(100) NOT NULL,
+    churn_probability REAL NOT NULL,
+    risk_level VARCHAR(20) NOT NULL,
+    confidence_score REAL DEFAULT 0.8,
+    predicted_churn_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    metric_name VARCHAR(100) NOT NULL,
+    metric_value REAL NOT NULL,
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS customer_segments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    segment_name VARCHAR(100) NOT NULL,
+    customer_count INTEGER DEFAULT 0,
+    retention_rate REAL DEFAULT 0.0,
+    avg_revenue REAL DEFAULT 0.0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS ai_recommendations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id VARCHAR(50) NOT NULL,
+    recommendation_type VARCHAR(100) NOT NULL,
+    recommendation_text TEXT NOT NULL,
+    confidence_score REAL DEFAULT 0.0,
+    risk_score REAL DEFAULT 0.0,
+    status VARCHAR(50) DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,9 @@
+-- Sample AI recommendations, previously inserted by a COUNT(*) probe on every boot
+INSERT INTO ai_recommendations (customer_id, recommendation_type, recommendation_text, confidence_score, risk_score)
+SELECT * FROM (
+    SELECT 'CUST001', 'Churn Prevention', 'Immediate intervention required - offer personalized discount', 0.94, 0.87
+    UNION ALL SELECT 'CUST002', 'Upselling', 'Engage with premium features promotion', 0.89, 0.72
+    UNION ALL SELECT 'CUST003', 'Engagement', 'Send satisfaction survey and follow up', 0.81, 0.65
+    UNION ALL SELECT 'CUST004', 'Retention', 'Provide loyalty rewards and benefits', 0.76, 0.58
+)
+WHERE NOT EXISTS (SELECT 1 FROM ai_recommendations);
@@ -0,0 +1,4 @@
+-- Per-user lookups: prediction history, new notifications, activity feeds
+CREATE INDEX IF NOT EXISTS idx_customer_predictions_user ON customer_predictions(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications(user_id, id);
+CREATE INDEX IF NOT EXISTS idx_user_activities_user ON user_activities(user_id, created_at);
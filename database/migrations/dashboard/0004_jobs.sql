@@ -0,0 +1,24 @@
+-- Durable background job queue (utils/jobs.py); times are epoch seconds
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    idempotency_key TEXT UNIQUE,
+    owner TEXT,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    run_after REAL NOT NULL,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+
+-- Claiming: highest priority first, then oldest due job
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(status, priority DESC, run_after, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_owner ON jobs(owner, created_at);
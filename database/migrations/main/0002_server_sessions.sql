@@ -0,0 +1,25 @@
+-- Server-side sessions (utils/session_store.py): session data and revision
+-- per row, and a nullable user_id for the demo login.  SQLite cannot relax
+-- the NOT NULL on user_id in place, so the table is rebuilt and the
+-- existing rows are copied across.
+ALTER TABLE user_sessions RENAME TO user_sessions_old;
+
+CREATE TABLE user_sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NULL,
+    session_token TEXT UNIQUE NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    data TEXT NOT NULL DEFAULT '{}',
+    revision INTEGER NOT NULL DEFAULT 1,
+    FOREIGN KEY (user_id) REFERENCES users (id)
+);
+
+INSERT INTO user_sessions (id, user_id, session_token, created_at, expires_at, is_active)
+SELECT id, user_id, session_token, created_at, expires_at, is_active FROM user_sessions_old;
+
+DROP TABLE user_sessions_old;
+
+CREATE INDEX idx_user_sessions_expires ON user_sessions(expires_at);
+CREATE INDEX idx_user_sessions_user ON user_sessions(user_id);
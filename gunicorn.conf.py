@@ -0,0 +1,19 @@
+"""Gunicorn settings: ``gunicorn -c gunicorn.conf.py``.
+
+Live dashboard streams (``/dashboard/api/stream``) keep a thread busy for as
+long as a dashboard is open, so workers use the threaded ``gthread`` class
+with room for ``LIVE_UPDATE_MAX_STREAMS`` streams plus ordinary requests.
+Streams beyond the cap get a 503 instead of starving the worker.
+"""
+import os
+
+from config import Config
+
+wsgi_app = 'app:create_app()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', Config.LIVE_UPDATE_MAX_STREAMS + 16))
+# Idle streams send a heartbeat every LIVE_UPDATE_HEARTBEAT seconds
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
@@ -0,0 +1,230 @@
+"""Loader for the bank complaints topic-modeling artifact.
+
+The pickle was written from a notebook, so it references classes such as
+``__main__.ComplaintTopicModeling`` and NLTK's lemmatizer that are not
+importable here.  Those are replaced with inert placeholders on load; the
+complaint data and analysis results are plain pandas/Python objects.
+
+Unpickling costs over a second and pulls in pandas, so the artifact is
+converted once into a columnar store under ``Config.COMPLAINTS_STORE_PATH``:
+one ``.npy`` per column (text dictionary-encoded, as in the feature store)
+plus a JSON sidecar holding the metadata and analysis results.  The store
+loads with ``allow_pickle=False`` in a few milliseconds, is memory-mapped so
+workers share its pages, and is opened once per process by
+``get_complaint_store``, which picks up newly published versions.  It is reconverted when the pickle changes.
+"""
+import json
+import os
+import pickle
+import threading
+import time
+import warnings
+
+import numpy as np
+
+from config import Config
+from utils.data_processor import (MANIFEST_NAME, POINTER_NAME, PROJECT_ROOT, new_version, publish,
+                                  read_pointer, resolve_path, source_signature, write_columns)
+
+STORE_FORMAT_VERSION = 1
+SIDECAR_NAME = 'analysis.json'
+
+
+class ArtifactPlaceholder:
+    """Stand-in for a class that could not be imported while unpickling"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            self.__dict__.update(state)
+        else:
+            self.state = state
+
+
+class _ArtifactUnpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        try:
+            return super().find_class(module, name)
+        except (ImportError, AttributeError):
+            return type(name, (ArtifactPlaceholder,), {'__module__': module})
+
+
+def load_complaint_analysis(path=None):
+    """Unpickle the full complaints analysis artifact"""
+    path = resolve_path(path or Config.COMPLAINTS_PATH)
+    with warnings.catch_warnings():
+        # The embedded scikit-learn estimators were pickled with an older release
+        warnings.simplefilter('ignore')
+        with open(path, 'rb') as f:
+            return _ArtifactUnpickler(f).load()
+
+
+def _json_default(value):
+    """Convert NumPy scalars and other stragglers in the analysis results"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return None
+
+
+def convert_complaint_analysis(path=None, store_dir=None):
+    """Convert the pickle into a versioned columnar store and publish it"""
+    path = resolve_path(path or Config.COMPLAINTS_PATH)
+    store_dir = resolve_path(store_dir or Config.COMPLAINTS_STORE_PATH)
+    os.makedirs(store_dir, exist_ok=True)
+
+    signature = source_signature(path)
+    artifact = load_complaint_analysis(path)
+    df = artifact['dataset']['customer_data']
+
+    version, version_dir = new_version(store_dir)
+    columns = write_columns(df, version_dir)
+
+    # Everything except the table and the notebook-only topic model object
+    sidecar = {
+        'metadata': artifact.get('metadata', {}),
+        'column_descriptions': artifact['dataset'].get('column_descriptions', {}),
+        'model_parameters': (artifact.get('trained_model') or {}).get('model_parameters', {}),
+        'analysis_results': artifact.get('analysis_results', {}),
+    }
+    with open(os.path.join(version_dir, SIDECAR_NAME), 'w') as f:
+        json.dump(sidecar, f, default=_json_default)
+
+    manifest = {
+        'format_version': STORE_FORMAT_VERSION,
+        'version': version,
+        'source': os.path.relpath(path, PROJECT_ROOT),
+        'source_signature': signature,
+        'rows': int(len(df)),
+        'columns': columns,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    publish(store_dir, version_dir, manifest)
+    return manifest
+
+
+class ComplaintStore:
+    """Read-only, memory-mapped complaint records plus the analysis sidecar"""
+
+    def __init__(self, store_dir=None):
+        self.store_dir = resolve_path(store_dir or Config.COMPLAINTS_STORE_PATH)
+        with open(os.path.join(self.store_dir, POINTER_NAME)) as f:
+            self.version = f.read().strip()
+        self.path = os.path.join(self.store_dir, self.version)
+
+        with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported complaint store format in {self.path}")
+
+        self.rows = self.manifest['rows']
+        # Map every column now so a superseded version can be deleted under us
+        self._columns = {}
+        for name in self.manifest['columns']:
+            self.column(name)
+        self._analysis = None
+        self._frame = None
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def column_names(self):
+        return list(self.manifest['columns'])
+
+    def column(self, name):
+        """Read-only array of a column (codes for text columns)"""
+        array = self._columns.get(name)
+        if array is None:
+            entry = self.manifest['columns'].get(name)
+            if entry is None:
+                raise KeyError(f"Unknown complaint column: {name}")
+            array = np.load(os.path.join(self.path, entry['file']), mmap_mode='r', allow_pickle=False)
+            self._columns[name] = array
+        return array
+
+    def values(self, name):
+        """Decoded Python values of a column"""
+        entry = self.manifest['columns'][name]
+        codes = self.column(name)
+        if entry['kind'] != 'category':
+            return codes.tolist()
+        categories = entry['categories']
+        return [categories[code] if code >= 0 else None for code in codes.tolist()]
+
+    def records(self, columns=None):
+        """Iterate rows as tuples of decoded values"""
+        columns = columns or self.column_names
+        return zip(*(self.values(name) for name in columns))
+
+    @property
+    def analysis(self):
+        """Metadata, column descriptions and analysis results from the sidecar"""
+        if self._analysis is None:
+            with open(os.path.join(self.path, SIDECAR_NAME)) as f:
+                self._analysis = json.load(f)
+        return self._analysis
+
+    def to_frame(self):
+        """The complaint records as a pandas DataFrame (built once)"""
+        if self._frame is None:
+            import pandas as pd
+
+            self._frame = pd.DataFrame({name: self.values(name) for name in self.column_names})
+        return self._frame
+
+    def is_stale(self, path=None):
+        """Whether the source pickle changed since this store was converted"""
+        path = resolve_path(path or Config.COMPLAINTS_PATH)
+        try:
+            return source_signature(path) != self.manifest['source_signature']
+        except OSError:
+            return False
+
+
+_complaint_store = None
+_complaint_store_lock = threading.Lock()
+_complaint_store_checked = 0.0
+
+
+def get_complaint_store():
+    """Return the process-wide complaint store, converting the pickle on first use"""
+    global _complaint_store, _complaint_store_checked
+    if _complaint_store is not None and \
+            time.monotonic() - _complaint_store_checked >= Config.FEATURE_STORE_CHECK_INTERVAL:
+        # Another process may have published a reconverted artifact
+        _complaint_store_checked = time.monotonic()
+        if read_pointer(_complaint_store.store_dir) not in (None, _complaint_store.version):
+            with _complaint_store_lock:
+                if read_pointer(_complaint_store.store_dir) not in (None, _complaint_store.version):
+                    _complaint_store = ComplaintStore(_complaint_store.store_dir)
+    if _complaint_store is None:
+        with _complaint_store_lock:
+            if _complaint_store is None:
+                store_dir = resolve_path(Config.COMPLAINTS_STORE_PATH)
+                if not os.path.exists(os.path.join(store_dir, POINTER_NAME)):
+                    print(f"Converting complaints artifact into {store_dir}")
+                    convert_complaint_analysis(store_dir=store_dir)
+                store = ComplaintStore(store_dir)
+                if store.is_stale():
+                    print(f"Complaints artifact changed, reconverting into {store_dir}")
+                    convert_complaint_analysis(store_dir=store_dir)
+                    store = ComplaintStore(store_dir)
+                _complaint_store = store
+    return _complaint_store
+
+
+def load_complaints(path=None):
+    """Complaint records (Complaint_ID, Reviews, Complaint_Category, ...) as a DataFrame"""
+    if path is not None:
+        return load_complaint_analysis(path)['dataset']['customer_data']
+    return get_complaint_store().to_frame()
+
+
+if __name__ == '__main__':
+    manifest = convert_complaint_analysis()
+    print(f"Complaint store {manifest['version']}: {manifest['rows']} rows, "
+          f"{len(manifest['columns'])} columns")
@@ -1,7 +1,8 @@
 import sqlite3
-import hashlib
 from datetime import datetime
 from database.init_db import get_connection
+from utils.password_hasher import HasherBusy, get_password_hasher
+from utils.write_behind import get_user_updates
 
 class User:
     def __init__(self, id=None, name=None, email=None, password_hash=None, 
@@ -16,36 +17,41 @@ class User:
     
     @staticmethod
     def hash_password(password):
-        """Hash a password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash a password with salted scrypt on the hashing pool"""
+        return get_password_hasher().hash_password(password)
     
     @staticmethod
     def create_user(name, email, password):
         """Create a new user in the database"""
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-            
-            # Check if user already exists
-            cursor.execute('SELECT id FROM users WHERE email = ?', (email.lower(),))
-            if cursor.fetchone():
-                conn.close()
-                return None, "User with this email already exists"
-            
-            # Hash password and insert user
+            # Hash before borrowing a connection; scrypt is the slow part
             password_hash = User.hash_password(password)
-            cursor.execute('''
-                INSERT INTO users (name, email, password_hash, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (name, email.lower(), password_hash, datetime.now()))
             
-            user_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            conn = get_connection()
+            try:
+                cursor = conn.cursor()
+                
+                # Check if user already exists
+                cursor.execute('SELECT id FROM users WHERE email = ?', (email.lower(),))
+                if cursor.fetchone():
+                    return None, "User with this email already exists"
+                
+                # Insert user
+                cursor.execute('''
+                    INSERT INTO users (name, email, password_hash, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (name, email.lower(), password_hash, datetime.now()))
+                
+                user_id = cursor.lastrowid
+                conn.commit()
+            finally:
+                conn.close()
             
             # Return the created user
             return User.get_by_id(user_id), "User created successfully"
             
+        except HasherBusy:
+            raise
         except sqlite3.Error as e:
             return None, f"Database error: {str(e)}"
         except Exception as e:
@@ -56,40 +62,57 @@ class User:
         """Authenticate a user with email and password"""
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-            
-            password_hash = User.hash_password(password)
-            cursor.execute('''
-                SELECT id, name, email, password_hash, created_at, last_login, is_active
-                FROM users 
-                WHERE email = ? AND password_hash = ? AND is_active = TRUE
-            ''', (email.lower(), password_hash))
-            
-            user_data = cursor.fetchone()
-            
-            if user_data:
-                # Update last login
+            try:
+                cursor = conn.cursor()
                 cursor.execute('''
-                    UPDATE users SET last_login = ? WHERE id = ?
-                ''', (datetime.now(), user_data[0]))
-                conn.commit()
-                
-                # Create user object
-                user = User(
-                    id=user_data[0],
-                    name=user_data[1],
-                    email=user_data[2],
-                    password_hash=user_data[3],
-                    created_at=user_data[4],
-                    last_login=datetime.now(),
-                    is_active=user_data[6]
-                )
-                conn.close()
-                return user, "Login successful"
-            else:
+                    SELECT id, name, email, password_hash, created_at, last_login, is_active
+                    FROM users 
+                    WHERE email = ? AND is_active = TRUE
+                ''', (email.lower(),))
+                user_data = cursor.fetchone()
+            finally:
+                # Give the connection back before the slow password check
                 conn.close()
+            
+            if not user_data:
+                # Same scrypt work as a wrong password, so response time does not reveal the email
+                hasher = get_password_hasher()
+                hasher.verify_password(password, hasher.dummy_hash)
                 return None, "Invalid email or password"
+            
+            matches, needs_rehash = get_password_hasher().verify_password(password, user_data[3])
+            if not matches:
+                return None, "Invalid email or password"
+            
+            password_hash = user_data[3]
+            if needs_rehash:
+                # Rare and must not be lost, so the upgraded hash is written now
+                password_hash = User.hash_password(password)
+                conn = get_connection()
+                try:
+                    conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (password_hash, user_data[0]))
+                    conn.commit()
+                finally:
+                    conn.close()
+            
+            # last_login is written behind, coalesced with other logins
+            last_login = datetime.now()
+            get_user_updates().record(user_data[0], last_login=last_login)
+            
+            # Create user object
+            user = User(
+                id=user_data[0],
+                name=user_data[1],
+                email=user_data[2],
+                password_hash=password_hash,
+                created_at=user_data[4],
+                last_login=last_login,
+                is_active=user_data[6]
+            )
+            return user, "Login successful"
                 
+        except HasherBusy:
+            raise
         except sqlite3.Error as e:
             return None, f"Database error: {str(e)}"
         except Exception as e:
@@ -100,15 +123,17 @@ class User:
         """Get user by ID"""
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, name, email, password_hash, created_at, last_login, is_active
-                FROM users WHERE id = ?
-            ''', (user_id,))
-            
-            user_data = cursor.fetchone()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT id, name, email, password_hash, created_at, last_login, is_active
+                    FROM users WHERE id = ?
+                ''', (user_id,))
+                
+                user_data = cursor.fetchone()
+            finally:
+                conn.close()
             
             if user_data:
                 return User(
@@ -117,7 +142,7 @@ class User:
                     email=user_data[2],
                     password_hash=user_data[3],
                     created_at=user_data[4],
-                    last_login=user_data[5],
+                    last_login=get_user_updates().pending_value(user_data[0], 'last_login') or user_data[5],
                     is_active=user_data[6]
                 )
             return None
@@ -131,15 +156,17 @@ class User:
         """Get user by email"""
         try:
             conn = get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, name, email, password_hash, created_at, last_login, is_active
-                FROM users WHERE email = ?
-            ''', (email.lower(),))
-            
-            user_data = cursor.fetchone()
-            conn.close()
+            try:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT id, name, email, password_hash, created_at, last_login, is_active
+                    FROM users WHERE email = ?
+                ''', (email.lower(),))
+                
+                user_data = cursor.fetchone()
+            finally:
+                conn.close()
             
             if user_data:
                 return User(
@@ -148,7 +175,7 @@ class User:
                     email=user_data[2],
                     password_hash=user_data[3],
                     created_at=user_data[4],
-                    last_login=user_data[5],
+                    last_login=get_user_updates().pending_value(user_data[0], 'last_login') or user_data[5],
                     is_active=user_data[6]
                 )
             return None
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, session
 import re
 from models.database_models import User
-from database.init_db import init_database
+from utils.password_hasher import HasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -94,6 +94,11 @@ def login():
                     'message': message
                 }), 401
                 
+        except HasherBusy:
+            return jsonify({
+                'success': False,
+                'message': 'Too many sign-ins right now. Please try again in a moment.'
+            }), 503
         except Exception as e:
             print(f"Login error: {str(e)}")
             return jsonify({
@@ -105,9 +110,6 @@ def login():
 def signup():
     """Signup route"""
     try:
-        # Initialize database
-        init_database()
-        
         data = request.get_json()
         
         if not data:
@@ -174,6 +176,11 @@ def signup():
                 'message': message
             }), 400
             
+    except HasherBusy:
+        return jsonify({
+            'success': False,
+            'message': 'Too many requests right now. Please try again in a moment.'
+        }), 503
     except Exception as e:
         print(f"Signup error: {str(e)}")
         return jsonify({
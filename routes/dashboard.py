@@ -1,18 +1,33 @@
-from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
+from flask import Blueprint, Response, render_template, request, jsonify, session, redirect, url_for
 import sqlite3
 import json
 from datetime import datetime, timedelta
 import random
+from config import Config
+from database.connection import get_connection
+from utils.activity_logger import log_activity
+from utils.aggregates import get_dashboard_aggregates
+from utils.customer_index import FILTERS, CursorError, get_customer_index
+from utils.data_processor import get_feature_store
+from utils.event_store import get_event_log
+from utils.fee_simulator import get_fee_simulator
+from utils.live_updates import HubFull, get_live_update_hub
+from utils.predictor import get_predictor
+from utils.response_cache import cached_fragment, cached_response
+from utils.search_index import get_search_index
+from utils.segmentation import get_segment_summary, get_segmentation
+from utils.visualization import get_chart_data
 
 # Create dashboard blueprint
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
+dashboard_bp.add_app_template_global(cached_fragment)
+
+MAX_SEGMENT_RECORDS = 10000
 
 def get_db_connection():
-    """Get database connection with proper error handling"""
+    """Get a pooled database connection with proper error handling"""
     try:
-        conn = sqlite3.connect('database/users.db')
-        conn.row_factory = sqlite3.Row
-        return conn
+        return get_connection(Config.DASHBOARD_DATABASE_PATH)
     except sqlite3.Error as e:
         print(f"Database connection error: {e}")
         return None
@@ -55,6 +70,7 @@ def dashboard_home():
 
 @dashboard_bp.route('/ai-recommendations')
 @login_required
+@cached_response()
 def ai_recommendations():
     """AI Recommendations feature page"""
     try:
@@ -70,6 +86,7 @@ def ai_recommendations():
 
 @dashboard_bp.route('/customer-segmentation')
 @login_required
+@cached_response()
 def customer_segmentation():
     """Customer Segmentation feature page"""
     try:
@@ -85,6 +102,7 @@ def customer_segmentation():
 
 @dashboard_bp.route('/ekyc-issues')
 @login_required
+@cached_response()
 def ekyc_issues():
     """E-KYC Issues feature page"""
     try:
@@ -100,6 +118,7 @@ def ekyc_issues():
 
 @dashboard_bp.route('/feedback-support')
 @login_required
+@cached_response()
 def feedback_support():
     """Feedback Support feature page"""
     try:
@@ -115,6 +134,7 @@ def feedback_support():
 
 @dashboard_bp.route('/document-verification')
 @login_required
+@cached_response()
 def document_verification():
     """Smart Document Verification feature page"""
     try:
@@ -130,10 +150,10 @@ def document_verification():
 
 @dashboard_bp.route('/maintenance-fee')
 @login_required
+@cached_response()
 def maintenance_fee():
     """Maintenance Fee feature page"""
     try:
-        # Simulate maintenance fee data
         fees = generate_maintenance_fee_data()
         
         return render_template('maintenance_fee.html', 
@@ -145,17 +165,17 @@ def maintenance_fee():
     
 @dashboard_bp.route('/analytics-dashboard')
 @login_required
+@cached_response()
 def analytics_dashboard():
     """Analytics Dashboard feature page"""
     try:
-        # Here you can load or simulate analytics data
-        # Example placeholder data (replace with real queries later)
+        stats = get_dashboard_stats()
         dashboard_data = {
-            "total_customers": 1250,
-            "active_customers": 1120,
-            "churn_rate": 0.08,
-            "monthly_growth": 0.12,
-            "top_segments": ["High Value", "Loyal", "At Risk"]
+            "total_customers": stats['total_customers'],
+            "active_customers": stats['active_customers'],
+            "churn_rate": stats['churn_rate'] / 100.0,
+            "retention_rate": stats['retention_rate'] / 100.0,
+            "top_segments": [segment['name'] for segment in stats['segments'][:3]]
         }
 
         return render_template('Analytics_dashboard.html',
@@ -166,8 +186,21 @@ def analytics_dashboard():
         return render_template('errors/500.html'), 500
 
 # API endpoints
+@dashboard_bp.route('/data-upload')
+@login_required
+def data_upload():
+    """Customer and event CSV upload page"""
+    try:
+        return render_template('data_upload.html',
+                               chunk_size=Config.UPLOAD_CHUNK_SIZE,
+                               current_user=get_current_user())
+    except Exception as e:
+        print(f"Error loading data upload: {e}")
+        return render_template('errors/500.html'), 500
+
 @dashboard_bp.route('/api/stats')
 @login_required
+@cached_response()
 def api_dashboard_stats():
     """API endpoint for dashboard statistics"""
     try:
@@ -181,16 +214,92 @@ def api_dashboard_stats():
 def api_search():
     """API endpoint for search functionality"""
     try:
-        data = request.get_json()
-        query = data.get('query', '').strip()
+        data = request.get_json(silent=True) or {}
+        query = str(data.get('query') or '').strip()
         
         if not query:
             return jsonify({'success': False, 'error': 'Query is required'}), 400
         
-        # Simulate search results
-        results = perform_search(query)
+        limit = min(int(data.get('limit', 20)), 100)
+        results = perform_search(query, limit=limit, doc_type=data.get('type'))
         
         return jsonify({'success': True, 'data': results})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/customers')
+@login_required
+def api_customers():
+    """Keyset-paginated customer list with segment, card, income, attrition and risk filters"""
+    try:
+        filters = {}
+        for name in FILTERS:
+            values = [value for arg in request.args.getlist(name) for value in arg.split(',') if value.strip()]
+            if values:
+                filters[name] = values
+        page = get_customer_index().page(
+            filters=filters,
+            sort=request.args.get('sort', 'customer_id'),
+            order=request.args.get('order', 'asc'),
+            limit=request.args.get('limit', 50),
+            cursor=request.args.get('cursor'),
+        )
+        return jsonify({'success': True, 'data': page})
+    except (CursorError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/customers/<int:clientnum>')
+@login_required
+def api_customer_profile(clientnum):
+    """API endpoint for the customer-360 view of a single customer"""
+    try:
+        profile = get_customer_profile(clientnum)
+        if profile is None:
+            return jsonify({'success': False, 'error': 'Customer not found'}), 404
+        return jsonify({'success': True, 'data': profile})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/segments')
+@login_required
+@cached_response()
+def api_segments():
+    """Segment sizes, retention and profiles"""
+    try:
+        return jsonify({'success': True, 'data': get_segment_summary()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/charts/<name>')
+@login_required
+@cached_response()
+def api_chart(name):
+    """Pre-binned data for a feature page chart"""
+    try:
+        return jsonify({'success': True, 'data': get_chart_data().get(name, request.args.to_dict())})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/segments/assign', methods=['POST'])
+@login_required
+def api_assign_segments():
+    """Assign customer feature records to their nearest segment"""
+    try:
+        data = request.get_json() or {}
+        records = data.get('customers') or data.get('records') or []
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            return jsonify({'success': False, 'error': 'customers must be a list of objects'}), 400
+        if len(records) > MAX_SEGMENT_RECORDS:
+            return jsonify({'success': False, 'error': f'At most {MAX_SEGMENT_RECORDS} customers per request'}), 400
+        return jsonify({'success': True, 'data': get_segmentation().assign_records(records)})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -204,6 +313,24 @@ def api_notifications():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@dashboard_bp.route('/api/stream')
+@login_required
+def api_stream():
+    """Server-sent event stream of stats deltas, alerts and notifications"""
+    hub = get_live_update_hub()
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    try:
+        subscription = hub.subscribe(session.get('user_id'))
+    except HubFull as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = str(max(1, Config.LIVE_UPDATE_RETRY_MS // 1000))
+        return response, 503
+    response = Response(hub.stream(subscription, last_event_id), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @dashboard_bp.route('/api/card-click', methods=['POST'])
 @login_required
 def api_card_click():
@@ -238,19 +365,8 @@ def api_implement_recommendation():
 
 # Data generation functions (simulating ML model outputs)
 def get_dashboard_stats():
-    """Generate dashboard statistics"""
-    return {
-        'model_accuracy': 94.2,
-        'active_customers': 15847,
-        'retention_rate': 12.4,
-        'avg_response_time': 2.3,
-        'ai_recommendations_count': 247,
-        'customer_segments': 12,
-        'pending_ekyc_issues': 23,
-        'recent_feedback': 156,
-        'documents_processed': 89,
-        'monthly_maintenance_fees': 1.2
-    }
+    """Dashboard statistics from the cached aggregate snapshot"""
+    return get_dashboard_aggregates().snapshot()
 
 def generate_ai_recommendations():
     """Generate simulated AI recommendations"""
@@ -289,34 +405,8 @@ def generate_ai_recommendations():
     return recommendations
 
 def generate_customer_segments():
-    """Generate simulated customer segments"""
-    segments = [
-        {
-            'id': 1,
-            'name': 'High Value Loyalists',
-            'customer_count': 2341,
-            'characteristics': ['High LTV', 'Low churn risk', 'Premium users'],
-            'retention_rate': 96.7,
-            'avg_revenue': 1250
-        },
-        {
-            'id': 2,
-            'name': 'At-Risk Premium',
-            'customer_count': 856,
-            'characteristics': ['Decreasing engagement', 'High value', 'Support tickets'],
-            'retention_rate': 73.2,
-            'avg_revenue': 980
-        },
-        {
-            'id': 3,
-            'name': 'New Adopters',
-            'customer_count': 1847,
-            'characteristics': ['Recent signup', 'Learning phase', 'High potential'],
-            'retention_rate': 82.4,
-            'avg_revenue': 420
-        }
-    ]
-    return segments
+    """Customer segments from the k-means segmentation of the book"""
+    return get_segment_summary()['segments']
 
 def generate_ekyc_issues():
     """Generate simulated E-KYC issues"""
@@ -389,45 +479,42 @@ def generate_document_data():
     return documents
 
 def generate_maintenance_fee_data():
-    """Generate simulated maintenance fee data"""
-    fees = [
-        {
-            'month': 'September 2025',
-            'total_collected': 1200000,
-            'pending_amount': 45000,
-            'customers_paid': 8947,
-            'customers_pending': 234,
-            'collection_rate': 97.8
-        },
-        {
-            'month': 'August 2025',
-            'total_collected': 1180000,
-            'pending_amount': 12000,
-            'customers_paid': 8956,
-            'customers_pending': 87,
-            'collection_rate': 99.1
-        }
-    ]
-    return fees
+    """Per-tier fee statistics from the customer book"""
+    return get_fee_simulator().tier_summary()
 
-def perform_search(query):
-    """Simulate search functionality"""
-    # This would typically query your database or search engine
-    mock_results = [
-        {
-            'type': 'Customer',
-            'id': 'CUST001',
-            'name': f'Customer matching "{query}"',
-            'relevance': 0.95
-        },
-        {
-            'type': 'Document',
-            'id': 'DOC001',
-            'name': f'Document containing "{query}"',
-            'relevance': 0.87
-        }
+def perform_search(query, limit=20, doc_type=None):
+    """Search customers and complaints, best matches first"""
+    hits = get_search_index().search(query, limit=limit, doc_type=doc_type)
+    if not hits:
+        return []
+
+    best = hits[0][0]
+    return [
+        dict(document, relevance=round(score / best, 3))
+        for score, document in hits
     ]
-    return mock_results
+
+def get_customer_profile(clientnum, event_limit=10):
+    """Build the customer-360 view from the feature store, churn model and event log"""
+    store = get_feature_store()
+    row = store.row_of(clientnum)
+    if row is None:
+        return None
+
+    record = store.row_dict(row)
+    offers = record.get('Recommended_Offers') or ''
+    churn = get_predictor().score_clientnums([clientnum])
+
+    return {
+        'customer_id': str(record['CLIENTNUM']),
+        'profile': record,
+        'segment': record.get('Segment'),
+        'cluster': record.get('Cluster'),
+        'customer_status': record.get('Customer_Status'),
+        'churn': churn[0] if churn else None,
+        'recommended_offers': [offer.strip() for offer in offers.split(';') if offer.strip()],
+        'recent_events': get_event_log().recent(clientnum, limit=event_limit)
+    }
 
 def get_user_notifications():
     """Get user notifications"""
@@ -461,33 +548,11 @@ def get_user_notifications():
 
 def log_card_click(user_id, card_type):
     """Log card click for analytics"""
-    try:
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO user_activities (user_id, activity_type, description, created_at)
-                VALUES (?, 'card_click', ?, ?)
-            """, (user_id, f"Clicked on {card_type} card", datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
-    except Exception as e:
-        print(f"Error logging card click: {e}")
+    log_activity(user_id, 'card_click', f"Clicked on {card_type} card")
 
 def log_recommendation_implementation(user_id, recommendation_id):
     """Log recommendation implementation"""
-    try:
-        conn = get_db_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO user_activities (user_id, activity_type, description, created_at)
-                VALUES (?, 'recommendation_implementation', ?, ?)
-            """, (user_id, f"Implemented recommendation {recommendation_id}", datetime.now().isoformat()))
-            conn.commit()
-            conn.close()
-    except Exception as e:
-        print(f"Error logging recommendation implementation: {e}")
+    log_activity(user_id, 'recommendation_implementation', f"Implemented recommendation {recommendation_id}")
 
 # Error handlers for dashboard blueprint
 @dashboard_bp.errorhandler(404)
@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from utils.decorators import login_required
+from utils.event_store import ingest_events
+
+events_bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+# Largest number of events accepted in one request
+MAX_BATCH_SIZE = 5000
+
+
+def normalize_event(data):
+    """Map an event posted by the browser onto the event log's CSV fields"""
+    tags = data.get('tags') or []
+    if isinstance(tags, (list, tuple)):
+        tags = ','.join(str(tag) for tag in tags)
+    return {
+        'timestamp': data.get('timestamp') or datetime.now().isoformat(timespec='seconds'),
+        'UserID': data.get('UserID', data.get('user_id', data.get('userId'))),
+        'offer_id': data.get('offer_id', data.get('offerId')),
+        'event_type': data.get('event_type', data.get('eventType')),
+        'tags': tags,
+    }
+
+
+@events_bp.route('', methods=['POST'])
+@login_required
+def record_events():
+    """Ingest one event or a batch of offer events (click, accept, ...)"""
+    try:
+        data = request.get_json() or {}
+        events = data.get('events') if 'events' in data else [data]
+        if not events:
+            return jsonify({'success': False, 'error': 'No events provided'}), 400
+        if len(events) > MAX_BATCH_SIZE:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} events per request'}), 400
+
+        accepted, rejected = ingest_events(normalize_event(event) for event in events)
+        if not accepted:
+            return jsonify({'success': False, 'error': 'No valid events', 'rejected': rejected}), 400
+
+        return jsonify({'success': True, 'accepted': accepted, 'rejected': rejected})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,118 @@
+from datetime import datetime
+import os
+
+from flask import Blueprint, Response, request, jsonify, send_file, session, url_for
+from utils.customer_index import FILTERS
+from utils.decorators import login_required
+from utils.export_utils import FORMATS, ExportBusy, get_export_manager
+
+exports_bp = Blueprint('exports', __name__, url_prefix='/api/exports')
+
+# Seconds a client should wait before retrying when every export slot is busy
+RETRY_AFTER = 5
+
+
+def export_params(values, getlist=None):
+    """Export parameters from query args or a JSON body"""
+    params = {}
+    filters = {}
+    for name in FILTERS:
+        raw = getlist(name) if getlist else values.get(name)
+        if isinstance(raw, str):
+            raw = [raw]
+        items = [item for value in raw or [] for item in str(value).split(',') if item.strip()]
+        if items:
+            filters[name] = items
+    if filters:
+        params['filters'] = filters
+    for name in ('sort', 'order', 'top_k', 'user_id', 'event_type', 'since'):
+        if values.get(name) not in (None, ''):
+            params[name] = values.get(name)
+    user_ids = getlist('user_ids') if getlist else values.get('user_ids')
+    if user_ids:
+        params['user_ids'] = [item for value in user_ids for item in str(value).split(',') if item.strip()]
+    return params
+
+
+def job_response(job):
+    data = {key: job[key] for key in ('id', 'kind', 'format', 'status', 'rows', 'size', 'error',
+                                      'created_at', 'finished_at')}
+    data['status_url'] = url_for('exports.export_status', job_id=job['id'])
+    if job['status'] == 'done':
+        data['download_url'] = url_for('exports.export_download', job_id=job['id'])
+    return data
+
+
+@exports_bp.route('/<kind>.<fmt>', methods=['GET'])
+@login_required
+def stream_export(kind, fmt):
+    """Stream an export straight into the response"""
+    try:
+        chunks = get_export_manager().stream(kind, fmt, export_params(request.args, request.args.getlist))
+        filename = f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{FORMATS[fmt][1]}"
+        return Response(chunks, mimetype=FORMATS[fmt][0], headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+        })
+    except ExportBusy as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response, 429
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@exports_bp.route('', methods=['POST'])
+@login_required
+def start_export():
+    """Run an export in the background and return its job handle"""
+    try:
+        data = request.get_json() or {}
+        job = get_export_manager().submit(
+            data.get('kind'), data.get('format', 'csv'), export_params(data), owner=session.get('user_id'))
+        return jsonify({'success': True, 'data': job_response(job)}), 202
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _own_job(job_id):
+    job = get_export_manager().job(job_id)
+    if job is None or job.get('owner') != session.get('user_id'):
+        return None
+    return job
+
+
+@exports_bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def export_status(job_id):
+    """Status and progress of a background export"""
+    try:
+        job = _own_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Export not found'}), 404
+        return jsonify({'success': True, 'data': job_response(job)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@exports_bp.route('/jobs/<job_id>/download', methods=['GET'])
+@login_required
+def export_download(job_id):
+    """Download the file of a finished background export"""
+    try:
+        job = _own_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Export not found'}), 404
+        if job['status'] != 'done':
+            return jsonify({'success': False, 'error': f"Export is {job['status']}"}), 409
+        path = get_export_manager().output_path(job)
+        if not os.path.exists(path):
+            return jsonify({'success': False, 'error': 'Export has expired'}), 410
+        return send_file(path, mimetype=FORMATS[job['format']][0], as_attachment=True,
+                         download_name=job['filename'])
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
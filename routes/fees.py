@@ -0,0 +1,67 @@
+from flask import Blueprint, request, jsonify, session
+from config import Config
+from routes.jobs import job_response
+from utils.decorators import login_required
+from utils.fee_simulator import (get_fee_simulator, get_default_sweep, expand_grid, check_sweep_params,
+                                 DEFAULT_MONTHS, DEFAULT_SIMULATIONS)
+from utils.jobs import enqueue
+
+fees_bp = Blueprint('fees', __name__, url_prefix='/api/fees')
+
+
+@fees_bp.route('/simulation', methods=['GET'])
+@login_required
+def default_simulation():
+    """Default fee x threshold sweep for the maintenance fee page"""
+    try:
+        return jsonify({'success': True, 'data': get_default_sweep()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@fees_bp.route('/simulate', methods=['POST'])
+@login_required
+def simulate():
+    """Run a Monte Carlo sweep over a custom fee/threshold grid.
+
+    Small grids are answered inline; larger ones are queued as a fee_sweep
+    job and answered with 202 and the job handle.
+    """
+    try:
+        data = request.get_json() or {}
+        months, simulations, top = check_sweep_params(data.get('months', DEFAULT_MONTHS),
+                                                      data.get('simulations', DEFAULT_SIMULATIONS),
+                                                      data.get('top', 10))
+
+        params = {
+            'fees': data.get('fees'),
+            'thresholds': data.get('thresholds'),
+            'months': months,
+            'simulations': simulations,
+            'seed': data.get('seed'),
+            'top': top,
+        }
+        fee_values, threshold_values = expand_grid(params['fees'], params['thresholds'])
+        cells = len(fee_values) * len(threshold_values) * simulations * months
+        if cells > Config.SIMULATION_INLINE_CELLS:
+            job = enqueue('fee_sweep', params, owner=session.get('user_id'))
+            return jsonify({'success': True, 'data': job_response(job)}), 202
+
+        result = get_fee_simulator().sweep(**params)
+        return jsonify({'success': True, 'data': result})
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@fees_bp.route('/tiers', methods=['GET'])
+@login_required
+def tiers():
+    """Fee-relevant statistics per card tier"""
+    try:
+        fee = request.args.get('fee', type=float)
+        threshold = request.args.get('threshold', type=float)
+        return jsonify({'success': True, 'data': get_fee_simulator().tier_summary(fee, threshold)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
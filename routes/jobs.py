@@ -0,0 +1,96 @@
+from flask import Blueprint, request, jsonify, session, url_for
+from utils.decorators import login_required
+from utils.jobs import STATUSES, TASKS, get_job_queue
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+MAX_LIMIT = 200
+
+
+def job_response(job):
+    data = {key: job[key] for key in ('id', 'task', 'status', 'priority', 'attempts', 'max_attempts',
+                                      'result', 'error', 'timing')}
+    for key in ('created_at', 'started_at', 'finished_at', 'run_after'):
+        data[key] = job[key]
+    data['status_url'] = url_for('jobs.job_status', job_id=job['id'])
+    return data
+
+
+def _own_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None or job['owner'] != session.get('user_id'):
+        return None
+    return job
+
+
+@jobs_bp.route('', methods=['POST'])
+@login_required
+def submit_job():
+    """Queue a public task and return its job handle"""
+    try:
+        data = request.get_json() or {}
+        job_queue = get_job_queue()
+        task_name = data.get('task')
+        if task_name not in TASKS or not TASKS[task_name]['public']:
+            public = sorted(name for name, spec in TASKS.items() if spec['public'])
+            raise ValueError(f"task must be one of: {', '.join(public)}")
+        payload = data.get('payload') or {}
+        if not isinstance(payload, dict):
+            raise ValueError('payload must be an object')
+        key = data.get('idempotency_key')
+        # Priority and attempts stay at the task's registered values so users cannot jump the queue
+        job = job_queue.enqueue(
+            task_name, payload,
+            # Keys are per user so one user cannot pick up another's job
+            idempotency_key=f"{session.get('user_id')}:{key}" if key else None,
+            owner=session.get('user_id'))
+        return jsonify({'success': True, 'data': job_response(job)}), 202
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('', methods=['GET'])
+@login_required
+def list_jobs():
+    """The user's most recent jobs, optionally filtered by status"""
+    try:
+        status = request.args.get('status')
+        if status and status not in STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(STATUSES)}")
+        limit = min(max(int(request.args.get('limit', 50)), 1), MAX_LIMIT)
+        jobs = get_job_queue().list(owner=session.get('user_id'), status=status, limit=limit)
+        return jsonify({'success': True, 'data': [job_response(job) for job in jobs]})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    """Status, result and timing of a job"""
+    try:
+        job = _own_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'data': job_response(job)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+@login_required
+def cancel_job(job_id):
+    """Cancel a job that has not started yet"""
+    try:
+        job = _own_job(job_id)
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        if not get_job_queue().cancel(job_id):
+            return jsonify({'success': False, 'error': f"Job is {get_job_queue().get(job_id)['status']}"}), 409
+        return jsonify({'success': True, 'data': job_response(get_job_queue().get(job_id))})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
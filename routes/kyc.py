@@ -0,0 +1,146 @@
+from flask import Blueprint, request, jsonify, session
+import sqlite3
+import numpy as np
+from datetime import datetime
+from config import Config
+from database.connection import get_connection
+from utils.decorators import login_required
+from utils.predictor import get_predictor
+
+kyc_bp = Blueprint('kyc', __name__, url_prefix='/api/kyc')
+
+# Largest number of customers accepted in one /predict call
+MAX_BATCH_SIZE = 10000
+
+
+def get_db_connection():
+    """Get a pooled database connection with proper error handling"""
+    try:
+        return get_connection(Config.DASHBOARD_DATABASE_PATH)
+    except sqlite3.Error as e:
+        print(f"Database connection error: {e}")
+        return None
+
+
+def save_predictions(user_id, predictions):
+    """Store scored customers in the prediction history"""
+    try:
+        conn = get_db_connection()
+        if conn:
+            try:
+                conn.executemany("""
+                    INSERT INTO customer_predictions
+                    (user_id, customer_id, churn_probability, risk_level, confidence_score, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (user_id, str(p['customer_id']), p['churn_probability'], p['risk_level'],
+                     p['confidence_score'], datetime.now().isoformat())
+                    for p in predictions
+                ])
+                conn.commit()
+            finally:
+                conn.close()
+    except Exception as e:
+        print(f"Error saving predictions: {e}")
+
+
+@kyc_bp.route('/predict', methods=['POST'])
+@login_required
+def predict():
+    """Score one or more customers.
+
+    Accepts ``{"customer": {...}}``, ``{"customers": [{...}, ...]}`` with
+    feature values, or ``{"clientnums": [...]}`` for customers already in the book.
+    """
+    try:
+        data = request.get_json() or {}
+        predictor = get_predictor()
+
+        if 'clientnums' in data:
+            clientnums = data.get('clientnums') or []
+            if len(clientnums) > MAX_BATCH_SIZE:
+                return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} customers per request'}), 400
+            predictions = predictor.score_clientnums(clientnums)
+        else:
+            records = data.get('customers') or ([data['customer']] if data.get('customer') else [])
+            if not records:
+                return jsonify({'success': False, 'error': 'customer, customers or clientnums is required'}), 400
+            if len(records) > MAX_BATCH_SIZE:
+                return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} customers per request'}), 400
+            predictions = predictor.score_records(records)
+
+        save_predictions(session.get('user_id'), predictions)
+
+        return jsonify({'success': True, 'data': predictions})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@kyc_bp.route('/rescore', methods=['POST'])
+@login_required
+def rescore():
+    """Rescore the whole customer book in one vectorized call"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            raise ValueError('request body must be a JSON object')
+        top_n = int(data.get('top_n', 20))
+        if not 1 <= top_n <= 1000:
+            raise ValueError('top_n must be between 1 and 1000')
+
+        result = get_predictor().score_population()
+        probabilities = result['probabilities']
+        levels = result['risk_levels']
+
+        top = probabilities.argsort()[::-1][:top_n]
+        labels, counts = np.unique(levels, return_counts=True)
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'scored': int(len(probabilities)),
+                'elapsed_ms': round(result['elapsed_ms'], 3),
+                'mean_churn_probability': round(float(probabilities.mean()), 4),
+                'risk_distribution': {str(label): int(count) for label, count in zip(labels, counts)},
+                'highest_risk': [
+                    {
+                        'customer_id': str(result['clientnums'][i]),
+                        'churn_probability': round(float(probabilities[i]), 4),
+                        'risk_level': str(levels[i]),
+                    }
+                    for i in top
+                ],
+            }
+        })
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@kyc_bp.route('/history')
+@login_required
+def history():
+    """Recent predictions made by the current user"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 500)
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({'success': False, 'error': 'Database unavailable'}), 500
+
+        try:
+            rows = conn.execute("""
+                SELECT customer_id, churn_probability, risk_level, confidence_score, created_at
+                FROM customer_predictions
+                WHERE user_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (session.get('user_id'), limit)).fetchall()
+        finally:
+            conn.close()
+
+        return jsonify({'success': True, 'data': [dict(row) for row in rows]})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
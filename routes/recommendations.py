@@ -0,0 +1,76 @@
+from flask import Blueprint, request, jsonify
+from utils.decorators import login_required
+from utils.recommender import get_recommendation_engine, DEFAULT_TOP_K, FEATURE_NAMES
+
+recommendations_bp = Blueprint('recommendations', __name__, url_prefix='/api/recommendations')
+
+# Largest number of customers ranked in one batch call
+MAX_BATCH_SIZE = 20000
+
+# Rankings only change when new events arrive, so let the browser reuse them briefly
+CACHE_MAX_AGE = 60
+
+
+@recommendations_bp.route('/<user_id>', methods=['GET'])
+@login_required
+def customer_recommendations(user_id):
+    """Ranked offers for a customer in the book"""
+    try:
+        top_k = request.args.get('top_k', DEFAULT_TOP_K, type=int)
+        results = get_recommendation_engine().recommend_for_customers([user_id], top_k=top_k)
+        if not results:
+            return jsonify({'success': False, 'error': 'Customer not found'}), 404
+
+        response = jsonify({'success': True, 'data': results[0]})
+        response.headers['Cache-Control'] = f'private, max-age={CACHE_MAX_AGE}'
+        return response
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@recommendations_bp.route('/<user_id>', methods=['POST'])
+@login_required
+def profile_recommendations(user_id):
+    """Ranked offers for a profile submitted from the Recommendation page"""
+    try:
+        data = request.get_json() or {}
+        if not isinstance(data, dict):
+            raise ValueError('request body must be a JSON object')
+        missing = [name for name in FEATURE_NAMES if data.get(name) in (None, '')]
+        if missing:
+            return jsonify({'success': False, 'error': f"Missing fields: {', '.join(missing)}"}), 400
+
+        top_k = int(data.get('top_k', DEFAULT_TOP_K))
+        result = get_recommendation_engine().recommend_for_profile(data, user_id=user_id, top_k=top_k)
+        return jsonify({'success': True, 'data': result})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@recommendations_bp.route('/batch', methods=['POST'])
+@login_required
+def batch_recommendations():
+    """Rank offers for many customers in one call (campaign generation)"""
+    try:
+        data = request.get_json() or {}
+        if not isinstance(data, dict):
+            raise ValueError('request body must be a JSON object')
+        user_ids = data.get('user_ids') or []
+        if not isinstance(user_ids, list):
+            raise ValueError('user_ids must be a list')
+        if not user_ids:
+            return jsonify({'success': False, 'error': 'user_ids is required'}), 400
+        if len(user_ids) > MAX_BATCH_SIZE:
+            return jsonify({'success': False, 'error': f'At most {MAX_BATCH_SIZE} customers per request'}), 400
+
+        top_k = int(data.get('top_k', DEFAULT_TOP_K))
+        results = get_recommendation_engine().recommend_for_customers(user_ids, top_k=top_k)
+        return jsonify({'success': True, 'data': results, 'not_found': len(user_ids) - len(results)})
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,67 @@
+from flask import Blueprint, request, jsonify, session
+from config import Config
+from utils.decorators import login_required
+from utils.uploads import UploadConflict, UploadError, get_upload_manager
+
+uploads_bp = Blueprint('uploads', __name__, url_prefix='/api/uploads')
+
+
+def upload_response(upload):
+    data = {key: value for key, value in upload.items() if key != 'owner'}
+    data['chunk_size'] = Config.UPLOAD_CHUNK_SIZE
+    return data
+
+
+def _own_upload(upload_id):
+    upload = get_upload_manager().get(upload_id)
+    if upload is None or upload.get('owner') != session.get('user_id'):
+        return None
+    return upload
+
+
+@uploads_bp.route('', methods=['POST'])
+@login_required
+def create_upload():
+    """Start a resumable upload of a customer or event CSV"""
+    try:
+        data = request.get_json() or {}
+        upload = get_upload_manager().create(
+            data.get('kind'), data.get('filename'), data.get('size', 0), owner=session.get('user_id'))
+        return jsonify({'success': True, 'data': upload_response(upload)}), 201
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@uploads_bp.route('/<upload_id>', methods=['GET'])
+@login_required
+def upload_status(upload_id):
+    """Upload offset (to resume from) and processing progress"""
+    try:
+        upload = _own_upload(upload_id)
+        if upload is None:
+            return jsonify({'success': False, 'error': 'Upload not found'}), 404
+        return jsonify({'success': True, 'data': upload_response(upload)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@uploads_bp.route('/<upload_id>', methods=['PUT'])
+@login_required
+def upload_chunk(upload_id):
+    """Append the request body to the upload at ?offset="""
+    try:
+        if _own_upload(upload_id) is None:
+            return jsonify({'success': False, 'error': 'Upload not found'}), 404
+        offset = request.args.get('offset', type=int)
+        if offset is None:
+            return jsonify({'success': False, 'error': 'offset is required'}), 400
+        upload = get_upload_manager().write_chunk(upload_id, offset, request.stream)
+        return jsonify({'success': True, 'data': upload_response(upload)})
+    except UploadConflict as e:
+        return jsonify({'success': False, 'error': str(e), 'offset': e.offset}), 409
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,62 @@
+// Real aggregated data arrays
+const churnTrendLabels = ["0-6","7-12","13-24","25-36","37-48","49-60","60+"];
+const churnTrendValues = [16.4,14.4,17.4,16.8,14.5,0,0];
+
+const segmentLabels = ["At Risk","Dormant","High Value","Loyal","Stable"];
+const segmentChurn = [14.1,28.8,7.9,16.6,8.6];
+
+const verificationLabels = ["Automated Biometric","Hybrid","Manual Review","OCR"];
+const verificationChurn = [15.4,17.1,17.2,15.1];
+
+const engagementLabels = [0,1,2,3,4,5];
+const engagementCounts = [21,269,736,1348,2008,0];
+
+const ageLabels = ["26-35","36-45","46-60","60+"];
+const ageChurnValues = [12.6,16.1,16.4,14.1];
+
+const balanceLabels = ["Retained","Churned"];
+const balanceValues = [60853,59899];
+
+const offersLabels = ["Upsell / Cross-sell","Reactivation","VIP / Concierge","Cashback / Personalized","Referral / Perks"];
+const offersCounts = [3054,2754,1524,1373,1295];
+
+// Chart rendering
+new Chart(document.getElementById('churnTrend'),{
+  type:'line',
+  data:{labels:churnTrendLabels,datasets:[{label:'Churn %',data:churnTrendValues,borderWidth:2,tension:0.3}]},
+  options:{scales:{y:{ticks:{callback:v=>v+"%"}}},plugins:{legend:{display:false}}}
+});
+
+new Chart(document.getElementById('churnBySegment'),{
+  type:'bar',
+  data:{labels:segmentLabels,datasets:[{data:segmentChurn}]},
+  options:{plugins:{legend:{display:false}},scales:{y:{ticks:{callback:v=>v+"%"}}}}
+});
+
+new Chart(document.getElementById('verificationImpact'),{
+  type:'pie',
+  data:{labels:verificationLabels,datasets:[{data:verificationChurn}]}
+});
+
+new Chart(document.getElementById('engagementDist'),{
+  type:'bar',
+  data:{labels:engagementLabels,datasets:[{data:engagementCounts}]},
+  options:{plugins:{legend:{display:false}}}
+});
+
+new Chart(document.getElementById('ageChurn'),{
+  type:'line',
+  data:{labels:ageLabels,datasets:[{data:ageChurnValues}]},
+  options:{scales:{y:{ticks:{callback:v=>v+"%"}}},plugins:{legend:{display:false}}}
+});
+
+new Chart(document.getElementById('balanceChurn'),{
+  type:'doughnut',
+  data:{labels:balanceLabels,datasets:[{data:balanceValues}]}
+});
+
+new Chart(document.getElementById('offers'),{
+  type:'bar',
+  data:{labels:offersLabels,datasets:[{data:offersCounts}]},
+  options:{plugins:{legend:{display:false}}}
+});
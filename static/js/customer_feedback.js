@@ -0,0 +1,613 @@
+// Sample data for different card categories
+const cardData = {
+    basic: {
+        name: "Basic/Blue Card",
+        icon: "💳",
+        totalCustomers: 1800,
+        churnRate: 35.2,
+        avgRating: 2.8,
+        complaints: [
+            {
+                rank: 1,
+                title: "High Maintenance Fees",
+                percentage: 28,
+                customers: 504,
+                description: "Customers complaining about $15-25 monthly maintenance fees being too high for basic services"
+            },
+            {
+                rank: 2,
+                title: "Low Credit Limits",
+                percentage: 22,
+                customers: 396,
+                description: "Credit limits of $1,000-$5,000 considered insufficient for customer needs"
+            },
+            {
+                rank: 3,
+                title: "Poor Customer Service",
+                percentage: 18,
+                customers: 324,
+                description: "Long wait times and inadequate support from customer service representatives"
+            }
+        ],
+        strategies: [
+            {
+                title: "Fee Restructuring",
+                description: "Implement tiered fee structure based on account balance or introduce fee-free basic accounts for students and seniors"
+            },
+            {
+                title: "Credit Limit Review",
+                description: "Develop automated credit limit review system to increase limits for customers with good payment history"
+            },
+            {
+                title: "Service Enhancement",
+                description: "Implement callback system to reduce wait times and provide dedicated support channels for basic card holders"
+            }
+        ]
+    },
+    silver: {
+        name: "Silver Card",
+        icon: "🥈",
+        totalCustomers: 1500,
+        churnRate: 28.4,
+        avgRating: 3.2,
+        complaints: [
+            {
+                rank: 1,
+                title: "Limited Rewards Program",
+                percentage: 24,
+                customers: 360,
+                description: "Cashback rates and rewards considered inferior compared to competitor offerings"
+            },
+            {
+                rank: 2,
+                title: "ATM Fee Issues",
+                percentage: 20,
+                customers: 300,
+                description: "High ATM fees and limited fee-free ATM network access"
+            },
+            {
+                rank: 3,
+                title: "Online Banking Problems",
+                percentage: 17,
+                customers: 255,
+                description: "Website crashes, slow loading times, and mobile app functionality issues"
+            }
+        ],
+        strategies: [
+            {
+                title: "Rewards Enhancement",
+                description: "Increase cashback rates to 1.5% on all purchases and introduce bonus categories for gas and groceries"
+            },
+            {
+                title: "ATM Network Expansion",
+                description: "Partner with additional ATM networks and reimburse fees for first 5 transactions per month"
+            },
+            {
+                title: "Digital Platform Upgrade",
+                description: "Invest in modern banking platform with improved mobile app functionality and faster response times"
+            }
+        ]
+    },
+    gold: {
+        name: "Gold Card",
+        icon: "🥇",
+        totalCustomers: 1200,
+        churnRate: 22.8,
+        avgRating: 3.6,
+        complaints: [
+            {
+                rank: 1,
+                title: "Travel Benefits Issues",
+                percentage: 26,
+                customers: 312,
+                description: "Travel insurance claims processing delays and limited airport lounge access"
+            },
+            {
+                rank: 2,
+                title: "Annual Fee Concerns",
+                percentage: 21,
+                customers: 252,
+                description: "Annual fee of $95-150 not justified by provided benefits and services"
+            },
+            {
+                rank: 3,
+                title: "Purchase Protection Claims",
+                percentage: 19,
+                customers: 228,
+                description: "Complicated claims process for purchase protection and extended warranty benefits"
+            }
+        ],
+        strategies: [
+            {
+                title: "Travel Benefits Streamlining",
+                description: "Simplify travel insurance claims process and expand airport lounge partnerships globally"
+            },
+            {
+                title: "Annual Fee Justification",
+                description: "Add more valuable perks like dining credits, streaming service benefits, and exclusive offers"
+            },
+            {
+                title: "Claims Process Improvement",
+                description: "Implement digital claims submission with AI-powered processing for faster resolution"
+            }
+        ]
+    },
+    platinum: {
+        name: "Platinum Card",
+        icon: "💎",
+        totalCustomers: 900,
+        churnRate: 18.5,
+        avgRating: 4.1,
+        complaints: [
+            {
+                rank: 1,
+                title: "Concierge Service Quality",
+                percentage: 23,
+                customers: 207,
+                description: "Concierge service unable to fulfill requests or provide adequate assistance"
+            },
+            {
+                rank: 2,
+                title: "Reward Redemption Limits",
+                percentage: 20,
+                customers: 180,
+                description: "Limited availability for premium reward redemptions and blackout dates"
+            },
+            {
+                rank: 3,
+                title: "Interest Rate Concerns",
+                percentage: 18,
+                customers: 162,
+                description: "High interest rates despite premium card status and excellent credit scores"
+            }
+        ],
+        strategies: [
+            {
+                title: "Concierge Service Upgrade",
+                description: "Partner with premium concierge services and provide 24/7 multilingual support for complex requests"
+            },
+            {
+                title: "Reward Flexibility",
+                description: "Expand reward inventory and reduce blackout restrictions, especially for travel redemptions"
+            },
+            {
+                title: "Interest Rate Optimization",
+                description: "Offer promotional 0% APR periods and competitive rates based on relationship banking"
+            }
+        ]
+    },
+    titanium: {
+        name: "Titanium Card",
+        icon: "⚡",
+        totalCustomers: 300,
+        churnRate: 15.2,
+        avgRating: 4.4,
+        complaints: [
+            {
+                rank: 1,
+                title: "Exclusive Event Access",
+                percentage: 25,
+                customers: 75,
+                description: "Limited availability for exclusive events and experiences despite premium status"
+            },
+            {
+                rank: 2,
+                title: "Personal Banking Service",
+                percentage: 22,
+                customers: 66,
+                description: "Dedicated relationship manager not always available or knowledgeable enough"
+            },
+            {
+                rank: 3,
+                title: "International Service Issues",
+                percentage: 19,
+                customers: 57,
+                description: "Card blocked during international travel without proper notification systems"
+            }
+        ],
+        strategies: [
+            {
+                title: "Exclusive Experiences Expansion",
+                description: "Partner with luxury brands and create members-only events in major cities worldwide"
+            },
+            {
+                title: "Relationship Manager Enhancement",
+                description: "Provide specialized training and reduce client-to-manager ratios for more personalized service"
+            },
+            {
+                title: "International Services",
+                description: "Implement smart travel notification system and provide 24/7 international support hotline"
+            }
+        ]
+    },
+    signature: {
+        name: "Signature Card",
+        icon: "✨",
+        totalCustomers: 180,
+        churnRate: 12.8,
+        avgRating: 4.6,
+        complaints: [
+            {
+                rank: 1,
+                title: "Investment Service Access",
+                percentage: 27,
+                customers: 49,
+                description: "Limited access to exclusive investment opportunities and wealth management services"
+            },
+            {
+                rank: 2,
+                title: "Lifestyle Concierge Limitations",
+                percentage: 24,
+                customers: 43,
+                description: "Concierge unable to handle ultra-luxury requests or provide white-glove services"
+            },
+            {
+                rank: 3,
+                title: "Credit Limit Flexibility",
+                percentage: 21,
+                customers: 38,
+                description: "Insufficient credit limit increases despite significant wealth and income growth"
+            }
+        ],
+        strategies: [
+            {
+                title: "Investment Platform Integration",
+                description: "Provide access to private banking, hedge funds, and pre-IPO investment opportunities"
+            },
+            {
+                title: "Ultra-Luxury Concierge",
+                description: "Partner with global luxury service providers for yacht charters, private jets, and exclusive venues"
+            },
+            {
+                title: "Dynamic Credit Management",
+                description: "Implement real-time credit limit adjustments based on deposits and investment portfolio value"
+            }
+        ]
+    },
+    infinite: {
+        name: "Infinite/Black Card",
+        icon: "♠",
+        totalCustomers: 120,
+        churnRate: 8.5,
+        avgRating: 4.8,
+        complaints: [
+            {
+                rank: 1,
+                title: "Ultra-Premium Service Expectations",
+                percentage: 30,
+                customers: 36,
+                description: "Service quality doesn't match the ultra-premium positioning and annual fees"
+            },
+            {
+                rank: 2,
+                title: "Global Recognition Issues",
+                percentage: 26,
+                customers: 31,
+                description: "Card not recognized or accepted at some luxury establishments worldwide"
+            },
+            {
+                rank: 3,
+                title: "Personalization Limits",
+                percentage: 22,
+                customers: 26,
+                description: "Insufficient customization and personalization options for individual preferences"
+            }
+        ],
+        strategies: [
+            {
+                title: "White-Glove Service Standard",
+                description: "Implement highest-tier service protocols with dedicated teams and instant response guarantees"
+            },
+            {
+                title: "Global Partnership Expansion",
+                description: "Establish acceptance agreements with all luxury hotels, restaurants, and exclusive venues worldwide"
+            },
+            {
+                title: "Hyper-Personalization",
+                description: "Develop AI-driven personalization engine for customized offers, services, and experiences"
+            }
+        ]
+    }
+};
+
+// Chart variables - removed ratingChart
+let complaintChart, churnChart, complaintsByCardChart;
+let filterOpen = false;
+
+// Chart data, filled from /dashboard/api/charts before the charts are drawn
+const chartData = {
+    complaintDistribution: {
+        labels: [],
+        data: [],
+        colors: ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57', '#FF9FF3', '#54A0FF', '#5F27CD']
+    },
+    churnByCard: {
+        labels: [],
+        data: [],
+        colors: ['#FF6B6B', '#FF8E53', '#FF9F43', '#FFC048', '#32D74B', '#007AFF', '#5856D6']
+    },
+    complaintsByCard: {
+        labels: [],
+        data: [],
+        colors: ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe', '#43e97b']
+    }
+};
+
+async function fetchChart(name, params) {
+    const query = params ? '?' + new URLSearchParams(params) : '';
+    const response = await fetch(`/dashboard/api/charts/${name}${query}`, { credentials: 'same-origin' });
+    const payload = await response.json();
+    if (!payload.success) {
+        throw new Error(payload.error || `Chart ${name} failed`);
+    }
+    return payload.data;
+}
+
+async function loadChartData() {
+    const [complaints, churn, complaintsByCard] = await Promise.all([
+        fetchChart('complaints_by_type'),
+        fetchChart('churn_by_category', { column: 'Card_Category' }),
+        fetchChart('complaints_by_category', { column: 'Card_Category' })
+    ]);
+    chartData.complaintDistribution.labels = complaints.labels;
+    chartData.complaintDistribution.data = complaints.series.share;
+    chartData.churnByCard.labels = churn.labels;
+    chartData.churnByCard.data = churn.series.churn_rate;
+    chartData.complaintsByCard.labels = complaintsByCard.labels;
+    chartData.complaintsByCard.data = complaintsByCard.series.complaints;
+}
+
+// Initialize charts when page loads
+document.addEventListener('DOMContentLoaded', function() {
+    loadChartData()
+        .then(initializeCharts)
+        .catch(error => console.error('Chart data failed to load:', error));
+});
+
+function initializeCharts() {
+    // Complaint Distribution Doughnut Chart
+    const ctx1 = document.getElementById('complaintDistributionChart').getContext('2d');
+    complaintChart = new Chart(ctx1, {
+        type: 'doughnut',
+        data: {
+            labels: chartData.complaintDistribution.labels,
+            datasets: [{
+                data: chartData.complaintDistribution.data,
+                backgroundColor: chartData.complaintDistribution.colors,
+                borderWidth: 2,
+                borderColor: '#fff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    position: 'bottom',
+                    labels: {
+                        padding: 15,
+                        usePointStyle: true,
+                        font: { size: 11 }
+                    }
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return context.label + ': ' + context.parsed + '%';
+                        }
+                    }
+                }
+            }
+        }
+    });
+
+    // Churn Rate Bar Chart
+    const ctx2 = document.getElementById('churnRateChart').getContext('2d');
+    churnChart = new Chart(ctx2, {
+        type: 'bar',
+        data: {
+            labels: chartData.churnByCard.labels,
+            datasets: [{
+                label: 'Churn Rate (%)',
+                data: chartData.churnByCard.data,
+                backgroundColor: chartData.churnByCard.colors,
+                borderWidth: 1,
+                borderColor: '#fff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return 'Churn Rate: ' + context.parsed.y + '%';
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        callback: function(value) {
+                            return value + '%';
+                        }
+                    },
+                    grid: {
+                        color: '#e3e6f0'
+                    }
+                },
+                x: {
+                    ticks: {
+                        maxRotation: 45,
+                        font: { size: 10 }
+                    },
+                    grid: {
+                        display: false
+                    }
+                }
+            }
+        }
+    });
+
+    // Complaints by Card Category Bar Chart
+    const ctx3 = document.getElementById('complaintsByCardChart').getContext('2d');
+    complaintsByCardChart = new Chart(ctx3, {
+        type: 'bar',
+        data: {
+            labels: chartData.complaintsByCard.labels,
+            datasets: [{
+                label: 'Number of Complaints',
+                data: chartData.complaintsByCard.data,
+                backgroundColor: chartData.complaintsByCard.colors,
+                borderWidth: 1,
+                borderColor: '#fff'
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                legend: {
+                    display: false
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return 'Complaints: ' + context.parsed.y.toLocaleString();
+                        }
+                    }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    ticks: {
+                        callback: function(value) {
+                            return value.toLocaleString();
+                        }
+                    },
+                    grid: {
+                        color: '#e3e6f0'
+                    }
+                },
+                x: {
+                    ticks: {
+                        maxRotation: 45,
+                        font: { size: 10 }
+                    },
+                    grid: {
+                        display: false
+                    }
+                }
+            }
+        }
+    });
+}
+
+function toggleFilter() {
+    const dropdown = document.getElementById('filterDropdown');
+    filterOpen = !filterOpen;
+    dropdown.classList.toggle('active', filterOpen);
+}
+
+function showCardAnalysis() {
+    const selectedCard = document.getElementById('cardSelect').value;
+    const analysisSection = document.getElementById('cardAnalysis');
+    const overviewCharts = document.getElementById('overviewCharts');
+
+    if (!selectedCard) {
+        analysisSection.classList.remove('active');
+        overviewCharts.style.display = 'grid';
+        return;
+    }
+
+    overviewCharts.style.display = 'none';
+    const data = cardData[selectedCard];
+
+    analysisSection.innerHTML = `
+        <div class="card-analysis">
+            <div class="card-title">
+                <div class="card-icon">${data.icon}</div>
+                ${data.name} Analysis
+            </div>
+
+            <div class="stats-grid">
+                <div class="stat-card">
+                    <div class="stat-value">${data.totalCustomers.toLocaleString()}</div>
+                    <div class="stat-label">Total Customers</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-value">${data.churnRate}%</div>
+                    <div class="stat-label">Churn Rate</div>
+                </div>
+                <div class="stat-card">
+                    <div class="stat-value">${data.avgRating}</div>
+                    <div class="stat-label">Avg Rating</div>
+                </div>
+            </div>
+
+            <h3 style="margin: 30px 0 20px; color: #2c3e50;">Top 3 Complaints</h3>
+            <div class="complaints-grid">
+                ${data.complaints.map(complaint => `
+                    <div class="complaint-card">
+                        <div class="complaint-rank">#${complaint.rank}</div>
+                        <div class="complaint-title">${complaint.title}</div>
+                        <div class="complaint-stats">
+                            <strong>${complaint.percentage}%</strong> of complaints<br>
+                            <strong>${complaint.customers.toLocaleString()}</strong> customers affected<br><br>
+                            ${complaint.description}
+                        </div>
+                    </div>
+                `).join('')}
+            </div>
+
+            <div class="strategies-section">
+                <div class="strategies-title">
+                    <span style="font-size: 1.5em;">🎯</span>
+                    Business Strategies & Recommendations
+                </div>
+                <div class="strategy-list">
+                    ${data.strategies.map(strategy => `
+                        <div class="strategy-item">
+                            <h4>${strategy.title}</h4>
+                            <p>${strategy.description}</p>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        </div>
+    `;
+
+    analysisSection.classList.add('active');
+}
+
+function resetAnalysis() {
+    document.getElementById('cardSelect').value = '';
+    document.getElementById('cardAnalysis').classList.remove('active');
+    const overviewCharts = document.getElementById('overviewCharts');
+    overviewCharts.style.display = 'grid';
+    document.getElementById('filterDropdown').classList.remove('active');
+    filterOpen = false;
+
+    // Re-initialize charts if they were destroyed
+    if (!complaintChart || complaintChart.canvas === null) {
+        setTimeout(initializeCharts, 100);
+    }
+}
+
+// Close dropdown when clicking outside
+document.addEventListener('click', function(event) {
+    const filterSection = document.querySelector('.filter-section');
+    const dropdown = document.getElementById('filterDropdown');
+
+    if (!filterSection.contains(event.target) && filterOpen) {
+        dropdown.classList.remove('active');
+        filterOpen = false;
+    }
+});
@@ -0,0 +1,186 @@
+// Customers are paged from /dashboard/api/customers; filtering happens server-side
+const PAGE_SIZE = 50;
+
+// Fallback when a customer has no offers on record
+const offerMapping = {
+    "At Risk": ["Retention Discount / Cashback", "Personalized Outreach / Call", "Loyalty Points Boost"],
+    "Dormant": ["Reactivation Campaign", "Limited-time Incentives", "Feature Reminder / App Engagement"],
+    "High Value": ["VIP Treatment / Premium Offers", "Concierge / Priority Service", "Exclusive Rewards"],
+    "Loyal": ["Referral Programs", "Premium Perks", "Anniversary / Milestone Gifts"],
+    "Stable": ["Gradual Upsell / Cross-sell", "Regular Engagement Notifications", "Periodic Rewards"]
+};
+
+let selectedSegment = 'All';
+let nextCursor = null;
+let shownCount = 0;
+let totalCount = 0;
+// Ignore responses for a filter the user has already moved away from
+let requestId = 0;
+
+function getSegmentClass(segment) {
+    const classes = {
+        'High Value': 'segment-high-value',
+        'Loyal': 'segment-loyal',
+        'Stable': 'segment-stable',
+        'At Risk': 'segment-at-risk',
+        'Dormant': 'segment-dormant'
+    };
+    return classes[segment] || 'segment-high-value';
+}
+
+function customersUrl(cursor) {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (selectedSegment !== 'All') {
+        params.set('segment', selectedSegment);
+    }
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    return `/dashboard/api/customers?${params.toString()}`;
+}
+
+async function loadCustomers(append) {
+    const current = ++requestId;
+    const loadMoreBtn = document.getElementById('load-more-btn');
+    loadMoreBtn.disabled = true;
+
+    try {
+        const response = await fetch(customersUrl(append ? nextCursor : null));
+        const result = await response.json();
+        if (current !== requestId) {
+            return;
+        }
+        if (!result.success) {
+            throw new Error(result.error || 'Failed to load customers');
+        }
+
+        const page = result.data;
+        if (!append) {
+            document.getElementById('customers-table').innerHTML = '';
+            shownCount = 0;
+            totalCount = page.total;
+        }
+        renderCustomers(page.customers);
+        nextCursor = page.next_cursor;
+    } catch (error) {
+        if (current === requestId) {
+            document.getElementById('showing-count').textContent = `Could not load customers: ${error.message}`;
+        }
+        return;
+    } finally {
+        if (current === requestId) {
+            loadMoreBtn.disabled = false;
+        }
+    }
+
+    loadMoreBtn.classList.toggle('hidden', !nextCursor);
+    document.getElementById('showing-count').textContent = `Showing ${shownCount} customers`;
+    document.getElementById('total-count').textContent = `Total customers: ${totalCount}`;
+}
+
+function cell(text) {
+    const td = document.createElement('td');
+    td.textContent = text;
+    return td;
+}
+
+function renderCustomers(customers) {
+    const tbody = document.getElementById('customers-table');
+    const fragment = document.createDocumentFragment();
+
+    customers.forEach(customer => {
+        const row = document.createElement('tr');
+        row.appendChild(cell(customer.customer_id));
+        row.appendChild(cell(customer.attrition_flag));
+        row.appendChild(cell(customer.age));
+        row.appendChild(cell(customer.gender));
+        row.appendChild(cell(customer.income_category));
+        row.appendChild(cell(customer.card_category));
+
+        const segmentCell = document.createElement('td');
+        const badge = document.createElement('span');
+        badge.className = `segment-badge ${getSegmentClass(customer.segment)}`;
+        badge.textContent = (customer.segment || '').toUpperCase();
+        segmentCell.appendChild(badge);
+        row.appendChild(segmentCell);
+
+        const actionCell = document.createElement('td');
+        const button = document.createElement('button');
+        button.className = 'send-offer-btn';
+        button.textContent = 'SEND OFFER';
+        button.addEventListener('click', () => sendOffer(customer));
+        actionCell.appendChild(button);
+        row.appendChild(actionCell);
+
+        fragment.appendChild(row);
+    });
+
+    tbody.appendChild(fragment);
+    shownCount += customers.length;
+}
+
+function setActiveFilter(segment) {
+    selectedSegment = segment;
+
+    // Update button states
+    document.querySelectorAll('.filter-btn[data-segment]').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    document.querySelector(`[data-segment="${segment}"]`).classList.add('active');
+
+    nextCursor = null;
+    loadCustomers(false);
+}
+
+function sendOffer(customer) {
+    const details = document.getElementById('customer-details');
+    details.innerHTML = '';
+    [
+        `Customer ID: ${customer.customer_id}`,
+        `Segment: ${customer.segment}`,
+        `Age: ${customer.age}`,
+        `Card Category: ${customer.card_category}`,
+        `Churn Risk: ${customer.risk_level} (${Math.round(customer.churn_probability * 100)}%)`
+    ].forEach(text => {
+        const item = document.createElement('li');
+        item.textContent = `• ${text}`;
+        details.appendChild(item);
+    });
+
+    const offers = customer.recommended_offers.length
+        ? customer.recommended_offers
+        : (offerMapping[customer.segment] || []);
+    document.getElementById('recommended-offers').textContent = offers.join('; ');
+
+    document.getElementById('modal').classList.remove('hidden');
+}
+
+function closeModal() {
+    document.getElementById('modal').classList.add('hidden');
+}
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    loadCustomers(false);
+
+    // Add event listeners to filter buttons
+    document.querySelectorAll('.filter-btn[data-segment]').forEach(btn => {
+        btn.addEventListener('click', function() {
+            setActiveFilter(this.dataset.segment);
+        });
+    });
+
+    document.getElementById('load-more-btn').addEventListener('click', function() {
+        loadCustomers(true);
+    });
+
+    // Initialize Feather icons
+    feather.replace();
+
+    // Close modal when clicking outside
+    document.getElementById('modal').addEventListener('click', function(e) {
+        if (e.target === this) {
+            closeModal();
+        }
+    });
+});
@@ -429,30 +429,44 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 });
 
-// Real-time data updates (simulated)
+// Real-time data updates pushed from the server (server-sent events)
+const LIVE_STAT_CARDS = {
+    'customer-segmentation': { field: 'customer_segments' },
+    'ekyc-issues': { field: 'model_accuracy', suffix: '%' },
+    'feedback-support': { field: 'open_complaints' },
+    'analytics-dashboard': { field: 'total_customers' }
+};
+
 function startRealTimeUpdates() {
-    setInterval(() => {
-        updateDashboardStats();
-    }, 30000); // Update every 30 seconds
+    if (typeof EventSource === 'undefined') return;
+
+    // EventSource reconnects on its own and resumes from the last event id
+    const stream = new EventSource('/dashboard/api/stream');
+    stream.addEventListener('error', () => {
+        // A refused stream (503 when the server is at capacity) is not retried by the browser
+        if (stream.readyState === EventSource.CLOSED) {
+            setTimeout(startRealTimeUpdates, 5000 + Math.random() * 10000);
+        }
+    });
+    stream.addEventListener('stats', event => updateDashboardStats(JSON.parse(event.data)));
+    stream.addEventListener('alert', event => {
+        const alert = JSON.parse(event.data);
+        showNotification(alert.message, 'warning');
+    });
+    stream.addEventListener('notification', event => {
+        const notification = JSON.parse(event.data);
+        showNotification(`${notification.title}: ${notification.message}`, notification.type);
+    });
+    window.addEventListener('beforeunload', () => stream.close());
 }
 
-function updateDashboardStats() {
-    const stats = [
-        { selector: '.dashboard-card[data-card="ai-recommendations"] .stat-number', 
-          baseValue: 247, variance: 5 },
-        { selector: '.dashboard-card[data-card="customer-segmentation"] .stat-number', 
-          baseValue: 12, variance: 1 },
-        { selector: '.dashboard-card[data-card="ekyc-issues"] .stat-number', 
-          baseValue: 23, variance: 3 },
-        { selector: '.dashboard-card[data-card="feedback-support"] .stat-number', 
-          baseValue: 156, variance: 10 }
-    ];
-    
-    stats.forEach(stat => {
-        const element = document.querySelector(stat.selector);
+function updateDashboardStats(changes) {
+    Object.entries(LIVE_STAT_CARDS).forEach(([card, stat]) => {
+        if (!(stat.field in changes) || changes[stat.field] === null) return;
+
+        const element = document.querySelector(`.dashboard-card[data-card="${card}"] .stat-number`);
         if (element) {
-            const newValue = stat.baseValue + Math.floor(Math.random() * stat.variance * 2) - stat.variance;
-            element.textContent = newValue;
+            element.textContent = changes[stat.field].toLocaleString() + (stat.suffix || '');
             
             // Add a subtle flash effect
             element.style.color = '#48bb78';
@@ -464,7 +478,7 @@ function updateDashboardStats() {
 }
 
 // Initialize real-time updates
-setTimeout(startRealTimeUpdates, 5000); // Start after 5 seconds
+document.addEventListener('DOMContentLoaded', startRealTimeUpdates);
 
 // Export functions for use in other modules
 window.dashboardFunctions = {
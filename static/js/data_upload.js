@@ -0,0 +1,171 @@
+// Resumable chunked uploads to /api/uploads, then progress polling
+const MAX_RETRIES = 5;
+const POLL_INTERVAL_MS = 1000;
+
+const STATUS_LABELS = {
+    uploading: 'Uploading',
+    queued: 'Queued for processing',
+    validating: 'Validating rows',
+    importing: 'Importing',
+    done: 'Done',
+    failed: 'Failed'
+};
+
+// Uploads are remembered per file so a reload or dropped connection resumes
+function resumeKey(kind, file) {
+    return `upload:${kind}:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function api(url, options) {
+    const response = await fetch(url, options);
+    const result = await response.json();
+    return { status: response.status, result };
+}
+
+async function startOrResume(kind, file) {
+    const key = resumeKey(kind, file);
+    const existing = localStorage.getItem(key);
+    if (existing) {
+        const { status, result } = await api(`/api/uploads/${existing}`);
+        if (status === 200 && result.data.status === 'uploading') {
+            return result.data;
+        }
+        localStorage.removeItem(key);
+    }
+
+    const { result } = await api('/api/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ kind, filename: file.name, size: file.size })
+    });
+    if (!result.success) {
+        throw new Error(result.error);
+    }
+    localStorage.setItem(key, result.data.id);
+    return result.data;
+}
+
+function sleep(ms) {
+    return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+async function sendChunks(upload, file) {
+    const chunkSize = upload.chunk_size || window.UPLOAD_CHUNK_SIZE;
+    let offset = upload.offset;
+    let retries = 0;
+
+    while (offset < file.size) {
+        const chunk = file.slice(offset, Math.min(offset + chunkSize, file.size));
+        try {
+            const { status, result } = await api(`/api/uploads/${upload.id}?offset=${offset}`, {
+                method: 'PUT',
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: chunk
+            });
+            if (status === 409) {
+                // The server has a different offset (e.g. a partial chunk); continue from there
+                offset = result.offset;
+                continue;
+            }
+            if (!result.success) {
+                throw Object.assign(new Error(result.error), { fatal: status === 400 });
+            }
+            offset = result.data.offset;
+            retries = 0;
+            showUploadProgress(offset, file.size);
+        } catch (error) {
+            if (error.fatal || ++retries > MAX_RETRIES) {
+                throw error;
+            }
+            await sleep(1000 * 2 ** retries);
+            const { result } = await api(`/api/uploads/${upload.id}`);
+            offset = result.data.offset;
+        }
+    }
+}
+
+function showUploadProgress(offset, size) {
+    const percent = Math.round(offset / size * 100);
+    document.getElementById('upload-percent').textContent = `${percent}%`;
+    document.getElementById('upload-fill').style.width = `${percent}%`;
+}
+
+function showStatus(upload) {
+    const percent = Math.round((upload.progress || 0) * 100);
+    document.getElementById('process-status').textContent = STATUS_LABELS[upload.status] || upload.status;
+    document.getElementById('process-percent').textContent = `${percent}%`;
+    document.getElementById('process-fill').style.width = `${percent}%`;
+
+    const summary = [
+        `Rows read: ${upload.rows_read}`,
+        `Valid: ${upload.rows_valid}`,
+        `Rejected: ${upload.rows_rejected}`
+    ];
+    if (upload.result && upload.result.customers !== undefined) {
+        summary.push(`Customers now: ${upload.result.customers} (${upload.result.new_customers} new)`);
+    }
+    if (upload.result && upload.result.events !== undefined) {
+        summary.push(`Events added: ${upload.result.events}`);
+    }
+    upload.warnings.forEach(warning => summary.push(warning));
+    document.getElementById('upload-summary').textContent = summary.join(' · ');
+
+    const errors = document.getElementById('upload-errors');
+    errors.innerHTML = '';
+    upload.errors.forEach(error => {
+        const item = document.createElement('li');
+        item.textContent = error.row
+            ? `Row ${error.row}, ${error.column}: ${error.value === null ? 'missing' : error.value}`
+            : error.value;
+        errors.appendChild(item);
+    });
+}
+
+async function pollStatus(uploadId) {
+    while (true) {
+        const { result } = await api(`/api/uploads/${uploadId}`);
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        showStatus(result.data);
+        if (result.data.status === 'done' || result.data.status === 'failed') {
+            return result.data;
+        }
+        await sleep(POLL_INTERVAL_MS);
+    }
+}
+
+async function upload() {
+    const file = document.getElementById('upload-file').files[0];
+    const kind = document.getElementById('upload-kind').value;
+    if (!file) {
+        alert('Choose a CSV file first');
+        return;
+    }
+
+    const button = document.getElementById('upload-btn');
+    button.disabled = true;
+    document.getElementById('upload-progress').classList.remove('hidden');
+    document.getElementById('upload-errors').innerHTML = '';
+
+    try {
+        const current = await startOrResume(kind, file);
+        showUploadProgress(current.offset, file.size);
+        await sendChunks(current, file);
+        localStorage.removeItem(resumeKey(kind, file));
+        await pollStatus(current.id);
+    } catch (error) {
+        document.getElementById('process-status').textContent = `Failed: ${error.message}`;
+        // A rejected file (e.g. wrong columns) cannot be resumed; a network failure can
+        if (error.fatal) {
+            localStorage.removeItem(resumeKey(kind, file));
+        }
+    } finally {
+        button.disabled = false;
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.getElementById('upload-btn').addEventListener('click', upload);
+    feather.replace();
+});
@@ -0,0 +1,119 @@
+// Initialize Risk Distribution Chart
+const ctx = document.getElementById('riskChart').getContext('2d');
+const riskChart = new Chart(ctx, {
+    type: 'doughnut',
+    data: {
+        labels: ['High Risk', 'Medium Risk', 'Low Risk'],
+        datasets: [{
+            data: [],
+            backgroundColor: [
+                '#e74c3c',
+                '#f39c12', 
+                '#27ae60'
+            ],
+            borderWidth: 3,
+            borderColor: '#fff'
+        }]
+    },
+    options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+            legend: {
+                position: 'bottom',
+                labels: {
+                    padding: 20,
+                    font: {
+                        size: 12,
+                        weight: '600'
+                    }
+                }
+            }
+        }
+    }
+});
+
+// Risk bands of the whole book, scored on the server
+fetch('/dashboard/api/charts/risk_distribution', { credentials: 'same-origin' })
+    .then(response => response.json())
+    .then(payload => {
+        if (!payload.success) {
+            throw new Error(payload.error);
+        }
+        riskChart.data.labels = payload.data.labels.map(label => `${label} Risk`);
+        riskChart.data.datasets[0].data = payload.data.series.customers;
+        riskChart.update();
+    })
+    .catch(error => console.error('Risk distribution failed to load:', error));
+
+// Tab switching functionality
+function showTab(tabName) {
+    // Hide all tab contents
+    const tabContents = document.querySelectorAll('.tab-content');
+    tabContents.forEach(content => content.classList.remove('active'));
+
+    // Remove active class from all buttons
+    const tabButtons = document.querySelectorAll('.tab-btn');
+    tabButtons.forEach(btn => btn.classList.remove('active'));
+
+    // Show selected tab content
+    document.getElementById(tabName).classList.add('active');
+
+    // Add active class to clicked button
+    event.target.classList.add('active');
+}
+
+// Simulate customer analysis
+function analyzeCustomer() {
+    const customerId = document.getElementById('customerIdInput').value;
+    const resultDiv = document.getElementById('customerResult');
+
+    if (customerId && customerId >= 1 && customerId <= 5000) {
+        // Simulate analysis result
+        resultDiv.style.display = 'block';
+        resultDiv.innerHTML = `
+            <div class="risk-badge risk-high">High Risk - 0.${Math.floor(Math.random() * 200 + 750)}</div>
+            <h4>Customer #${customerId} Analysis</h4>
+            <p><strong>Status:</strong> ${Math.random() > 0.3 ? 'Active' : 'Churned'}</p>
+            <div style="margin-top: 15px;">
+                <p><strong>KYC Metrics:</strong></p>
+                <ul style="margin-left: 20px; margin-top: 5px;">
+                    <li>Failed Verifications: ${Math.floor(Math.random() * 8 + 1)}</li>
+                    <li>Document Rejection Rate: ${(Math.random() * 0.8 + 0.1).toFixed(1)}%</li>
+                    <li>KYC Approval Days: ${(Math.random() * 20 + 5).toFixed(1)}</li>
+                    <li>Friction Score: ${(Math.random() * 3 + 1).toFixed(2)}</li>
+                    <li>Support Tickets: ${Math.floor(Math.random() * 5)}</li>
+                </ul>
+            </div>
+        `;
+    } else {
+        alert('Please enter a valid Customer ID (1-5000)');
+    }
+}
+
+// Add some interactive effects
+document.addEventListener('DOMContentLoaded', function() {
+    // Animate numbers on load
+    const statNumbers = document.querySelectorAll('.stat-number');
+    statNumbers.forEach(stat => {
+        const finalValue = stat.textContent;
+        stat.textContent = '0';
+
+        let current = 0;
+        const increment = parseFloat(finalValue.replace(/[^\d.]/g, '')) / 50;
+
+        const timer = setInterval(() => {
+            current += increment;
+            if (current >= parseFloat(finalValue.replace(/[^\d.]/g, ''))) {
+                stat.textContent = finalValue;
+                clearInterval(timer);
+            } else {
+                if (finalValue.includes('%')) {
+                    stat.textContent = Math.floor(current) + '%';
+                } else {
+                    stat.textContent = Math.floor(current).toLocaleString();
+                }
+            }
+        }, 50);
+    });
+});
@@ -0,0 +1,506 @@
+// Wait for DOM to be fully loaded
+document.addEventListener('DOMContentLoaded', function() {
+    console.log('🚀 Dashboard loading...');
+
+    try {
+        // Initialize tabs
+        initializeTabs();
+
+        // Initialize charts with delay to ensure DOM is ready
+        setTimeout(function() {
+            initializeCharts();
+            console.log('✅ Dashboard loaded successfully!');
+        }, 100);
+
+    } catch (error) {
+        console.error('❌ Dashboard initialization error:', error);
+    }
+});
+
+// Tab switching functionality
+function initializeTabs() {
+    const tabs = document.querySelectorAll('.tab');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    if (tabs.length === 0) {
+        console.warn('No tabs found');
+        return;
+    }
+
+    tabs.forEach(function(tab) {
+        tab.addEventListener('click', function() {
+            try {
+                const targetId = this.getAttribute('data-target');
+
+                // Remove active class from all tabs
+                tabs.forEach(function(t) {
+                    t.classList.remove('active');
+                });
+
+                // Hide all tab contents
+                tabContents.forEach(function(content) {
+                    content.classList.remove('active');
+                });
+
+                // Add active class to clicked tab
+                this.classList.add('active');
+
+                // Show selected tab content
+                const targetContent = document.getElementById(targetId);
+                if (targetContent) {
+                    targetContent.classList.add('active');
+                }
+
+                console.log('📋 Switched to tab:', targetId);
+            } catch (error) {
+                console.error('❌ Tab switching error:', error);
+            }
+        });
+    });
+}
+
+// Initialize all charts
+function initializeCharts() {
+    try {
+        // Set Chart.js defaults
+        if (typeof Chart !== 'undefined') {
+            Chart.defaults.font = Chart.defaults.font || {};
+            Chart.defaults.font.family = 'system-ui, -apple-system, sans-serif';
+            Chart.defaults.color = '#64748b';
+        } else {
+            console.warn('Chart.js not loaded');
+            return;
+        }
+
+        // Pie Chart - Customer Distribution
+        createPieChart();
+
+        // Revenue Chart
+        createRevenueChart();
+
+        // Optimization Chart
+        createOptimizationChart();
+
+        // Simulation Chart
+        createSimulationChart();
+
+        // Segment Chart
+        createSegmentChart();
+
+        // Feature Chart
+        createFeatureChart();
+
+    } catch (error) {
+        console.error('❌ Chart initialization error:', error);
+    }
+}
+
+function createPieChart() {
+    const canvas = document.getElementById('pieChart');
+    if (!canvas) return;
+
+    loadChart('churn_by_category', { column: 'Card_Category' }).then(function(result) {
+        const total = result.series.customers.reduce((sum, count) => sum + count, 0);
+        new Chart(canvas.getContext('2d'), {
+            type: 'pie',
+            data: {
+                labels: result.labels.map((label, i) =>
+                    `${label} (${Math.round(result.series.customers[i] / total * 100)}%)`),
+                datasets: [{
+                    data: result.series.customers,
+                    backgroundColor: ['#3b82f6', '#10b981', '#f59e0b', '#8b5cf6', '#ef4444'],
+                    borderWidth: 2,
+                    borderColor: '#ffffff'
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom'
+                    }
+                }
+            }
+        });
+        console.log('✅ Pie chart created');
+    }).catch(function(error) {
+        console.error('❌ Pie chart error:', error);
+    });
+}
+
+function createRevenueChart() {
+    const canvas = document.getElementById('revenueChart');
+    if (!canvas) return;
+
+    loadChart('fee_curve').then(function(result) {
+        new Chart(canvas.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: result.labels.map(fee => '$' + fee),
+                datasets: [{
+                    label: `Revenue over ${result.months} months ($)`,
+                    data: result.series.revenue,
+                    borderColor: '#3b82f6',
+                    backgroundColor: 'rgba(59, 130, 246, 0.1)',
+                    fill: true,
+                    tension: 0.4
+                }, {
+                    label: 'Customers',
+                    data: result.series.customers,
+                    borderColor: '#10b981',
+                    backgroundColor: 'rgba(16, 185, 129, 0.1)',
+                    yAxisID: 'y1'
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        type: 'linear',
+                        display: true,
+                        position: 'left',
+                        title: {
+                            display: true,
+                            text: 'Revenue ($)'
+                        }
+                    },
+                    y1: {
+                        type: 'linear',
+                        display: true,
+                        position: 'right',
+                        title: {
+                            display: true,
+                            text: 'Customers'
+                        },
+                        grid: {
+                            drawOnChartArea: false,
+                        }
+                    }
+                }
+            }
+        });
+        console.log('✅ Revenue chart created');
+    }).catch(function(error) {
+        console.error('❌ Revenue chart error:', error);
+    });
+}
+
+// Server-side chart data, one request per chart and parameters
+const chartRequests = {};
+
+function loadChart(name, params) {
+    const query = params ? '?' + new URLSearchParams(params) : '';
+    const url = `/dashboard/api/charts/${name}${query}`;
+    if (!chartRequests[url]) {
+        chartRequests[url] = fetch(url, { credentials: 'same-origin' })
+            .then(function(response) { return response.json(); })
+            .then(function(payload) {
+                if (!payload.success) {
+                    throw new Error(payload.error || `Chart ${name} failed`);
+                }
+                return payload.data;
+            });
+    }
+    return chartRequests[url];
+}
+
+// Fee simulation results, fetched once and shared by both charts
+let feeSimulationRequest = null;
+
+function loadFeeSimulation() {
+    if (!feeSimulationRequest) {
+        feeSimulationRequest = fetch('/api/fees/simulation', { credentials: 'same-origin' })
+            .then(function(response) { return response.json(); })
+            .then(function(payload) {
+                if (!payload.success) {
+                    throw new Error(payload.error || 'Simulation failed');
+                }
+                showSimulationSummary(payload.data);
+                return payload.data;
+            });
+    }
+    return feeSimulationRequest;
+}
+
+function formatMoney(value) {
+    return '$' + Math.round(value).toLocaleString();
+}
+
+function showSimulationSummary(result) {
+    const best = result.best;
+    const setText = function(id, text) {
+        const element = document.getElementById(id);
+        if (element) element.textContent = text;
+    };
+
+    setText('optimalFee', '$' + best.fee.toFixed(2));
+    setText('optimalRevenue', 'Expected Revenue: ' + formatMoney(best.expected_revenue));
+    setText('expectedCustomers', Math.round(best.expected_customers).toLocaleString());
+    setText('breakpointFee', result.breakpoint_fee === null ? 'None' : '$' + result.breakpoint_fee.toFixed(2));
+    setText('breakpointAlert', result.breakpoint_fee === null
+        ? `No fee in the simulated range pushes churn past 1.5x the no-fee rate of ${result.baseline_churn_rate}%. Optimal fee is $${best.fee.toFixed(2)} with a $${best.threshold.toLocaleString()} waiver balance.`
+        : `Setting fees above $${result.breakpoint_fee.toFixed(2)} will cause accelerated customer churn. Optimal fee is $${best.fee.toFixed(2)} with a $${best.threshold.toLocaleString()} waiver balance.`);
+
+    setText('simulationRevenueTitle', `Total Revenue (${result.months} months)`);
+    setText('simulationRevenue', '$' + (best.expected_revenue / 1e6).toFixed(2) + 'M');
+    setText('simulationStrategy', `$${best.fee.toFixed(2)} fee, 90% range ${formatMoney(best.revenue_p5)} - ${formatMoney(best.revenue_p95)}`);
+    setText('simulationRetention', (100 - best.churn_rate).toFixed(1) + '%');
+    setText('simulationMonthlyRevenue', formatMoney(best.expected_revenue / result.months));
+}
+
+function createOptimizationChart() {
+    const canvas = document.getElementById('optimizationChart');
+    if (!canvas) return;
+
+    loadFeeSimulation().then(function(result) {
+        const curve = result.fee_curve;
+        new Chart(canvas.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: curve.fees.map(fee => '$' + fee),
+                datasets: [{
+                    label: 'Revenue ($)',
+                    data: curve.expected_revenue,
+                    borderColor: '#3b82f6',
+                    backgroundColor: 'rgba(59, 130, 246, 0.2)',
+                    fill: true,
+                    tension: 0.4
+                }, {
+                    label: 'Churn Rate (%)',
+                    data: curve.churn_rate,
+                    borderColor: '#dc2626',
+                    borderWidth: 3,
+                    yAxisID: 'y1'
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        type: 'linear',
+                        display: true,
+                        position: 'left',
+                        title: {
+                            display: true,
+                            text: 'Revenue ($)'
+                        }
+                    },
+                    y1: {
+                        type: 'linear',
+                        display: true,
+                        position: 'right',
+                        title: {
+                            display: true,
+                            text: 'Churn Rate (%)'
+                        },
+                        grid: {
+                            drawOnChartArea: false,
+                        }
+                    }
+                }
+            }
+        });
+        console.log('✅ Optimization chart created');
+    }).catch(function(error) {
+        console.error('❌ Optimization chart error:', error);
+    });
+}
+
+function createSimulationChart() {
+    const canvas = document.getElementById('simulationChart');
+    if (!canvas) return;
+
+    loadFeeSimulation().then(function(result) {
+        const timeline = result.timeline;
+        new Chart(canvas.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: timeline.months.map(month => 'M' + month),
+                datasets: [{
+                    label: 'Monthly Revenue ($)',
+                    data: timeline.revenue,
+                    borderColor: '#3b82f6',
+                    backgroundColor: 'rgba(59, 130, 246, 0.1)',
+                    fill: true
+                }, {
+                    label: 'Customer Count',
+                    data: timeline.customers,
+                    borderColor: '#10b981',
+                    yAxisID: 'y1'
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                scales: {
+                    y: {
+                        type: 'linear',
+                        display: true,
+                        position: 'left',
+                        title: {
+                            display: true,
+                            text: 'Revenue ($)'
+                        }
+                    },
+                    y1: {
+                        type: 'linear',
+                        display: true,
+                        position: 'right',
+                        title: {
+                            display: true,
+                            text: 'Customers'
+                        }
+                    }
+                }
+            }
+        });
+        console.log('✅ Simulation chart created');
+    }).catch(function(error) {
+        console.error('❌ Simulation chart error:', error);
+    });
+}
+
+function createSegmentChart() {
+    const canvas = document.getElementById('segmentChart');
+    if (!canvas) return;
+
+    loadChart('fee_curve').then(function(result) {
+        const colors = ['#3b82f6', '#10b981', '#f59e0b', '#8b5cf6', '#ef4444'];
+        new Chart(canvas.getContext('2d'), {
+            type: 'line',
+            data: {
+                labels: result.labels.map(fee => '$' + fee),
+                datasets: result.tiers.map((tier, i) => ({
+                    label: `${tier} Revenue`,
+                    data: result.series[`revenue_${tier}`],
+                    borderColor: colors[i % colors.length],
+                    tension: 0.4,
+                    fill: false
+                }))
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        position: 'bottom'
+                    }
+                },
+                scales: {
+                    y: {
+                        title: {
+                            display: true,
+                            text: 'Expected Revenue ($)'
+                        }
+                    },
+                    x: {
+                        title: {
+                            display: true,
+                            text: 'Fee Level'
+                        }
+                    }
+                }
+            }
+        });
+        console.log('✅ Segment chart created');
+    }).catch(function(error) {
+        console.error('❌ Segment chart error:', error);
+    });
+}
+
+function createFeatureChart() {
+    const canvas = document.getElementById('featureChart');
+    if (!canvas) return;
+
+    loadChart('feature_importance', { top: 5 }).then(function(result) {
+        new Chart(canvas.getContext('2d'), {
+            type: 'bar',
+            data: {
+                labels: result.labels.map(name => name.replace(/_/g, ' ')),
+                datasets: [{
+                    label: 'Feature Importance',
+                    data: result.series.importance,
+                    backgroundColor: [
+                        '#3b82f6', '#10b981', '#f59e0b', '#8b5cf6', '#ef4444'
+                    ],
+                    borderColor: [
+                        '#1e40af', '#059669', '#d97706', '#7c3aed', '#dc2626'
+                    ],
+                    borderWidth: 1
+                }]
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: false,
+                plugins: {
+                    legend: {
+                        display: false
+                    }
+                },
+                scales: {
+                    y: {
+                        beginAtZero: true,
+                        title: {
+                            display: true,
+                            text: 'Importance Score'
+                        }
+                    },
+                    x: {
+                        title: {
+                            display: true,
+                            text: 'Features'
+                        }
+                    }
+                }
+            }
+        });
+        console.log('✅ Feature chart created');
+    }).catch(function(error) {
+        console.error('❌ Feature chart error:', error);
+    });
+}
+
+// Status badge follows the dashboard's live update stream
+function updateStatus() {
+    try {
+        const statusBadge = document.querySelector('.status-badge span:last-child');
+        if (statusBadge) {
+            const currentTime = new Date().toLocaleTimeString();
+            statusBadge.textContent = `System Active - Last Updated: ${currentTime}`;
+
+        }
+    } catch (error) {
+        console.error('❌ Status update error:', error);
+    }
+}
+
+function startLiveUpdates() {
+    const liveUpdates = new EventSource('/dashboard/api/stream');
+    liveUpdates.addEventListener('stats', updateStatus);
+    liveUpdates.addEventListener('error', function() {
+        const statusBadge = document.querySelector('.status-badge span:last-child');
+        if (statusBadge) statusBadge.textContent = 'Reconnecting...';
+        // A refused stream (503 when the server is at capacity) is not retried by the browser
+        if (liveUpdates.readyState === EventSource.CLOSED) {
+            setTimeout(startLiveUpdates, 5000 + Math.random() * 10000);
+        }
+    });
+    window.addEventListener('beforeunload', function() { liveUpdates.close(); });
+}
+
+if (typeof EventSource !== 'undefined') {
+    startLiveUpdates();
+}
+
+// Add error handling for the entire page
+window.addEventListener('error', function(event) {
+    console.error('❌ Global error:', event.error);
+});
+
+// Log successful initialization
+console.log('🏦 Dynamic Fee Optimizer Dashboard');
+console.log('📊 Features: Interactive tabs, real-time charts, responsive design');
+console.log('🎯 Ready for Python backend integration');
@@ -0,0 +1,171 @@
+// Fetch ranked offers from the recommendation API
+async function fetchRecommendations(userId, features) {
+  const response = await fetch(`/api/recommendations/${encodeURIComponent(userId)}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(features)
+  });
+  const result = await response.json();
+  if (!result.success) {
+    throw new Error(result.error || 'Unable to load recommendations');
+  }
+  return result.data;
+}
+
+// Record user feedback in the server-side event log
+function recordFeedback(userId, offerId, eventType, tags) {
+  return fetch('/api/events', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      timestamp: new Date().toISOString(),
+      user_id: userId,
+      offer_id: offerId,
+      event_type: eventType,
+      tags: tags
+    })
+  }).catch(err => console.error('Failed to record feedback:', err));
+}
+
+// DOM helpers
+function show(el) { el.classList.remove("hidden"); }
+function hide(el) { el.classList.add("hidden"); }
+
+// Convert form to object
+function formToJSON(form) {
+  const fd = new FormData(form);
+  const obj = {};
+  for (const [k, v] of fd.entries()) {
+    if (["Age","Income","Tenure","Transactions","CreditLimit"].includes(k)) {
+      obj[k] = v === "" ? null : Number(v);
+    } else {
+      obj[k] = v;
+    }
+  }
+  return obj;
+}
+
+// Create offer card
+function createOfferCard(rec, userId) {
+  const card = document.createElement("div");
+  card.className = "recommend-card";
+
+  const top = document.createElement("div");
+  top.className = "top";
+
+  const title = document.createElement("h3");
+  title.textContent = rec.title || rec.name || "Offer";
+
+  const score = document.createElement("div");
+  score.className = "score";
+  score.textContent = `${Math.round(rec.personalization_score * 100)}%`;
+
+  top.appendChild(title);
+  top.appendChild(score);
+  card.appendChild(top);
+
+  if (rec.description) {
+    const desc = document.createElement("div");
+    desc.className = "desc";
+    desc.textContent = rec.description;
+    card.appendChild(desc);
+  }
+
+  if (rec.tags && rec.tags.length) {
+    const tags = document.createElement("div");
+    tags.className = "tags";
+    tags.textContent = rec.tags.join(", ");
+    card.appendChild(tags);
+  }
+
+  const reason = document.createElement("p");
+  reason.className = "reason";
+  reason.textContent = rec.reason;
+  card.appendChild(reason);
+
+  // Actions
+  const actions = document.createElement("div");
+  actions.className = "rec-actions";
+
+  const acceptBtn = document.createElement("button");
+  acceptBtn.className = "btn small";
+  acceptBtn.textContent = "Accept";
+
+  acceptBtn.addEventListener("click", () => {
+    acceptBtn.disabled = true;
+    acceptBtn.textContent = "Accepted ✓";
+    recordFeedback(userId, rec.id, 'accept', rec.tags);
+  });
+
+  const viewBtn = document.createElement("button");
+  viewBtn.className = "btn small ghost";
+  viewBtn.textContent = "I viewed this";
+
+  viewBtn.addEventListener("click", () => {
+    viewBtn.disabled = true;
+    viewBtn.textContent = "Recorded";
+    recordFeedback(userId, rec.id, 'click', rec.tags);
+  });
+
+  actions.appendChild(acceptBtn);
+  actions.appendChild(viewBtn);
+  card.appendChild(actions);
+
+  return card;
+}
+
+// Main application logic
+document.addEventListener("DOMContentLoaded", () => {
+  const form = document.getElementById("reco-form");
+  const status = document.getElementById("status");
+  const recoList = document.getElementById("reco-list");
+  const clusterInfo = document.getElementById("cluster-info");
+  const clusterName = document.getElementById("cluster-name");
+  const clusterDesc = document.getElementById("cluster-desc");
+
+  form.addEventListener("submit", (e) => {
+    e.preventDefault();
+    status.textContent = "Running model predictions...";
+    show(status);
+    hide(recoList);
+    hide(clusterInfo);
+
+    try {
+      const payload = formToJSON(form);
+      const userId = payload.UserID || 'anonymous';
+
+      fetchRecommendations(userId, payload).then(result => {
+        // Show cluster information
+        clusterName.textContent = result.cluster_profile.name;
+        clusterDesc.textContent = result.cluster_profile.description;
+        show(clusterInfo);
+
+        // Clear and render recommendations
+        recoList.innerHTML = "";
+
+        if (!result.offers.length) {
+          status.textContent = "No offers matched your profile right now.";
+          show(status);
+          return;
+        }
+
+        result.offers.forEach(rec => {
+          const card = createOfferCard(rec, userId);
+          recoList.appendChild(card);
+        });
+
+        hide(status);
+        show(recoList);
+      }).catch(err => {
+        status.textContent = "Error: " + err.message;
+        show(status);
+      });
+
+    } catch (err) {
+      status.textContent = "Error: " + err.message;
+      show(status);
+      hide(recoList);
+      hide(clusterInfo);
+    }
+  });
+});
@@ -0,0 +1,71 @@
+import threading
+
+from database.connection import get_connection
+from utils import activity_logger
+from utils.activity_logger import ActivityLogger
+
+
+def make_logger(tmp_path, **kwargs):
+    path = str(tmp_path / 'activity.db')
+    conn = get_connection(path)
+    conn.execute('CREATE TABLE user_activities (id INTEGER PRIMARY KEY, user_id INTEGER, '
+                 'activity_type TEXT, description TEXT, created_at TIMESTAMP)')
+    conn.commit()
+    conn.close()
+    return path, ActivityLogger(db_path=path, flush_interval=0.05, retry_delay=0, **kwargs)
+
+
+def count_rows(path):
+    conn = get_connection(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM user_activities').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_rows_are_batched_and_flushed(tmp_path):
+    path, logger = make_logger(tmp_path, batch_size=50)
+    for i in range(120):
+        assert logger.log(i, 'login', 'Logged in')
+    logger.stop()
+    assert count_rows(path) == 120
+    stats = logger.stats()
+    assert stats['written'] == 120 and stats['dropped'] == 0 and stats['batches'] >= 3
+
+
+def test_failed_batch_is_retried_once_then_dropped(tmp_path, monkeypatch):
+    path, logger = make_logger(tmp_path)
+    failures = []
+    real = activity_logger.get_connection
+
+    def flaky(db_path):
+        if len(failures) < 1:
+            failures.append(db_path)
+            raise RuntimeError('database is locked')
+        return real(db_path)
+
+    monkeypatch.setattr(activity_logger, 'get_connection', flaky)
+    logger._write([(1, 'login', 'Logged in', '2024-01-01')])
+    assert count_rows(path) == 1 and logger.stats()['written'] == 1
+
+    def broken(db_path):
+        failures.append(db_path)
+        raise RuntimeError('disk I/O error')
+
+    monkeypatch.setattr(activity_logger, 'get_connection', broken)
+    logger._write([(1, 'login', 'Logged in', '2024-01-01')] * 3)
+    assert len(failures) == 3
+    assert logger.stats()['dropped'] == 3
+
+
+def test_drop_counter_is_exact_under_contention(tmp_path):
+    _, logger = make_logger(tmp_path, queue_size=1, enqueue_timeout=0)
+    # Keep the writer thread from draining so every enqueue past the first is dropped
+    logger._ensure_started = lambda: None
+    threads = [threading.Thread(target=lambda: [logger.log(1, 'view', 'x') for _ in range(500)])
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert logger.stats()['dropped'] == 8 * 500 - 1
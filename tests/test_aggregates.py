@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+from database.connection import get_connection
+from utils import aggregates
+from utils.aggregates import DashboardAggregates, compute_book_aggregates, compute_event_aggregates, materialize
+from utils.event_store import EventLog
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'database', 'migrations', 'dashboard',
+                         '0001_initial.sql')
+
+
+class FakeStore:
+    """Four customers in two segments; code -1 is a missing category"""
+
+    def __init__(self, version='v1'):
+        self.version = version
+        self.columns = {
+            'Churn': [1, 0, 0, 0],
+            'Inactive_90Days_Flag': [0, 1, 0, 0],
+            'Segment': [0, 0, 1, -1],
+            'Total_Trans_Amt': [100.0, 300.0, 50.0, 999.0],
+            'Complaint_Type': [0, 1, 1, 4],
+            'Avg_Utilization_Ratio': [0.1, 0.2, 0.3, 0.4],
+            'Customer_Rating': [4, 5, 3, 4],
+        }
+
+    def __len__(self):
+        return 4
+
+    def column(self, name):
+        return np.asarray(self.columns[name])
+
+    def categories(self, name):
+        return ['Gold', 'Silver']
+
+
+def test_book_aggregates():
+    book = compute_book_aggregates(FakeStore())
+    assert book['total_customers'] == 4
+    assert book['churned_customers'] == 1 and book['churn_rate'] == 25.0
+    assert book['active_customers'] == 2
+    assert book['avg_utilization'] == 25.0
+    assert book['complaints'] == {'No Complaint': 1, 'Transaction Error': 2, 'Customer Service': 0,
+                                  'Mobile App': 0, 'Unexpected Fees': 1}
+    assert book['open_complaints'] == 3
+    gold, silver = book['segments']
+    assert gold == {'name': 'Gold', 'customer_count': 2, 'retention_rate': 50.0, 'avg_revenue': 200.0}
+    assert silver['customer_count'] == 1 and silver['retention_rate'] == 100.0
+
+
+def test_book_aggregates_skip_invalid_complaint_codes():
+    store = FakeStore()
+    store.columns['Complaint_Type'] = [0, -1, 1, 4]
+    assert compute_book_aggregates(store)['complaints']['Transaction Error'] == 1
+
+
+def test_event_aggregates():
+    log = EventLog()
+    log.add_rows([{'timestamp': '2024-01-01T00:00:00Z', 'UserID': 1, 'offer_id': 'o1', 'event_type': t}
+                  for t in ('click', 'click', 'accept', 'impression')])
+    events = compute_event_aggregates(log)
+    assert events['total_events'] == 4
+    assert events['offer_engagement'] == {'accept': 1.0, 'click': 2.0, 'impression': 1.0}
+    assert events['offer_acceptance_rate'] == 25.0
+
+
+def test_snapshot_recomputes_only_changed_sources(monkeypatch):
+    store = FakeStore()
+    log = EventLog()
+    monkeypatch.setattr(aggregates, 'get_feature_store', lambda: store)
+    monkeypatch.setattr(aggregates, 'get_event_log', lambda: log)
+    monkeypatch.setattr(aggregates, 'get_predictor', lambda: None)
+    book_calls = []
+    real = aggregates.compute_book_aggregates
+    monkeypatch.setattr(aggregates, 'compute_book_aggregates',
+                        lambda *args: book_calls.append(1) or real(*args))
+
+    cache = DashboardAggregates(ttl=0, persist=False)
+    versions = []
+    cache.add_listener(versions.append)
+    first = cache.snapshot()
+    assert first['data_version'] == 'v1:0'
+    assert cache.snapshot() is first
+
+    log.add_rows([{'timestamp': '2024-01-01T00:00:00Z', 'UserID': 1, 'offer_id': 'o1', 'event_type': 'click'}])
+    assert cache.snapshot()['data_version'] == 'v1:1'
+    assert len(book_calls) == 1
+
+    store.version = 'v2'
+    assert cache.snapshot()['data_version'] == 'v2:1'
+    assert len(book_calls) == 2 and versions == ['v1:0', 'v1:1', 'v2:1']
+
+
+def test_materialize_replaces_rows(tmp_path):
+    path = str(tmp_path / 'users.db')
+    conn = get_connection(path)
+    with open(MIGRATION, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.close()
+
+    book = compute_book_aggregates(FakeStore())
+    materialize(book, db_path=path)
+    materialize(book, db_path=path)
+    conn = get_connection(path)
+    try:
+        stats = dict(conn.execute('SELECT metric_name, metric_value FROM dashboard_stats').fetchall())
+        segments = conn.execute('SELECT segment_name, customer_count FROM customer_segments').fetchall()
+    finally:
+        conn.close()
+    assert stats['total_customers'] == 4 and 'high_risk_customers' not in stats
+    assert [tuple(row) for row in segments] == [('Gold', 2), ('Silver', 1)]
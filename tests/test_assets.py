@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from utils import assets
+from utils.assets import STATIC_DIR, _skip_quoted, minify_js
+
+JS_DIR = os.path.join(STATIC_DIR, 'js')
+JS_FILES = sorted(name for name in os.listdir(JS_DIR) if name.endswith('.js') and '.min.' not in name)
+
+
+@pytest.fixture(autouse=True)
+def builtin_minifier(monkeypatch):
+    # Exercise the fallback even where rjsmin is installed
+    monkeypatch.setattr(assets, 'rjsmin', None)
+
+
+def template_literals(source):
+    """Backtick literals in order, skipping quotes and comments the simple way"""
+    literals, i = [], 0
+    while i < len(source):
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end < 0 else end
+        elif source.startswith('/*', i):
+            i = source.index('*/', i) + 2
+        elif source[i] in '\'"`':
+            end = _skip_quoted(source, i, source[i])
+            if source[i] == '`':
+                literals.append(source[i:end])
+            i = end
+        else:
+            i += 1
+    return literals
+
+
+def test_multiline_template_literals_are_kept_byte_for_byte():
+    source = (
+        "function card(item) {\n"
+        "    // header\n"
+        "    return `\n"
+        "        <div class=\"card\">\n"
+        "\n"
+        "            <h3>${item.title  +  ' x'}</h3>   \n"
+        "        </div>`;  /* trailing */\n"
+        "}\n"
+    )
+    expected = ("function card(item){\n"
+                "return `\n"
+                "        <div class=\"card\">\n"
+                "\n"
+                "            <h3>${item.title  +  ' x'}</h3>   \n"
+                "        </div>`;\n"
+                "}\n")
+    assert minify_js(source) == expected
+
+
+def test_keeps_line_breaks_regexes_and_needed_spaces():
+    source = "let a = b\n/* c\n */ ++d\nconst re = /a b\\/ [/]/g;  return  x  in  y / 2\n"
+    assert minify_js(source) == "let a=b\n++d\nconst re=/a b\\/ [/]/g;return x in y / 2\n"
+
+
+@pytest.mark.parametrize('name', JS_FILES)
+def test_round_trip_on_static_js(name, tmp_path):
+    with open(os.path.join(JS_DIR, name), encoding='utf-8') as f:
+        source = f.read()
+    minified = minify_js(source)
+    assert template_literals(minified) == template_literals(source)
+    assert minify_js(minified) == minified
+    assert len(minified) < len(source)
+
+    node = shutil.which('node')
+    if node:
+        path = tmp_path / name
+        path.write_text(minified, encoding='utf-8')
+        result = subprocess.run([node, '--check', str(path)], capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
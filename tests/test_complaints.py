@@ -0,0 +1,48 @@
+import os
+import pickle
+import shutil
+
+import pandas as pd
+
+from models.complaints import ComplaintStore, convert_complaint_analysis
+from utils.data_processor import SUPERSEDED_NAME
+
+
+def write_artifact(tmp_path, rows):
+    artifact = {
+        'metadata': {'rows': rows},
+        'dataset': {
+            'customer_data': pd.DataFrame({
+                'Complaint_ID': range(1, rows + 1),
+                'Complaint_Category': ['Fees', 'App', None][:rows] + ['Fees'] * max(0, rows - 3),
+            }),
+            'column_descriptions': {'Complaint_ID': 'id'},
+        },
+        'analysis_results': {'topics': [['fee', 'charge']]},
+    }
+    path = tmp_path / 'complaints.pkl'
+    with open(path, 'wb') as f:
+        pickle.dump(artifact, f)
+    return str(path)
+
+
+def test_convert_publishes_versions_through_the_feature_store_helpers(tmp_path):
+    store_dir = str(tmp_path / 'store')
+    source = write_artifact(tmp_path, 3)
+    first = convert_complaint_analysis(source, store_dir)
+    store = ComplaintStore(store_dir)
+    assert store.version == first['version'] and len(store) == 3
+    assert store.values('Complaint_Category') == ['Fees', 'App', None]
+    assert store.analysis['analysis_results'] == {'topics': [['fee', 'charge']]}
+    assert not store.is_stale(source)
+
+    source = write_artifact(tmp_path, 4)
+    os.utime(source, ns=(0, 0))
+    assert store.is_stale(source)
+    second = convert_complaint_analysis(source, store_dir)
+    assert os.path.exists(os.path.join(store_dir, first['version'], SUPERSEDED_NAME))
+
+    # Columns were mapped when the store was opened, so deletion does not break readers
+    shutil.rmtree(store.path)
+    assert store.column('Complaint_ID').tolist() == [1, 2, 3]
+    assert len(ComplaintStore(store_dir)) == 4 and second['rows'] == 4
@@ -0,0 +1,100 @@
+import gzip
+
+import pytest
+from flask import Flask, Response, jsonify, request
+
+from utils import compression
+from utils.compression import CompressionMiddleware
+
+SCRIPT = b'function greet(name) { return "hello " + name; }\n' * 100
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+    static = tmp_path / 'static'
+    static.mkdir()
+    (static / 'app.js').write_bytes(SCRIPT)
+    (static / 'app.js.gz').write_bytes(gzip.compress(SCRIPT))
+
+    app = Flask(__name__, static_folder=str(static))
+    app.secret_key = 'test'
+
+    @app.route('/data')
+    def data():
+        response = jsonify({'rows': list(range(500))})
+        response.set_etag('v1')
+        return response.make_conditional(request)
+
+    @app.route('/stream')
+    def stream():
+        return Response((f"data: {i}\n\n" for i in range(3)), mimetype='text/event-stream')
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, static_folder=app.static_folder, min_size=100)
+    return app.test_client()
+
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+def test_precompressed_static_file_is_served_with_suffixed_etag(client):
+    response = client.get('/static/app.js', headers=GZIP)
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'javascript' in response.headers['Content-Type']
+    assert response.headers['ETag'].endswith('-gz"')
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.data) == SCRIPT
+
+    again = client.get('/static/app.js', headers={**GZIP, 'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == response.headers['ETag']
+
+
+def test_range_request_gets_identity_bytes(client):
+    response = client.get('/static/app.js', headers={**GZIP, 'Range': 'bytes=0-7'})
+    assert response.status_code == 206
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == SCRIPT[:8]
+
+
+def test_head_passes_through_unchanged(client):
+    for path, length in (('/static/app.js', len(SCRIPT)), ('/data', None)):
+        plain = client.get(path)
+        response = client.head(path, headers=GZIP)
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Content-Length'] == str(length or len(plain.data))
+        assert response.data == b''
+
+
+def test_dynamic_response_revalidates_against_suffixed_etag(client):
+    response = client.get('/data', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == '"v1-gz"'
+    assert gzip.decompress(response.data) == client.get('/data').data
+
+    again = client.get('/data', headers={**GZIP, 'If-None-Match': '"v1-gz"'})
+    assert again.status_code == 304
+    assert again.headers['ETag'] == '"v1-gz"'
+    assert again.data == b''
+
+
+def test_stream_is_flushed_chunk_by_chunk(client):
+    response = client.get('/stream', headers=GZIP, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    decoder = gzip.zlib.decompressobj(16 + gzip.zlib.MAX_WBITS)
+    received = []
+    for chunk in response.response:
+        text = decoder.decompress(chunk)
+        if text:
+            received.append(text)
+    response.close()
+    # Every event decodes as soon as its own chunk arrives
+    assert received == [f"data: {i}\n\n".encode() for i in range(3)]
+
+
+def test_small_and_unaccepted_responses_are_untouched(client):
+    assert 'Content-Encoding' not in client.get('/data').headers
+    assert 'Content-Encoding' not in client.get('/static/app.js', headers={'Accept-Encoding': 'gzip;q=0'}).headers
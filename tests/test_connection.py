@@ -0,0 +1,64 @@
+import gc
+import sqlite3
+import threading
+
+import pytest
+
+from database.connection import ConnectionPool, PoolTimeout, connection, get_pool
+
+
+def test_connections_are_reused_and_rolled_back(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'app.db'), 2)
+    conn = pool.acquire()
+    conn.execute('CREATE TABLE t (x INTEGER)')
+    conn.commit()
+    conn.execute('INSERT INTO t VALUES (1)')
+    raw = conn.raw
+    conn.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+
+    again = pool.acquire()
+    assert again.raw is raw and pool.created == 1
+    assert again.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+    again.close()
+
+
+def test_acquire_times_out_when_pool_is_exhausted(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'app.db'), 2, timeout=0.05)
+    held = [pool.acquire(), pool.acquire()]
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    # A waiter gets the connection as soon as one is closed
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(timeout=5)))
+    waiter.start()
+    held.pop().close()
+    waiter.join(5)
+    assert acquired and pool.created == 2
+    for conn in held + acquired:
+        conn.close()
+
+
+def test_dropped_connection_is_not_returned_by_gc(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'app.db'), 1, timeout=0.05)
+    conn = pool.acquire()
+    raw = conn.raw
+    del conn
+    gc.collect()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    raw.close()
+
+
+def test_context_manager_returns_connection(tmp_path):
+    path = str(tmp_path / 'app.db')
+    with pytest.raises(RuntimeError):
+        with connection(path) as conn:
+            raw = conn.raw
+            raise RuntimeError
+    pool = get_pool(path)
+    again = pool.acquire(timeout=0)
+    assert again.raw is raw
+    again.close()
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from utils.customer_index import CursorError, get_customer_index
+
+
+@pytest.fixture(scope='module')
+def index():
+    return get_customer_index()
+
+
+def walk(index, **kwargs):
+    customers, cursor = [], None
+    while True:
+        page = index.page(cursor=cursor, **kwargs)
+        if cursor is None:
+            total = page['total']
+        customers.extend(page['customers'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return customers, total
+
+
+def test_pages_cover_every_customer_once_in_order(index):
+    customers, total = walk(index, limit=500)
+    ids = [int(c['customer_id']) for c in customers]
+    assert total == len(index.clientnums)
+    assert ids == sorted(index.clientnums.tolist())
+
+
+def test_filtered_pages_match_a_full_scan(index):
+    filters = {'segment': ['At Risk'], 'card_category': ['Blue'], 'risk': ['High', 'Medium']}
+    customers, total = walk(index, filters=filters, sort='churn_probability', order='desc', limit=37)
+    assert len(customers) == total
+    assert all(c['segment'] == 'At Risk' and c['card_category'] == 'Blue' for c in customers)
+    assert all(c['risk_level'] in ('High', 'Medium') for c in customers)
+
+    churn = [c['churn_probability'] for c in customers]
+    assert churn == sorted(churn, reverse=True)
+
+    store = index.store
+    expected = ((np.asarray(store.decode('Segment', store.column('Segment'))) == 'At Risk')
+                & (np.asarray(store.decode('Card_Category', store.column('Card_Category'))) == 'Blue')
+                & (index.churn >= 0.4))
+    assert total == int(expected.sum())
+
+
+def test_cursor_is_tied_to_its_sort_order(index):
+    cursor = index.page(limit=5)['next_cursor']
+    with pytest.raises(CursorError):
+        index.page(sort='age', cursor=cursor)
+    with pytest.raises(CursorError):
+        index.page(cursor='not-a-cursor')
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import shutil
+import time
+
+import numpy as np
+
+from config import Config
+from utils import data_processor
+from utils.data_processor import SUPERSEDED_NAME, FeatureStore, build_feature_store, remove_old_versions
+
+
+def build(tmp_path, rows):
+    source = tmp_path / 'customers.csv'
+    source.write_text('CLIENTNUM,Age,Card\n' + ''.join(f"{i},{20 + i},Blue\n" for i in range(1, rows + 1)))
+    return build_feature_store(csv_path=str(source), store_dir=str(tmp_path / 'store'))
+
+
+def test_columns_stay_readable_after_their_version_is_deleted(tmp_path):
+    first = build(tmp_path, 3)
+    store = FeatureStore(str(tmp_path / 'store'))
+    shutil.rmtree(store.path)
+    assert store.column('Age').tolist() == [21, 22, 23]
+    assert list(store.decode('Card', store.column('Card'))) == ['Blue'] * 3
+    assert store.version == first['version']
+
+
+def test_grace_period_starts_when_a_version_is_superseded(tmp_path):
+    first = build(tmp_path, 3)
+    old_dir = tmp_path / 'store' / first['version']
+    # Built long ago, but only superseded just now
+    os.utime(old_dir, (0, 0))
+    second = build(tmp_path, 4)
+    assert (old_dir / SUPERSEDED_NAME).exists()
+    assert old_dir.exists()
+
+    remove_old_versions(str(tmp_path / 'store'), keep=second['version'], grace_seconds=0.0)
+    assert not old_dir.exists()
+    assert len(FeatureStore(str(tmp_path / 'store'))) == 4
+
+
+def test_unpublished_builds_are_left_alone(tmp_path):
+    first = build(tmp_path, 2)
+    in_progress = tmp_path / 'store' / 'v00000000000000-partial'
+    in_progress.mkdir()
+    np.save(in_progress / '000.npy', np.arange(3))
+    remove_old_versions(str(tmp_path / 'store'), keep=first['version'], grace_seconds=0.0)
+    assert in_progress.exists()
+
+
+def test_clientnum_lookups(tmp_path):
+    build(tmp_path, 5)
+    store = FeatureStore(str(tmp_path / 'store'))
+    assert store.row_of(3) == 2
+    assert store.row_of('3') == 2
+    assert store.row_of(99) is None and store.row_of('abc') is None
+    found, rows = store.rows_for([5, 99, 1])
+    assert found == [5, 1] and rows.tolist() == [4, 0]
+    assert store.row_dict(1) == {'CLIENTNUM': 2, 'Age': 22, 'Card': 'Blue'}
+
+
+def test_workers_booting_together_build_the_store_once(tmp_path, monkeypatch):
+    source = tmp_path / 'customers.csv'
+    source.write_text('CLIENTNUM,Age,Card\n1,21,Blue\n2,22,Gold\n')
+    builds = tmp_path / 'builds.log'
+    real_build = data_processor.build_feature_store
+
+    def slow_build(**kwargs):
+        with open(builds, 'a') as f:
+            f.write('build\n')
+        time.sleep(0.2)
+        return real_build(**kwargs)
+
+    monkeypatch.setattr(Config, 'DATA_PATH', str(source))
+    monkeypatch.setattr(Config, 'FEATURE_STORE_PATH', str(tmp_path / 'store'))
+    monkeypatch.setattr(data_processor, 'build_feature_store', slow_build)
+    monkeypatch.setattr(data_processor, '_store', None)
+
+    context = multiprocessing.get_context('fork')
+    versions = context.Queue()
+    workers = [context.Process(target=lambda: versions.put(data_processor.get_feature_store().version))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    seen = {versions.get(timeout=30) for _ in workers}
+    for worker in workers:
+        worker.join()
+    assert builds.read_text().count('build') == 1
+    assert seen == {data_processor.read_pointer(str(tmp_path / 'store'))}
@@ -0,0 +1,94 @@
+import csv
+
+from config import Config
+from utils.event_store import EVENT_FIELDS, EventLog, append_events
+
+
+def event(timestamp, user_id=1, offer_id='offer_01', event_type='click', tags='cashback,savings'):
+    return {'timestamp': timestamp, 'UserID': user_id, 'offer_id': offer_id, 'event_type': event_type,
+            'tags': tags}
+
+
+def write_backlog(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=EVENT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_recent_orders_by_event_time_not_timestamp_text():
+    log = EventLog(recent_per_user=2)
+    # Lexically '2024-01-01T12:00:00+05:00' sorts after '2024-01-01T09:00:00Z' but happens earlier
+    log.add_rows([event('2024-01-01T12:00:00+05:00', offer_id='early'),
+                  event('2024-01-01T09:00:00Z', offer_id='late'),
+                  event('2023-12-31T00:00:00Z', offer_id='oldest')])
+    assert [e['offer_id'] for e in log.recent(1)] == ['late', 'early']
+
+
+def test_snapshot_restores_table_and_resumes_from_offset(tmp_path, monkeypatch):
+    backlog = str(tmp_path / 'events.csv')
+    ingest = str(tmp_path / 'ingested.csv')
+    snapshot = str(tmp_path / 'event_log.snapshot')
+    write_backlog(backlog, [event('2024-01-01T00:00:00Z')])
+    append_events([event('2024-01-02T00:00:00Z', event_type='accept')], path=ingest)
+
+    first = EventLog()
+    first.follow(ingest, snapshot_path=snapshot, backlog_path=backlog)
+    assert first.total_events == 2
+
+    append_events([event('2024-01-03T00:00:00Z', user_id=2)], path=ingest)
+    # A restarted worker must not replay the backlog or the already-applied log prefix
+    monkeypatch.setattr(EventLog, 'load_csv', lambda self, path=None: 1 / 0)
+    second = EventLog()
+    second.follow(ingest, snapshot_path=snapshot, backlog_path=backlog)
+    assert second.total_events == 3
+    first.refresh(force=True)
+    assert second.tag_affinity(1) == first.tag_affinity(1)
+    assert second.hourly_counts() == first.hourly_counts()
+    assert [e['offer_id'] for e in second.recent(2)] == ['offer_01']
+
+
+def test_snapshot_ignored_when_sources_change(tmp_path, monkeypatch):
+    backlog = str(tmp_path / 'events.csv')
+    ingest = str(tmp_path / 'ingested.csv')
+    snapshot = str(tmp_path / 'event_log.snapshot')
+    write_backlog(backlog, [event('2024-01-01T00:00:00Z')])
+    append_events([event('2024-01-02T00:00:00Z')], path=ingest)
+    EventLog().follow(ingest, snapshot_path=snapshot, backlog_path=backlog)
+
+    write_backlog(backlog, [event('2024-01-01T00:00:00Z'), event('2024-01-01T01:00:00Z', user_id=3)])
+    restarted = EventLog()
+    restarted.follow(ingest, snapshot_path=snapshot, backlog_path=backlog)
+    assert restarted.total_events == 3
+
+    # A truncated ingest log invalidates the saved offset
+    open(ingest, 'w').close()
+    truncated = EventLog()
+    truncated.follow(ingest, snapshot_path=snapshot, backlog_path=backlog)
+    assert truncated.total_events == 2
+
+
+def test_refresh_snapshots_every_n_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'EVENT_SNAPSHOT_EVERY', 2)
+    ingest = str(tmp_path / 'ingested.csv')
+    snapshot = str(tmp_path / 'event_log.snapshot')
+    log = EventLog()
+    log.follow(ingest, snapshot_path=snapshot)
+    append_events([event('2024-01-01T00:00:00Z'), event('2024-01-02T00:00:00Z')], path=ingest)
+    assert log.refresh(force=True) == 2
+
+    # Simulate a crash: the snapshot taken during refresh must already cover both events
+    monkeypatch.setattr(EventLog, 'refresh', lambda self, force=False: 0)
+    restarted = EventLog()
+    restarted.follow(ingest, snapshot_path=snapshot)
+    assert restarted.total_events == 2
+
+
+def test_future_dated_events_do_not_decay_other_customers():
+    log = EventLog()
+    log.add_rows([event('2024-01-01T00:00:00Z')])
+    before = log.tag_affinity(1)
+    assert log.add_rows([event('2999-01-01T00:00:00', user_id=2)]) == (0, 1)
+    assert log.tag_affinity(1) == before
+    assert before['cashback']['click'] == 1.0
+    assert log.tag_affinity(2) == {}
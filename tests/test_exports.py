@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+
+import pytest
+
+from utils.export_utils import EXPORTS, ExportBusy, ExportManager, encode_rows
+
+
+def rows(count):
+    for i in range(count):
+        yield {'timestamp': '2025-01-30T00:11:00', 'user_id': str(i), 'offer_id': 'offer_01',
+               'event_type': 'click', 'tags': 'loan,"quoted"'}
+
+
+def test_csv_chunks_round_trip():
+    chunks = list(encode_rows(rows(2000), EXPORTS['events'][1], 'csv', chunk_size=4096))
+    assert len(chunks) > 1
+    parsed = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert [row['user_id'] for row in parsed] == [str(i) for i in range(2000)]
+    assert parsed[0]['tags'] == 'loan,"quoted"'
+
+
+def test_jsonl_keeps_field_order():
+    lines = b''.join(encode_rows(rows(3), EXPORTS['events'][1], 'jsonl')).decode('utf-8').splitlines()
+    assert list(json.loads(lines[0])) == [name for name, _ in EXPORTS['events'][1]]
+    assert len(lines) == 3
+
+
+def test_streams_share_a_capped_number_of_slots(tmp_path):
+    manager = ExportManager(directory=str(tmp_path), max_concurrent=1)
+    first = manager.stream('events', 'csv')
+    with pytest.raises(ExportBusy):
+        manager.stream('events', 'csv')
+    first.close()
+    manager.stream('events', 'csv').close()
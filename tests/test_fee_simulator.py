@@ -0,0 +1,80 @@
+import time
+
+import pytest
+from flask import Flask
+
+from config import Config
+from routes import fees
+from routes.fees import fees_bp
+from routes.jobs import jobs_bp
+from utils import tasks
+from utils.fee_simulator import FeeSimulator, expand_grid, expand_range
+
+
+def test_expand_range_counts_before_allocating():
+    assert expand_range({'start': 0, 'stop': 1, 'step': 0.25}, None).tolist() == [0, 0.25, 0.5, 0.75, 1.0]
+    assert expand_range({'start': 0, 'stop': 0.9, 'step': 0.3}, None).tolist() == [0, 0.3, 0.6, 0.9]
+    started = time.perf_counter()
+    with pytest.raises(ValueError, match='limit'):
+        expand_range({'start': 0, 'stop': 1e12, 'step': 1e-6}, None, limit=1000)
+    assert time.perf_counter() - started < 0.1
+    with pytest.raises(ValueError):
+        expand_range({'start': 0, 'stop': float('inf'), 'step': 1}, None)
+    with pytest.raises(ValueError):
+        expand_range([1.0, float('nan')], None)
+
+
+def test_grid_rejects_negative_fees_and_oversized_grids(monkeypatch):
+    with pytest.raises(ValueError, match='negative'):
+        expand_grid([-5, 10], [0])
+    monkeypatch.setattr(Config, 'SIMULATION_MAX_SCENARIOS', 100)
+    with pytest.raises(ValueError, match='scenarios'):
+        expand_grid({'start': 0, 'stop': 20, 'step': 1}, {'start': 0, 'stop': 20, 'step': 1})
+    fee_values, threshold_values = expand_grid([1, 2], {'start': 0, 'stop': 100, 'step': 50})
+    assert len(fee_values) * len(threshold_values) == 6
+
+
+@pytest.mark.parametrize('params', [{'simulations': 10000000}, {'months': 0}, {'top': -5}, {'months': 'x'}])
+def test_sweep_enforces_bounds_for_job_payloads(params, monkeypatch):
+    monkeypatch.setattr(FeeSimulator, 'simulate', lambda *args: pytest.fail('out-of-bounds sweep ran'))
+    with pytest.raises(ValueError):
+        tasks.fee_sweep(**params)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(fees_bp)
+    app.register_blueprint(jobs_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 'demo'
+    return client
+
+
+def test_large_sweeps_are_queued_as_jobs(client, monkeypatch):
+    queued = []
+
+    def fake_enqueue(task, payload, owner=None):
+        queued.append((task, payload, owner))
+        return {'id': 'j1', 'task': task, 'status': 'queued', 'priority': 0, 'attempts': 0,
+                'max_attempts': 3, 'result': None, 'error': None, 'timing': None, 'created_at': 0,
+                'started_at': None, 'finished_at': None, 'run_after': 0}
+
+    monkeypatch.setattr(fees, 'enqueue', fake_enqueue)
+    monkeypatch.setattr(fees, 'get_fee_simulator', lambda: pytest.fail('large sweep ran inline'))
+    response = client.post('/api/fees/simulate', json={'fees': {'start': 0, 'stop': 25, 'step': 0.5},
+                                                         'months': 36, 'simulations': 100})
+    assert response.status_code == 202
+    assert response.get_json()['data']['status_url'] == '/api/jobs/j1'
+    assert queued[0][0] == 'fee_sweep' and queued[0][2] == 'demo'
+    assert queued[0][1]['months'] == 36
+
+
+def test_invalid_grids_are_rejected(client):
+    response = client.post('/api/fees/simulate', json={'fees': [-1, 5], 'thresholds': [0]})
+    assert response.status_code == 400
+    response = client.post('/api/fees/simulate', json={'fees': {'start': 0, 'stop': 1e12, 'step': 1e-6}})
+    assert response.status_code == 400
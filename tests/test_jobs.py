@@ -0,0 +1,119 @@
+import os
+import sqlite3
+
+import pytest
+from flask import Flask
+
+from config import Config
+from database.connection import get_connection
+from routes import jobs as jobs_routes
+from routes.jobs import jobs_bp
+from utils import jobs, tasks
+from utils.jobs import TASKS, JobQueue, task
+
+MIGRATION = os.path.join(os.path.dirname(__file__), '..', 'database', 'migrations', 'dashboard', '0004_jobs.sql')
+
+calls = []
+
+
+@task('test_echo')
+def echo(value):
+    return {'value': value}
+
+
+@task('test_flaky', max_attempts=2)
+def flaky():
+    calls.append(1)
+    raise RuntimeError('boom')
+
+
+def make_queue(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    conn = get_connection(path)
+    with open(MIGRATION, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.close()
+    return JobQueue(db_path=path)
+
+
+def test_claims_highest_priority_first_and_records_result(tmp_path):
+    queue = make_queue(tmp_path)
+    low = queue.enqueue('test_echo', {'value': 'low'}, priority=-1)
+    high = queue.enqueue('test_echo', {'value': 'high'}, priority=5)
+    job = queue.claim('w1')
+    assert job['id'] == high['id']
+    assert queue.run(job)
+    done = queue.get(high['id'])
+    assert done['status'] == 'succeeded' and done['result'] == {'value': 'high'}
+    assert done['timing']['run_seconds'] is not None
+    assert queue.claim('w1')['id'] == low['id']
+    assert queue.claim('w1') is None
+
+
+def test_idempotency_key_returns_the_existing_job(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.enqueue('test_echo', {'value': 1}, idempotency_key='k')
+    second = queue.enqueue('test_echo', {'value': 2}, idempotency_key='k')
+    assert second['id'] == first['id']
+    assert len(queue.list()) == 1
+
+
+def test_failures_retry_until_max_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_RETRY_DELAY', 0)
+    queue = make_queue(tmp_path)
+    job = queue.enqueue('test_flaky')
+    calls.clear()
+    assert not queue.run(queue.claim('w1'))
+    assert queue.get(job['id'])['status'] == 'queued'
+    assert not queue.run(queue.claim('w1'))
+    failed = queue.get(job['id'])
+    assert failed['status'] == 'failed' and failed['attempts'] == 2 and 'boom' in failed['error']
+    assert len(calls) == 2
+
+
+def test_rescore_rejects_out_of_range_top():
+    for top in (0, -1, 10 ** 6):
+        with pytest.raises(ValueError, match='top'):
+            tasks.rescore(top=top)
+
+
+def test_public_submissions_keep_the_task_priority_and_attempts(tmp_path, monkeypatch):
+    queue = make_queue(tmp_path)
+    monkeypatch.setattr(jobs_routes, 'get_job_queue', lambda: queue)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(jobs_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 'demo'
+
+    response = client.post('/api/jobs', json={'task': 'rescore', 'payload': {'top': 5}, 'priority': 99,
+                                              'max_attempts': 1000})
+    assert response.status_code == 202
+    job = response.get_json()['data']
+    assert job['priority'] == TASKS['rescore']['priority']
+    assert job['max_attempts'] == TASKS['rescore']['max_attempts']
+
+
+def test_worker_survives_database_errors_while_recording_a_job(monkeypatch):
+    ran = []
+
+    class FlakyQueue:
+        def requeue_expired(self):
+            return 0
+
+        def claim(self, name):
+            return {'id': f"j{len(ran)}"}
+
+        def run(self, job):
+            ran.append(job['id'])
+            if len(ran) == 1:
+                raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(jobs, 'get_job_queue', FlakyQueue)
+    # The "parent" goes away once the second job has run
+    monkeypatch.setattr(jobs.os, 'getppid', lambda: 1 if len(ran) < 2 else 2)
+    monkeypatch.setattr(jobs.signal, 'signal', lambda *args: None)
+    jobs.worker_main('w1', parent_pid=1)
+    assert ran == ['j0', 'j1']
@@ -0,0 +1,59 @@
+import pytest
+from flask import Flask
+
+from routes import dashboard
+from utils.live_updates import HubFull, LiveUpdateHub
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    # No publisher thread: the tests publish by hand
+    monkeypatch.setattr(LiveUpdateHub, '_run', lambda self: None)
+    return LiveUpdateHub(interval=1, max_streams=2)
+
+
+def test_publish_serializes_once_and_targets_users(hub):
+    everyone, alice = hub.subscribe(), hub.subscribe('alice')
+    hub.publish('stats', {'churn_rate': 12.5})
+    hub.publish('notification', {'title': 'Hi'}, user_id='alice')
+    first = everyone.get(0)
+    assert first == b'id: 1\nevent: stats\ndata: {"churn_rate":12.5}\n\n'
+    assert alice.get(0) is first
+    assert everyone.get(0) is None
+    assert alice.get(0).startswith(b'id: 2\nevent: notification')
+
+
+def test_replay_since_last_event_id(hub):
+    for i in range(3):
+        hub.publish('stats', {'n': i})
+    hub.publish('notification', {'n': 'private'}, user_id='bob')
+    assert len(hub.replay_since(1)) == 2
+    assert len(hub.replay_since(1, 'bob')) == 3
+    # Ids from before a restart cannot be resumed
+    assert hub.replay_since(99) is None
+
+
+def test_streams_are_capped_per_process(hub):
+    first, second = hub.subscribe(), hub.subscribe()
+    with pytest.raises(HubFull):
+        hub.subscribe()
+    second.closed = True
+    hub.subscribe()
+    hub.unsubscribe(first)
+    assert hub.subscriber_count() == 2
+
+
+def test_stream_route_answers_503_at_capacity(hub, monkeypatch):
+    monkeypatch.setattr(dashboard, 'get_live_update_hub', lambda: hub)
+    hub.subscribe()
+    hub.subscribe()
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(dashboard.dashboard_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 'demo'
+    response = client.get('/dashboard/api/stream')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from database import migrate as migrate_module
+from database.connection import open_connection
+from database.migrate import MigrationError, migrate, split_statements
+
+
+@pytest.fixture
+def main_db(tmp_path, monkeypatch):
+    path = str(tmp_path / 'retention.db')
+    monkeypatch.setitem(migrate_module.DATABASES, 'main', path)
+    return path
+
+
+def test_split_statements_skips_comments_and_rejects_partial_sql():
+    sql = "-- header\nCREATE TABLE a (x TEXT DEFAULT ';');\n\n-- note\nINSERT INTO a VALUES ('b');\n"
+    statements = split_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].endswith("CREATE TABLE a (x TEXT DEFAULT ';');")
+    assert statements[1].endswith("INSERT INTO a VALUES ('b');")
+    with pytest.raises(MigrationError):
+        split_statements('CREATE TABLE a (x')
+
+
+def test_migrations_apply_once(main_db):
+    assert migrate('main') == [1, 2]
+    assert migrate('main') == []
+    conn = open_connection(main_db)
+    try:
+        assert [row[0] for row in conn.execute('SELECT version FROM schema_version')] == [1, 2]
+    finally:
+        conn.close()
+
+
+def test_session_migration_keeps_existing_rows(main_db):
+    migrate('main', target=1)
+    conn = open_connection(main_db)
+    try:
+        conn.execute("INSERT INTO users (id, name, email, password_hash) VALUES (1, 'a', 'a@x', 'h')")
+        conn.execute("INSERT INTO user_sessions (user_id, session_token, expires_at) "
+                     "VALUES (1, 'tok', '2030-01-01 00:00:00')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert migrate('main') == [2]
+    conn = open_connection(main_db)
+    try:
+        row = conn.execute('SELECT user_id, session_token, data, revision FROM user_sessions').fetchone()
+        assert tuple(row) == (1, 'tok', '{}', 1)
+        # user_id is nullable now (demo logins)
+        conn.execute("INSERT INTO user_sessions (session_token, expires_at) VALUES ('demo', '2030-01-01')")
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert 'user_sessions_old' not in tables
+    finally:
+        conn.close()
+
+
+def test_failed_migration_leaves_previous_version(main_db, monkeypatch):
+    real = migrate_module.load_migrations
+    monkeypatch.setattr(migrate_module, 'load_migrations',
+                        lambda database: real(database) + [(3, 'broken', 'CREATE TABLE t (x);\n'
+                                                                            'INSERT INTO nope VALUES (1);')])
+    with pytest.raises(MigrationError):
+        migrate('main')
+    conn = open_connection(main_db)
+    try:
+        assert conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] == 2
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute('SELECT * FROM t')
+    finally:
+        conn.close()
@@ -0,0 +1,67 @@
+import hashlib
+import threading
+
+import pytest
+
+from config import Config
+from database.connection import get_connection
+from models import database_models
+from models.database_models import User
+from utils.password_hasher import HasherBusy, PasswordHasher
+
+MIGRATION = 'database/migrations/main/0001_initial.sql'
+
+
+def make_hasher(**kwargs):
+    # Cheap parameters keep the tests fast
+    return PasswordHasher(n=2 ** 8, r=8, p=1, **kwargs)
+
+
+def test_hash_and_verify():
+    hasher = make_hasher()
+    stored = hasher.hash_password('s3cret')
+    assert stored.startswith('scrypt$256$8$1$')
+    assert hasher.verify_password('s3cret', stored) == (True, False)
+    assert hasher.verify_password('wrong', stored) == (False, False)
+    assert hasher.hash_password('s3cret') != stored
+    assert hasher.verify_password('s3cret', 'garbage') == (False, False)
+
+
+def test_old_parameters_and_legacy_hashes_need_rehash():
+    old = make_hasher().hash_password('s3cret')
+    stronger = PasswordHasher(n=2 ** 9, r=8, p=1)
+    assert stronger.verify_password('s3cret', old) == (True, True)
+    legacy = hashlib.sha256(b's3cret').hexdigest()
+    assert stronger.verify_password('s3cret', legacy) == (True, True)
+
+
+def test_full_queue_raises_busy():
+    hasher = make_hasher(workers=1, max_pending=0)
+    release = threading.Event()
+    thread = threading.Thread(target=hasher._submit, args=(release.wait,))
+    thread.start()
+    while hasher.metrics()['running'] == 0:
+        pass
+    with pytest.raises(HasherBusy):
+        hasher.hash_password('s3cret')
+    release.set()
+    thread.join()
+    assert hasher.metrics()['rejected'] == 1
+
+
+def test_unknown_email_still_runs_a_verification(tmp_path, monkeypatch):
+    path = str(tmp_path / 'retention.db')
+    conn = get_connection(path)
+    with open(MIGRATION, encoding='utf-8') as f:
+        conn.executescript(f.read())
+    conn.close()
+    monkeypatch.setattr(Config, 'DATABASE_PATH', path)
+    hasher = make_hasher()
+    monkeypatch.setattr(database_models, 'get_password_hasher', lambda: hasher)
+    verified = []
+    real = hasher.verify_password
+    monkeypatch.setattr(hasher, 'verify_password', lambda *args: verified.append(args) or real(*args))
+
+    user, message = User.authenticate('nobody@example.com', 'guess')
+    assert user is None and message == 'Invalid email or password'
+    assert verified == [('guess', hasher.dummy_hash)]
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from routes import kyc
+from routes.kyc import kyc_bp
+from utils.data_processor import get_feature_store
+from utils.predictor import ChurnPredictor, FEATURE_COLUMNS, risk_levels, train_model
+
+
+@pytest.fixture(scope='module')
+def predictor(tmp_path_factory):
+    model_path = tmp_path_factory.mktemp('model') / 'trained_model.pkl'
+    return ChurnPredictor(train_model(model_path=str(model_path)))
+
+
+@pytest.fixture(scope='module')
+def features():
+    return get_feature_store().matrix(FEATURE_COLUMNS)
+
+
+def test_vectorized_scores_match_pipeline(predictor, features):
+    expected = predictor.pipeline.predict_proba(features[:500])[:, 1]
+    np.testing.assert_allclose(predictor.predict_proba(features[:500]), expected, atol=1e-9)
+
+
+def test_columnar_scores_match_matrix_scores(predictor, features):
+    np.testing.assert_allclose(predictor.predict_store(get_feature_store()),
+                               predictor.predict_proba(features), atol=1e-12)
+
+
+def test_single_record_matches_batch(predictor, features):
+    record = dict(zip(FEATURE_COLUMNS, features[3]))
+    single = predictor.score_records([record])[0]
+    batch = predictor.predict_proba(features[:10])
+    assert single['churn_probability'] == round(float(batch[3]), 4)
+
+
+def test_missing_features_use_training_means(predictor):
+    X = predictor.records_to_matrix([{}, {'Customer_Age': 40}])
+    np.testing.assert_array_equal(X[0], predictor.defaults)
+    assert X[1, FEATURE_COLUMNS.index('Customer_Age')] == 40
+
+
+def test_score_population_covers_whole_book(predictor):
+    result = predictor.score_population()
+    assert len(result['probabilities']) == len(result['clientnums']) > 10000
+    assert ((result['probabilities'] >= 0) & (result['probabilities'] <= 1)).all()
+
+
+def test_score_clientnums_skips_unknown_ids(predictor):
+    clientnum = int(get_feature_store().clientnums[0])
+    scored = predictor.score_clientnums([clientnum, 1])
+    assert [s['customer_id'] for s in scored] == [str(clientnum)]
+
+
+def test_risk_levels():
+    assert list(risk_levels([0.95, 0.5, 0.1])) == ['High', 'Medium', 'Low']
+
+
+def test_wrong_feature_count_rejected(predictor):
+    with pytest.raises(ValueError):
+        predictor.predict_proba(np.zeros((2, 3)))
+
+
+@pytest.mark.parametrize('record', [{'Customer_Age': {'a': 1}}, {'Customer_Age': [1]},
+                                    {'Customer_Age': 'forty'}, {'Customer_Age': float('nan')}])
+def test_bad_feature_values_rejected(predictor, record):
+    with pytest.raises(ValueError):
+        predictor.records_to_matrix([record])
+
+
+def test_records_must_be_objects(predictor):
+    with pytest.raises(ValueError):
+        predictor.records_to_matrix(['not a customer'])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    population = {'probabilities': np.array([0.2, 0.9, 0.5]), 'risk_levels': np.array(['Low', 'High', 'Medium']),
+                  'clientnums': np.array([11, 12, 13]), 'elapsed_ms': 1.0}
+    monkeypatch.setattr(kyc, 'get_predictor', lambda: SimpleNamespace(score_population=lambda: population))
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(kyc_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 'demo'
+    return client
+
+
+def test_rescore_returns_highest_risk_first(client):
+    response = client.post('/api/kyc/rescore', json={'top_n': 2})
+    assert response.status_code == 200
+    assert [row['customer_id'] for row in response.get_json()['data']['highest_risk']] == ['12', '13']
+
+
+@pytest.mark.parametrize('body', [{'top_n': 0}, {'top_n': -1}, {'top_n': 1001}, {'top_n': 'x'}, [1, 2]])
+def test_rescore_rejects_bad_requests(client, body):
+    response = client.post('/api/kyc/rescore', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from flask import Flask
+
+from routes import recommendations
+from routes.recommendations import recommendations_bp
+from utils import recommender
+from utils.recommender import RecommendationEngine, predict_cluster, predict_clusters
+
+
+class FakeEventLog:
+    def __init__(self, affinity):
+        self.affinity = affinity
+
+    def tag_affinity(self, user_id):
+        return self.affinity.get(int(user_id), {})
+
+
+def test_cluster_rules_match_single_and_vectorized():
+    young = {'Age': 25, 'Income': 20000, 'Tenure': 3, 'Transactions': 5, 'CreditLimit': 1000}
+    rich = {'Age': 45, 'Income': 150000, 'Tenure': 48, 'Transactions': 60, 'CreditLimit': 60000}
+    assert predict_cluster(young) == 0
+    assert predict_cluster(rich) == 1
+    assert predict_cluster({'Age': '', 'Income': None}) == 0
+    clusters = predict_clusters([25, 45], [20000, 150000], [3, 48], [5, 60], [1000, 60000])
+    assert clusters.tolist() == [0, 1]
+
+
+def test_rank_is_deterministic_and_boosted_by_history(monkeypatch):
+    monkeypatch.setattr(recommender, 'get_event_log', lambda: FakeEventLog({7: {'loan': {'accept': 3}}}))
+    engine = RecommendationEngine()
+    plain, engaged = engine.rank([0, 0], [None, 7], top_k=8)
+    assert engine.rank([0], [None], top_k=8)[0] == plain
+    scores = {offer['id']: offer['personalization_score'] for offer in plain['offers']}
+    assert list(scores.values()) == sorted(scores.values(), reverse=True)
+    loan = next(offer for offer in engaged['offers'] if offer['id'] == 'offer_04')
+    assert loan['personalization_score'] > scores['offer_04']
+    assert loan['reason'] == 'Similar to offers you have engaged with before'
+    assert engaged['user_id'] == '7' and plain['user_id'] is None
+
+
+def test_score_matrix_matches_per_customer_loop():
+    engine = RecommendationEngine()
+    affinity = np.random.default_rng(0).random((3, len(engine.tags)))
+    scores = engine.score_matrix(np.array([0, 2, 3]), affinity)
+    for row, cluster in enumerate([0, 2, 3]):
+        for i, offer_id in enumerate(engine.offer_ids):
+            offer = recommender.CATALOG[offer_id]
+            expected = offer['cluster_boost'].get(cluster, 0)
+            expected += recommender.PREFERENCE_TAG_POINTS * len(
+                set(offer['tags']) & set(recommender.CLUSTER_PROFILES[cluster]['preferences']))
+            expected += sum(affinity[row, engine.tag_index[tag]] / len(offer['tags']) for tag in offer['tags'])
+            assert abs(scores[row, i] - expected) < 1e-9
+
+
+def test_top_k_is_clamped(monkeypatch):
+    monkeypatch.setattr(recommender, 'get_event_log', lambda: FakeEventLog({}))
+    engine = RecommendationEngine()
+    assert len(engine.recommend_for_profile({'Age': 30}, top_k=0)['offers']) == 1
+    assert len(engine.recommend_for_profile({'Age': 30}, top_k=99)['offers']) == len(engine.offer_ids)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    class Engine:
+        def recommend_for_customers(self, clientnums, top_k=3):
+            return [{'user_id': clientnum, 'offers': []} for clientnum in clientnums]
+
+    monkeypatch.setattr(recommendations, 'get_recommendation_engine', Engine)
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(recommendations_bp)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+        session['user_id'] = 'demo'
+    return client
+
+
+def test_batch_ranks_listed_customers(client):
+    response = client.post('/api/recommendations/batch', json={'user_ids': [1, 2], 'top_k': 2})
+    assert response.status_code == 200
+    assert response.get_json()['not_found'] == 0
+
+
+@pytest.mark.parametrize('body', [{'user_ids': [1], 'top_k': 'x'}, {'user_ids': '123'}, {'user_ids': 5}, [1]])
+def test_batch_rejects_bad_requests(client, body):
+    response = client.post('/api/recommendations/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_profile_rejects_bad_top_k(client):
+    profile = {name: 1 for name in recommender.FEATURE_NAMES}
+    for body in ({**profile, 'top_k': [1]}, [profile]):
+        assert client.post('/api/recommendations/42', json=body).status_code == 400
@@ -0,0 +1,99 @@
+import pytest
+from flask import Flask, jsonify, render_template_string, session
+
+from utils import response_cache
+from utils.response_cache import ResponseCache, cached_fragment, cached_response
+
+
+@pytest.fixture
+def app(monkeypatch):
+    cache = ResponseCache(max_entries=8, ttl=60)
+    version = {'value': 'v1:0'}
+    monkeypatch.setattr(response_cache, 'get_response_cache', lambda: cache)
+    monkeypatch.setattr(response_cache, 'current_data_version', lambda: version['value'])
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.calls = []
+    app.cache, app.version = cache, version
+
+    @app.route('/stats/<name>')
+    @cached_response()
+    def stats(name):
+        app.calls.append(name)
+        return jsonify({'name': name, 'calls': len(app.calls)})
+
+    @app.route('/mine')
+    @cached_response(vary_user=True)
+    def mine():
+        app.calls.append('mine')
+        return jsonify({'user': session.get('user_id')})
+
+    @app.route('/missing')
+    @cached_response()
+    def missing():
+        app.calls.append('missing')
+        return jsonify({'error': 'nope'}), 404
+
+    @app.route('/fragment')
+    def fragment():
+        app.calls.append('fragment')
+        return render_template_string("{% call cached_fragment('cards') %}<b>{{ n }}</b>{% endcall %}",
+                                      cached_fragment=cached_fragment, n=len(app.calls))
+
+    return app
+
+
+def test_responses_are_cached_per_url_and_revalidated_with_etags(app):
+    client = app.test_client()
+    first = client.get('/stats/churn')
+    assert client.get('/stats/churn').data == first.data
+    assert client.get('/stats/churn?range=30').status_code == 200
+    client.get('/stats/retention')
+    assert app.calls == ['churn', 'churn', 'retention']
+
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+    revalidated = client.get('/stats/churn', headers={'If-None-Match': first.headers['ETag']})
+    assert revalidated.status_code == 304 and revalidated.data == b''
+    assert app.cache.stats()['not_modified'] == 1
+
+
+def test_new_data_version_and_errors_are_not_served_from_cache(app):
+    client = app.test_client()
+    client.get('/stats/churn')
+    app.version['value'] = 'v2:0'
+    client.get('/stats/churn')
+    client.get('/missing')
+    client.get('/missing')
+    assert app.calls == ['churn', 'churn', 'missing', 'missing']
+
+
+def test_vary_user_keeps_personal_responses_apart(app):
+    client = app.test_client()
+    for user in ('alice', 'bob', 'alice'):
+        with client.session_transaction() as s:
+            s['user_id'] = user
+        assert client.get('/mine').get_json() == {'user': user}
+    assert app.calls == ['mine', 'mine']
+
+
+def test_fragments_are_cached_until_the_version_changes(app):
+    client = app.test_client()
+    assert client.get('/fragment').data == b'<b>1</b>'
+    assert client.get('/fragment').data == b'<b>1</b>'
+    app.version['value'] = 'v2:0'
+    assert client.get('/fragment').data == b'<b>3</b>'
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1
+    expired = ResponseCache(max_entries=2, ttl=-1)
+    expired.put('a', 1)
+    assert expired.get('a') is None
+    cache.invalidate('v2:0')
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,47 @@
+from utils import search_index
+from utils.search_index import SearchIndex
+
+WEIGHTS = {'name': 2.0, 'text': 1.0}
+
+
+def docs(items):
+    for key, name, text in items:
+        yield ('Customer', key), {'name': name, 'text': text}, {'id': key, 'name': name}
+
+
+def ids(hits):
+    return [document['id'] for _, document in hits]
+
+
+def test_exact_prefix_and_typo_matches():
+    index = SearchIndex()
+    index.sync('Customer', docs([('1', 'Dormant', 'cashback offer'), ('2', 'Loyal', 'travel rewards'),
+                                 ('3', 'Dormant', 'travel insurance')]), WEIGHTS)
+    assert ids(index.search('dormant travel'))[0] == '3'
+    assert set(ids(index.search('trav'))) == {'2', '3'}
+    assert ids(index.search('cashbak')) == ['1']
+
+
+def test_sync_reindexes_only_changed_documents_and_drops_missing():
+    index = SearchIndex()
+    assert index.sync('Customer', docs([('1', 'Dormant', 'a'), ('2', 'Loyal', 'b')]), WEIGHTS) == (2, 0)
+    assert index.sync('Customer', docs([('1', 'Dormant', 'a'), ('2', 'Stable', 'b'), ('3', 'Loyal', 'c')]),
+                      WEIGHTS) == (2, 0)
+    assert ids(index.search('loyal')) == ['3']
+    assert ids(index.search('stable')) == ['2']
+    assert index.sync('Customer', docs([('3', 'Loyal', 'c')]), WEIGHTS) == (0, 2)
+    assert len(index) == 1 and index.search('stable') == []
+
+
+def test_compaction_keeps_results(monkeypatch):
+    monkeypatch.setattr(search_index, 'COMPACT_MIN_TOMBSTONES', 5)
+    index = SearchIndex()
+    items = [(str(i), 'Dormant' if i % 2 else 'Loyal', f"note{i}") for i in range(20)]
+    index.sync('Customer', docs(items), WEIGHTS)
+    before = ids(index.search('loyal', limit=50))
+    for i in range(1, 20, 2):
+        index.remove_document(('Customer', str(i)))
+    assert index.tombstones == 0
+    assert sorted(ids(index.search('loyal', limit=50))) == sorted(before)
+    assert index.search('dormant') == []
+    assert ids(index.search('note4')) == ['4']
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from utils.data_processor import get_feature_store
+from utils.segmentation import SEGMENT_FEATURES, SegmentationModel, row_digests
+
+
+@pytest.fixture(scope='module')
+def model():
+    return SegmentationModel.fit(get_feature_store(), inits=2, parallel=False)
+
+
+@pytest.fixture(scope='module')
+def features():
+    return get_feature_store().matrix(SEGMENT_FEATURES)
+
+
+def test_assignment_is_nearest_centroid(model, features):
+    Z = model.project(features[:500])
+    brute = ((Z[:, None, :] - model.centroids[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    np.testing.assert_array_equal(model.assign(features[:500]), brute)
+
+
+def test_clusters_get_distinct_segment_names(model):
+    store = get_feature_store()
+    assert len(set(model.names)) == len(model.names)
+    assert set(model.names) <= set(store.categories('Segment'))
+
+
+def test_partial_fit_moves_centroids_towards_new_rows(model, features):
+    updated = SegmentationModel(model.artifact())
+    batch = features[:200]
+    assignments = updated.assign(batch)
+    cluster = np.bincount(assignments).argmax()
+    target = updated.project(batch[assignments == cluster]).mean(axis=0)
+    before = np.linalg.norm(updated.centroids[cluster] - target)
+
+    updated.partial_fit(batch)
+    assert np.linalg.norm(updated.centroids[cluster] - target) < before
+    assert updated.counts.sum() == model.counts.sum() + len(batch)
+
+
+def test_row_digests_change_with_any_feature(features):
+    changed = features[:50].copy()
+    changed[7, 3] += 1
+    digests = row_digests(features[:50])
+    assert (digests != row_digests(changed)).tolist() == [i == 7 for i in range(50)]
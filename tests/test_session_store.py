@@ -0,0 +1,87 @@
+import os
+from datetime import timedelta
+
+from flask import Flask, session
+
+from database.connection import get_connection
+from utils.session_store import SessionStore, SqliteSessionInterface
+
+MIGRATIONS = os.path.join(os.path.dirname(__file__), '..', 'database', 'migrations', 'main')
+HOUR = timedelta(hours=1)
+
+
+def make_db(tmp_path):
+    path = str(tmp_path / 'retention.db')
+    conn = get_connection(path)
+    for name in sorted(os.listdir(MIGRATIONS)):
+        with open(os.path.join(MIGRATIONS, name), encoding='utf-8') as f:
+            conn.executescript(f.read())
+    conn.executemany("INSERT INTO users (id, name, email, password_hash) VALUES (?, 'u', ?, 'x')",
+                     [(i, f"u{i}@example.com") for i in range(1, 10)])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_create_load_and_cross_worker_revisions(tmp_path):
+    path = make_db(tmp_path)
+    worker_a, worker_b = SessionStore(db_path=path), SessionStore(db_path=path)
+    token, revision, _ = worker_a.create({'user_id': 1, 'theme': 'dark'}, HOUR)
+    assert worker_a.load(token, revision)[0] == {'user_id': 1, 'theme': 'dark'}
+    assert worker_a.hits == 1 and worker_a.misses == 0
+
+    assert worker_b.load(token, revision)[0]['theme'] == 'dark'
+    new_revision, _ = worker_a.save(token, {'user_id': 1, 'theme': 'light'})
+    assert new_revision == revision + 1
+    # The cookie's newer revision makes worker B drop its cached copy
+    assert worker_b.load(token, new_revision)[0]['theme'] == 'light'
+    assert worker_b.misses == 2
+
+
+def test_revocation_and_expiry(tmp_path):
+    path = make_db(tmp_path)
+    store, other = SessionStore(db_path=path), SessionStore(db_path=path, cache_ttl=0)
+    token, revision, _ = store.create({'user_id': 7}, HOUR)
+    other.load(token, revision)
+    store.revoke(token)
+    assert store.load(token, revision) is None
+    assert other.load(token, revision) is None
+
+    second, revision, _ = store.create({'user_id': 7}, HOUR)
+    store.revoke_user(7)
+    assert store.load(second, revision) is None
+
+    expired, revision, _ = store.create({'user_id': 8}, -HOUR)
+    assert SessionStore(db_path=path).load(expired, revision) is None
+    live, _, _ = store.create({'user_id': 9}, HOUR)
+    assert store.sweep(batch_size=1) == 3
+    assert store.load(live, 1) is not None
+
+
+def test_flask_interface_round_trip(tmp_path):
+    store = SessionStore(db_path=make_db(tmp_path))
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = SqliteSessionInterface(store)
+
+    @app.route('/login')
+    def login():
+        session['user_id'] = 5
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return str(session.get('user_id'))
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'bye'
+
+    client = app.test_client()
+    client.get('/login')
+    token = next(c.value for c in client.cookie_jar if c.name == 'session').partition('.')[0]
+    assert client.get('/whoami').data == b'5'
+    client.get('/logout')
+    assert client.get('/whoami').data == b'None'
+    assert store.load(token) is None
@@ -0,0 +1,106 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from config import Config
+from utils import data_processor
+from utils.data_processor import FeatureStore, build_feature_store, upsert_feature_store
+from utils.uploads import UploadError, check_header, event_schema, validate_chunk
+
+SCHEMA = {'CLIENTNUM': 'integer', 'Age': 'integer', 'Limit': 'float', 'Card': 'category'}
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    source = tmp_path / 'customers.csv'
+    source.write_text('CLIENTNUM,Age,Limit,Card\n1,30,100.5,Blue\n2,40,200.0,Gold\n')
+    build_feature_store(csv_path=str(source), store_dir=str(tmp_path / 'store'))
+    return str(tmp_path / 'store')
+
+
+def chunks(text, size=2):
+    def read():
+        first_row = 1
+        for df in pd.read_csv(io.StringIO(text), chunksize=size, dtype=str):
+            valid, _, _ = validate_chunk(df, SCHEMA, first_row)
+            first_row += len(df)
+            yield valid
+    return read
+
+
+def test_validation_rejects_bad_numbers_and_ids():
+    df = pd.read_csv(io.StringIO('CLIENTNUM,Age,Limit,Card\n1,30,1.5,Blue\n,31,2,Blue\n3,x,3,Gold\n4,33,,Gold\n'),
+                     dtype=str)
+    valid, rejected, samples = validate_chunk(df, SCHEMA, 1)
+    assert valid['CLIENTNUM'].tolist() == [1]
+    assert rejected == 3
+    assert [(s['row'], s['column']) for s in samples] == [(2, 'CLIENTNUM'), (3, 'Age'), (4, 'Limit')]
+
+
+def test_validation_rejects_blank_float_and_category_cells():
+    df = pd.read_csv(io.StringIO('CLIENTNUM,Age,Limit,Card\n1,30, ,Blue\n2,31,2.5,\n3,32,3.5,  \n4,33,4.5,Gold\n'),
+                     dtype=str)
+    valid, rejected, samples = validate_chunk(df, SCHEMA, 1)
+    assert valid['CLIENTNUM'].tolist() == [4]
+    assert rejected == 3
+    assert [(s['row'], s['column'], s['value']) for s in samples] == [
+        (1, 'Limit', ' '), (2, 'Card', None), (3, 'Card', '  ')]
+
+
+def test_header_must_have_every_column():
+    assert check_header(['CLIENTNUM', 'Age', 'Limit', 'Card', 'Extra'], SCHEMA) == ['Extra']
+    with pytest.raises(UploadError):
+        check_header(['CLIENTNUM', 'Age'], SCHEMA)
+
+
+def test_upsert_updates_known_and_appends_new_customers(store_dir):
+    text = 'CLIENTNUM,Age,Limit,Card\n2,41,250.0,Platinum\n3,1000,7.25,Blue\n4,50,,Blue\n5,60,8.0,Blue\n'
+    manifest = upsert_feature_store(chunks(text), store_dir=store_dir)
+
+    store = FeatureStore(store_dir)
+    assert store.version == manifest['version']
+    # The blank Limit rejects customer 4
+    assert store.clientnums.tolist() == [1, 2, 3, 5]
+    assert store.row_dict(store.row_of(1)) == {'CLIENTNUM': 1, 'Age': 30, 'Limit': 100.5, 'Card': 'Blue'}
+    assert store.row_dict(store.row_of(2))['Card'] == 'Platinum'
+    assert store.row_dict(store.row_of(3))['Age'] == 1000
+    assert store.row_dict(store.row_of(5))['Limit'] == 8.0
+    # Existing category codes keep their meaning
+    assert store.categories('Card')[:2] == ['Blue', 'Gold']
+
+
+def test_changed_source_does_not_rebuild_over_uploaded_rows(store_dir, tmp_path, monkeypatch):
+    manifest = upsert_feature_store(chunks('CLIENTNUM,Age,Limit,Card\n7,70,7.5,Gold\n'), store_dir=store_dir)
+    source = tmp_path / 'customers.csv'
+    source.write_text(source.read_text() + '3,50,300.0,Blue\n')
+    monkeypatch.setattr(Config, 'DATA_PATH', str(source))
+    monkeypatch.setattr(Config, 'FEATURE_STORE_PATH', store_dir)
+    monkeypatch.setattr(data_processor, '_store', None)
+
+    store = data_processor.get_feature_store()
+    assert store.is_stale()
+    assert store.version == manifest['version']
+    assert store.clientnums.tolist() == [1, 2, 7]
+
+
+def test_validation_rejects_future_event_timestamps():
+    df = pd.DataFrame({'timestamp': ['2024-01-01T00:00:00Z', '2999-01-01T00:00:00', '2999-01-01T00:00:00+05:00',
+                                     datetime.now().isoformat(timespec='seconds')],
+                       'UserID': ['1', '2', '3', '4'], 'offer_id': ['offer_01'] * 4,
+                       'event_type': ['click'] * 4, 'tags': [None] * 4})
+    valid, rejected, samples = validate_chunk(df, event_schema(), 1)
+    assert valid['UserID'].tolist() == [1, 4]
+    assert rejected == 2
+    assert [(s['row'], s['column']) for s in samples] == [(2, 'timestamp'), (3, 'timestamp')]
+
+
+def test_validation_rejects_unknown_codes_and_flags():
+    schema = {'CLIENTNUM': 'integer', 'Complaint_Type': 'integer', 'Churn': 'integer'}
+    df = pd.read_csv(io.StringIO('CLIENTNUM,Complaint_Type,Churn\n1,4,1\n2,-1,0\n3,5,0\n4,0,2\n'), dtype=str)
+    valid, rejected, samples = validate_chunk(df, schema, 1)
+    assert valid['CLIENTNUM'].tolist() == [1]
+    assert rejected == 3
+    assert [(s['row'], s['column']) for s in samples] == [(2, 'Complaint_Type'), (3, 'Complaint_Type'),
+                                                          (4, 'Churn')]
@@ -0,0 +1,84 @@
+import numpy as np
+
+from config import Config
+from utils import visualization
+from utils.event_store import EventLog
+from utils.visualization import ChartData, bin_edges, binned_aggregate, lttb_indices
+
+
+def test_binned_aggregate_matches_histogram():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=5000)
+    flags = values > 0
+    edges = bin_edges(values, 25)
+    counts, means = binned_aggregate(values, edges, flags)
+    assert counts.tolist() == np.histogram(values, bins=edges)[0].tolist()
+    assert means[0] == 0.0 and means[-1] == 1.0
+
+
+def test_lttb_keeps_ends_and_extremes_within_the_point_budget():
+    x = np.arange(10000)
+    y = np.zeros(10000)
+    y[4321] = 50.0
+    keep = lttb_indices(x, y, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 9999
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+    assert len(lttb_indices(x[:50], y[:50], 100)) == 50
+
+
+def test_payloads_are_cached_per_data_version(monkeypatch):
+    calls = []
+    version = ['v1']
+
+    class Aggregates:
+        def snapshot(self):
+            return {'data_version': version[0]}
+
+    def chart(bins=10):
+        calls.append(bins)
+        return {'labels': list(range(int(bins)))}
+
+    monkeypatch.setattr(visualization, 'get_dashboard_aggregates', Aggregates)
+    monkeypatch.setitem(visualization.CHARTS, 'test_chart', (chart, ('bins',)))
+    charts = ChartData(max_entries=4)
+    first = charts.get('test_chart', {'bins': '3', 'ignored': 'x'})
+    assert charts.get('test_chart', {'bins': '3'}) is first
+    assert first['data_version'] == 'v1' and len(calls) == 1
+    version[0] = 'v2'
+    assert charts.get('test_chart', {'bins': '3'})['data_version'] == 'v2'
+    assert len(calls) == 2
+
+
+def timeline_log(rows):
+    log = EventLog()
+    log.add_rows([{'timestamp': timestamp, 'UserID': 1, 'offer_id': 'offer_01', 'event_type': event_type,
+                   'tags': ''} for timestamp, event_type in rows])
+    return log
+
+
+def test_event_timeline_buckets_the_event_log_counters(monkeypatch):
+    log = timeline_log([('2024-01-01T01:00:00Z', 'click'), ('2024-01-01T23:00:00Z', 'accept'),
+                        ('2024-01-03T12:00:00Z', 'click'), ('2024-01-03T12:30:00+01:00', 'dismiss')])
+    monkeypatch.setattr(visualization, 'get_event_log', lambda: log)
+    payload = visualization.event_timeline('day')
+    assert payload['labels'] == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert payload['series'] == {'impression': [0, 0, 0], 'click': [1, 0, 1], 'accept': [1, 0, 0],
+                                 'dismiss': [0, 0, 1]}
+    assert visualization.event_timeline('hour')['buckets'] == 60
+
+
+def test_event_timeline_clamps_outlying_timestamps(monkeypatch):
+    # Ingest rejects future events; the timeline still clamps any that got into the log
+    monkeypatch.setattr(Config, 'EVENT_MAX_CLOCK_SKEW', float('inf'))
+    log = timeline_log([('1970-01-01T00:00:00Z', 'click'), ('2024-01-10T00:00:00Z', 'click'),
+                        ('2024-01-12T00:00:00Z', 'accept'), ('9999-01-01T00:00:00Z', 'accept')])
+    monkeypatch.setattr(visualization, 'get_event_log', lambda: log)
+    monkeypatch.setattr(Config, 'CHART_MAX_BUCKETS', 5)
+    monkeypatch.setattr(visualization.time, 'time', lambda: 1705017600.0)  # 2024-01-12
+    payload = visualization.event_timeline('day')
+    assert payload['buckets'] == 5
+    assert payload['labels'] == ['2024-01-08', '2024-01-09', '2024-01-10', '2024-01-11', '2024-01-12']
+    assert payload['series']['click'] == [1, 0, 1, 0, 0]
+    assert payload['series']['accept'] == [0, 0, 0, 0, 2]
@@ -0,0 +1,63 @@
+import pytest
+
+from database.connection import get_connection
+from utils import write_behind
+from utils.write_behind import WriteBehindBuffer
+
+
+def make_buffer(tmp_path):
+    path = str(tmp_path / 'users.db')
+    conn = get_connection(path)
+    conn.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, last_login TEXT, name TEXT)')
+    conn.executemany('INSERT INTO users (id, name) VALUES (?, ?)', [(1, 'a'), (2, 'b')])
+    conn.commit()
+    conn.close()
+    # Long interval: the tests flush by hand
+    return path, WriteBehindBuffer('users', 'id', ('last_login', 'name'), db_path=path, flush_interval=3600)
+
+
+def rows(path):
+    conn = get_connection(path)
+    try:
+        return [tuple(row) for row in conn.execute('SELECT id, last_login, name FROM users ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def test_updates_coalesce_and_flush_in_one_pass(tmp_path):
+    path, buffer = make_buffer(tmp_path)
+    buffer.record(1, last_login='t1')
+    buffer.record(1, last_login='t2')
+    buffer.record(2, name='bee')
+    assert buffer.pending_value(1, 'last_login') == 't2'
+    assert rows(path) == [(1, None, 'a'), (2, None, 'b')]
+
+    assert buffer.flush() == 2
+    assert rows(path) == [(1, 't2', 'a'), (2, None, 'bee')]
+    assert buffer.stats() == {'pending': 0, 'flushed_rows': 2, 'coalesced': 1}
+    assert buffer.flush() == 0
+
+
+def test_unknown_columns_are_rejected(tmp_path):
+    _, buffer = make_buffer(tmp_path)
+    with pytest.raises(ValueError):
+        buffer.record(1, password_hash='x')
+
+
+def test_failed_flush_keeps_updates_and_newer_values_win(tmp_path, monkeypatch):
+    path, buffer = make_buffer(tmp_path)
+    buffer.record(1, last_login='old', name='alpha')
+
+    def failing(db_path):
+        # A newer value arrives while the failing flush is in progress
+        buffer.record(1, last_login='new')
+        raise RuntimeError('database is locked')
+
+    monkeypatch.setattr(write_behind, 'get_connection', failing)
+    assert buffer.flush() == 0
+    assert buffer.pending_value(1, 'last_login') == 'new'
+    assert buffer.pending_value(1, 'name') == 'alpha'
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert rows(path)[0] == (1, 'new', 'alpha')
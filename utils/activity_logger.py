@@ -0,0 +1,182 @@
+"""Buffered, asynchronous writer for the user_activities table.
+
+Request handlers call ``log_activity`` which only enqueues the row.  A
+background thread drains the queue and writes each batch with one
+``executemany`` in a single transaction, either when ``ACTIVITY_BATCH_SIZE``
+rows are waiting or ``ACTIVITY_FLUSH_INTERVAL`` seconds have passed.  When
+the queue is full, callers block for up to ``ACTIVITY_ENQUEUE_TIMEOUT``
+seconds (backpressure) before the row is dropped and counted.  A batch whose
+write fails is retried once after ``ACTIVITY_RETRY_DELAY`` seconds before it
+is dropped.  Pending rows are flushed at interpreter exit.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from database.connection import get_connection
+
+INSERT_SQL = """
+    INSERT INTO user_activities (user_id, activity_type, description, created_at)
+    VALUES (?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+class ActivityLogger:
+    """Queues activity rows and writes them in batches on a background thread"""
+
+    def __init__(self, db_path=None, batch_size=None, flush_interval=None,
+                 queue_size=None, enqueue_timeout=None, retry_delay=None):
+        self.db_path = db_path or Config.DASHBOARD_DATABASE_PATH
+        self.batch_size = batch_size or Config.ACTIVITY_BATCH_SIZE
+        self.flush_interval = flush_interval or Config.ACTIVITY_FLUSH_INTERVAL
+        self.enqueue_timeout = Config.ACTIVITY_ENQUEUE_TIMEOUT if enqueue_timeout is None else enqueue_timeout
+        self.retry_delay = Config.ACTIVITY_RETRY_DELAY if retry_delay is None else retry_delay
+        self._queue = queue.Queue(maxsize=queue_size or Config.ACTIVITY_QUEUE_SIZE)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        # Counters are bumped from request threads and the writer thread
+        self._stats_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='activity-logger', daemon=True)
+                self._thread.start()
+
+    def log(self, user_id, activity_type, description, created_at=None):
+        """Queue one activity row; returns False if it had to be dropped"""
+        self._ensure_started()
+        row = (user_id, activity_type, description, created_at or datetime.now().isoformat())
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            print(f"Activity queue full, dropped {activity_type} for user {user_id}")
+            return False
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(batch)
+                self._drain()
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _drain(self):
+        """Write everything still queued (used at shutdown)"""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                batch.append(item)
+        self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        for attempt in range(2):
+            try:
+                conn = get_connection(self.db_path)
+                try:
+                    with conn:
+                        conn.executemany(INSERT_SQL, batch)
+                finally:
+                    conn.close()
+            except Exception as e:
+                if attempt == 0:
+                    # Usually a locked database or an exhausted pool; back off once
+                    print(f"Error writing {len(batch)} activity rows, retrying: {e}")
+                    time.sleep(self.retry_delay)
+                    continue
+                with self._stats_lock:
+                    self.dropped += len(batch)
+                print(f"Error writing {len(batch)} activity rows, dropped: {e}")
+                return
+            with self._stats_lock:
+                self.written += len(batch)
+                self.batches += 1
+            return
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain()
+            return
+        target = self._done() + self._queue.qsize()
+        end = time.monotonic() + timeout
+        while self._done() < target and time.monotonic() < end:
+            time.sleep(0.01)
+
+    def _done(self):
+        with self._stats_lock:
+            return self.written + self.dropped
+
+    def stop(self, timeout=5.0):
+        """Flush pending rows and stop the writer thread"""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        else:
+            self._drain()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches,
+            }
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_activity_logger():
+    """Return the process-wide activity logger"""
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = ActivityLogger()
+                atexit.register(_logger.stop)
+    return _logger
+
+
+def log_activity(user_id, activity_type, description):
+    """Queue an activity row without touching the database on the request thread"""
+    return get_activity_logger().log(user_id, activity_type, description)
@@ -0,0 +1,214 @@
+"""Materialized dashboard aggregates.
+
+Headline numbers (churn and retention rates, active customers, utilization,
+complaint counts, per-segment retention) are computed from the customer
+feature store once per store version, and offer engagement totals come from
+the event log's incrementally maintained counters.  The merged snapshot is
+cached in memory; a dashboard load just returns it.  At most once every
+``AGGREGATE_TTL_SECONDS`` the cache checks the source versions (store version
+and event count) and recomputes only the part whose source changed.
+
+Each book recompute is also written to the ``dashboard_stats`` and
+``customer_segments`` tables so SQL consumers see the same numbers.
+"""
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from config import Config
+from database.connection import get_connection
+from utils.data_processor import COMPLAINT_TYPE_LABELS, get_feature_store
+from utils.event_store import get_event_log
+from utils.predictor import RISK_THRESHOLDS, get_predictor
+
+
+def _rate(numerator, denominator):
+    return round(100.0 * numerator / denominator, 2) if denominator else 0.0
+
+
+def group_counts(codes, categories, values=None):
+    """Per-category counts (and sums of values) in one bincount pass"""
+    codes = np.asarray(codes)
+    valid = codes >= 0
+    size = len(categories)
+    counts = np.bincount(codes[valid], minlength=size)
+    if values is None:
+        return counts, None
+    sums = np.bincount(codes[valid], weights=np.asarray(values, dtype=np.float64)[valid], minlength=size)
+    return counts, sums
+
+
+def compute_book_aggregates(store, predictor=None):
+    """Aggregate the customer book with vectorized column scans"""
+    total = len(store)
+    churn = np.asarray(store.column('Churn'), dtype=bool)
+    inactive = np.asarray(store.column('Inactive_90Days_Flag'), dtype=bool)
+    retained = total - int(churn.sum())
+
+    segment_names = store.categories('Segment')
+    segment_codes = store.column('Segment')
+    segment_counts, segment_retained = group_counts(segment_codes, segment_names, ~churn)
+    _, segment_revenue = group_counts(segment_codes, segment_names, store.column('Total_Trans_Amt'))
+    segments = [
+        {
+            'name': name,
+            'customer_count': int(segment_counts[i]),
+            'retention_rate': _rate(segment_retained[i], segment_counts[i]),
+            'avg_revenue': round(float(segment_revenue[i] / segment_counts[i]), 2) if segment_counts[i] else 0.0,
+        }
+        for i, name in enumerate(segment_names)
+    ]
+    segments.sort(key=lambda s: s['customer_count'], reverse=True)
+
+    complaint_counts, _ = group_counts(store.column('Complaint_Type'), range(max(COMPLAINT_TYPE_LABELS) + 1))
+    complaints = {label: int(complaint_counts[code]) for code, label in COMPLAINT_TYPE_LABELS.items()}
+
+    aggregates = {
+        'total_customers': total,
+        'active_customers': int((~churn & ~inactive).sum()),
+        'churned_customers': total - retained,
+        'churn_rate': _rate(total - retained, total),
+        'retention_rate': _rate(retained, total),
+        'avg_utilization': round(float(np.mean(store.column('Avg_Utilization_Ratio'))) * 100.0, 2),
+        'customer_satisfaction': round(float(np.mean(store.column('Customer_Rating'))), 2),
+        'complaints': complaints,
+        'open_complaints': total - complaints[COMPLAINT_TYPE_LABELS[0]],
+        'customer_segments': len(segment_names),
+        'segments': segments,
+    }
+
+    if predictor is not None:
+        high_risk = RISK_THRESHOLDS[0][0]
+        aggregates['high_risk_customers'] = int((predictor.predict_store(store) >= high_risk).sum())
+        aggregates['model_accuracy'] = round(predictor.accuracy * 100.0, 2) if predictor.accuracy else None
+    return aggregates
+
+
+def compute_event_aggregates(event_log):
+    """Offer engagement totals from the event log's decayed counters"""
+    totals = {}
+    for counts in event_log.offer_stats().values():
+        for event_type, value in counts.items():
+            totals[event_type] = totals.get(event_type, 0.0) + value
+    return {
+        'total_events': event_log.total_events,
+        'offer_engagement': {event_type: round(value, 2) for event_type, value in sorted(totals.items())},
+        # Share of all recorded offer events that were accepts
+        'offer_acceptance_rate': _rate(totals.get('accept', 0.0), sum(totals.values())),
+    }
+
+
+def materialize(aggregates, db_path=None):
+    """Replace the dashboard_stats and customer_segments rows with a fresh snapshot"""
+    recorded_at = datetime.now().isoformat()
+    metrics = [
+        (name, float(aggregates[name]), recorded_at)
+        for name in ('model_accuracy', 'total_customers', 'active_customers', 'churn_rate',
+                     'retention_rate', 'avg_utilization', 'customer_satisfaction',
+                     'open_complaints', 'high_risk_customers')
+        if aggregates.get(name) is not None
+    ]
+    segments = [
+        (s['name'], s['customer_count'], s['retention_rate'], s['avg_revenue'], recorded_at)
+        for s in aggregates['segments']
+    ]
+
+    conn = get_connection(db_path or Config.DASHBOARD_DATABASE_PATH)
+    try:
+        with conn:
+            conn.execute("DELETE FROM dashboard_stats")
+            conn.executemany("""
+                INSERT INTO dashboard_stats (metric_name, metric_value, recorded_at)
+                VALUES (?, ?, ?)
+            """, metrics)
+            conn.execute("DELETE FROM customer_segments")
+            conn.executemany("""
+                INSERT INTO customer_segments
+                (segment_name, customer_count, retention_rate, avg_revenue, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, segments)
+    finally:
+        conn.close()
+
+
+class DashboardAggregates:
+    """Versioned, TTL-checked cache of the dashboard aggregates"""
+
+    def __init__(self, ttl=None, persist=True):
+        self.ttl = Config.AGGREGATE_TTL_SECONDS if ttl is None else ttl
+        self.persist = persist
+        self._book = None
+        self._book_version = None
+        self._events = None
+        self._events_seen = None
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def snapshot(self):
+        """Current aggregates; recomputes only when a source has changed"""
+        if self._snapshot is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._refresh()
+        return self._snapshot
+
+    def _refresh(self):
+        store = get_feature_store()
+        event_log = get_event_log()
+        event_log.refresh(force=True)
+        changed = False
+
+        if store.version != self._book_version:
+            self._book = compute_book_aggregates(store, get_predictor())
+            self._book_version = store.version
+            changed = True
+            if self.persist:
+                try:
+                    materialize(self._book)
+                except Exception as e:
+                    print(f"Error materializing dashboard aggregates: {e}")
+
+        if event_log.total_events != self._events_seen:
+            self._events = compute_event_aggregates(event_log)
+            self._events_seen = event_log.total_events
+            changed = True
+
+        if changed or self._snapshot is None:
+            snapshot = dict(self._book)
+            snapshot.update(self._events)
+            snapshot['data_version'] = f"{self._book_version}:{self._events_seen}"
+            snapshot['computed_at'] = datetime.now().isoformat()
+            self._snapshot = snapshot
+            for listener in self._listeners:
+                try:
+                    listener(snapshot['data_version'])
+                except Exception as e:
+                    print(f"Error notifying aggregate listener: {e}")
+        self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a source-version check on the next read"""
+        self._checked_at = 0.0
+
+    def add_listener(self, listener):
+        """Call listener(data_version) whenever a new snapshot is computed"""
+        self._listeners.append(listener)
+
+
+_aggregates = None
+_aggregates_lock = threading.Lock()
+
+
+def get_dashboard_aggregates():
+    """Return the process-wide aggregate cache"""
+    global _aggregates
+    if _aggregates is None:
+        with _aggregates_lock:
+            if _aggregates is None:
+                _aggregates = DashboardAggregates()
+    return _aggregates
@@ -0,0 +1,367 @@
+"""Static asset build: minify, fingerprint and precompress.
+
+``python -m utils.assets`` (also run by ``create_app`` when
+``ASSET_BUILD_ON_STARTUP`` is on) takes every ``.js`` and ``.css`` file under
+``static/`` outside ``static/dist``:
+
+* minifies it (``rjsmin``/``rcssmin`` when installed, otherwise the
+  conservative built-in minifiers below, which only drop comments and
+  whitespace and keep line breaks so automatic semicolon insertion is
+  unaffected; ``.min.`` files are copied as they are),
+* writes it to ``static/dist/<dir>/<name>.<hash>.<ext>`` where the hash is
+  taken from the minified content, plus ``.gz`` and (with ``brotli``
+  installed) ``.br`` siblings,
+* records ``source -> fingerprinted`` in ``static/dist/manifest.json``.
+
+Fingerprinted files never change, so a build skips files that already
+exist and several workers can build at once.  ``init_assets`` makes
+``url_for('static', filename=...)`` resolve through the manifest and serves
+``static/dist`` with ``Cache-Control: public, max-age=..., immutable``;
+without a manifest the original files are served.
+
+Third-party libraries are vendored into ``static/vendor`` so the pages work
+without internet access; ``python -m utils.assets --vendor`` downloads any
+that are missing.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import urllib.request
+
+from flask import request, url_for
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(PROJECT_ROOT, 'static')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+
+# Vendored libraries: static path -> pinned download URL
+VENDOR = {
+    'vendor/chart.min.js': 'https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js',
+}
+
+# After these characters a '/' starts a regular expression, not a division
+_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw')
+# Spaces next to these are never needed
+_JS_TIGHT = set('{}()[];,:=<>?!&|')
+
+
+def _skip_quoted(source, i, quote):
+    """Index just past the string literal starting at source[i]"""
+    i += 1
+    while i < len(source) and source[i] != quote:
+        if source[i] == '\\':
+            i += 1
+        elif source[i] == '\n' and quote != '`':
+            break
+        elif quote == '`' and source.startswith('${', i):
+            i = _skip_template_expression(source, i + 2) - 1
+        i += 1
+    return i + 1
+
+
+def _skip_template_expression(source, i):
+    """Index just past the '}' closing a ${...} in a template literal"""
+    depth = 1
+    while i < len(source) and depth:
+        char = source[i]
+        if char in '\'"`':
+            i = _skip_quoted(source, i, char)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+        i += 1
+    return i
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal (and flags) starting at source[i]"""
+    i += 1
+    in_class = False
+    while i < len(source) and source[i] != '\n':
+        char = source[i]
+        if char == '\\':
+            i += 1
+        elif char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(source) and (source[i].isalnum() or source[i] == '_'):
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Whether a '/' after the output so far starts a regex literal"""
+    tail = ''
+    for piece in reversed(out):
+        tail = piece + tail
+        if len(tail.strip()) >= 12:
+            break
+    tail = tail.rstrip()
+    if not tail or tail[-1] in _REGEX_PREFIX:
+        return True
+    word = re.search(r'[\w$]+$', tail)
+    return word is not None and word.group(0) in _REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """Drop comments and redundant whitespace, keeping line breaks.
+
+    String, template and regex literals are copied byte for byte, so
+    multi-line template literals keep their indentation and blank lines.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(source)
+
+    out = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in '\'"`':
+            end = _skip_quoted(source, i, char)
+            out.append(source[i:end])
+            i = end
+        elif char.isspace() or source.startswith('//', i) or source.startswith('/*', i):
+            i, newline = _skip_js_gap(source, i)
+            if not out or out[-1] == '\n':
+                continue
+            if newline:
+                # Line breaks stay so automatic semicolon insertion is unaffected
+                out.append('\n')
+            elif out[-1][-1] not in _JS_TIGHT and source[i:i + 1] not in _JS_TIGHT:
+                out.append(' ')
+        elif char == '/' and _regex_allowed(out):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).rstrip() + '\n'
+
+
+def _skip_js_gap(source, i):
+    """Skip whitespace and comments from source[i]; returns (end, whether a line break was crossed)"""
+    newline = False
+    while i < len(source):
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = len(source) if end < 0 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = len(source) if end < 0 else end + 2
+            newline = newline or '\n' in source[i:end]
+            i = end
+        elif source[i].isspace():
+            newline = newline or source[i] == '\n'
+            i += 1
+        else:
+            break
+    return i, newline
+
+
+def minify_css(source):
+    """Drop comments and whitespace outside strings"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(source)
+
+    out = []
+    i = 0
+    while i < len(source):
+        char = source[i]
+        if char in '\'"':
+            end = _skip_quoted(source, i, char)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = len(source) if end < 0 else end + 2
+        elif char.isspace():
+            while i < len(source) and source[i].isspace():
+                i += 1
+            previous = out[-1][-1:] if out else ''
+            following = source[i:i + 1]
+            # Keep the space in selectors like "a .b" and values like "1px solid"
+            if previous not in set('{};:,>') and following not in set('{};,>'):
+                out.append(' ')
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out).replace(';}', '}').strip() + '\n'
+
+
+def _minify(path, text):
+    if '.min.' in os.path.basename(path):
+        return text
+    if path.endswith('.js'):
+        return minify_js(text)
+    return minify_css(text)
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _sources(static_dir):
+    for root, dirs, files in os.walk(static_dir):
+        rel_root = os.path.relpath(root, static_dir)
+        if rel_root.split(os.sep)[0] in (DIST_DIR, 'uploads'):
+            dirs[:] = []
+            continue
+        for name in sorted(files):
+            if name.endswith(('.js', '.css')):
+                yield os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, '/')
+
+
+def build_assets(static_dir=STATIC_DIR):
+    """Build static/dist and its manifest; returns the manifest"""
+    dist = os.path.join(static_dir, DIST_DIR)
+    manifest = {}
+    for source in _sources(static_dir):
+        with open(os.path.join(static_dir, source), encoding='utf-8') as f:
+            minified = _minify(source, f.read()).encode('utf-8')
+        digest = hashlib.sha256(minified).hexdigest()[:HASH_LENGTH]
+        stem, ext = os.path.splitext(source)
+        target = f"{DIST_DIR}/{stem}.{digest}{ext}"
+        path = os.path.join(static_dir, target)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path + '.gz', gzip.compress(minified, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_atomic(path + '.br', brotli.compress(minified, quality=11))
+            _write_atomic(path, minified)
+        manifest[source] = target
+
+    os.makedirs(dist, exist_ok=True)
+    _write_atomic(os.path.join(dist, MANIFEST_NAME),
+                  json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    get_manifest().reload()
+    return manifest
+
+
+def missing_vendor_files(static_dir=STATIC_DIR):
+    return [path for path in VENDOR if not os.path.exists(os.path.join(static_dir, path))]
+
+
+def fetch_vendor(static_dir=STATIC_DIR):
+    """Download vendored libraries that are not present yet"""
+    fetched = []
+    for path in missing_vendor_files(static_dir):
+        target = os.path.join(static_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(VENDOR[path], timeout=30) as response:
+            _write_atomic(target, response.read())
+        fetched.append(path)
+    return fetched
+
+
+class AssetManifest:
+    """source -> fingerprinted path, reloaded when the manifest file changes"""
+
+    def __init__(self, static_dir=STATIC_DIR):
+        self.path = os.path.join(static_dir, DIST_DIR, MANIFEST_NAME)
+        self._entries = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def reload(self):
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime != self._mtime:
+                    with open(self.path, encoding='utf-8') as f:
+                        self._entries = json.load(f)
+                    self._mtime = mtime
+            except (OSError, ValueError):
+                self._entries = {}
+                self._mtime = None
+
+    def resolve(self, filename):
+        return self._entries.get(filename, filename)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """Return the process-wide asset manifest"""
+    global _manifest
+    if _manifest is None:
+        with _manifest_lock:
+            if _manifest is None:
+                _manifest = AssetManifest()
+                _manifest.reload()
+    return _manifest
+
+
+def vendor_url(path):
+    """URL of a vendored library; its pinned CDN URL until it has been fetched"""
+    if os.path.exists(os.path.join(STATIC_DIR, path)):
+        return url_for('static', filename=path)
+    return VENDOR[path]
+
+
+def init_assets(app):
+    """Resolve static URLs through the manifest and cache fingerprinted files forever"""
+    immutable = f"public, max-age={int(Config.ASSET_MAX_AGE)}, immutable"
+    app.add_template_global(vendor_url)
+
+    @app.url_defaults
+    def fingerprint_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = get_manifest().resolve(values['filename'])
+
+    @app.after_request
+    def cache_fingerprinted_assets(response):
+        if request.endpoint == 'static' and request.view_args.get('filename', '').startswith(DIST_DIR + '/'):
+            response.headers['Cache-Control'] = immutable
+            response.headers.pop('Expires', None)
+        return response
+
+
+if __name__ == '__main__':
+    # python -m utils.assets [--vendor]
+    if '--vendor' in sys.argv[1:]:
+        for path in fetch_vendor():
+            print(f"Fetched {path}")
+    for path in missing_vendor_files():
+        print(f"Missing vendored file static/{path} (run python -m utils.assets --vendor)")
+    manifest = build_assets()
+    print(f"Built {len(manifest)} assets into static/{DIST_DIR}")
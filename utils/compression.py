@@ -0,0 +1,289 @@
+"""WSGI response compression.
+
+``CompressionMiddleware`` wraps the Flask app and, when the client's
+``Accept-Encoding`` allows it, compresses text-like responses with brotli
+(if the ``brotli`` package is installed) or gzip:
+
+* Bodies with a ``Content-Length`` below ``COMPRESSION_MIN_SIZE``, responses
+  that already have a ``Content-Encoding`` and binary content types are
+  passed through untouched.
+* Responses without a ``Content-Length`` (generators such as the event
+  stream or exports) are compressed chunk by chunk and flushed after each
+  chunk, so nothing is held back waiting for a full compression block.
+* A request for a static file that has a precompressed ``.br``/``.gz``
+  sibling (see ``utils.assets``) is answered with that file directly, unless
+  it asks for a ``Range`` of it (byte offsets would then refer to the
+  compressed file, so the identity file is served instead).
+* ``HEAD`` requests pass through untouched: their empty body cannot be
+  compressed to the length a ``GET`` would report.
+
+The compressed representation gets its own strong ETag (the original with an
+encoding suffix) and ``Vary: Accept-Encoding``; the suffix is stripped from
+``If-None-Match`` on the way in so the app's conditional GETs still match.
+"""
+import mimetypes
+import os
+import zlib
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml',
+    'application/x-ndjson', 'image/svg+xml',
+)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+ETAG_SUFFIX = {'br': '-br', 'gzip': '-gz'}
+SKIP_STATUS = (204, 206, 304)
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header"""
+    codings = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        codings[name.strip().lower()] = q
+    return codings
+
+
+def choose_encoding(header):
+    """Best coding we support that the client accepts, or None"""
+    codings = parse_accept_encoding(header)
+    wildcard = codings.get('*', 0.0)
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = codings.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli stream"""
+
+    def __init__(self, encoding, level, brotli_quality):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._stream = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._stream = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._stream.process(data)
+        return self._stream.compress(data)
+
+    def flush(self):
+        if self.encoding == 'br':
+            return self._stream.flush()
+        return self._stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._stream.finish() if self.encoding == 'br' else self._stream.flush(zlib.Z_FINISH)
+
+
+def _header(headers, name):
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers, *names):
+    names = {name.lower() for name in names}
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+def _add_vary(headers):
+    vary = _header(headers, 'Vary')
+    if vary is None:
+        return headers + [('Vary', 'Accept-Encoding')]
+    if 'accept-encoding' in vary.lower():
+        return headers
+    return _without(headers, 'Vary') + [('Vary', f"{vary}, Accept-Encoding")]
+
+
+def _suffix_etag(etag, suffix):
+    if etag.endswith('"'):
+        return f"{etag[:-1]}{suffix}\""
+    return f"{etag}{suffix}"
+
+
+class CompressionMiddleware:
+    """Negotiates and applies Content-Encoding for every response"""
+
+    def __init__(self, app, static_folder=None, static_url_path='/static', level=None,
+                 brotli_quality=None, min_size=None):
+        self.app = app
+        self.static_folder = static_folder
+        self.static_url_path = static_url_path.rstrip('/') + '/'
+        self.level = Config.COMPRESSION_LEVEL if level is None else level
+        self.brotli_quality = Config.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality
+        self.min_size = Config.COMPRESSION_MIN_SIZE if min_size is None else min_size
+
+    def __call__(self, environ, start_response):
+        encoding = choose_encoding(environ.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None or environ.get('REQUEST_METHOD') not in ('GET', 'HEAD', 'POST'):
+            return self.app(environ, start_response)
+
+        # The app only knows its identity ETags
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        revalidating = False
+        if if_none_match:
+            for suffix in ETAG_SUFFIX.values():
+                revalidating = revalidating or f'{suffix}"' in if_none_match
+                if_none_match = if_none_match.replace(f'{suffix}"', '"')
+            environ['HTTP_IF_NONE_MATCH'] = if_none_match
+
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return self.app(environ, start_response)
+
+        precompressed = None if environ.get('HTTP_RANGE') else self._precompressed(environ, encoding)
+        if precompressed is not None:
+            return self._serve_precompressed(environ, start_response, encoding, precompressed)
+
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            captured['exc_info'] = exc_info
+            return lambda data: None
+
+        app_iter = self.app(environ, capture)
+        chunks = iter(app_iter)
+        first = None
+        if 'status' not in captured:
+            # start_response may be deferred until the first chunk
+            try:
+                first = next(chunks, None)
+            except Exception:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+                raise
+        return self._respond(start_response, captured, app_iter, _chain(first, chunks), encoding, revalidating)
+
+    # Precompressed static files
+
+    def _precompressed(self, environ, encoding):
+        path = environ.get('PATH_INFO', '')
+        if self.static_folder is None or not path.startswith(self.static_url_path):
+            return None
+        relative = path[len(self.static_url_path):]
+        if not relative or '..' in relative.split('/'):
+            return None
+        candidate = os.path.join(self.static_folder, relative + SUFFIXES[encoding])
+        if os.path.isfile(candidate):
+            return relative + SUFFIXES[encoding]
+        return None
+
+    def _serve_precompressed(self, environ, start_response, encoding, relative):
+        original_path = environ['PATH_INFO']
+        environ['PATH_INFO'] = self.static_url_path + relative
+
+        def start(status, headers, exc_info=None):
+            headers = _without(headers, 'Content-Type', 'Content-Encoding')
+            content_type = _guess_type(original_path)
+            headers.append(('Content-Type', content_type))
+            if int(status.split(' ', 1)[0]) in (200, 304):
+                headers.append(('Content-Encoding', encoding))
+                etag = _header(headers, 'ETag')
+                if etag:
+                    headers = _without(headers, 'ETag') + [('ETag', _suffix_etag(etag, ETAG_SUFFIX[encoding]))]
+            return start_response(status, _add_vary(headers), exc_info)
+
+        return self.app(environ, start)
+
+    # Dynamic responses
+
+    def _compressible(self, status, headers):
+        if int(status.split(' ', 1)[0]) in SKIP_STATUS:
+            return False
+        if _header(headers, 'Content-Encoding'):
+            return False
+        content_type = (_header(headers, 'Content-Type') or '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        length = _header(headers, 'Content-Length')
+        return length is None or int(length) >= self.min_size
+
+    def _respond(self, start_response, captured, app_iter, chunks, encoding, revalidating):
+        status, headers = captured['status'], captured['headers']
+        if not self._compressible(status, headers):
+            etag = _header(headers, 'ETag')
+            if revalidating and etag and status.startswith('304'):
+                # Confirm the compressed representation the client already has
+                headers = _without(headers, 'ETag') + [('ETag', _suffix_etag(etag, ETAG_SUFFIX[encoding]))]
+                headers = _add_vary(headers)
+            start_response(status, headers, captured['exc_info'])
+            return _closing(chunks, app_iter)
+
+        etag = _header(headers, 'ETag')
+        headers = _without(headers, 'Content-Length', 'ETag')
+        if etag:
+            headers.append(('ETag', _suffix_etag(etag, ETAG_SUFFIX[encoding])))
+        headers.append(('Content-Encoding', encoding))
+        headers = _add_vary(headers)
+
+        compressor = _Compressor(encoding, self.level, self.brotli_quality)
+        if _header(captured['headers'], 'Content-Length') is not None:
+            # Known size: compress the whole body in one go
+            try:
+                body = b''.join(chunks)
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+            data = compressor.compress(body) + compressor.finish()
+            start_response(status, headers + [('Content-Length', str(len(data)))], captured['exc_info'])
+            return [data]
+
+        start_response(status, headers, captured['exc_info'])
+        return self._stream(compressor, chunks, app_iter)
+
+    @staticmethod
+    def _stream(compressor, chunks, app_iter):
+        try:
+            for chunk in chunks:
+                if chunk:
+                    # Flush so each chunk (e.g. an SSE message) reaches the client now
+                    yield compressor.compress(chunk) + compressor.flush()
+            yield compressor.finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+
+def _chain(first, chunks):
+    if first is not None:
+        yield first
+    yield from chunks
+
+
+def _closing(chunks, app_iter):
+    try:
+        yield from chunks
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+
+
+def _guess_type(path):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type == 'application/javascript':
+        content_type += '; charset=utf-8'
+    return content_type
@@ -0,0 +1,285 @@
+"""Keyset-paginated, filtered customer listing over the feature store.
+
+For every sort key the index keeps the row permutation that sorts the book
+by ``(value, CLIENTNUM)``, ascending and descending, built once per feature
+store version.  A page cursor carries the sort value and CLIENTNUM of the
+last row returned, so the next page starts with two binary searches instead
+of skipping ``offset`` rows, and stays correct when the book is rebuilt.
+
+Filters (``Segment``, ``Card_Category``, ``Income_Category``,
+``Attrition_Flag`` and the churn risk band) use posting lists: the sorted
+positions of the rows holding each value, built lazily per sort order.  A
+page with one single-valued filter is a slice of its posting list; with
+several, the shortest list drives the scan and the other filters are checked
+on the candidates in chunks.  Either way a page costs roughly
+``page size / selectivity of the other filters`` row visits, whatever the
+offset.
+"""
+import base64
+import json
+import threading
+
+import numpy as np
+
+from utils.data_processor import get_feature_store
+from utils.predictor import RISK_THRESHOLDS, get_predictor, risk_levels
+
+# Query parameter -> feature store column (or the derived risk band)
+FILTERS = {
+    'segment': 'Segment',
+    'card_category': 'Card_Category',
+    'income_category': 'Income_Category',
+    'attrition_flag': 'Attrition_Flag',
+    'risk': 'risk_level',
+}
+
+# Sortable fields -> feature store column (or the churn score)
+SORT_KEYS = {
+    'customer_id': 'CLIENTNUM',
+    'churn_probability': 'churn_probability',
+    'credit_limit': 'Credit_Limit',
+    'total_trans_amt': 'Total_Trans_Amt',
+    'age': 'Customer_Age',
+}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+SCAN_CHUNK = 1024
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor or one from a different sort"""
+
+
+def encode_cursor(sort, order, value, clientnum):
+    payload = json.dumps({'s': sort, 'o': order, 'v': value, 'id': clientnum}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort, order):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value, clientnum = float(payload['v']), int(payload['id'])
+    except (ValueError, KeyError, TypeError) as e:
+        raise CursorError('Invalid cursor') from e
+    if payload.get('s') != sort or payload.get('o') != order:
+        raise CursorError('Cursor belongs to a different sort order')
+    return value, clientnum
+
+
+class SortOrder:
+    """Rows sorted by (key, CLIENTNUM), with per-filter posting lists"""
+
+    def __init__(self, values, clientnums, descending=False):
+        keys = -values if descending else values
+        self.rows = np.lexsort((clientnums, keys))
+        self.keys = keys[self.rows]
+        self.ids = clientnums[self.rows]
+        self.descending = descending
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def start_after(self, value, clientnum):
+        """Sorted position just after the row (value, clientnum)"""
+        key = -value if self.descending else value
+        lo = int(np.searchsorted(self.keys, key, 'left'))
+        hi = int(np.searchsorted(self.keys, key, 'right'))
+        return lo + int(np.searchsorted(self.ids[lo:hi], clientnum, 'right'))
+
+    def postings(self, column, codes, code):
+        """Sorted positions of the rows whose column has this code"""
+        key = (column, code)
+        positions = self._postings.get(key)
+        if positions is None:
+            with self._lock:
+                positions = self._postings.get(key)
+                if positions is None:
+                    positions = np.flatnonzero(codes[self.rows] == code)
+                    self._postings[key] = positions
+        return positions
+
+
+class CustomerIndex:
+    """Sort orders, filter codes and display columns for one store version"""
+
+    def __init__(self, store, predictor):
+        self.store = store
+        self.version = store.version
+        self.clientnums = np.asarray(store.clientnums, dtype=np.int64)
+
+        self.churn = predictor.predict_store(store)
+        self.risk_names = [label for _, label in RISK_THRESHOLDS]
+        labels = risk_levels(self.churn)
+        self.risk_codes = np.full(len(labels), -1, dtype=np.int8)
+        for code, name in enumerate(self.risk_names):
+            self.risk_codes[labels == name] = code
+
+        self._orders = {}
+        self._lock = threading.Lock()
+
+    # Filters
+
+    def categories(self, column):
+        return self.risk_names if column == 'risk_level' else self.store.categories(column)
+
+    def codes(self, column):
+        return self.risk_codes if column == 'risk_level' else self.store.column(column)
+
+    def resolve_filters(self, filters):
+        """{column: [codes]} from {query parameter: [values]}; unknown values match nothing"""
+        resolved = {}
+        for name, values in filters.items():
+            column = FILTERS[name]
+            lookup = {category.lower(): code for code, category in enumerate(self.categories(column))}
+            resolved[column] = sorted({lookup.get(str(value).strip().lower(), -2) for value in values})
+        return resolved
+
+    def _matches(self, rows, resolved):
+        mask = np.ones(len(rows), dtype=bool)
+        for column, codes in resolved.items():
+            values = self.codes(column)[rows]
+            mask &= values == codes[0] if len(codes) == 1 else np.isin(values, codes)
+        return mask
+
+    # Sorting
+
+    def sort_order(self, sort, order):
+        key = (sort, order)
+        sort_order = self._orders.get(key)
+        if sort_order is None:
+            with self._lock:
+                sort_order = self._orders.get(key)
+                if sort_order is None:
+                    column = SORT_KEYS[sort]
+                    if column == 'churn_probability':
+                        values = self.churn
+                    else:
+                        values = np.asarray(self.store.column(column), dtype=np.float64)
+                    sort_order = SortOrder(values, self.clientnums, descending=(order == 'desc'))
+                    self._orders[key] = sort_order
+        return sort_order
+
+    def sort_value(self, sort, row):
+        column = SORT_KEYS[sort]
+        if column == 'churn_probability':
+            return float(self.churn[row])
+        return float(self.store.column(column)[row])
+
+    # Paging
+
+    def page(self, filters=None, sort='customer_id', order='asc', limit=DEFAULT_LIMIT, cursor=None):
+        """One page of customers after the cursor, plus the cursor for the next"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        resolved = self.resolve_filters(filters or {})
+        sort_order = self.sort_order(sort, order)
+        start = 0
+        if cursor:
+            start = sort_order.start_after(*decode_cursor(cursor, sort, order))
+
+        positions = self._positions(sort_order, resolved, start, limit + 1)
+        has_more = len(positions) > limit
+        rows = sort_order.rows[positions[:limit]]
+
+        next_cursor = None
+        if has_more and len(rows):
+            last = int(rows[-1])
+            next_cursor = encode_cursor(sort, order, self.sort_value(sort, last), int(self.clientnums[last]))
+
+        page = {
+            'customers': self.records(rows),
+            'next_cursor': next_cursor,
+            'sort': sort,
+            'order': order,
+            'data_version': self.version,
+        }
+        if not cursor:
+            # Only the first page pays for the count
+            page['total'] = self.count(resolved)
+        return page
+
+    def _positions(self, sort_order, resolved, start, wanted):
+        """Sorted positions of the next `wanted` matching rows from `start`"""
+        single = [(column, codes[0]) for column, codes in resolved.items() if len(codes) == 1]
+        if single:
+            lists = [(sort_order.postings(column, self.codes(column), code), column)
+                     for column, code in single]
+            driver, driver_column = min(lists, key=lambda item: len(item[0]))
+            remaining = {c: codes for c, codes in resolved.items() if c != driver_column}
+            candidates = driver[np.searchsorted(driver, start):]
+        else:
+            remaining = resolved
+            candidates = None
+
+        if not remaining:
+            return candidates[:wanted] if candidates is not None \
+                else np.arange(start, min(start + wanted, len(sort_order.rows)))
+
+        found = []
+        total = len(candidates) if candidates is not None else len(sort_order.rows) - start
+        offset, chunk = 0, max(SCAN_CHUNK, wanted * 4)
+        while offset < total and sum(len(f) for f in found) < wanted:
+            if candidates is not None:
+                block = candidates[offset:offset + chunk]
+            else:
+                block = np.arange(start + offset, min(start + offset + chunk, len(sort_order.rows)))
+            found.append(block[self._matches(sort_order.rows[block], remaining)])
+            offset += chunk
+            chunk *= 2
+        positions = np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+        return positions[:wanted]
+
+    def count(self, resolved):
+        if not resolved:
+            return int(len(self.clientnums))
+        return int(self._matches(np.arange(len(self.clientnums)), resolved).sum())
+
+    # Output
+
+    def records(self, rows):
+        store = self.store
+        rows = np.asarray(rows, dtype=np.intp)
+
+        def decoded(column):
+            return store.decode(column, store.column(column)[rows])
+
+        offers = decoded('Recommended_Offers') if store.has_column('Recommended_Offers') else [None] * len(rows)
+        columns = zip(
+            self.clientnums[rows], decoded('Attrition_Flag'), store.column('Customer_Age')[rows],
+            decoded('Gender'), decoded('Income_Category'), decoded('Card_Category'), decoded('Segment'),
+            self.churn[rows], self.risk_codes[rows], offers,
+        )
+        return [
+            {
+                'customer_id': str(clientnum),
+                'attrition_flag': attrition,
+                'age': int(age),
+                'gender': gender,
+                'income_category': income,
+                'card_category': card,
+                'segment': segment,
+                'churn_probability': round(float(churn), 4),
+                'risk_level': self.risk_names[risk] if risk >= 0 else None,
+                'recommended_offers': [offer.strip() for offer in (offer_text or '').split(';') if offer.strip()],
+            }
+            for clientnum, attrition, age, gender, income, card, segment, churn, risk, offer_text in columns
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_customer_index():
+    """Return the customer index for the current feature store version"""
+    global _index
+    store = get_feature_store()
+    if _index is None or _index.version != store.version:
+        with _index_lock:
+            if _index is None or _index.version != store.version:
+                _index = CustomerIndex(store, get_predictor())
+    return _index
@@ -0,0 +1,515 @@
+"""Columnar, memory-mapped customer feature store.
+
+``build_feature_store`` converts the customer CSV once into one ``.npy`` file
+per column plus a JSON manifest.  Numeric columns are stored with the smallest
+dtype that holds them and text columns are dictionary-encoded into integer
+codes.  ``FeatureStore`` opens the files with ``mmap_mode='r'`` so every
+gunicorn worker maps the same pages from the OS page cache instead of parsing
+the CSV into its own heap.
+
+Builds are written to a fresh version directory and published by atomically
+replacing the ``CURRENT`` pointer file, so readers never see a partial store.
+The version being replaced is marked as superseded and deleted once it has
+been superseded for a grace period; ``FeatureStore`` maps every column when
+it opens, so a worker still on an old version keeps reading its mapped pages
+even after the files are unlinked.
+``upsert_feature_store`` publishes a new version with uploaded rows merged in
+by ``CLIENTNUM``, streaming the upload twice (once to size the columns, once
+to fill them) so it is never held in memory.  Workers re-read the pointer at
+most every ``FEATURE_STORE_CHECK_INTERVAL`` seconds to pick up new versions.
+Builds on first use and upserts hold an ``flock`` on the store directory, so
+workers booting together against an empty store build it only once.
+"""
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from config import Config
+
+ID_COLUMN = 'CLIENTNUM'
+MANIFEST_NAME = 'manifest.json'
+POINTER_NAME = 'CURRENT'
+SUPERSEDED_NAME = '.superseded'
+# Serializes builds and upserts of one store across processes
+STORE_LOCK_NAME = '.upsert.lock'
+FORMAT_VERSION = 1
+
+# Labels for the integer Complaint_Type codes in newone.csv
+COMPLAINT_TYPE_LABELS = {
+    0: 'No Complaint',
+    1: 'Transaction Error',
+    2: 'Customer Service',
+    3: 'Mobile App',
+    4: 'Unexpected Fees',
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def resolve_path(path):
+    """Resolve a config path relative to the project root"""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
+
+def source_signature(csv_path):
+    """Size and mtime of the source CSV, used to detect stale stores"""
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _smallest_int_dtype(values):
+    """Smallest signed integer dtype that can hold every value"""
+    if len(values) == 0:
+        return np.dtype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_column(series):
+    """Return (array, column manifest entry) for one pandas column"""
+    import pandas as pd
+
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=np.int8), {'kind': 'numeric'}
+
+    if pd.api.types.is_integer_dtype(series):
+        values = series.to_numpy()
+        return values.astype(_smallest_int_dtype(values)), {'kind': 'numeric'}
+
+    if pd.api.types.is_float_dtype(series):
+        return series.to_numpy(dtype=np.float64), {'kind': 'numeric'}
+
+    # Text: dictionary-encode, keeping -1 for missing values
+    codes, categories = pd.factorize(series, sort=True)
+    codes = codes.astype(_smallest_int_dtype(np.array([-1, len(categories)])))
+    return codes, {'kind': 'category', 'categories': [str(c) for c in categories]}
+
+
+def build_feature_store(csv_path=None, store_dir=None):
+    """Convert the customer CSV into a versioned columnar store and publish it"""
+    import pandas as pd
+
+    csv_path = resolve_path(csv_path or Config.DATA_PATH)
+    store_dir = resolve_path(store_dir or Config.FEATURE_STORE_PATH)
+    os.makedirs(store_dir, exist_ok=True)
+
+    signature = source_signature(csv_path)
+    df = pd.read_csv(csv_path)
+    if ID_COLUMN not in df.columns:
+        raise ValueError(f"{csv_path} has no {ID_COLUMN} column")
+    if not df[ID_COLUMN].is_unique:
+        raise ValueError(f"{ID_COLUMN} values in {csv_path} are not unique")
+
+    version, version_dir = new_version(store_dir)
+    columns = write_columns(df, version_dir)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'version': version,
+        'source': os.path.relpath(csv_path, PROJECT_ROOT),
+        'source_signature': signature,
+        'rows': int(len(df)),
+        'id_column': ID_COLUMN,
+        'columns': columns,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    publish(store_dir, version_dir, manifest)
+    return manifest
+
+
+def write_columns(df, version_dir):
+    """Encode every DataFrame column into an .npy file; returns the manifest column entries"""
+    columns = {}
+    for name in df.columns:
+        values, entry = encode_column(df[name])
+        filename = f"{len(columns):03d}.npy"
+        np.save(os.path.join(version_dir, filename), np.ascontiguousarray(values))
+        entry.update({'file': filename, 'dtype': values.dtype.str})
+        columns[name] = entry
+    return columns
+
+
+def new_version(store_dir):
+    """Create an empty, not yet published version directory"""
+    version = f"v{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    version_dir = os.path.join(store_dir, version)
+    os.makedirs(version_dir)
+    return version, version_dir
+
+
+def publish(store_dir, version_dir, manifest):
+    """Write the manifest and atomically point CURRENT at the new version"""
+    version = manifest['version']
+    with open(os.path.join(version_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Publish atomically, then clean up versions nobody points at any more
+    previous = read_pointer(store_dir)
+    pointer_tmp = os.path.join(store_dir, f"{POINTER_NAME}.{version}.tmp")
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(store_dir, POINTER_NAME))
+    if previous and previous != version:
+        _mark_superseded(os.path.join(store_dir, previous))
+    remove_old_versions(store_dir, keep=version)
+
+
+def _mark_superseded(version_dir):
+    """Record when a version stopped being current; the grace period starts here"""
+    try:
+        with open(os.path.join(version_dir, SUPERSEDED_NAME), 'w') as f:
+            f.write(time.strftime('%Y-%m-%dT%H:%M:%S'))
+    except OSError:
+        pass
+
+
+def read_pointer(store_dir):
+    """Version CURRENT points at, or None before the first publish"""
+    try:
+        with open(os.path.join(store_dir, POINTER_NAME)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def upsert_feature_store(read_chunks, store_dir=None, progress=None):
+    """Publish a new store version with validated rows upserted by CLIENTNUM.
+
+    ``read_chunks()`` is called twice and must yield the same sequence of
+    DataFrames each time, holding every store column: numeric columns as
+    numbers (no NaN in integer columns) and text columns as strings or NaN.
+    Rows for known customers replace theirs; unknown customers are appended.
+    ``progress(phase, done)`` is called after each chunk.  Returns the new
+    manifest.
+    """
+    store_dir = resolve_path(store_dir or Config.FEATURE_STORE_PATH)
+    # One upsert at a time across processes, or one would drop the other's rows
+    with store_lock(store_dir):
+        return _upsert_locked(read_chunks, store_dir, progress)
+
+
+@contextlib.contextmanager
+def store_lock(store_dir):
+    """Exclusive lock on a store directory, held across processes"""
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, STORE_LOCK_NAME), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _upsert_locked(read_chunks, store_dir, progress):
+    import pandas as pd
+
+    base = FeatureStore(store_dir)
+    columns = base.manifest['columns']
+    old_ids = np.asarray(base.clientnums, dtype=np.int64)
+    order = np.argsort(old_ids, kind='stable')
+    sorted_old = old_ids[order]
+
+    # Pass 1: new customers, new categories and the value range of each column
+    new_ids = []
+    new_categories = {name: set() for name, entry in columns.items() if entry['kind'] == 'category'}
+    integral = {name: True for name, entry in columns.items() if entry['kind'] == 'numeric'}
+    low = dict.fromkeys(integral, np.inf)
+    high = dict.fromkeys(integral, -np.inf)
+    seen = 0
+    for df in read_chunks():
+        ids = df[ID_COLUMN].to_numpy(dtype=np.int64)
+        seen += len(ids)
+        new_ids.append(ids[~_known(sorted_old, ids)])
+        for name in new_categories:
+            values = df[name].dropna().unique()
+            new_categories[name].update(str(v) for v in values)
+        for name in integral:
+            values = df[name].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values):
+                integral[name] = integral[name] and bool(np.all(values == np.floor(values)))
+                low[name] = min(low[name], float(values.min()))
+                high[name] = max(high[name], float(values.max()))
+        if progress:
+            progress('validated', len(df))
+
+    if not seen:
+        raise ValueError('No valid rows to import')
+    new_ids = np.unique(np.concatenate(new_ids))
+    total = len(old_ids) + len(new_ids)
+
+    version, version_dir = new_version(store_dir)
+    outputs, categories = {}, {}
+    manifest_columns = {}
+    for name, entry in columns.items():
+        old = base.column(name)
+        entry = dict(entry)
+        if entry['kind'] == 'category':
+            known = set(entry['categories'])
+            # Append new categories so existing codes stay valid
+            categories[name] = entry['categories'] + sorted(new_categories[name] - known)
+            entry['categories'] = categories[name]
+            dtype = _smallest_int_dtype(np.array([-1, len(categories[name])]))
+        elif old.dtype.kind == 'f' or not integral[name]:
+            dtype = np.dtype(np.float64)
+        else:
+            bounds = [low[name], high[name]] + ([int(old.min()), int(old.max())] if len(old) else [])
+            bounds = [b for b in bounds if np.isfinite(b)]
+            dtype = _smallest_int_dtype(np.array(bounds, dtype=np.int64)) if bounds else old.dtype
+        out = np.lib.format.open_memmap(os.path.join(version_dir, entry['file']), mode='w+',
+                                        dtype=dtype, shape=(total,))
+        out[:len(old)] = old
+        outputs[name] = out
+        entry['dtype'] = np.dtype(dtype).str
+        manifest_columns[name] = entry
+
+    # Pass 2: write every row into its slot
+    for df in read_chunks():
+        ids = df[ID_COLUMN].to_numpy(dtype=np.int64)
+        positions = _positions(sorted_old, order, new_ids, ids)
+        for name, out in outputs.items():
+            if name in categories:
+                out[positions] = pd.Categorical(df[name], categories=categories[name]).codes
+            else:
+                out[positions] = df[name].to_numpy(dtype=np.float64)
+        if progress:
+            progress('imported', len(df))
+    for out in outputs.values():
+        out.flush()
+    outputs.clear()
+
+    manifest = dict(base.manifest)
+    manifest.update({
+        'version': version,
+        'rows': int(total),
+        'columns': manifest_columns,
+        'parent_version': base.version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    })
+    publish(store_dir, version_dir, manifest)
+    return manifest
+
+
+def _known(sorted_ids, ids):
+    """Mask of ids present in the sorted id array"""
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    slots = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[slots] == ids
+
+
+def _positions(sorted_old, order, new_ids, ids):
+    """Row offset of each id: its existing row, or its slot after the old rows"""
+    known = _known(sorted_old, ids)
+    positions = np.empty(len(ids), dtype=np.intp)
+    positions[known] = order[np.searchsorted(sorted_old, ids[known])]
+    positions[~known] = len(sorted_old) + np.searchsorted(new_ids, ids[~known])
+    return positions
+
+
+def remove_old_versions(store_dir, keep, grace_seconds=300):
+    """Delete versions that have been superseded for longer than the grace period.
+
+    The grace period gives workers time to notice the new pointer.  Workers
+    that still hold an older version map all of its columns at open time, so
+    the unlink does not break them either.  Directories without a manifest
+    are builds in progress and are left alone.
+    """
+    now = time.time()
+    for name in os.listdir(store_dir):
+        path = os.path.join(store_dir, name)
+        if name == keep or not name.startswith('v') or not os.path.isdir(path):
+            continue
+        marker = os.path.join(path, SUPERSEDED_NAME)
+        try:
+            if not os.path.exists(marker):
+                # Superseded before markers existed (or by a crashed publish)
+                if os.path.exists(os.path.join(path, MANIFEST_NAME)):
+                    _mark_superseded(path)
+                continue
+            if now - os.path.getmtime(marker) > grace_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+class FeatureStore:
+    """Read-only, memory-mapped view of one published feature store version"""
+
+    def __init__(self, store_dir=None):
+        self.store_dir = resolve_path(store_dir or Config.FEATURE_STORE_PATH)
+        with open(os.path.join(self.store_dir, POINTER_NAME)) as f:
+            self.version = f.read().strip()
+        self.path = os.path.join(self.store_dir, self.version)
+
+        with open(os.path.join(self.path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature store format in {self.path}")
+
+        self.rows = self.manifest['rows']
+        # Map every column now: once mapped, a column survives its version being deleted
+        self._columns = {}
+        for name in self.manifest['columns']:
+            self.column(name)
+
+        # CLIENTNUM -> row offset, built once so lookups never scan the column
+        clientnums = self.clientnums.tolist()
+        self._row_index = dict(zip(clientnums, range(len(clientnums))))
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def column_names(self):
+        return list(self.manifest['columns'])
+
+    def has_column(self, name):
+        return name in self.manifest['columns']
+
+    def is_category(self, name):
+        return self.manifest['columns'][name]['kind'] == 'category'
+
+    def categories(self, name):
+        return self.manifest['columns'][name].get('categories', [])
+
+    def column(self, name):
+        """Zero-copy, read-only array view of a column (codes for text columns)"""
+        array = self._columns.get(name)
+        if array is None:
+            entry = self.manifest['columns'].get(name)
+            if entry is None:
+                raise KeyError(f"Unknown feature store column: {name}")
+            array = np.load(os.path.join(self.path, entry['file']), mmap_mode='r')
+            self._columns[name] = array
+        return array
+
+    @property
+    def clientnums(self):
+        return self.column(self.manifest['id_column'])
+
+    def row_of(self, clientnum):
+        """Row offset of a customer, or None if the CLIENTNUM is unknown"""
+        try:
+            return self._row_index.get(int(clientnum))
+        except (TypeError, ValueError):
+            return None
+
+    def rows_for(self, clientnums):
+        """Return (found CLIENTNUMs, row offsets) for the known ids in clientnums"""
+        found, rows = [], []
+        for clientnum in clientnums:
+            row = self.row_of(clientnum)
+            if row is not None:
+                found.append(int(clientnum))
+                rows.append(row)
+        return found, np.asarray(rows, dtype=np.intp)
+
+    def decode(self, name, codes):
+        """Map dictionary codes of a text column back to strings"""
+        categories = np.asarray(self.categories(name) + [None], dtype=object)
+        return categories[np.asarray(codes)]
+
+    def matrix(self, columns, rows=None, dtype=np.float64):
+        """Gather columns into a dense 2-D array, optionally for selected rows"""
+        count = self.rows if rows is None else len(rows)
+        out = np.empty((count, len(columns)), dtype=dtype)
+        for j, name in enumerate(columns):
+            values = self.column(name)
+            out[:, j] = values if rows is None else values[rows]
+        return out
+
+    def row_dict(self, row):
+        """Decoded values of every column for a single row"""
+        record = {}
+        for name, entry in self.manifest['columns'].items():
+            value = self.column(name)[row]
+            if entry['kind'] == 'category':
+                record[name] = entry['categories'][value] if value >= 0 else None
+            else:
+                record[name] = value.item()
+        return record
+
+    def is_stale(self, csv_path=None):
+        """Whether the source CSV changed since this version was built"""
+        csv_path = resolve_path(csv_path or Config.DATA_PATH)
+        try:
+            return source_signature(csv_path) != self.manifest['source_signature']
+        except OSError:
+            return False
+
+
+_store = None
+_store_lock = threading.Lock()
+_store_checked = 0.0
+
+
+def get_feature_store(rebuild_if_stale=True):
+    """Return the process-wide feature store, building it on first use"""
+    global _store, _store_checked
+    if _store is not None and time.monotonic() - _store_checked >= Config.FEATURE_STORE_CHECK_INTERVAL:
+        # Another worker may have published a new version (e.g. an upload)
+        _store_checked = time.monotonic()
+        if read_pointer(_store.store_dir) not in (None, _store.version):
+            with _store_lock:
+                if read_pointer(_store.store_dir) not in (None, _store.version):
+                    _store = FeatureStore(_store.store_dir)
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store_dir = resolve_path(Config.FEATURE_STORE_PATH)
+                store = _current_store(store_dir, rebuild_if_stale)
+                if store is None:
+                    # Workers booting together build once; the others wait and map that build
+                    with store_lock(store_dir):
+                        store = _current_store(store_dir, rebuild_if_stale)
+                        if store is None:
+                            if read_pointer(store_dir) is None:
+                                print(f"Building feature store at {store_dir}")
+                            else:
+                                print(f"Source data changed, rebuilding feature store at {store_dir}")
+                            build_feature_store(store_dir=store_dir)
+                            store = FeatureStore(store_dir)
+                _store = store
+    return _store
+
+
+def _current_store(store_dir, rebuild_if_stale):
+    """The published store, or None if there is none or it needs a rebuild"""
+    if read_pointer(store_dir) is None:
+        return None
+    store = FeatureStore(store_dir)
+    if rebuild_if_stale and store.is_stale():
+        if 'parent_version' in store.manifest:
+            # Rebuilding from the CSV would drop the rows uploaded since
+            print(f"Source data changed, keeping uploaded feature store version {store.version}")
+        else:
+            return None
+    return store
+
+
+def reload_feature_store():
+    """Drop the cached store so the next access maps the newest version"""
+    global _store
+    with _store_lock:
+        _store = None
+    return get_feature_store()
+
+
+if __name__ == '__main__':
+    manifest = build_feature_store()
+    print(f"Feature store {manifest['version']}: {manifest['rows']} rows, "
+          f"{len(manifest['columns'])} columns")
@@ -0,0 +1,14 @@
+from functools import wraps
+from flask import session, redirect, url_for, request, jsonify
+
+
+def login_required(f):
+    """Decorator to require login; API routes get a JSON 401 instead of a redirect"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'logged_in' not in session or not session['logged_in']:
+            if '/api/' in request.path:
+                return jsonify({'success': False, 'error': 'Authentication required'}), 401
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,434 @@
+"""Customer offer events (clicks, accepts) keyed by CLIENTNUM.
+
+``EventLog`` keeps an incrementally maintained affinity table instead of the
+raw event history:
+
+* per customer, per tag and per event type,
+* per customer, per offer and per event type,
+* per offer and per event type,
+
+each as an exponentially time-decayed counter updated in O(1) per event.  A
+counter stores ``(value, reference_time)``; adding an event decays the value
+to the event's time and adds its weight.  Reads decay to the event-time
+watermark (the newest event seen) so results do not drift with the wall clock.
+Events dated more than ``Config.EVENT_MAX_CLOCK_SKEW`` seconds ahead of the
+server clock are rejected, since one of them would decay every counter to zero.
+Plain (undecayed) event counts per hour and event type are kept alongside
+for the event timeline chart.
+
+Events ingested through the API are appended to ``Config.EVENT_LOG_PATH``.
+Every worker tails that file from its last offset, so all workers converge on
+the same table without rescanning history.  Loading always streams row by
+row, so memory is bounded by the number of customers/tags, not events.
+
+The table and the ingest-log offset are snapshotted to
+``Config.EVENT_SNAPSHOT_PATH`` after the initial load and every
+``Config.EVENT_SNAPSHOT_EVERY`` applied events, so a restarted worker restores
+the snapshot and only reads the log from the saved offset.
+"""
+import csv
+import heapq
+import io
+import itertools
+import math
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from utils.data_processor import resolve_path
+
+EVENT_FIELDS = ['timestamp', 'UserID', 'offer_id', 'event_type', 'tags']
+EVENT_TYPES = ('impression', 'click', 'accept', 'dismiss')
+
+# Most recent events kept per customer for the customer-360 view
+RECENT_EVENTS_PER_USER = 20
+
+# Minimum seconds between checks of the shared ingest log for new events
+REFRESH_INTERVAL = 1.0
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT = 2
+
+
+def parse_event(row):
+    """Normalize one raw event row into a dict, or None if it is malformed"""
+    try:
+        user_id = int(str(row['UserID']).strip())
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    timestamp = str(row.get('timestamp') or '').strip()
+    offer_id = str(row.get('offer_id') or '').strip()
+    event_type = str(row.get('event_type') or '').strip().lower()
+    if not timestamp or not offer_id or event_type not in EVENT_TYPES:
+        return None
+
+    try:
+        epoch = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+    # A future event would raise the watermark and decay every other counter to zero
+    if epoch > time.time() + Config.EVENT_MAX_CLOCK_SKEW:
+        return None
+
+    tags = row.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+
+    return {
+        'timestamp': timestamp,
+        'epoch': epoch,
+        'user_id': user_id,
+        'offer_id': offer_id,
+        'event_type': event_type,
+        'tags': [str(tag) for tag in tags],
+    }
+
+
+def _decay_add(cells, key, weight, epoch, rate):
+    """Add weight at time epoch to the decayed counter cells[key]"""
+    cell = cells.get(key)
+    if cell is None:
+        cells[key] = [weight, epoch]
+    elif epoch >= cell[1]:
+        cell[0] = cell[0] * math.exp(-rate * (epoch - cell[1])) + weight
+        cell[1] = epoch
+    else:
+        # Late event: decay its weight to the counter's reference time instead
+        cell[0] += weight * math.exp(-rate * (cell[1] - epoch))
+
+
+def _file_signature(path):
+    """(inode, size, mtime_ns) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _decayed(cell, now, rate):
+    return cell[0] * math.exp(-rate * max(0.0, now - cell[1]))
+
+
+class EventLog:
+    """In-memory, incrementally maintained view of the offer event stream"""
+
+    def __init__(self, half_life_days=None, recent_per_user=RECENT_EVENTS_PER_USER):
+        half_life_days = half_life_days or Config.EVENT_HALF_LIFE_DAYS
+        self.decay_rate = math.log(2) / (float(half_life_days) * 86400.0)
+        self.recent_per_user = recent_per_user
+        self.total_events = 0
+        self.watermark = 0.0
+        self._recent = {}
+        self._user_tags = {}
+        self._user_offers = {}
+        self._offers = {}
+        self._hourly = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._follow_path = None
+        self._follow_offset = 0
+        self._last_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self._snapshot_path = None
+        self._backlog_signature = None
+        self._since_snapshot = 0
+
+    def add(self, event):
+        """Record one parsed event in O(1) per tag"""
+        epoch = event['epoch']
+        event_type = event['event_type']
+        rate = self.decay_rate
+        with self._lock:
+            self.total_events += 1
+            self.watermark = max(self.watermark, epoch)
+
+            # Min-heap on event time keeps the newest N events regardless of arrival order
+            heap = self._recent.setdefault(event['user_id'], [])
+            item = (epoch, next(self._sequence),
+                    {k: v for k, v in event.items() if k != 'epoch'})
+            if len(heap) < self.recent_per_user:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+            user_tags = self._user_tags.setdefault(event['user_id'], {})
+            for tag in event['tags']:
+                _decay_add(user_tags, (tag, event_type), 1.0, epoch, rate)
+            _decay_add(self._user_offers.setdefault(event['user_id'], {}),
+                       (event['offer_id'], event_type), 1.0, epoch, rate)
+            _decay_add(self._offers, (event['offer_id'], event_type), 1.0, epoch, rate)
+            hour = int(epoch // 3600)
+            counts = self._hourly.get(hour)
+            if counts is None:
+                counts = self._hourly[hour] = [0] * len(EVENT_TYPES)
+            counts[EVENT_TYPES.index(event_type)] += 1
+
+    def add_rows(self, rows):
+        """Parse and add raw rows one at a time; returns (accepted, rejected)"""
+        accepted = rejected = 0
+        for row in rows:
+            event = parse_event(row)
+            if event is None:
+                rejected += 1
+            else:
+                self.add(event)
+                accepted += 1
+        return accepted, rejected
+
+    def load_csv(self, path=None):
+        """Stream events from a CSV file row by row; returns the number loaded"""
+        path = resolve_path(path or Config.EVENTS_PATH)
+        with open(path, newline='') as f:
+            return self.add_rows(csv.DictReader(f))[0]
+
+    # Shared ingest log
+
+    def follow(self, path, snapshot_path=None, backlog_path=None):
+        """Load the backlog and an append-only event log, then keep tailing it on refresh().
+
+        With snapshot_path, a snapshot taken from the same backlog and log is
+        restored instead of replaying them, and the table is snapshotted again
+        once loaded and every ``Config.EVENT_SNAPSHOT_EVERY`` applied events.
+        """
+        self._follow_path = path
+        self._follow_offset = 0
+        self._snapshot_path = snapshot_path
+        self._backlog_signature = _file_signature(backlog_path) if backlog_path else None
+        restored = snapshot_path is not None and self._restore(snapshot_path)
+        if not restored and self._backlog_signature is not None:
+            self.load_csv(backlog_path)
+        self.refresh(force=True)
+        if snapshot_path and (not restored or self._since_snapshot):
+            self.save_snapshot()
+
+    def refresh(self, force=False):
+        """Apply events appended to the followed log since the last refresh"""
+        if self._follow_path is None:
+            return 0
+        if not force and time.monotonic() - self._last_refresh < REFRESH_INTERVAL:
+            return 0
+        # One refresher at a time; readers that lose the race just use current data
+        if not self._refresh_lock.acquire(blocking=force):
+            return 0
+        try:
+            self._last_refresh = time.monotonic()
+            try:
+                size = os.path.getsize(self._follow_path)
+            except OSError:
+                return 0
+            if size <= self._follow_offset:
+                return 0
+
+            applied = 0
+            with open(self._follow_path, 'rb') as f:
+                f.seek(self._follow_offset)
+                while True:
+                    line = f.readline()
+                    # Stop at a partial line; a writer may be mid-append
+                    if not line or not line.endswith(b'\n'):
+                        break
+                    self._follow_offset += len(line)
+                    values = next(csv.reader([line.decode('utf-8')]), None)
+                    if values and values[0] != EVENT_FIELDS[0]:
+                        applied += self.add_rows([dict(zip(EVENT_FIELDS, values))])[0]
+            self._since_snapshot += applied
+            if self._snapshot_path and self._since_snapshot >= Config.EVENT_SNAPSHOT_EVERY:
+                self._write_snapshot()
+            return applied
+        finally:
+            self._refresh_lock.release()
+
+    # Snapshots
+
+    def save_snapshot(self):
+        """Write the table and the followed-log offset to the snapshot path"""
+        if self._snapshot_path is None:
+            return
+        with self._refresh_lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        # Caller holds _refresh_lock so the offset matches the counters
+        signature = _file_signature(self._follow_path)
+        with self._lock:
+            state = {
+                'format': SNAPSHOT_FORMAT,
+                'decay_rate': self.decay_rate,
+                'recent_per_user': self.recent_per_user,
+                'backlog': self._backlog_signature,
+                'log_inode': signature[0] if signature else None,
+                'offset': self._follow_offset,
+                'total_events': self.total_events,
+                'watermark': self.watermark,
+                'sequence': next(self._sequence),
+                'recent': self._recent,
+                'user_tags': self._user_tags,
+                'user_offers': self._user_offers,
+                'offers': self._offers,
+                'hourly': self._hourly,
+            }
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            os.makedirs(os.path.dirname(self._snapshot_path), exist_ok=True)
+            # Per-process temp file: workers may snapshot the same log concurrently
+            tmp_path = f"{self._snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._snapshot_path)
+            self._since_snapshot = 0
+        except OSError as e:
+            print(f"Error writing event log snapshot: {e}")
+
+    def _restore(self, path):
+        """Load a snapshot if it was taken from the current backlog and log"""
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError) as e:
+            print(f"Ignoring unreadable event log snapshot: {e}")
+            return False
+
+        signature = _file_signature(self._follow_path)
+        if (not isinstance(state, dict) or state.get('format') != SNAPSHOT_FORMAT
+                or state['decay_rate'] != self.decay_rate
+                or state['recent_per_user'] != self.recent_per_user
+                or state['backlog'] != self._backlog_signature):
+            return False
+        if state['offset']:
+            # The log must be the same file and must not have been truncated
+            if signature is None or signature[0] != state['log_inode'] or signature[1] < state['offset']:
+                return False
+
+        with self._lock:
+            self.total_events = state['total_events']
+            self.watermark = state['watermark']
+            self._sequence = itertools.count(state['sequence'])
+            self._recent = state['recent']
+            self._user_tags = state['user_tags']
+            self._user_offers = state['user_offers']
+            self._offers = state['offers']
+            self._hourly = state['hourly']
+            self._follow_offset = state['offset']
+        return True
+
+    # Reads
+
+    def recent(self, user_id, limit=10):
+        """Newest events for a customer, newest first"""
+        self.refresh()
+        with self._lock:
+            heap = list(self._recent.get(int(user_id), ()))
+        return [event for _, _, event in heapq.nlargest(limit, heap)]
+
+    def _decayed_table(self, cells):
+        table = {}
+        for (name, event_type), cell in cells.items():
+            table.setdefault(name, {})[event_type] = _decayed(cell, self.watermark, self.decay_rate)
+        return table
+
+    def tag_affinity(self, user_id):
+        """{tag: {event_type: decayed count}} for a customer"""
+        self.refresh()
+        with self._lock:
+            return self._decayed_table(self._user_tags.get(int(user_id), {}))
+
+    def offer_affinity(self, user_id):
+        """{offer_id: {event_type: decayed count}} for a customer"""
+        self.refresh()
+        with self._lock:
+            return self._decayed_table(self._user_offers.get(int(user_id), {}))
+
+    def offer_stats(self):
+        """{offer_id: {event_type: decayed count}} across all customers"""
+        self.refresh()
+        with self._lock:
+            return self._decayed_table(self._offers)
+
+    def hourly_counts(self):
+        """[(hour since the epoch, [count per EVENT_TYPES entry])], oldest first"""
+        self.refresh()
+        with self._lock:
+            return sorted((hour, list(counts)) for hour, counts in self._hourly.items())
+
+
+def append_events(rows, path=None):
+    """Validate rows and append the good ones to the shared ingest log.
+
+    The batch goes out in a single O_APPEND write so concurrent workers never
+    interleave partial lines.  Returns (accepted events, rejected count).
+    """
+    path = resolve_path(path or Config.EVENT_LOG_PATH)
+    events = []
+    rejected = 0
+    for row in rows:
+        event = parse_event(row)
+        if event is None:
+            rejected += 1
+        else:
+            events.append(event)
+    if not events:
+        return events, rejected
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    for event in events:
+        writer.writerow([event['timestamp'], event['user_id'], event['offer_id'],
+                         event['event_type'], ','.join(event['tags'])])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, buffer.getvalue().encode('utf-8'))
+    finally:
+        os.close(fd)
+    return events, rejected
+
+
+_event_log = None
+_event_log_lock = threading.Lock()
+
+
+def get_event_log():
+    """Return the process-wide event log, streaming the backlog on first use"""
+    global _event_log
+    if _event_log is None:
+        with _event_log_lock:
+            if _event_log is None:
+                event_log = EventLog()
+                event_log.follow(resolve_path(Config.EVENT_LOG_PATH),
+                                 snapshot_path=resolve_path(Config.EVENT_SNAPSHOT_PATH),
+                                 backlog_path=resolve_path(Config.EVENTS_PATH))
+                _event_log = event_log
+    return _event_log
+
+
+def ingest_events(rows):
+    """Persist new events for every worker and apply them to this worker now"""
+    events, rejected = append_events(rows)
+    # This worker picks its own events up from the log like every other worker
+    get_event_log().refresh(force=True)
+    return len(events), rejected
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Stream a large event backlog into the shared ingest log in bounded chunks
+    total = rejected_total = 0
+    with open(sys.argv[1], newline='') as f:
+        reader = csv.DictReader(f)
+        while True:
+            chunk = list(itertools.islice(reader, 10000))
+            if not chunk:
+                break
+            accepted, rejected = append_events(chunk)
+            total += len(accepted)
+            rejected_total += rejected
+    print(f"Appended {total} events ({rejected_total} rejected)")
@@ -0,0 +1,444 @@
+"""Streaming exports of customer scores, recommendations and event history.
+
+Every export is a generator of row dicts (``EXPORTS``) fed through an
+encoder that turns rows into byte chunks of about ``EXPORT_CHUNK_SIZE``:
+
+* ``csv`` and ``jsonl`` write rows as they arrive,
+* ``parquet`` (needs ``pyarrow``) buffers one row group of
+  ``EXPORT_ROW_GROUP_SIZE`` rows at a time.
+
+The same chunks go either into a chunked HTTP response or into a file, so
+memory stays bounded by a page of source rows plus one chunk (or row group)
+whatever the size of the export.
+
+``ExportManager`` hands long exports to the background job queue
+(``utils.jobs``) and keeps each export's status in a JSON file next to its
+output under ``EXPORT_DIR``, so any worker can report on or serve it.
+Background exports run in the job worker processes, never in web workers.
+Streamed exports take one of ``EXPORT_MAX_CONCURRENT`` slots per process; one
+that finds no free slot is refused straight away rather than queued, so
+exports cannot tie up every request thread.
+"""
+import csv
+import io
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from config import Config
+from utils.data_processor import resolve_path
+from utils.event_store import EVENT_FIELDS, parse_event
+from utils.jobs import enqueue
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Parquet column types by field type
+_ARROW_TYPES = {'string': 'string', 'int': 'int64', 'float': 'float64'}
+
+# Customers fetched per page of the customer index
+CUSTOMER_PAGE_SIZE = 500
+# Customers ranked per recommendation batch
+RECOMMENDATION_BATCH_SIZE = 1000
+# Seconds between job progress updates
+PROGRESS_INTERVAL = 1.0
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ExportBusy(Exception):
+    """Raised when every export slot is taken"""
+
+
+# Row sources
+
+def customer_rows(filters=None, sort='customer_id', order='asc'):
+    """Scored customers, optionally filtered, in keyset-paginated order"""
+    from utils.customer_index import FILTERS, SORT_KEYS
+
+    # Check up front; a streamed response cannot turn into a 400 halfway
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort field: {sort}")
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be 'asc' or 'desc'")
+    unknown = set(filters or {}) - set(FILTERS)
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+    return _customer_rows(filters, sort, order)
+
+
+def _customer_rows(filters, sort, order):
+    from utils.customer_index import get_customer_index
+
+    index = get_customer_index()
+    cursor = None
+    while True:
+        page = index.page(filters=filters, sort=sort, order=order, limit=CUSTOMER_PAGE_SIZE, cursor=cursor)
+        for customer in page['customers']:
+            row = dict(customer)
+            row['recommended_offers'] = '; '.join(customer['recommended_offers'])
+            yield row
+        cursor = page['next_cursor']
+        if cursor is None:
+            return
+
+
+def recommendation_rows(user_ids=None, filters=None, top_k=3):
+    """One row per (customer, ranked offer) for the given or filtered customers"""
+    if user_ids:
+        ids = iter(user_ids)
+    else:
+        ids = (row['customer_id'] for row in customer_rows(filters=filters))
+    return _recommendation_rows(ids, int(top_k))
+
+
+def _recommendation_rows(ids, top_k):
+    from utils.recommender import get_recommendation_engine
+
+    engine = get_recommendation_engine()
+    while True:
+        batch = [user_id for _, user_id in zip(range(RECOMMENDATION_BATCH_SIZE), ids)]
+        if not batch:
+            return
+        for result in engine.recommend_for_customers(batch, top_k=top_k):
+            for rank, offer in enumerate(result['offers'], start=1):
+                yield {
+                    'user_id': result['user_id'],
+                    'cluster_profile': result['cluster_profile']['name'],
+                    'rank': rank,
+                    'offer_id': offer['id'],
+                    'title': offer['title'],
+                    'personalization_score': offer['personalization_score'],
+                    'reason': offer['reason'],
+                }
+
+
+def event_rows(user_id=None, event_type=None, since=None):
+    """Historical and ingested offer events, read row by row"""
+    user_id = int(user_id) if user_id not in (None, '') else None
+    since_epoch = datetime.fromisoformat(since.replace('Z', '+00:00')).timestamp() if since else None
+    return _event_rows(user_id, event_type, since_epoch)
+
+
+def _event_rows(user_id, event_type, since_epoch):
+    # The historical file has a header row; the ingest log is bare rows
+    for path, fieldnames in ((Config.EVENTS_PATH, None), (Config.EVENT_LOG_PATH, EVENT_FIELDS)):
+        path = resolve_path(path)
+        if not os.path.exists(path):
+            continue
+        with open(path, newline='') as f:
+            for raw in csv.DictReader(f, fieldnames=fieldnames):
+                event = parse_event(raw)
+                if event is None:
+                    continue
+                if user_id is not None and event['user_id'] != user_id:
+                    continue
+                if event_type and event['event_type'] != event_type:
+                    continue
+                if since_epoch is not None and event['epoch'] < since_epoch:
+                    continue
+                yield {
+                    'timestamp': event['timestamp'],
+                    'user_id': str(event['user_id']),
+                    'offer_id': event['offer_id'],
+                    'event_type': event['event_type'],
+                    'tags': ','.join(event['tags']),
+                }
+
+
+# kind -> (row source, [(field, type)], accepted parameters)
+EXPORTS = {
+    'customers': (customer_rows, [
+        ('customer_id', 'string'), ('segment', 'string'), ('risk_level', 'string'),
+        ('churn_probability', 'float'), ('attrition_flag', 'string'), ('age', 'int'),
+        ('gender', 'string'), ('income_category', 'string'), ('card_category', 'string'),
+        ('recommended_offers', 'string'),
+    ], ('filters', 'sort', 'order')),
+    'recommendations': (recommendation_rows, [
+        ('user_id', 'string'), ('cluster_profile', 'string'), ('rank', 'int'), ('offer_id', 'string'),
+        ('title', 'string'), ('personalization_score', 'float'), ('reason', 'string'),
+    ], ('user_ids', 'filters', 'top_k')),
+    'events': (event_rows, [
+        ('timestamp', 'string'), ('user_id', 'string'), ('offer_id', 'string'),
+        ('event_type', 'string'), ('tags', 'string'),
+    ], ('user_id', 'event_type', 'since')),
+}
+
+
+def check_export(kind, fmt):
+    if kind not in EXPORTS:
+        raise ValueError(f"Unknown export: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == 'parquet' and pyarrow is None:
+        raise ValueError('Parquet exports need the pyarrow package')
+
+
+def export_rows(kind, params=None):
+    """(row generator, field spec) for an export kind"""
+    source, fields, accepted = EXPORTS[kind]
+    params = {key: value for key, value in (params or {}).items() if key in accepted and value not in (None, '')}
+    return source(**params), fields
+
+
+# Encoders
+
+def encode_rows(rows, fields, fmt, chunk_size=None):
+    """Encode row dicts into byte chunks of roughly chunk_size"""
+    chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+    if fmt == 'csv':
+        return _encode_csv(rows, fields, chunk_size)
+    if fmt == 'jsonl':
+        return _encode_jsonl(rows, fields, chunk_size)
+    return _encode_parquet(rows, fields, Config.EXPORT_ROW_GROUP_SIZE)
+
+
+def _encode_csv(rows, fields, chunk_size):
+    names = [name for name, _ in fields]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(names)
+    for row in rows:
+        writer.writerow([row.get(name) for name in names])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_jsonl(rows, fields, chunk_size):
+    names = [name for name, _ in fields]
+    lines, size = [], 0
+    for row in rows:
+        line = json.dumps({name: row.get(name) for name in names}, separators=(',', ':'))
+        lines.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines, size = [], 0
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object whose contents are handed out and dropped"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _encode_parquet(rows, fields, row_group_size):
+    schema = pyarrow.schema([(name, _ARROW_TYPES[kind]) for name, kind in fields])
+    sink = _DrainableSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    columns = {name: [] for name, _ in fields}
+    count = 0
+    try:
+        for row in rows:
+            for name in columns:
+                columns[name].append(row.get(name))
+            count += 1
+            if count >= row_group_size:
+                writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+                columns = {name: [] for name in columns}
+                count = 0
+                yield sink.drain()
+        if count:
+            writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def write_export(chunks, path):
+    """Write chunks to path atomically; returns the byte count"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    size = 0
+    try:
+        with open(tmp, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return size
+
+
+class _SlotStream:
+    """Response iterable that gives its export slot back when closed"""
+
+    def __init__(self, chunks, release):
+        self._chunks = chunks
+        self._release = release
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    def close(self):
+        try:
+            self._chunks.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+# Background exports
+
+class ExportManager:
+    """Caps concurrent exports and runs background export jobs"""
+
+    def __init__(self, directory=None, max_concurrent=None, ttl_hours=None):
+        self.directory = resolve_path(directory or Config.EXPORT_DIR)
+        self.max_concurrent = max_concurrent or Config.EXPORT_MAX_CONCURRENT
+        self.ttl = (Config.EXPORT_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._meta_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    # Streaming
+
+    def stream(self, kind, fmt, params=None):
+        """Chunks of an export for a streaming response; raises ExportBusy when full"""
+        check_export(kind, fmt)
+        rows, fields = export_rows(kind, params)
+        if not self._slots.acquire(blocking=False):
+            raise ExportBusy('Too many exports are running, try again shortly')
+        return _SlotStream(encode_rows(rows, fields, fmt), self._slots.release)
+
+    # Jobs
+
+    def submit(self, kind, fmt, params=None, owner=None):
+        """Queue a background export and return its job record"""
+        check_export(kind, fmt)
+        self.sweep()
+
+        job_id = uuid.uuid4().hex
+        extension = FORMATS[fmt][1]
+        job = {
+            'id': job_id,
+            'kind': kind,
+            'format': fmt,
+            'params': params or {},
+            'owner': owner,
+            'status': 'queued',
+            'rows': 0,
+            'size': None,
+            'error': None,
+            'filename': f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}",
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None,
+        }
+        self._save(job)
+        enqueue('export', {'job': job}, idempotency_key=f"export:{job_id}", owner=owner)
+        return job
+
+    def job(self, job_id):
+        """Job record by id, or None"""
+        if not _JOB_ID.match(job_id or ''):
+            return None
+        try:
+            with open(self._meta_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def output_path(self, job):
+        return os.path.join(self.directory, f"{job['id']}.{FORMATS[job['format']][1]}")
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job):
+        with self._meta_lock:
+            path = self._meta_path(job['id'])
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(job, f)
+            os.replace(tmp, path)
+
+    def run(self, job):
+        """Write a queued export to its file (called by the job workers)"""
+        job.update({'status': 'running', 'rows': 0, 'error': None})
+        self._save(job)
+        try:
+            rows, fields = export_rows(job['kind'], job['params'])
+            job['size'] = write_export(
+                encode_rows(self._progress(rows, job), fields, job['format']), self.output_path(job))
+            job['status'] = 'done'
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            raise
+        finally:
+            job['finished_at'] = datetime.now().isoformat()
+            self._save(job)
+        return {'rows': job['rows'], 'size': job['size']}
+
+    def _progress(self, rows, job):
+        """Count rows as they pass, saving the count every PROGRESS_INTERVAL"""
+        last = time.monotonic()
+        for row in rows:
+            job['rows'] += 1
+            yield row
+            if time.monotonic() - last >= PROGRESS_INTERVAL:
+                self._save(job)
+                last = time.monotonic()
+
+    def sweep(self):
+        """Remove jobs and outputs older than the TTL"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_export_manager():
+    """Return the process-wide export manager"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ExportManager()
+    return _manager
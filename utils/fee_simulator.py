@@ -0,0 +1,345 @@
+"""Monte Carlo maintenance-fee strategy simulator.
+
+Each scenario is a (monthly fee, waiver balance threshold) pair.  The customer
+book is split into card tiers (``Card_Category``) with, per tier:
+
+* the number of customers and the observed churn rate, turned into a
+  baseline monthly attrition hazard,
+* the share of customers who do not pay the fee because they hold the
+  minimum required balance (``Minimum_Required_Balance``) or carry a
+  revolving balance at or above the scenario's threshold.
+
+Fee payers churn faster: their hazard is the baseline times
+``exp(elasticity * fee * tier multiplier)``, where the elasticity is drawn per
+simulation to carry its uncertainty into the results.  Every month, the
+churners in each (scenario, tier, simulation) cell are one binomial draw, so a
+whole grid of scenarios advances with a handful of array operations.  Large
+grids are cut into chunks that run on a process pool; each chunk has its own
+seed from a ``SeedSequence``, so results do not depend on the worker count.
+"""
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from config import Config
+from utils.data_processor import get_feature_store
+
+# Fee charged to each card tier as a multiple of the scenario's base fee
+TIER_FEE_MULTIPLIERS = {
+    'Blue': 1.0,
+    'Silver': 1.5,
+    'Gold': 2.0,
+    'Platinum': 3.0,
+}
+
+# Log-hazard increase per dollar of monthly fee, and its uncertainty
+FEE_ELASTICITY_MEAN = 0.08
+FEE_ELASTICITY_SD = 0.02
+
+DEFAULT_MONTHS = 36
+DEFAULT_SIMULATIONS = 100
+DEFAULT_FEES = {'start': 0.0, 'stop': 25.0, 'step': 0.5}
+DEFAULT_THRESHOLDS = {'start': 0.0, 'stop': 2500.0, 'step': 100.0}
+
+# Bounds of a custom sweep; memory per scenario grows with months x simulations
+MAX_MONTHS = 120
+MAX_SIMULATIONS = 1000
+MAX_TOP = 100
+
+# Scenarios per pool task
+CHUNK_SIZE = 128
+
+# Expected churn at which a fee counts as the breakpoint, relative to no fee
+BREAKPOINT_CHURN_RATIO = 1.5
+
+
+def expand_range(spec, default, limit=None):
+    """Turn a list of values or a {start, stop, step} dict into a float array.
+
+    The number of values is checked against limit before anything is allocated.
+    """
+    spec = default if spec is None else spec
+    if isinstance(spec, dict):
+        start, stop, step = float(spec['start']), float(spec['stop']), float(spec['step'])
+        if not np.isfinite([start, stop, step]).all() or step <= 0 or stop < start:
+            raise ValueError('Range needs finite start <= stop and a positive step')
+        # Same half-step tolerance as the arange below
+        count = math.floor((stop - start) / step + 0.5) + 1
+        if limit is not None and count > limit:
+            raise ValueError(f"Range has {count} values; the limit is {limit}")
+        return np.round(start + step * np.arange(count), 6)
+    if limit is not None and isinstance(spec, (list, tuple)) and len(spec) > limit:
+        raise ValueError(f"Range has {len(spec)} values; the limit is {limit}")
+    values = np.asarray(spec, dtype=np.float64).ravel()
+    if len(values) == 0:
+        raise ValueError('Range is empty')
+    if not np.isfinite(values).all():
+        raise ValueError('Range values must be finite')
+    return values
+
+
+def expand_grid(fees=None, thresholds=None):
+    """Validated (fee values, threshold values) for a sweep"""
+    limit = Config.SIMULATION_MAX_SCENARIOS
+    fee_values = expand_range(fees, DEFAULT_FEES, limit)
+    if fee_values.min() < 0:
+        raise ValueError('Fees must not be negative')
+    threshold_values = expand_range(thresholds, DEFAULT_THRESHOLDS, limit)
+    scenario_count = len(fee_values) * len(threshold_values)
+    if scenario_count > limit:
+        raise ValueError(f"Grid has {scenario_count} scenarios; the limit is {limit}")
+    return fee_values, threshold_values
+
+
+def check_sweep_params(months, simulations, top):
+    """Validated (months, simulations, top) for a sweep"""
+    months, simulations, top = int(months), int(simulations), int(top)
+    if not 1 <= months <= MAX_MONTHS:
+        raise ValueError(f"months must be between 1 and {MAX_MONTHS}")
+    if not 1 <= simulations <= MAX_SIMULATIONS:
+        raise ValueError(f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    if not 1 <= top <= MAX_TOP:
+        raise ValueError(f"top must be between 1 and {MAX_TOP}")
+    return months, simulations, top
+
+
+def _simulate_chunk(tiers, fees, exempt, months, simulations, seed):
+    """Simulate scenarios fees[s] with exempt shares exempt[s, t].
+
+    Runs in pool workers, so it only takes plain arrays.  Returns summary
+    arrays over the simulations for every scenario.
+    """
+    rng = np.random.default_rng(seed)
+    counts = tiers['counts']
+    hazard = tiers['hazard']
+    tier_fees = fees[:, None] * tiers['multipliers'][None, :]
+
+    elasticity = np.maximum(rng.normal(FEE_ELASTICITY_MEAN, FEE_ELASTICITY_SD, simulations), 0.0)
+    payer_hazard = np.minimum(
+        hazard[None, :, None] * np.exp(tier_fees[:, :, None] * elasticity[None, None, :]), 1.0)
+    exempt_hazard = np.broadcast_to(hazard[None, :, None], payer_hazard.shape)
+
+    exempt_alive = np.rint(counts[None, :] * exempt).astype(np.int64)
+    exempt_alive = np.repeat(exempt_alive[:, :, None], simulations, axis=2)
+    payers = np.repeat((counts[None, :] - exempt_alive[:, :, 0])[:, :, None], simulations, axis=2)
+
+    scenarios = len(fees)
+    revenue = np.zeros((scenarios, simulations))
+    monthly_revenue = np.zeros((scenarios, months))
+    monthly_customers = np.zeros((scenarios, months))
+    for month in range(months):
+        # Fees are collected from everyone on the books at the start of the month
+        month_revenue = np.einsum('stk,st->sk', payers, tier_fees)
+        revenue += month_revenue
+        payers -= rng.binomial(payers, payer_hazard)
+        exempt_alive -= rng.binomial(exempt_alive, exempt_hazard)
+        monthly_revenue[:, month] = month_revenue.mean(axis=1)
+        monthly_customers[:, month] = (payers + exempt_alive).sum(axis=1).mean(axis=1)
+
+    remaining = (payers + exempt_alive).sum(axis=1)
+    return {
+        'revenue_mean': revenue.mean(axis=1),
+        'revenue_p5': np.percentile(revenue, 5, axis=1),
+        'revenue_p95': np.percentile(revenue, 95, axis=1),
+        'customers_mean': remaining.mean(axis=1),
+        'monthly_revenue': monthly_revenue,
+        'monthly_customers': monthly_customers,
+    }
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_simulation_pool():
+    """Process pool for scenario chunks, created on first use in each process"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # Spawned workers never inherit the web server's threads or locks
+                _pool = ProcessPoolExecutor(max_workers=Config.SIMULATION_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+                _pool_pid = os.getpid()
+    return _pool
+
+
+class FeeSimulator:
+    """Per-tier book statistics plus the vectorized scenario sweep"""
+
+    def __init__(self, store):
+        self.version = store.version
+        categories = store.categories('Card_Category')
+        codes = np.asarray(store.column('Card_Category'))
+        churn = np.asarray(store.column('Churn'), dtype=np.float64)
+        holds_minimum = np.asarray(store.column('Minimum_Required_Balance'), dtype=bool)
+        balances = np.asarray(store.column('Total_Revolving_Bal'), dtype=np.float64)
+
+        order = sorted(range(len(categories)), key=lambda i: TIER_FEE_MULTIPLIERS.get(categories[i], 1.0))
+        self.tier_names = [categories[i] for i in order]
+        counts, churn_rates, minimum_counts, payer_balances = [], [], [], []
+        for i in order:
+            in_tier = codes == i
+            counts.append(int(in_tier.sum()))
+            churn_rates.append(float(churn[in_tier].mean()) if in_tier.any() else 0.0)
+            minimum_counts.append(int((in_tier & holds_minimum).sum()))
+            # Only customers without the minimum balance can be waived by the threshold
+            payer_balances.append(np.sort(balances[in_tier & ~holds_minimum]))
+
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.churn_rates = np.asarray(churn_rates)
+        # Observed churn is over a year; convert it to a constant monthly hazard
+        self.hazard = 1.0 - (1.0 - self.churn_rates) ** (1.0 / 12.0)
+        self.multipliers = np.asarray([TIER_FEE_MULTIPLIERS.get(name, 1.0) for name in self.tier_names])
+        self.minimum_counts = np.asarray(minimum_counts, dtype=np.int64)
+        self._payer_balances = payer_balances
+
+    def tier_arrays(self):
+        return {'counts': self.counts, 'hazard': self.hazard, 'multipliers': self.multipliers}
+
+    def exempt_share(self, thresholds):
+        """(thresholds x tiers) share of customers the fee is waived for"""
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        shares = np.zeros((len(thresholds), len(self.tier_names)))
+        for t, balances in enumerate(self._payer_balances):
+            if self.counts[t] == 0:
+                continue
+            above = len(balances) - np.searchsorted(balances, thresholds, side='left')
+            shares[:, t] = (self.minimum_counts[t] + above) / self.counts[t]
+        return shares
+
+    def tier_summary(self, fee=None, threshold=None):
+        """Book statistics per card tier"""
+        fee = DEFAULT_FEES['stop'] / 2.0 if fee is None else fee
+        threshold = 0.0 if threshold is None else threshold
+        exempt = self.exempt_share([threshold])[0]
+        return [
+            {
+                'tier': name,
+                'customers': int(self.counts[t]),
+                'annual_churn_rate': round(float(self.churn_rates[t]) * 100.0, 2),
+                'fee_multiplier': float(self.multipliers[t]),
+                'holds_minimum_balance': int(self.minimum_counts[t]),
+                'fee_paying_share': round(float(1.0 - exempt[t]) * 100.0, 2),
+                'monthly_fee': round(float(fee * self.multipliers[t]), 2),
+            }
+            for t, name in enumerate(self.tier_names)
+        ]
+
+    def baseline_churn(self, months):
+        """Expected churn rate over the horizon with no fee"""
+        retained = (self.counts * (1.0 - self.hazard) ** months).sum()
+        return 1.0 - retained / max(int(self.counts.sum()), 1)
+
+    def simulate(self, fees, thresholds, months=DEFAULT_MONTHS, simulations=DEFAULT_SIMULATIONS,
+                 seed=None, parallel=True):
+        """Run every scenario (fees[s], thresholds[s]) and return per-scenario arrays"""
+        fees = np.asarray(fees, dtype=np.float64)
+        exempt = self.exempt_share(thresholds)
+        chunks = [slice(i, min(i + CHUNK_SIZE, len(fees))) for i in range(0, len(fees), CHUNK_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        tiers = self.tier_arrays()
+
+        if parallel and len(chunks) > 1 and Config.SIMULATION_WORKERS > 1:
+            pool = get_simulation_pool()
+            futures = [pool.submit(_simulate_chunk, tiers, fees[c], exempt[c], months, simulations, s)
+                       for c, s in zip(chunks, seeds)]
+            parts = [future.result() for future in futures]
+        else:
+            parts = [_simulate_chunk(tiers, fees[c], exempt[c], months, simulations, s)
+                     for c, s in zip(chunks, seeds)]
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def sweep(self, fees=None, thresholds=None, months=DEFAULT_MONTHS,
+              simulations=DEFAULT_SIMULATIONS, seed=None, top=10):
+        """Evaluate the full fee x threshold grid and summarize it for the dashboard"""
+        # Job payloads reach here unchecked, so the bounds are enforced here too
+        months, simulations, top = check_sweep_params(months, simulations, top)
+        fee_values, threshold_values = expand_grid(fees, thresholds)
+        scenario_count = len(fee_values) * len(threshold_values)
+
+        started = time.perf_counter()
+        grid_fees, grid_thresholds = np.meshgrid(fee_values, threshold_values, indexing='ij')
+        grid_fees, grid_thresholds = grid_fees.ravel(), grid_thresholds.ravel()
+        results = self.simulate(grid_fees, grid_thresholds, months, simulations, seed)
+        elapsed = time.perf_counter() - started
+
+        total_customers = int(self.counts.sum())
+        churn = 1.0 - results['customers_mean'] / max(total_customers, 1)
+        ranked = np.argsort(-results['revenue_mean'], kind='stable')
+        best = int(ranked[0])
+
+        # Revenue and churn against fee at the best scenario's threshold
+        curve = np.flatnonzero(grid_thresholds == grid_thresholds[best])
+        baseline = self.baseline_churn(months)
+        over = curve[churn[curve] >= BREAKPOINT_CHURN_RATIO * baseline]
+        breakpoint = float(grid_fees[over[0]]) if len(over) else None
+
+        def scenario(i):
+            return {
+                'fee': float(grid_fees[i]),
+                'threshold': float(grid_thresholds[i]),
+                'expected_revenue': round(float(results['revenue_mean'][i]), 2),
+                'revenue_p5': round(float(results['revenue_p5'][i]), 2),
+                'revenue_p95': round(float(results['revenue_p95'][i]), 2),
+                'expected_customers': round(float(results['customers_mean'][i]), 1),
+                'churn_rate': round(float(churn[i]) * 100.0, 2),
+            }
+
+        return {
+            'data_version': self.version,
+            'months': months,
+            'simulations': simulations,
+            'scenario_count': scenario_count,
+            'elapsed_ms': round(elapsed * 1000.0, 1),
+            'total_customers': total_customers,
+            'baseline_churn_rate': round(baseline * 100.0, 2),
+            'best': scenario(best),
+            'breakpoint_fee': breakpoint,
+            'top_scenarios': [scenario(int(i)) for i in ranked[:top]],
+            'fee_curve': {
+                'threshold': float(grid_thresholds[best]),
+                'fees': grid_fees[curve].tolist(),
+                'expected_revenue': np.round(results['revenue_mean'][curve], 2).tolist(),
+                'churn_rate': np.round(churn[curve] * 100.0, 2).tolist(),
+            },
+            'timeline': {
+                'months': list(range(1, months + 1)),
+                'revenue': np.round(results['monthly_revenue'][best], 2).tolist(),
+                'customers': np.round(results['monthly_customers'][best], 1).tolist(),
+            },
+            'tiers': self.tier_summary(float(grid_fees[best]), float(grid_thresholds[best])),
+        }
+
+
+_simulator = None
+_simulator_lock = threading.Lock()
+_default_sweep = None
+
+
+def get_fee_simulator():
+    """Return the fee simulator for the current feature store version"""
+    global _simulator
+    store = get_feature_store()
+    if _simulator is None or _simulator.version != store.version:
+        with _simulator_lock:
+            if _simulator is None or _simulator.version != store.version:
+                _simulator = FeeSimulator(store)
+    return _simulator
+
+
+def get_default_sweep():
+    """The dashboard's default sweep, computed once per feature store version"""
+    global _default_sweep
+    simulator = get_fee_simulator()
+    if _default_sweep is None or _default_sweep['data_version'] != simulator.version:
+        with _simulator_lock:
+            if _default_sweep is None or _default_sweep['data_version'] != simulator.version:
+                _default_sweep = simulator.sweep(seed=0)
+    return _default_sweep
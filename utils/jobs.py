@@ -0,0 +1,388 @@
+"""Durable background job queue in SQLite, served by worker processes.
+
+Jobs live in the ``jobs`` table of the dashboard database, so they survive
+restarts and need no external broker:
+
+* ``enqueue`` inserts a job for a registered task.  An ``idempotency_key``
+  is unique, so enqueueing the same key twice returns the existing job.
+* Workers claim the due job with the highest priority inside a
+  ``BEGIN IMMEDIATE`` transaction, so two workers never claim the same job,
+  and hold a lease of ``JOB_LEASE_SECONDS`` that a heartbeat thread renews
+  while the task runs.  Jobs whose lease ran out (their worker died) are
+  put back in the queue.
+* A failing task is retried after ``JOB_RETRY_DELAY * 2 ** (attempt - 1)``
+  seconds until it has used ``max_attempts``.
+
+``start_workers`` (called from ``create_app``) starts ``JOB_WORKERS``
+processes; one app process per host wins a lock file and owns the pool, and
+the workers exit when it does.  ``python -m utils.jobs`` runs a pool on its
+own instead, e.g. as a separate service with ``JOB_WORKERS_ON_STARTUP`` off.
+
+Tasks are plain functions registered with ``@task`` (see ``utils.tasks``);
+they take the job payload as keyword arguments and return a JSON-serializable
+result.
+"""
+import atexit
+import fcntl
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+from config import Config
+from database.connection import get_connection
+from utils.data_processor import resolve_path
+
+STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED = ('succeeded', 'failed', 'cancelled')
+
+# Seconds between checks for jobs whose worker died
+REAP_INTERVAL = 30
+
+# name -> {'func', 'priority', 'max_attempts', 'public'}
+TASKS = {}
+
+
+def task(name, priority=0, max_attempts=3, public=False):
+    """Register a function as a job task; public tasks can be queued over the API"""
+    def register(func):
+        TASKS[name] = {'func': func, 'priority': priority, 'max_attempts': max_attempts, 'public': public}
+        return func
+    return register
+
+
+def _row_to_job(row):
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'] or '{}')
+    job['result'] = json.loads(job['result']) if job['result'] is not None else None
+    now = time.time()
+    started, finished = job['started_at'], job['finished_at']
+    job['timing'] = {
+        'queued_seconds': round((started or (finished if job['status'] == 'cancelled' else now))
+                                - job['created_at'], 3),
+        'run_seconds': round((finished or now) - started, 3) if started else None,
+    }
+    return job
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs in the SQLite jobs table"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Config.DASHBOARD_DATABASE_PATH
+
+    def enqueue(self, task_name, payload=None, priority=None, idempotency_key=None,
+                max_attempts=None, owner=None, delay=0):
+        """Queue a job and return it; an existing job is returned for a repeated key"""
+        if task_name not in TASKS:
+            raise ValueError(f"Unknown task: {task_name}")
+        spec = TASKS[task_name]
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    INSERT INTO jobs (id, task, payload, priority, max_attempts, idempotency_key,
+                                      owner, run_after, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (job_id, task_name, json.dumps(payload or {}),
+                      spec['priority'] if priority is None else int(priority),
+                      spec['max_attempts'] if max_attempts is None else max(1, int(max_attempts)),
+                      idempotency_key, owner, now + max(0.0, float(delay)), now))
+        except sqlite3.IntegrityError:
+            existing = self.find(idempotency_key)
+            if existing is None:
+                raise
+            return existing
+        finally:
+            conn.close()
+        return self.get(job_id)
+
+    def get(self, job_id):
+        conn = get_connection(self.db_path)
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return _row_to_job(row) if row else None
+
+    def find(self, idempotency_key):
+        conn = get_connection(self.db_path)
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE idempotency_key = ?', (idempotency_key,)).fetchone()
+        finally:
+            conn.close()
+        return _row_to_job(row) if row else None
+
+    def list(self, owner=None, status=None, limit=50):
+        clauses, params = [], []
+        if owner is not None:
+            clauses.append('owner = ?')
+            params.append(owner)
+        if status:
+            clauses.append('status = ?')
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        conn = get_connection(self.db_path)
+        try:
+            rows = conn.execute(f'SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?',
+                                params + [int(limit)]).fetchall()
+        finally:
+            conn.close()
+        return [_row_to_job(row) for row in rows]
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started; returns whether it was cancelled"""
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                cursor = conn.execute('''
+                    UPDATE jobs SET status = 'cancelled', finished_at = ?
+                    WHERE id = ? AND status = 'queued'
+                ''', (time.time(), job_id))
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    # Worker side
+
+    def claim(self, worker):
+        """Lease the next due job to this worker, or return None"""
+        now = time.time()
+        conn = get_connection(self.db_path)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute('''
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' AND run_after <= ?
+                    ORDER BY priority DESC, run_after, created_at
+                    LIMIT 1
+                ''', (now,)).fetchone()
+                if row is None:
+                    conn.rollback()
+                    return None
+                conn.execute('''
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                                    started_at = ?, lease_expires = ?, error = NULL
+                    WHERE id = ?
+                ''', (worker, now, now + Config.JOB_LEASE_SECONDS, row['id']))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        finally:
+            conn.close()
+        return self.get(row['id'])
+
+    def heartbeat(self, job_id, worker):
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    UPDATE jobs SET lease_expires = ?
+                    WHERE id = ? AND worker = ? AND status = 'running'
+                ''', (time.time() + Config.JOB_LEASE_SECONDS, job_id, worker))
+        finally:
+            conn.close()
+
+    def succeed(self, job, result):
+        self._settle(job, "status = 'succeeded', result = ?, finished_at = ?",
+                     (json.dumps(result, default=str), time.time()))
+
+    def fail(self, job, error):
+        """Retry with exponential backoff, or fail for good after the last attempt"""
+        now = time.time()
+        if job['attempts'] < job['max_attempts']:
+            delay = Config.JOB_RETRY_DELAY * 2 ** (job['attempts'] - 1)
+            self._settle(job, "status = 'queued', error = ?, run_after = ?, lease_expires = NULL",
+                         (error, now + delay))
+        else:
+            self._settle(job, "status = 'failed', error = ?, finished_at = ?", (error, now))
+
+    def _settle(self, job, assignments, params):
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                # Only the worker holding the lease may settle the job
+                conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ? AND worker = ? AND status = 'running'",
+                             params + (job['id'], job['worker']))
+        finally:
+            conn.close()
+
+    def requeue_expired(self):
+        """Put jobs whose worker stopped renewing its lease back in the queue"""
+        now = time.time()
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute('''
+                    UPDATE jobs SET status = 'failed', error = 'Worker lost', finished_at = ?
+                    WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts
+                ''', (now, now))
+                cursor = conn.execute('''
+                    UPDATE jobs SET status = 'queued', error = 'Worker lost', run_after = ?
+                    WHERE status = 'running' AND lease_expires < ?
+                ''', (now, now))
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def run(self, job):
+        """Run a claimed job, renewing its lease until the task returns"""
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(Config.JOB_LEASE_SECONDS / 3):
+                try:
+                    self.heartbeat(job['id'], job['worker'])
+                except sqlite3.Error as e:
+                    print(f"Job {job['id']} heartbeat failed: {e}")
+
+        heartbeat = threading.Thread(target=renew, daemon=True)
+        heartbeat.start()
+        try:
+            spec = TASKS.get(job['task'])
+            if spec is None:
+                raise ValueError(f"Unknown task: {job['task']}")
+            result = spec['func'](**job['payload'])
+        except Exception as e:
+            print(f"Job {job['id']} ({job['task']}) attempt {job['attempts']} failed: {e}")
+            self.fail(job, ''.join(traceback.format_exception_only(type(e), e)).strip())
+            return False
+        finally:
+            done.set()
+            heartbeat.join()
+        self.succeed(job, result)
+        return True
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                import utils.tasks  # noqa: F401  (registers the tasks)
+                _queue = JobQueue()
+    return _queue
+
+
+def enqueue(task_name, payload=None, **kwargs):
+    """Queue a job on the process-wide queue"""
+    return get_job_queue().enqueue(task_name, payload, **kwargs)
+
+
+# Worker processes
+
+def worker_main(name, parent_pid=None):
+    """Claim and run jobs until told to stop or the parent process exits"""
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+
+    job_queue = get_job_queue()
+    last_reap = 0.0
+    while not stopping.is_set():
+        if parent_pid is not None and os.getppid() != parent_pid:
+            break
+        try:
+            if time.monotonic() - last_reap >= REAP_INTERVAL:
+                last_reap = time.monotonic()
+                requeued = job_queue.requeue_expired()
+                if requeued:
+                    print(f"Requeued {requeued} job(s) from lost workers")
+            job = job_queue.claim(name)
+        except sqlite3.Error as e:
+            print(f"Job worker {name}: {e}")
+            job = None
+        if job is None:
+            stopping.wait(Config.JOB_POLL_INTERVAL)
+            continue
+        try:
+            job_queue.run(job)
+        except sqlite3.Error as e:
+            # Recording the outcome failed; the job's lease expires and the reaper requeues it
+            print(f"Job worker {name}: job {job['id']}: {e}")
+
+
+class WorkerPool:
+    """A set of worker processes owned by this process"""
+
+    def __init__(self, size=None):
+        self.size = Config.JOB_WORKERS if size is None else size
+        self.processes = []
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        host = socket.gethostname()
+        for i in range(self.size):
+            process = context.Process(target=worker_main, args=(f"{host}:{os.getpid()}:{i}", os.getpid()),
+                                      name=f"job-worker-{i}")
+            process.start()
+            self.processes.append(process)
+        return self
+
+    def stop(self, timeout=10):
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+        self.processes = []
+
+
+_pool = None
+_pool_lock_file = None
+
+
+def start_workers(size=None):
+    """Start the worker pool unless another process on this host already owns it"""
+    global _pool, _pool_lock_file
+    size = Config.JOB_WORKERS if size is None else size
+    if _pool is not None or size <= 0:
+        return _pool
+    lock_path = resolve_path(Config.JOB_POOL_LOCK)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    lock_file = open(lock_path, 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    _pool_lock_file = lock_file
+    _pool = WorkerPool(size).start()
+    atexit.register(_pool.stop)
+    return _pool
+
+
+if __name__ == '__main__':
+    # python -m utils.jobs [workers]
+    pool = start_workers(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    if pool is None:
+        print('Another process already runs the job workers on this host')
+        sys.exit(1)
+    print(f"Running {len(pool.processes)} job worker(s); Ctrl+C to stop")
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        while not stop.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    pool.stop()
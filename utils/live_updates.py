@@ -0,0 +1,244 @@
+"""Server-sent-event fan-out for live dashboard updates.
+
+One publisher thread per process wakes every ``LIVE_UPDATE_INTERVAL``
+seconds, reads the cached dashboard aggregates and the notifications added
+since its last look (one query for everybody), and turns any changes into
+messages:
+
+* ``stats``  - only the headline numbers that changed,
+* ``alert``  - the high-risk customer count went up,
+* ``notification`` - a new row in the notifications table (sent to its user).
+
+Each message is serialized to SSE wire format once and put on every
+subscriber's queue, so the work per tick is the same for one open dashboard
+or a thousand.  The thread only runs while someone is subscribed.  A client
+that falls too far behind is disconnected and reconnects through
+``EventSource``; recent messages are kept so it can resume from
+``Last-Event-ID``.
+
+Every open stream holds a server thread, so a process accepts at most
+``LIVE_UPDATE_MAX_STREAMS`` of them and refuses more with ``HubFull`` (the
+route answers 503).  ``gunicorn.conf.py`` runs threaded workers with enough
+threads for that many streams plus ordinary requests.
+"""
+import collections
+import json
+import queue
+import threading
+import time
+
+from config import Config
+from database.connection import get_connection
+from utils.aggregates import get_dashboard_aggregates
+
+# Headline numbers pushed to dashboards when they change
+STAT_FIELDS = (
+    'total_customers', 'active_customers', 'churn_rate', 'retention_rate',
+    'high_risk_customers', 'model_accuracy', 'open_complaints', 'customer_segments',
+    'customer_satisfaction', 'offer_acceptance_rate', 'total_events',
+)
+
+# Messages kept for clients resuming with Last-Event-ID
+REPLAY_SIZE = 256
+
+
+class HubFull(Exception):
+    """Raised when this process already serves LIVE_UPDATE_MAX_STREAMS streams"""
+
+
+def format_event(event_id, event, data):
+    """One message in text/event-stream format"""
+    payload = json.dumps(data, separators=(',', ':'), default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class Subscription:
+    """One connected client's message queue"""
+
+    def __init__(self, user_id, size):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=size)
+        self.closed = False
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # Too slow to keep up: drop it, the browser reconnects and resumes
+            self.closed = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LiveUpdateHub:
+    """Computes dashboard changes once per tick and fans them out"""
+
+    def __init__(self, interval=None, max_streams=None):
+        self.interval = interval or Config.LIVE_UPDATE_INTERVAL
+        self.max_streams = max_streams or Config.LIVE_UPDATE_MAX_STREAMS
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._sequence = 0
+        self._replay = collections.deque(maxlen=REPLAY_SIZE)
+        self._stats = None
+        self._notification_id = None
+
+    # Subscribers
+
+    def subscribe(self, user_id=None):
+        subscription = Subscription(user_id, Config.LIVE_UPDATE_QUEUE_SIZE)
+        with self._lock:
+            # Dropped clients still in the set are on their way out; do not count them
+            if sum(1 for s in self._subscribers if not s.closed) >= self.max_streams:
+                raise HubFull(f"Already serving {self.max_streams} live update streams")
+            self._subscribers.add(subscription)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-updates', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def replay_since(self, last_event_id, user_id=None):
+        """Messages after last_event_id, or None if some are no longer buffered"""
+        with self._lock:
+            if last_event_id > self._sequence:
+                # The id came from before a restart
+                return None
+            if self._replay and self._replay[0][0] > last_event_id + 1:
+                return None
+            return [message for event_id, target, message in self._replay
+                    if event_id > last_event_id and target in (None, user_id)]
+
+    def snapshot_message(self):
+        """Full current stats for a newly connected client"""
+        stats = self._current_stats()
+        with self._lock:
+            return format_event(self._sequence, 'stats', stats)
+
+    # Publishing
+
+    def publish(self, event, data, user_id=None):
+        """Serialize once and queue for every matching subscriber"""
+        with self._lock:
+            self._sequence += 1
+            message = format_event(self._sequence, event, data)
+            self._replay.append((self._sequence, user_id, message))
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if user_id is None or subscription.user_id == user_id:
+                subscription.offer(message)
+
+    def _current_stats(self):
+        snapshot = get_dashboard_aggregates().snapshot()
+        stats = {name: snapshot.get(name) for name in STAT_FIELDS}
+        stats['data_version'] = snapshot.get('data_version')
+        return stats
+
+    def tick(self):
+        """Publish whatever changed since the previous tick"""
+        stats = self._current_stats()
+        previous = self._stats
+        self._stats = stats
+        if previous is not None:
+            changes = {name: value for name, value in stats.items() if previous.get(name) != value}
+            if changes:
+                self.publish('stats', changes)
+            old_risk = previous.get('high_risk_customers') or 0
+            new_risk = stats.get('high_risk_customers') or 0
+            if new_risk > old_risk:
+                self.publish('alert', {
+                    'type': 'alert',
+                    'title': 'High Risk Customer Alert',
+                    'message': f"{new_risk - old_risk} more customers identified as high churn risk "
+                               f"({new_risk} in total)",
+                })
+
+        for row in self._new_notifications():
+            self.publish('notification', {
+                'id': row['id'],
+                'type': row['type'],
+                'title': row['title'],
+                'message': row['message'],
+                'created_at': row['created_at'],
+            }, user_id=row['user_id'])
+
+    def _new_notifications(self):
+        conn = get_connection(Config.DASHBOARD_DATABASE_PATH)
+        try:
+            if self._notification_id is None:
+                # Start from the newest existing row; only later ones are news
+                row = conn.execute("SELECT COALESCE(MAX(id), 0) FROM notifications").fetchone()
+                self._notification_id = row[0]
+                return []
+            rows = conn.execute("""
+                SELECT id, user_id, title, message, type, created_at
+                FROM notifications WHERE id > ? ORDER BY id
+            """, (self._notification_id,)).fetchall()
+            if rows:
+                self._notification_id = rows[-1]['id']
+            return rows
+        finally:
+            conn.close()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                # Drop clients that fell behind, and stop when nobody is listening
+                self._subscribers = {s for s in self._subscribers if not s.closed}
+                if not self._subscribers:
+                    self._thread = None
+                    self._stats = None
+                    return
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Error publishing live updates: {e}")
+            time.sleep(self.interval)
+
+    # Streaming
+
+    def stream(self, subscription, last_event_id=None):
+        """Generator of SSE bytes for one client; ends when it is dropped"""
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield f"retry: {int(Config.LIVE_UPDATE_RETRY_MS)}\n\n".encode('utf-8')
+            missed = None
+            if last_event_id is not None:
+                missed = self.replay_since(last_event_id, subscription.user_id)
+            if missed is None:
+                yield self.snapshot_message()
+            else:
+                for message in missed:
+                    yield message
+
+            while not subscription.closed:
+                message = subscription.get(timeout=Config.LIVE_UPDATE_HEARTBEAT)
+                # Comment lines keep proxies from closing an idle connection
+                yield message if message is not None else b": heartbeat\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_live_update_hub():
+    """Return the process-wide live update hub"""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = LiveUpdateHub()
+    return _hub
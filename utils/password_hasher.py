@@ -0,0 +1,213 @@
+"""Salted scrypt password hashing on a bounded worker pool.
+
+Hashes are stored as ``scrypt$<n>$<r>$<p>$<salt>$<key>`` (base64 salt and
+key), so the cost parameters can be raised later: a login that verifies
+against older parameters, or against a legacy unsalted SHA-256 hex digest,
+is flagged for rehashing.
+
+scrypt is deliberately slow and memory hungry (about ``128 * n * r`` bytes),
+so it runs on a small thread pool (``hashlib.scrypt`` releases the GIL) with
+at most ``PASSWORD_HASH_WORKERS`` hashes in flight and at most
+``PASSWORD_HASH_MAX_PENDING`` logins waiting.  Beyond that callers get
+``HasherBusy`` immediately instead of tying up a web worker, so a login burst
+cannot starve the dashboard routes.  Queue wait and total latency are
+recorded for the last ``LATENCY_WINDOW`` operations.
+
+Logins for unknown emails verify against ``dummy_hash`` so they cost the
+same scrypt work as a wrong password and do not reveal which emails exist.
+"""
+import base64
+import collections
+import hashlib
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+ALGORITHM = 'scrypt'
+SALT_BYTES = 16
+KEY_BYTES = 32
+LATENCY_WINDOW = 2048
+
+
+class HasherBusy(Exception):
+    """Raised when too many hashes are already queued"""
+
+
+def _b64encode(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _b64decode(text):
+    return base64.b64decode(text.encode('ascii'))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=KEY_BYTES)
+
+
+def _percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000.0, 2)
+
+
+def is_legacy_hash(stored):
+    """Unsalted SHA-256 hex digests from before scrypt"""
+    return len(stored) == 64 and all(c in '0123456789abcdef' for c in stored.lower())
+
+
+class PasswordHasher:
+    """scrypt hashing and verification with a concurrency cap and metrics"""
+
+    def __init__(self, n=None, r=None, p=None, workers=None, max_pending=None):
+        self.n = n or Config.PASSWORD_SCRYPT_N
+        self.r = r or Config.PASSWORD_SCRYPT_R
+        self.p = p or Config.PASSWORD_SCRYPT_P
+        self.workers = workers or Config.PASSWORD_HASH_WORKERS
+        self.max_pending = Config.PASSWORD_HASH_MAX_PENDING if max_pending is None else max_pending
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+        # Slots for running plus queued operations
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._waits = collections.deque(maxlen=LATENCY_WINDOW)
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._dummy_hash = None
+
+    # Pool
+
+    def _submit(self, fn, *args):
+        """Run fn on the pool and wait for it; raises HasherBusy when the queue is full"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy('Too many password operations in progress')
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._waits.append(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._latencies.append(time.perf_counter() - submitted)
+                self._slots.release()
+
+        return self._executor.submit(run).result()
+
+    # Hashing
+
+    def _hash(self, password):
+        salt = os.urandom(SALT_BYTES)
+        key = _scrypt(password, salt, self.n, self.r, self.p)
+        return f"{ALGORITHM}${self.n}${self.r}${self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def _verify(self, password, stored):
+        if is_legacy_hash(stored):
+            legacy = hashlib.sha256(password.encode('utf-8')).hexdigest()
+            return hmac.compare_digest(legacy, stored.lower()), True
+        try:
+            algorithm, n, r, p, salt, key = stored.split('$')
+            n, r, p = int(n), int(r), int(p)
+        except ValueError:
+            return False, False
+        if algorithm != ALGORITHM:
+            return False, False
+        candidate = _scrypt(password, _b64decode(salt), n, r, p)
+        matches = hmac.compare_digest(candidate, _b64decode(key))
+        return matches, matches and (n, r, p) != (self.n, self.r, self.p)
+
+    def hash_password(self, password):
+        """Salted scrypt hash of a password"""
+        return self._submit(self._hash, password)
+
+    def verify_password(self, password, stored):
+        """Return (matches, needs_rehash) for a stored scrypt or legacy hash"""
+        if not stored:
+            return False, False
+        return self._submit(self._verify, password, stored)
+
+    @property
+    def dummy_hash(self):
+        """A fixed hash at the current cost, for equalizing unknown-user logins"""
+        if self._dummy_hash is None:
+            # Computed once per process; a race just computes it twice
+            self._dummy_hash = self._hash(_b64encode(os.urandom(SALT_BYTES)))
+        return self._dummy_hash
+
+    # Metrics
+
+    def metrics(self):
+        with self._lock:
+            waits = list(self._waits)
+            latencies = list(self._latencies)
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'running': self._running,
+                'pending': self._pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'queue_wait_ms_p50': _percentile(waits, 50),
+                'queue_wait_ms_p99': _percentile(waits, 99),
+                'latency_ms_p50': _percentile(latencies, 50),
+                'latency_ms_p99': _percentile(latencies, 99),
+            }
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Return the process-wide password hasher"""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Simulate a login burst and report latency: python -m utils.password_hasher [logins]
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    hasher = get_password_hasher()
+    stored = hasher.hash_password('correct horse battery staple')
+    hasher._waits.clear()
+    hasher._latencies.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=64) as clients:
+        def login(_):
+            try:
+                return hasher.verify_password('correct horse battery staple', stored)[0]
+            except HasherBusy:
+                return None
+        results = list(clients.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{logins} logins in {elapsed:.2f}s: {results.count(True)} verified, "
+          f"{results.count(None)} rejected as busy")
+    print(hasher.metrics())
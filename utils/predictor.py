@@ -0,0 +1,316 @@
+"""Churn scoring engine.
+
+The trained model is loaded once per process and folded into a single
+weight vector so that scoring any number of customers is one NumPy
+matrix-vector product instead of a Python loop per customer.
+"""
+import fcntl
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from config import Config
+from utils.data_processor import get_feature_store, resolve_path
+
+# Numeric and encoded columns of newone.csv used as model inputs.  Columns that
+# are derived from the target (Attrition_Flag_Encoded, Customer_Status) or from
+# offline clustering (Cluster, PCA1, PCA2, Segment) are deliberately left out.
+FEATURE_COLUMNS = [
+    'Customer_Age',
+    'Dependent_count',
+    'Months_on_book',
+    'Total_Relationship_Count',
+    'Months_Inactive_12_mon',
+    'Contacts_Count_12_mon',
+    'Credit_Limit',
+    'Total_Revolving_Bal',
+    'Avg_Open_To_Buy',
+    'Total_Amt_Chng_Q4_Q1',
+    'Total_Trans_Amt',
+    'Total_Trans_Ct',
+    'Total_Ct_Chng_Q4_Q1',
+    'Avg_Utilization_Ratio',
+    'Surprise_Opaque_Fees',
+    'Security',
+    'Scheme_Personalization',
+    'Minimum_Required_Balance',
+    'Server_Maintenance_Count',
+    'Customer_Rating',
+    'Average_Complaints',
+    'Complaint_Type',
+    'Gender_Encoded',
+    'Education_Level_Encoded',
+    'Marital_Status_Encoded',
+    'Income_Category_Encoded',
+    'Card_Category_Encoded',
+    'Engagement_Score',
+    'Trans_Freq_3M',
+    'Days_Since_Last_Transaction',
+    'Inactive_90Days_Flag',
+]
+TARGET_COLUMN = 'Churn'
+ID_COLUMN = 'CLIENTNUM'
+
+# Lower bounds of each risk band, highest first
+RISK_THRESHOLDS = [(0.7, 'High'), (0.4, 'Medium'), (0.0, 'Low')]
+
+
+def risk_levels(probabilities):
+    """Map an array of churn probabilities to risk band labels"""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    conditions = [probabilities >= threshold for threshold, _ in RISK_THRESHOLDS]
+    labels = [label for _, label in RISK_THRESHOLDS]
+    return np.select(conditions, labels, default=RISK_THRESHOLDS[-1][1])
+
+
+def records_matrix(records, columns, defaults):
+    """Feature matrix from customer dicts; missing or blank features take the defaults.
+
+    Raises ValueError for anything that is not a list of objects with finite
+    numeric feature values, so bad input is a 400 rather than a 500.
+    """
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError('customers must be a list of objects')
+    index = {name: i for i, name in enumerate(columns)}
+    X = np.tile(defaults, (len(records), 1))
+    for row, record in enumerate(records):
+        for name, value in record.items():
+            col = index.get(name)
+            if col is None or value is None or value == '':
+                continue
+            try:
+                if not isinstance(value, (int, float, str)):
+                    raise TypeError
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Customer {row}: {name} must be a number") from None
+            if not math.isfinite(number):
+                raise ValueError(f"Customer {row}: {name} must be finite")
+            X[row, col] = number
+    return X
+
+
+def train_model(data_path=None, model_path=None):
+    """Train the churn model on the customer CSV and save it to model_path"""
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    data_path = resolve_path(data_path or Config.DATA_PATH)
+    model_path = resolve_path(model_path or Config.MODEL_PATH)
+
+    df = pd.read_csv(data_path, usecols=FEATURE_COLUMNS + [TARGET_COLUMN])
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = df[TARGET_COLUMN].to_numpy()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+    pipeline = make_pipeline(StandardScaler(),
+                             LogisticRegression(max_iter=1000, class_weight='balanced'))
+    pipeline.fit(X_train, y_train)
+    accuracy = float(pipeline.score(X_test, y_test))
+
+    # Refit on the full book once the held-out accuracy has been recorded
+    pipeline.fit(X, y)
+
+    artifact = {
+        'feature_columns': list(FEATURE_COLUMNS),
+        'pipeline': pipeline,
+        'accuracy': accuracy,
+        'trained_at': datetime.now().isoformat(),
+        'training_rows': int(len(df)),
+    }
+
+    # Write to a temp file first so concurrent workers never read a partial model
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, model_path)
+
+    return artifact
+
+
+class ChurnPredictor:
+    """Vectorized churn scorer built from a trained model artifact"""
+
+    def __init__(self, artifact):
+        self.feature_columns = list(artifact['feature_columns'])
+        self.accuracy = artifact.get('accuracy')
+        self.trained_at = artifact.get('trained_at')
+        self.pipeline = artifact['pipeline']
+        self._column_index = {name: i for i, name in enumerate(self.feature_columns)}
+        self._weights = None
+        self._bias = 0.0
+        self._fold_linear_model()
+
+        # Per-feature fill values for records with missing fields
+        scaler = self.pipeline.steps[0][1] if len(self.pipeline.steps) > 1 else None
+        if scaler is not None and hasattr(scaler, 'mean_'):
+            self.defaults = np.asarray(scaler.mean_, dtype=np.float64)
+        else:
+            self.defaults = np.zeros(len(self.feature_columns))
+
+    @classmethod
+    def load(cls, model_path=None):
+        """Load a predictor from disk"""
+        return cls(joblib.load(resolve_path(model_path or Config.MODEL_PATH)))
+
+    def _fold_linear_model(self):
+        """Fold a StandardScaler + linear classifier into one weight vector"""
+        steps = [step for _, step in self.pipeline.steps]
+        estimator = steps[-1]
+        if not hasattr(estimator, 'coef_') or len(steps) > 2:
+            return
+
+        weights = np.asarray(estimator.coef_, dtype=np.float64).ravel()
+        bias = float(np.ravel(estimator.intercept_)[0])
+        if len(steps) == 2:
+            scaler = steps[0]
+            mean = getattr(scaler, 'mean_', None)
+            scale = getattr(scaler, 'scale_', None)
+            if mean is None or scale is None:
+                return
+            weights = weights / scale
+            bias = bias - float(np.dot(weights, mean))
+
+        self._weights = np.ascontiguousarray(weights)
+        self._bias = bias
+
+    def predict_proba(self, X):
+        """Return churn probabilities for a 2-D feature matrix"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_columns):
+            raise ValueError(f"Expected {len(self.feature_columns)} features, got {X.shape[1]}")
+
+        if self._weights is None:
+            return self.pipeline.predict_proba(X)[:, 1]
+
+        logits = X @ self._weights + self._bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def records_to_matrix(self, records):
+        """Build a feature matrix from a list of dicts, filling gaps with training means"""
+        return records_matrix(records, self.feature_columns, self.defaults)
+
+    def score_records(self, records):
+        """Score a list of customer feature dicts"""
+        if not records:
+            return []
+
+        probabilities = self.predict_proba(self.records_to_matrix(records))
+        levels = risk_levels(probabilities)
+
+        return [
+            {
+                'customer_id': record.get(ID_COLUMN) or record.get('customer_id'),
+                'churn_probability': round(float(probability), 4),
+                'risk_level': str(level),
+                'confidence_score': round(float(max(probability, 1.0 - probability)), 4),
+            }
+            for record, probability, level in zip(records, probabilities, levels)
+        ]
+
+    def predict_store(self, store, rows=None):
+        """Score feature store rows straight from the memory-mapped columns"""
+        if self._weights is None:
+            return self.predict_proba(store.matrix(self.feature_columns, rows))
+
+        # Accumulate column by column so the full matrix is never materialized
+        count = len(store) if rows is None else len(rows)
+        logits = np.full(count, self._bias, dtype=np.float64)
+        for weight, name in zip(self._weights, self.feature_columns):
+            values = store.column(name)
+            logits += weight * (values if rows is None else values[rows])
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def feature_importance(self, store=None):
+        """Share of the model's influence per feature column, summing to 1.
+
+        For a linear model this is each weight times the spread of its
+        column over the book; tree models report their own importances.
+        """
+        if self._weights is not None:
+            store = store or get_feature_store()
+            spread = np.asarray([np.std(store.column(name)) for name in self.feature_columns])
+            raw = np.abs(self._weights) * spread
+        else:
+            estimator = self.pipeline.steps[-1][1]
+            if not hasattr(estimator, 'feature_importances_'):
+                raise ValueError('The churn model does not expose feature importances')
+            raw = np.asarray(estimator.feature_importances_, dtype=np.float64)
+        total = raw.sum()
+        return raw / total if total else raw
+
+    def score_clientnums(self, clientnums):
+        """Score existing customers by CLIENTNUM; unknown ids are skipped"""
+        store = get_feature_store()
+        found, rows = store.rows_for(clientnums)
+        if not found:
+            return []
+
+        probabilities = self.predict_store(store, rows)
+        levels = risk_levels(probabilities)
+
+        return [
+            {
+                'customer_id': str(clientnum),
+                'churn_probability': round(float(probability), 4),
+                'risk_level': str(level),
+                'confidence_score': round(float(max(probability, 1.0 - probability)), 4),
+            }
+            for clientnum, probability, level in zip(found, probabilities, levels)
+        ]
+
+    def score_population(self):
+        """Score every customer in the book in a single vectorized call"""
+        store = get_feature_store()
+        started = time.perf_counter()
+        probabilities = self.predict_store(store)
+        elapsed = time.perf_counter() - started
+
+        return {
+            'clientnums': store.clientnums,
+            'probabilities': probabilities,
+            'risk_levels': risk_levels(probabilities),
+            'elapsed_ms': elapsed * 1000.0,
+        }
+
+
+_predictor = None
+_predictor_lock = threading.Lock()
+
+
+def get_predictor():
+    """Return the process-wide predictor, training a model if none exists yet"""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                model_path = resolve_path(Config.MODEL_PATH)
+                if not os.path.exists(model_path):
+                    _train_once(model_path)
+                _predictor = ChurnPredictor.load(model_path)
+    return _predictor
+
+
+def _train_once(model_path):
+    """Train a missing model, with one process per host doing the work"""
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(f"{model_path}.lock", 'w') as lock:
+        # Other workers block here and load the model the winner wrote
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(model_path):
+                print(f"No trained model at {model_path}, training a new one")
+                train_model(model_path=model_path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
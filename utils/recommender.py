@@ -0,0 +1,285 @@
+"""Offer recommendation engine.
+
+Server-side port of the scoring that used to run in Recommendation.html.
+The catalog is compiled once into matrices:
+
+* ``offer_tags``   (offers x tags)    1 where an offer carries a tag
+* ``base_scores``  (clusters x offers) cluster boost + 2 per preferred tag
+
+A customer's score for every offer is then ``base_scores[cluster]`` plus
+their tag-affinity vector projected onto the offers, so ranking one customer
+or thousands is the same handful of array operations.  Scores are fully
+deterministic (no random jitter) and therefore cacheable.
+"""
+import threading
+
+import numpy as np
+
+from utils.data_processor import get_feature_store
+from utils.event_store import get_event_log
+
+CLUSTER_PROFILES = {
+    0: {
+        'name': 'Budget Conscious',
+        'description': 'Cost-effective solutions, basic banking needs, cashback focus',
+        'preferences': ['savings', 'cashback', 'digital', 'starter'],
+    },
+    1: {
+        'name': 'Premium Spender',
+        'description': 'High-value transactions, luxury services, investment opportunities',
+        'preferences': ['wealth', 'investment', 'premium', 'travel', 'rewards'],
+    },
+    2: {
+        'name': 'Young Professional',
+        'description': 'Career growth, travel benefits, moderate spending',
+        'preferences': ['travel', 'rewards', 'credit_card', 'loan', 'education'],
+    },
+    3: {
+        'name': 'Established Saver',
+        'description': 'Long-term relationships, steady transactions, wealth building',
+        'preferences': ['wealth', 'savings', 'investment', 'private_banking'],
+    },
+}
+
+CATALOG = {
+    'offer_01': {
+        'title': 'Basic Savings Account',
+        'description': 'No fees, cashback on digital payments',
+        'tags': ['cashback', 'savings', 'digital'],
+        'cluster_boost': {0: 3, 3: 2},
+    },
+    'offer_02': {
+        'title': 'Travel Rewards Credit Card',
+        'description': 'Earn points on travel and dining',
+        'tags': ['travel', 'rewards', 'credit_card'],
+        'cluster_boost': {1: 3, 2: 4},
+    },
+    'offer_03': {
+        'title': 'Premium Banking Package',
+        'description': 'Exclusive wealth management and concierge',
+        'tags': ['wealth', 'private_banking', 'investment'],
+        'cluster_boost': {1: 4, 3: 3},
+    },
+    'offer_04': {
+        'title': 'Personal Loan',
+        'description': 'Quick disbursal, competitive interest rates',
+        'tags': ['loan', 'personal', 'quick_disbursal'],
+        'cluster_boost': {2: 3, 0: 1},
+    },
+    'offer_05': {
+        'title': 'Student Starter Kit',
+        'description': 'Beginner-friendly account with education benefits',
+        'tags': ['education', 'onboarding', 'starter'],
+        'cluster_boost': {0: 2, 2: 2},
+    },
+    'offer_06': {
+        'title': 'Investment Portfolio',
+        'description': 'Diversified mutual funds and SIP options',
+        'tags': ['investment', 'wealth', 'sip'],
+        'cluster_boost': {1: 4, 3: 4},
+    },
+    'offer_07': {
+        'title': 'Digital Wallet Cashback',
+        'description': '5% cashback on all digital transactions',
+        'tags': ['digital', 'cashback', 'mobile'],
+        'cluster_boost': {0: 3, 2: 2},
+    },
+    'offer_08': {
+        'title': 'Business Credit Card',
+        'description': 'Expense management and business rewards',
+        'tags': ['business', 'credit_card', 'rewards'],
+        'cluster_boost': {1: 2, 3: 3},
+    },
+}
+
+# Points per past event on an offer sharing the customer's tags
+EVENT_WEIGHTS = {'accept': 5.0, 'click': 2.0}
+PREFERENCE_TAG_POINTS = 2.0
+SCORE_SCALE = 10.0
+DEFAULT_TOP_K = 4
+
+# Annual income assumed for each Income_Category in the customer book
+INCOME_MIDPOINTS = {
+    'Less than $40K': 30000,
+    '$40K - $60K': 50000,
+    '$60K - $80K': 70000,
+    '$80K - $120K': 100000,
+    '$120K +': 140000,
+}
+
+FEATURE_NAMES = ['Age', 'Income', 'Tenure', 'Transactions', 'CreditLimit']
+
+
+def predict_clusters(age, income, tenure, transactions, credit_limit):
+    """Vectorized cluster assignment from profile arrays (same rules as the old JS model)"""
+    age = np.asarray(age, dtype=np.float64)
+    income = np.asarray(income, dtype=np.float64)
+    tenure = np.asarray(tenure, dtype=np.float64)
+    transactions = np.asarray(transactions, dtype=np.float64)
+    credit_limit = np.asarray(credit_limit, dtype=np.float64)
+
+    score = np.select([age < 30, age >= 50], [1, 3], default=2)
+    score = score + np.select([income >= 100000, income >= 60000, income >= 40000], [3, 2, 1], default=0)
+    score = score + np.select([tenure >= 36, tenure >= 12], [2, 1], default=0)
+    score = score + np.select([transactions >= 50, transactions >= 20], [2, 1], default=0)
+    score = score + np.select([credit_limit >= 50000, credit_limit >= 25000], [2, 1], default=0)
+
+    return np.select([score <= 3, score >= 9, (score <= 6) & (age < 35)], [0, 1, 2], default=3)
+
+
+def predict_cluster(features):
+    """Cluster for a single profile dict with Age/Income/Tenure/Transactions/CreditLimit"""
+    values = []
+    for name in FEATURE_NAMES:
+        value = features.get(name)
+        values.append(float(value) if value not in (None, '') else 0.0)
+    return int(predict_clusters(*values))
+
+
+class RecommendationEngine:
+    """Ranks the offer catalog for customers using precomputed matrices"""
+
+    def __init__(self, catalog=CATALOG, cluster_profiles=CLUSTER_PROFILES):
+        self.catalog = catalog
+        self.cluster_profiles = cluster_profiles
+        self.offer_ids = list(catalog)
+        self.tags = sorted({tag for offer in catalog.values() for tag in offer['tags']}
+                           | {tag for p in cluster_profiles.values() for tag in p['preferences']})
+        self.tag_index = {tag: i for i, tag in enumerate(self.tags)}
+        clusters = sorted(cluster_profiles)
+
+        self.offer_tags = np.zeros((len(self.offer_ids), len(self.tags)))
+        for i, offer_id in enumerate(self.offer_ids):
+            for tag in catalog[offer_id]['tags']:
+                self.offer_tags[i, self.tag_index[tag]] = 1.0
+
+        preferences = np.zeros((len(clusters), len(self.tags)))
+        boosts = np.zeros((len(clusters), len(self.offer_ids)))
+        for c in clusters:
+            for tag in cluster_profiles[c]['preferences']:
+                preferences[c, self.tag_index[tag]] = 1.0
+            for i, offer_id in enumerate(self.offer_ids):
+                boosts[c, i] = catalog[offer_id]['cluster_boost'].get(c, 0)
+
+        # clusters x offers: number of an offer's tags the cluster prefers
+        self.matching_tags = preferences @ self.offer_tags.T
+        self.base_scores = boosts + PREFERENCE_TAG_POINTS * self.matching_tags
+
+        # tags x offers: a tag's affinity spread evenly over each offer's tags.
+        # An event on an offer therefore adds its full weight to that offer and
+        # a proportional share to offers that overlap it.
+        self.affinity_projection = (self.offer_tags / self.offer_tags.sum(axis=1, keepdims=True)).T
+
+        self._book_clusters = None
+        self._book_version = None
+        self._lock = threading.Lock()
+
+    # Customer features
+
+    def book_clusters(self, store):
+        """Cluster of every customer in the feature store, computed once per version"""
+        if self._book_version != store.version:
+            with self._lock:
+                if self._book_version != store.version:
+                    income_codes = store.column('Income_Category')
+                    lookup = np.array([INCOME_MIDPOINTS.get(c, 0) for c in store.categories('Income_Category')] + [0])
+                    self._book_clusters = predict_clusters(
+                        store.column('Customer_Age'),
+                        lookup[income_codes],
+                        store.column('Months_on_book'),
+                        np.asarray(store.column('Total_Trans_Ct')) / 12.0,
+                        store.column('Credit_Limit'),
+                    )
+                    self._book_version = store.version
+        return self._book_clusters
+
+    def affinity_matrix(self, user_ids):
+        """users x tags matrix of time-decayed, weighted accept/click counts"""
+        event_log = get_event_log()
+        affinity = np.zeros((len(user_ids), len(self.tags)))
+        for row, user_id in enumerate(user_ids):
+            try:
+                tag_affinity = event_log.tag_affinity(user_id)
+            except (TypeError, ValueError):
+                # Anonymous or non-numeric ids have no recorded history
+                continue
+            for tag, counts in tag_affinity.items():
+                col = self.tag_index.get(tag)
+                if col is not None:
+                    affinity[row, col] = sum(EVENT_WEIGHTS.get(t, 0.0) * n for t, n in counts.items())
+        return affinity
+
+    # Ranking
+
+    def score_matrix(self, clusters, affinity):
+        """users x offers scores for cluster labels and tag-affinity rows"""
+        return self.base_scores[clusters] + affinity @ self.affinity_projection
+
+    def rank(self, clusters, user_ids, top_k=DEFAULT_TOP_K):
+        """Rank the catalog for many customers at once"""
+        clusters = np.asarray(clusters, dtype=np.intp)
+        affinity = self.affinity_matrix(user_ids)
+        scores = self.score_matrix(clusters, affinity)
+        history = affinity @ self.affinity_projection
+
+        top_k = max(1, min(int(top_k), len(self.offer_ids)))
+        # Stable sort on the negated scores keeps catalog order for ties
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+
+        results = []
+        for row, user_id in enumerate(user_ids):
+            cluster = int(clusters[row])
+            profile = self.cluster_profiles[cluster]
+            offers = []
+            for i in order[row]:
+                offer_id = self.offer_ids[i]
+                offer = self.catalog[offer_id]
+                offers.append({
+                    'id': offer_id,
+                    'title': offer['title'],
+                    'description': offer['description'],
+                    'tags': offer['tags'],
+                    'personalization_score': round(max(0.0, float(scores[row, i])) / SCORE_SCALE, 4),
+                    'reason': self._reason(profile, int(self.matching_tags[cluster, i]), history[row, i]),
+                })
+            results.append({
+                'user_id': None if user_id is None else str(user_id),
+                'cluster': cluster,
+                'cluster_profile': {'name': profile['name'], 'description': profile['description']},
+                'offers': offers,
+            })
+        return results
+
+    @staticmethod
+    def _reason(profile, matching_tags, history_score):
+        if history_score > 0:
+            return 'Similar to offers you have engaged with before'
+        if matching_tags > 0:
+            return f"Matches {matching_tags} of the key preferences of {profile['name']} customers"
+        return f"Recommended based on your customer segment: {profile['name']}"
+
+    def recommend_for_customers(self, clientnums, top_k=DEFAULT_TOP_K):
+        """Rank offers for book customers by CLIENTNUM; unknown ids are skipped"""
+        store = get_feature_store()
+        found, rows = store.rows_for(clientnums)
+        if not found:
+            return []
+        return self.rank(self.book_clusters(store)[rows], found, top_k)
+
+    def recommend_for_profile(self, features, user_id=None, top_k=DEFAULT_TOP_K):
+        """Rank offers for an ad-hoc profile (the Recommendation page form)"""
+        return self.rank([predict_cluster(features)], [user_id], top_k)[0]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_recommendation_engine():
+    """Return the process-wide recommendation engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RecommendationEngine()
+    return _engine
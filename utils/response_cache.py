@@ -0,0 +1,149 @@
+"""Response and template-fragment cache for the dashboard.
+
+Rendered pages, JSON payloads and template fragments are cached in a
+per-process LRU keyed by endpoint, URL arguments, query string, the user's
+role (and the user id for views that show personal data) and the dashboard
+data version (feature store version plus event count).  When ``DashboardAggregates``
+sees a new data version it notifies this cache, which drops everything, so
+entries never outlive the data they were built from; ``RESPONSE_CACHE_TTL``
+is only a backstop for content that changes without a version bump.
+
+Cached responses carry a strong ETag (a hash of the body) and
+``Cache-Control: private, no-cache``, so browsers revalidate every time and
+an unchanged page costs a 304 with no body.
+"""
+import collections
+import functools
+import hashlib
+import threading
+import time
+
+from flask import Response, make_response, request, session
+from markupsafe import Markup
+
+from config import Config
+from utils.aggregates import get_dashboard_aggregates
+
+
+def current_data_version():
+    """Version of the data every cached entry was built from"""
+    return get_dashboard_aggregates().snapshot()['data_version']
+
+
+def current_role():
+    return session.get('user_role', 'User')
+
+
+class ResponseCache:
+    """LRU of rendered bodies, cleared when the data version changes"""
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or Config.RESPONSE_CACHE_SIZE
+        self.ttl = Config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def invalidate(self, data_version=None):
+        """Drop every entry (called when the aggregates change)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'not_modified': self.not_modified}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide response cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+                get_dashboard_aggregates().add_listener(_cache.invalidate)
+    return _cache
+
+
+def _conditional(body, mimetype, etag):
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    # Answers If-None-Match with 304 and an empty body
+    return response.make_conditional(request)
+
+
+def cached_response(vary_user=False):
+    """Cache a GET view's 200 responses and serve them with ETags"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_response_cache()
+            key = (
+                'response',
+                request.endpoint,
+                tuple(sorted((request.view_args or {}).items())),
+                tuple(sorted(request.args.items(multi=True))),
+                current_role(),
+                session.get('user_id') if vary_user else None,
+                current_data_version(),
+            )
+            entry = cache.get(key)
+            if entry is None:
+                response = view(*args, **kwargs)
+                response = make_response(response)
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = (body, response.mimetype, hashlib.sha256(body).hexdigest()[:32])
+                cache.put(key, entry)
+
+            response = _conditional(*entry)
+            if response.status_code == 304:
+                cache.record_not_modified()
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_fragment(name, caller):
+    """Jinja call block cached per role and data version:
+
+        {% call cached_fragment('dashboard-cards') %} ... {% endcall %}
+    """
+    cache = get_response_cache()
+    key = ('fragment', name, current_role(), current_data_version())
+    html = cache.get(key)
+    if html is None:
+        html = str(caller())
+        cache.put(key, html)
+    return Markup(html)
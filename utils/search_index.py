@@ -0,0 +1,450 @@
+"""In-memory inverted index for dashboard search.
+
+Documents are customers from the feature store and complaints from the
+complaints analysis artifact.  Queries support:
+
+* exact term matches ranked with BM25 (field-weighted term frequencies),
+* prefix matches through a sorted vocabulary and ``bisect``,
+* single-typo matches through a symmetric-delete index (SymSpell style).
+
+Postings are kept as Python lists for O(1) incremental appends and cached as
+NumPy arrays between writes, so scoring a term is one vectorized BM25 update
+over its posting list and ranking is one ``argpartition``.
+
+``get_search_index`` keeps the index in step with the data: when the feature
+store or complaint store publishes a new version, only documents that are
+new, changed (per-document field digests) or gone are re-indexed.  Removed
+documents leave tombstones in the postings; once they pass
+``COMPACT_MIN_TOMBSTONES`` and ``COMPACT_RATIO`` of all documents the
+postings are compacted in place.
+"""
+import bisect
+import hashlib
+import re
+import threading
+
+import numpy as np
+
+from utils.data_processor import COMPLAINT_TYPE_LABELS
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multipliers for non-exact term matches
+PREFIX_WEIGHT = 0.7
+TYPO_WEIGHT = 0.5
+
+MAX_PREFIX_EXPANSIONS = 30
+
+# Compact the postings once this many (and this share of) documents are tombstones
+COMPACT_MIN_TOMBSTONES = 1000
+COMPACT_RATIO = 0.25
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+
+# Relative importance of each indexed field
+CUSTOMER_FIELDS = {
+    'CLIENTNUM': 3.0,
+    'Segment': 2.0,
+    'Customer_Status': 1.5,
+    'Complaint_Type': 1.5,
+    'Card_Category': 1.5,
+    'Recommended_Offers': 1.0,
+    'Customer_Feedback': 1.0,
+}
+COMPLAINT_FIELDS = {
+    'Complaint_ID': 3.0,
+    'Complaint_Category': 2.0,
+    'Card_Category': 1.0,
+    'Reviews': 1.0,
+}
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens of a string"""
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _deletes(term):
+    """All strings obtained by deleting one character from term"""
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a, b):
+    """Damerau-Levenshtein distance of at most one"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diffs = [i for i in range(la) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if la > lb:
+        a, b = b, a
+    # b is one character longer than a
+    return any(b[:i] + b[i + 1:] == a for i in range(len(b)))
+
+
+class _Postings:
+    __slots__ = ('docs', 'freqs', 'cache')
+
+    def __init__(self):
+        self.docs = []
+        self.freqs = []
+        self.cache = None
+
+    def add(self, doc, freq):
+        self.docs.append(doc)
+        self.freqs.append(freq)
+        self.cache = None
+
+    def arrays(self):
+        if self.cache is None:
+            self.cache = (np.asarray(self.docs, dtype=np.int64),
+                          np.asarray(self.freqs, dtype=np.float64))
+        return self.cache
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking"""
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._delete_index = {}
+        self._keys = []
+        self._documents = []
+        self._lengths = []
+        self._alive = []
+        self._key_to_doc = {}
+        self._total_length = 0.0
+        self._live_count = 0
+        self._lengths_cache = None
+        self._alive_cache = None
+        self._types_cache = None
+        self._digests = {}
+        self.versions = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return self._live_count
+
+    @property
+    def tombstones(self):
+        return len(self._keys) - self._live_count
+
+    # Indexing
+
+    def add_document(self, key, fields, weights, document):
+        """Index or re-index a document.
+
+        ``key`` is a unique (type, id) tuple, ``fields`` maps field names to
+        text, ``weights`` maps field names to term-frequency multipliers and
+        ``document`` is the payload returned in search results.
+        """
+        frequencies = {}
+        for name, text in fields.items():
+            weight = weights.get(name, 1.0)
+            for token in tokenize(text):
+                frequencies[token] = frequencies.get(token, 0.0) + weight
+
+        with self._lock:
+            if key in self._key_to_doc:
+                self._remove(key)
+
+            doc = len(self._keys)
+            self._keys.append(key)
+            self._documents.append(document)
+            length = sum(frequencies.values())
+            self._lengths.append(length)
+            self._alive.append(True)
+            self._key_to_doc[key] = doc
+            self._total_length += length
+            self._live_count += 1
+            self._lengths_cache = None
+            self._alive_cache = None
+
+            for term, freq in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                    bisect.insort(self._vocabulary, term)
+                    self._add_deletes(term)
+                postings.add(doc, freq)
+            self._maybe_compact()
+
+    def remove_document(self, key):
+        """Remove a document from results; returns False if it was not indexed"""
+        with self._lock:
+            removed = self._remove(key)
+            self._maybe_compact()
+            return removed
+
+    def _remove(self, key):
+        doc = self._key_to_doc.pop(key, None)
+        if doc is None:
+            return False
+        # Postings keep the tombstoned doc until compaction; the alive mask
+        # filters it out of scoring.
+        self._alive[doc] = False
+        self._documents[doc] = None
+        self._total_length -= self._lengths[doc]
+        self._live_count -= 1
+        self._alive_cache = None
+        self._digests.pop(key, None)
+        return True
+
+    def _add_deletes(self, term):
+        # Identifiers are matched by prefix only; typo matching them is noise
+        if len(term) >= MIN_TYPO_LENGTH and not term.isdigit():
+            for variant in _deletes(term) | {term}:
+                self._delete_index.setdefault(variant, set()).add(term)
+
+    def _maybe_compact(self):
+        tombstones = self.tombstones
+        if tombstones >= COMPACT_MIN_TOMBSTONES and tombstones >= COMPACT_RATIO * len(self._keys):
+            self.compact()
+
+    def compact(self):
+        """Drop tombstoned documents from every posting list; returns how many"""
+        with self._lock:
+            removed = self.tombstones
+            if removed == 0:
+                return 0
+            alive = np.asarray(self._alive, dtype=bool)
+            # New id of every live document
+            remap = np.cumsum(alive) - 1
+            for term in list(self._postings):
+                docs, freqs = self._postings[term].arrays()
+                keep = alive[docs]
+                if not keep.any():
+                    del self._postings[term]
+                    continue
+                postings = _Postings()
+                postings.docs = remap[docs[keep]].tolist()
+                postings.freqs = freqs[keep].tolist()
+                self._postings[term] = postings
+
+            self._keys = [key for key, live in zip(self._keys, self._alive) if live]
+            self._documents = [doc for doc, live in zip(self._documents, self._alive) if live]
+            self._lengths = [length for length, live in zip(self._lengths, self._alive) if live]
+            self._alive = [True] * len(self._keys)
+            self._key_to_doc = {key: doc for doc, key in enumerate(self._keys)}
+            self._vocabulary = sorted(self._postings)
+            self._delete_index = {}
+            for term in self._vocabulary:
+                self._add_deletes(term)
+            self._lengths_cache = None
+            self._alive_cache = None
+            return removed
+
+    def sync(self, source, documents, weights):
+        """Re-index only documents that are new or changed, and drop the missing ones.
+
+        ``documents`` yields (key, fields, document) for every document of one
+        source (all keys share ``key[0]``).  Returns (indexed, removed).
+        """
+        indexed = 0
+        seen = set()
+        for key, fields, document in documents:
+            seen.add(key)
+            digest = _digest(fields)
+            if self._digests.get(key) == digest:
+                continue
+            self.add_document(key, fields, weights, document)
+            self._digests[key] = digest
+            indexed += 1
+        with self._lock:
+            gone = [key for key in self._key_to_doc if key[0] == source and key not in seen]
+        for key in gone:
+            self.remove_document(key)
+        return indexed, len(gone)
+
+    def warm(self):
+        """Materialize every posting list's arrays so first queries are not slower"""
+        with self._lock:
+            for postings in self._postings.values():
+                postings.arrays()
+
+    # Querying
+
+    def _prefix_terms(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                terms.append(term)
+        return terms[:MAX_PREFIX_EXPANSIONS]
+
+    def _typo_terms(self, term):
+        if len(term) < MIN_TYPO_LENGTH or term.isdigit():
+            return []
+        candidates = set()
+        for variant in _deletes(term) | {term}:
+            candidates.update(self._delete_index.get(variant, ()))
+        candidates.discard(term)
+        return [c for c in candidates if _within_one_edit(term, c)]
+
+    def _expand(self, token):
+        """Index terms matching one query token, with their score multipliers"""
+        expansions = {}
+        if token in self._postings:
+            expansions[token] = 1.0
+        if len(token) >= MIN_PREFIX_LENGTH:
+            for term in self._prefix_terms(token):
+                expansions.setdefault(term, PREFIX_WEIGHT)
+        if token not in self._postings:
+            for term in self._typo_terms(token):
+                expansions.setdefault(term, TYPO_WEIGHT)
+        return expansions
+
+    def search(self, query, limit=20, doc_type=None):
+        """Return the top ``(relevance, document)`` pairs for a query, best first.
+
+        Every query token contributes the BM25 score of its best-matching
+        expansion (exact, prefix or one typo away).  Documents matching only
+        some of the tokens are scaled down by the fraction they match.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or limit <= 0:
+            return []
+
+        with self._lock:
+            if self._live_count == 0:
+                return []
+            if self._lengths_cache is None:
+                self._lengths_cache = np.asarray(self._lengths, dtype=np.float64)
+            if self._alive_cache is None:
+                self._alive_cache = np.asarray(self._alive, dtype=bool)
+                self._types_cache = np.asarray([key[0] for key in self._keys], dtype=object)
+            lengths = self._lengths_cache
+            live_count = self._live_count
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths * live_count / self._total_length)
+
+            scores = np.zeros(len(lengths), dtype=np.float64)
+            matched = np.zeros(len(lengths), dtype=np.int32)
+            for token in tokens:
+                token_scores = np.zeros(len(lengths), dtype=np.float64)
+                for term, multiplier in self._expand(token).items():
+                    docs, freqs = self._postings[term].arrays()
+                    df = len(docs)
+                    idf = np.log(1.0 + (live_count - df + 0.5) / (df + 0.5))
+                    contribution = multiplier * idf * freqs * (BM25_K1 + 1.0) / (freqs + norm[docs])
+                    # Doc ids are unique within a posting list, so fancy indexing is safe
+                    token_scores[docs] = np.maximum(token_scores[docs], contribution)
+                scores += token_scores
+                matched += token_scores > 0
+
+            scores *= matched / len(tokens)
+            scores[~self._alive_cache] = 0.0
+            if doc_type is not None:
+                scores[self._types_cache != doc_type] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) == 0:
+                return []
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+            return [(float(scores[doc]), self._documents[doc]) for doc in candidates]
+
+
+def _customer_documents(store):
+    """Yield (key, fields, document) for every customer in the feature store"""
+    text_columns = [name for name in CUSTOMER_FIELDS if name not in ('CLIENTNUM', 'Complaint_Type')]
+    decoded = {name: store.decode(name, store.column(name)) for name in text_columns}
+    clientnums = store.clientnums.tolist()
+    complaint_types = store.column('Complaint_Type').tolist()
+
+    for row, clientnum in enumerate(clientnums):
+        fields = {name: decoded[name][row] or '' for name in text_columns}
+        fields['CLIENTNUM'] = str(clientnum)
+        fields['Complaint_Type'] = COMPLAINT_TYPE_LABELS.get(complaint_types[row], '')
+        yield ('Customer', str(clientnum)), fields, {
+            'type': 'Customer',
+            'id': str(clientnum),
+            'name': f"Customer {clientnum} ({fields['Segment']})",
+            'snippet': fields['Customer_Feedback'],
+        }
+
+
+def _complaint_documents(complaints):
+    """Yield (key, fields, document) for every record in the complaint store"""
+    for record in complaints.records(list(COMPLAINT_FIELDS)):
+        fields = {name: str(value) for name, value in zip(COMPLAINT_FIELDS, record)}
+        category = fields['Complaint_Category'].replace('_', ' ')
+        # Also index the readable category so "billing errors" matches billing_errors
+        fields['Complaint_Category'] = f"{fields['Complaint_Category']} {category}"
+        yield ('Complaint', fields['Complaint_ID']), fields, {
+            'type': 'Complaint',
+            'id': fields['Complaint_ID'],
+            'name': f"{fields['Complaint_ID']} - {category.title()}",
+            'snippet': fields['Reviews'],
+        }
+
+
+def _digest(fields):
+    return hashlib.blake2b(repr(sorted(fields.items())).encode('utf-8'), digest_size=8).digest()
+
+
+def sync_search_index(index):
+    """Apply feature store and complaint store changes since the index last saw them"""
+    from models.complaints import get_complaint_store
+    from utils.data_processor import get_feature_store
+
+    changed = False
+    store = get_feature_store()
+    if index.versions.get('Customer') != store.version:
+        index.sync('Customer', _customer_documents(store), CUSTOMER_FIELDS)
+        index.versions['Customer'] = store.version
+        changed = True
+
+    try:
+        complaints = get_complaint_store()
+    except Exception as e:
+        print(f"Complaints not indexed: {e}")
+    else:
+        if index.versions.get('Complaint') != complaints.version:
+            index.sync('Complaint', _complaint_documents(complaints), COMPLAINT_FIELDS)
+            index.versions['Complaint'] = complaints.version
+            changed = True
+    if changed:
+        index.warm()
+    return index
+
+
+def build_search_index():
+    """Index every customer and complaint"""
+    return sync_search_index(SearchIndex())
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide search index, bringing it up to date with the stores"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_search_index()
+        return _index
+    # One syncer at a time; other requests search the current index meanwhile
+    if _index_lock.acquire(blocking=False):
+        try:
+            sync_search_index(_index)
+        except Exception as e:
+            print(f"Search index sync failed: {e}")
+        finally:
+            _index_lock.release()
+    return _index
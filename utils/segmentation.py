@@ -0,0 +1,392 @@
+"""Customer segmentation: scaling + PCA + k-means, with incremental updates.
+
+A full fit standardizes ``SEGMENT_FEATURES``, projects them onto the first
+``SEGMENT_PCA_COMPONENTS`` principal components and runs k-means there.  The
+k-means restarts (``SEGMENT_REFIT_INITS`` seeds) run in parallel on a
+process pool and the lowest-inertia run wins.  Clusters are named after the
+offline ``Segment`` labels they overlap most (one label per cluster).
+
+The scaler and PCA fold into one affine map, so assigning customers is
+``Z = X @ W + b`` followed by one vectorized distance computation against
+the persisted centroids.  When the feature store changes, only customers
+that are new or whose features changed (per-row digests kept in the
+artifact) are assigned and fed to a mini-batch centroid update with a
+per-centroid learning rate of ``1 / count``; the full fit is left to the
+nightly ``python -m utils.segmentation --refit``.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from config import Config
+from utils.data_processor import get_feature_store, resolve_path
+from utils.predictor import records_matrix
+
+# Behavioural columns clustered on (encoded demographics are left out)
+SEGMENT_FEATURES = [
+    'Customer_Age',
+    'Dependent_count',
+    'Months_on_book',
+    'Total_Relationship_Count',
+    'Months_Inactive_12_mon',
+    'Contacts_Count_12_mon',
+    'Credit_Limit',
+    'Total_Revolving_Bal',
+    'Avg_Open_To_Buy',
+    'Total_Amt_Chng_Q4_Q1',
+    'Total_Trans_Amt',
+    'Total_Trans_Ct',
+    'Total_Ct_Chng_Q4_Q1',
+    'Avg_Utilization_Ratio',
+    'Customer_Rating',
+    'Average_Complaints',
+    'Engagement_Score',
+    'Trans_Freq_3M',
+    'Days_Since_Last_Transaction',
+]
+
+# Odd multipliers for the per-row change digest
+_DIGEST_MULTIPLIERS = (np.arange(len(SEGMENT_FEATURES), dtype=np.uint64) * np.uint64(2) + np.uint64(1)) \
+    * np.uint64(0x9E3779B97F4A7C15)
+
+
+def row_digests(X):
+    """uint64 digest per row, for spotting changed customers"""
+    bits = np.ascontiguousarray(X, dtype=np.float64).view(np.uint64)
+    with np.errstate(over='ignore'):
+        return (bits * _DIGEST_MULTIPLIERS[:X.shape[1]]).sum(axis=1, dtype=np.uint64)
+
+
+def _fit_kmeans(Z, k, seed, max_iter):
+    """One k-means run; executed in pool workers, so it only takes plain arrays"""
+    from sklearn.cluster import KMeans
+    model = KMeans(n_clusters=k, n_init=1, max_iter=max_iter, random_state=seed).fit(Z)
+    return model.cluster_centers_, float(model.inertia_)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_refit_pool():
+    """Process pool for k-means restarts, created on first use in each process"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = ProcessPoolExecutor(max_workers=Config.SEGMENT_REFIT_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def _name_clusters(assignments, reference_codes, reference_names, k):
+    """Give each cluster the reference label it overlaps most, one label per cluster"""
+    from scipy.optimize import linear_sum_assignment
+    overlap = np.zeros((k, len(reference_names)), dtype=np.int64)
+    valid = reference_codes >= 0
+    np.add.at(overlap, (assignments[valid], reference_codes[valid]), 1)
+    clusters, labels = linear_sum_assignment(-overlap)
+    names = [f"Segment {i + 1}" for i in range(k)]
+    for cluster, label in zip(clusters, labels):
+        names[cluster] = reference_names[label]
+    return names
+
+
+class SegmentationModel:
+    """Folded scaler + PCA projection and k-means centroids"""
+
+    def __init__(self, artifact):
+        self.features = list(artifact['features'])
+        self.feature_means = np.asarray(artifact['feature_means'], dtype=np.float64)
+        self.weights = np.asarray(artifact['weights'], dtype=np.float64)
+        self.bias = np.asarray(artifact['bias'], dtype=np.float64)
+        self.centroids = np.array(artifact['centroids'], dtype=np.float64)
+        self.counts = np.array(artifact['counts'], dtype=np.float64)
+        self.names = list(artifact['names'])
+        self.explained_variance = list(artifact['explained_variance'])
+        self.clientnums = np.asarray(artifact['clientnums'])
+        self.digests = np.asarray(artifact['digests'], dtype=np.uint64)
+        self.fitted_at = artifact['fitted_at']
+        self.store_version = artifact['store_version']
+        self.updated_rows = int(artifact.get('updated_rows', 0))
+        self._lock = threading.Lock()
+
+    # Fitting
+
+    @classmethod
+    def fit(cls, store, k=None, components=None, inits=None, parallel=True):
+        """Full fit on every customer in the store"""
+        from sklearn.decomposition import PCA
+
+        k = k or Config.SEGMENT_COUNT
+        components = components or Config.SEGMENT_PCA_COMPONENTS
+        inits = inits or Config.SEGMENT_REFIT_INITS
+        X = store.matrix(SEGMENT_FEATURES)
+
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        pca = PCA(n_components=components, random_state=0).fit((X - mean) / scale)
+
+        # z = ((x - mean) / scale - pca.mean_) @ components.T, folded into one affine map
+        weights = pca.components_.T / scale[:, None]
+        bias = -((mean / scale) + pca.mean_) @ pca.components_.T
+        Z = X @ weights + bias
+
+        seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(0).spawn(inits)]
+        max_iter = Config.SEGMENT_MAX_ITER
+        if parallel and inits > 1 and Config.SEGMENT_REFIT_WORKERS > 1:
+            pool = get_refit_pool()
+            runs = [future.result() for future in
+                    [pool.submit(_fit_kmeans, Z, k, seed, max_iter) for seed in seeds]]
+        else:
+            runs = [_fit_kmeans(Z, k, seed, max_iter) for seed in seeds]
+        centroids = min(runs, key=lambda run: run[1])[0]
+
+        model = cls({
+            'features': SEGMENT_FEATURES,
+            'feature_means': mean,
+            'weights': weights,
+            'bias': bias,
+            'centroids': centroids,
+            'counts': np.zeros(k),
+            'names': [''] * k,
+            'explained_variance': [round(float(v), 4) for v in pca.explained_variance_ratio_],
+            'clientnums': store.clientnums,
+            'digests': row_digests(X),
+            'fitted_at': datetime.now().isoformat(),
+            'store_version': store.version,
+        })
+        assignments = model.assign(X)
+        model.counts = np.bincount(assignments, minlength=k).astype(np.float64)
+        model.names = _name_clusters(assignments, np.asarray(store.column('Segment')),
+                                     store.categories('Segment'), k)
+        return model
+
+    # Assignment
+
+    def project(self, X):
+        """PCA coordinates of raw feature rows"""
+        return np.asarray(X, dtype=np.float64) @ self.weights + self.bias
+
+    def assign(self, X, return_distances=False):
+        """Nearest centroid for each raw feature row"""
+        Z = self.project(X)
+        centroids = self.centroids
+        # ||z - c||^2 = ||z||^2 - 2 z.c + ||c||^2; ||z||^2 does not change the argmin
+        scores = (centroids * centroids).sum(axis=1) - 2.0 * (Z @ centroids.T)
+        assignments = scores.argmin(axis=1)
+        if not return_distances:
+            return assignments
+        distances = np.sqrt(np.maximum(scores[np.arange(len(Z)), assignments] + (Z * Z).sum(axis=1), 0.0))
+        return assignments, distances
+
+    def assign_records(self, records):
+        """Assign feature dicts; missing features count as the book average"""
+        X = records_matrix(records, self.features, self.feature_means)
+        assignments, distances = self.assign(X, return_distances=True)
+        Z = self.project(X)
+        return [
+            {
+                'customer_id': record.get('CLIENTNUM') or record.get('customer_id'),
+                'cluster': int(cluster),
+                'segment': self.names[cluster],
+                'distance': round(float(distance), 4),
+                'pca1': round(float(z[0]), 4),
+                'pca2': round(float(z[1]), 4),
+            }
+            for record, cluster, distance, z in zip(records, assignments, distances, Z)
+        ]
+
+    # Incremental updates
+
+    def partial_fit(self, X):
+        """Mini-batch k-means step on new rows; returns their assignments"""
+        with self._lock:
+            assignments = self.assign(X)
+            Z = self.project(X)
+            batch = Config.SEGMENT_BATCH_SIZE
+            for start in range(0, len(Z), batch):
+                z, a = Z[start:start + batch], assignments[start:start + batch]
+                sums = np.zeros_like(self.centroids)
+                np.add.at(sums, a, z)
+                counts = np.bincount(a, minlength=len(self.centroids)).astype(np.float64)
+                self.counts += counts
+                moved = counts > 0
+                # Each centroid moves towards its new members with rate 1 / count
+                self.centroids[moved] += (sums[moved] - counts[moved, None] * self.centroids[moved]) \
+                    / self.counts[moved, None]
+            self.updated_rows += len(Z)
+            return assignments
+
+    def sync(self, store):
+        """Fold new and changed customers of a new store version into the centroids"""
+        if store.version == self.store_version:
+            return 0
+        X = store.matrix(SEGMENT_FEATURES)
+        digests = row_digests(X)
+        known = dict(zip(self.clientnums.tolist(), self.digests.tolist()))
+        changed = np.fromiter((known.get(c) != d for c, d in zip(store.clientnums.tolist(), digests.tolist())),
+                              dtype=bool, count=len(digests))
+        if changed.any():
+            self.partial_fit(X[changed])
+        self.clientnums = store.clientnums
+        self.digests = digests
+        self.store_version = store.version
+        return int(changed.sum())
+
+    # Persistence
+
+    def artifact(self):
+        return {
+            'features': self.features,
+            'feature_means': self.feature_means,
+            'weights': self.weights,
+            'bias': self.bias,
+            'centroids': self.centroids,
+            'counts': self.counts,
+            'names': self.names,
+            'explained_variance': self.explained_variance,
+            'clientnums': self.clientnums,
+            'digests': self.digests,
+            'fitted_at': self.fitted_at,
+            'store_version': self.store_version,
+            'updated_rows': self.updated_rows,
+        }
+
+    def save(self, path=None):
+        path = resolve_path(path or Config.SEGMENT_MODEL_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(self.artifact(), tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=None):
+        return cls(joblib.load(resolve_path(path or Config.SEGMENT_MODEL_PATH)))
+
+    # Reporting
+
+    def summary(self, store):
+        """Per-segment sizes, churn and profile, from one assignment pass"""
+        X = store.matrix(SEGMENT_FEATURES)
+        assignments = self.assign(X)
+        Z = self.project(X)
+        k = len(self.centroids)
+        counts = np.bincount(assignments, minlength=k)
+        churned = np.bincount(assignments, weights=np.asarray(store.column('Churn'), dtype=np.float64),
+                              minlength=k)
+        overall = X.mean(axis=0)
+        spread = X.std(axis=0)
+        spread[spread == 0] = 1.0
+
+        segments = []
+        for cluster in range(k):
+            members = assignments == cluster
+            size = int(counts[cluster])
+            profile = X[members].mean(axis=0) if size else overall
+            # Features furthest above / below the book average describe the segment
+            z = (profile - overall) / spread
+            order = np.argsort(-np.abs(z))[:3]
+            segments.append({
+                'id': cluster,
+                'name': self.names[cluster],
+                'customer_count': size,
+                'share': round(size / max(len(X), 1) * 100.0, 2),
+                'retention_rate': round(float(1.0 - churned[cluster] / size) * 100.0, 2) if size else 0.0,
+                'avg_revenue': round(float(profile[self.features.index('Total_Trans_Amt')]), 2),
+                'characteristics': [
+                    f"{'High' if z[i] > 0 else 'Low'} {self.features[i].replace('_', ' ')}" for i in order
+                ],
+                'centroid_pca': [round(float(v), 4) for v in self.centroids[cluster][:2]],
+                'pca_mean': [round(float(v), 4) for v in Z[members, :2].mean(axis=0)] if size else [0.0, 0.0],
+            })
+        segments.sort(key=lambda s: s['customer_count'], reverse=True)
+        return {
+            'segments': segments,
+            'total_customers': int(len(X)),
+            'explained_variance': self.explained_variance,
+            'fitted_at': self.fitted_at,
+            'updated_rows': self.updated_rows,
+            'data_version': store.version,
+        }
+
+
+def refit(parallel=True):
+    """Full refit on the current book, saved for every worker to pick up"""
+    started = time.perf_counter()
+    model = SegmentationModel.fit(get_feature_store(), parallel=parallel)
+    model.save()
+    reset_segmentation()
+    print(f"Segmentation refit in {time.perf_counter() - started:.2f}s: "
+          f"{', '.join(f'{n} ({int(c)})' for n, c in zip(model.names, model.counts))}")
+    return model
+
+
+_model = None
+_model_mtime = None
+_summary = None
+_model_lock = threading.Lock()
+
+
+def get_segmentation():
+    """Return the segmentation model, synced with the current feature store"""
+    global _model, _model_mtime, _summary
+    store = get_feature_store()
+    path = resolve_path(Config.SEGMENT_MODEL_PATH)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if _model is None or mtime != _model_mtime or _model.store_version != store.version:
+        with _model_lock:
+            mtime = os.path.getmtime(path) if os.path.exists(path) else None
+            if _model is None or mtime != _model_mtime:
+                if mtime is None:
+                    print(f"No segmentation model at {path}, fitting one")
+                    SegmentationModel.fit(store).save(path)
+                    mtime = os.path.getmtime(path)
+                _model = SegmentationModel.load(path)
+                _model_mtime = mtime
+                _summary = None
+            if _model.store_version != store.version:
+                updated = _model.sync(store)
+                _model.save(path)
+                _model_mtime = os.path.getmtime(path)
+                _summary = None
+                print(f"Segmentation synced to {store.version} ({updated} new or changed customers)")
+    return _model
+
+
+def get_segment_summary():
+    """Segment summary, computed once per model and store version"""
+    global _summary
+    model = get_segmentation()
+    summary = _summary
+    if summary is None or summary['data_version'] != model.store_version:
+        summary = model.summary(get_feature_store())
+        _summary = summary
+    return summary
+
+
+def reset_segmentation():
+    """Drop the in-process model so the next call reloads it from disk"""
+    global _model, _model_mtime, _summary
+    with _model_lock:
+        _model = None
+        _model_mtime = None
+        _summary = None
+
+
+if __name__ == '__main__':
+    # Nightly full refit: python -m utils.segmentation --refit
+    if '--refit' in sys.argv[1:]:
+        refit()
+    else:
+        print(get_segment_summary())
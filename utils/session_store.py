@@ -0,0 +1,323 @@
+"""Server-side sessions stored in the ``user_sessions`` table.
+
+The session cookie carries only ``<token>.<revision>``; the session data
+lives in ``user_sessions`` (the SHA-256 of the token is stored, never the
+token itself), so a session can be revoked on the server.
+
+Lookups are served from a per-process LRU cache of at most
+``SESSION_CACHE_SIZE`` entries, so validating a request is a dict lookup:
+
+* The revision in the cookie goes up each time the session data is saved.
+  A worker whose cached copy has an older revision reloads it, so data
+  written by another worker is never served stale.
+* Cached entries are re-checked against the table after
+  ``SESSION_CACHE_TTL`` seconds, which bounds how long a session revoked in
+  another worker stays usable there.  Revocation in the same worker is
+  immediate.
+
+Expired and revoked rows are deleted in batches of ``SESSION_SWEEP_BATCH``
+on a background thread, at most once every ``SESSION_SWEEP_INTERVAL``
+seconds.
+"""
+import collections
+import hashlib
+import json
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from config import Config
+from database.connection import get_connection
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _timestamp(moment):
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session dict that remembers its token and revision"""
+
+    def __init__(self, initial=None, token=None, revision=0, expires=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.token = token
+        self.revision = revision
+        self.expires = expires
+        self.new = token is None
+        self.modified = False
+
+
+class SessionStore:
+    """user_sessions rows behind an LRU + TTL cache"""
+
+    def __init__(self, db_path=None, cache_size=None, cache_ttl=None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.cache_size = cache_size or Config.SESSION_CACHE_SIZE
+        self.cache_ttl = Config.SESSION_CACHE_TTL if cache_ttl is None else cache_ttl
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._sweeping = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Cache
+
+    def _cache_get(self, key, revision):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            checked_at, entry_revision, data, expires = entry
+            now = time.time()
+            if entry_revision < revision or now - checked_at > self.cache_ttl or expires <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry
+
+    def _cache_put(self, key, revision, data, expires):
+        with self._lock:
+            self._cache[key] = (time.time(), revision, data, expires)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_drop(self, key):
+        with self._lock:
+            self._cache.pop(key, None)
+
+    # Rows
+
+    def load(self, token, revision=0):
+        """Return (data, revision, expires epoch) for a live session, or None"""
+        key = _token_hash(token)
+        entry = self._cache_get(key, revision)
+        if entry is not None:
+            self.hits += 1
+            return entry[2], entry[1], entry[3]
+
+        self.misses += 1
+        conn = get_connection(self.db_path)
+        try:
+            row = conn.execute("""
+                SELECT data, revision, expires_at FROM user_sessions
+                WHERE session_token = ? AND is_active = 1
+            """, (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        expires = datetime.strptime(row['expires_at'], '%Y-%m-%d %H:%M:%S').timestamp()
+        if expires <= time.time():
+            return None
+        data = json.loads(row['data'] or '{}')
+        self._cache_put(key, row['revision'], data, expires)
+        return data, row['revision'], expires
+
+    def create(self, data, lifetime):
+        """Insert a new session; returns (token, revision, expires epoch)"""
+        token = secrets.token_urlsafe(32)
+        key = _token_hash(token)
+        expires_at = datetime.now() + lifetime
+        user_id = data.get('user_id')
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO user_sessions (user_id, session_token, expires_at, data, revision)
+                    VALUES (?, ?, ?, ?, 1)
+                """, (user_id if isinstance(user_id, int) else None, key, _timestamp(expires_at),
+                      json.dumps(data)))
+        finally:
+            conn.close()
+        expires = expires_at.timestamp()
+        self._cache_put(key, 1, dict(data), expires)
+        return token, 1, expires
+
+    def save(self, token, data, lifetime=None):
+        """Write changed data (and optionally a new expiry); returns (revision, expires)"""
+        key = _token_hash(token)
+        user_id = data.get('user_id')
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                if lifetime is not None:
+                    conn.execute("""
+                        UPDATE user_sessions SET data = ?, user_id = ?, revision = revision + 1,
+                               expires_at = ?
+                        WHERE session_token = ? AND is_active = 1
+                    """, (json.dumps(data), user_id if isinstance(user_id, int) else None,
+                          _timestamp(datetime.now() + lifetime), key))
+                else:
+                    conn.execute("""
+                        UPDATE user_sessions SET data = ?, user_id = ?, revision = revision + 1
+                        WHERE session_token = ? AND is_active = 1
+                    """, (json.dumps(data), user_id if isinstance(user_id, int) else None, key))
+                row = conn.execute("""
+                    SELECT revision, expires_at FROM user_sessions WHERE session_token = ?
+                """, (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            self._cache_drop(key)
+            return None
+        expires = datetime.strptime(row['expires_at'], '%Y-%m-%d %H:%M:%S').timestamp()
+        self._cache_put(key, row['revision'], dict(data), expires)
+        return row['revision'], expires
+
+    def revoke(self, token):
+        """Deactivate one session"""
+        key = _token_hash(token)
+        self._cache_drop(key)
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute("UPDATE user_sessions SET is_active = 0 WHERE session_token = ?", (key,))
+        finally:
+            conn.close()
+
+    def revoke_user(self, user_id):
+        """Deactivate every session of a user (e.g. after a password change)"""
+        conn = get_connection(self.db_path)
+        try:
+            with conn:
+                conn.execute("UPDATE user_sessions SET is_active = 0 WHERE user_id = ?", (user_id,))
+        finally:
+            conn.close()
+        with self._lock:
+            stale = [key for key, entry in self._cache.items() if entry[2].get('user_id') == user_id]
+            for key in stale:
+                del self._cache[key]
+
+    # Expiry
+
+    def sweep(self, batch_size=None):
+        """Delete expired and revoked sessions in small batches; returns the count"""
+        batch_size = batch_size or Config.SESSION_SWEEP_BATCH
+        now = _timestamp(datetime.now())
+        removed = 0
+        while True:
+            conn = get_connection(self.db_path)
+            try:
+                with conn:
+                    cursor = conn.execute("""
+                        DELETE FROM user_sessions WHERE id IN (
+                            SELECT id FROM user_sessions
+                            WHERE expires_at <= ? OR is_active = 0
+                            LIMIT ?
+                        )
+                    """, (now, batch_size))
+            finally:
+                conn.close()
+            removed += cursor.rowcount
+            # Short transactions let logins interleave with a large sweep
+            if cursor.rowcount < batch_size:
+                return removed
+
+    def maybe_sweep(self):
+        """Start a background sweep if the last one was long enough ago"""
+        if time.time() - self._last_sweep < Config.SESSION_SWEEP_INTERVAL:
+            return
+        if not self._sweeping.acquire(blocking=False):
+            return
+        self._last_sweep = time.time()
+
+        def run():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error sweeping sessions: {e}")
+            finally:
+                self._sweeping.release()
+
+        threading.Thread(target=run, name='session-sweep', daemon=True).start()
+
+
+class SqliteSessionInterface(SessionInterface):
+    """Flask session interface backed by SessionStore"""
+
+    session_class = ServerSession
+
+    def __init__(self, store=None):
+        self.store = store or SessionStore()
+
+    @staticmethod
+    def _parse_cookie(value):
+        token, _, revision = (value or '').partition('.')
+        try:
+            return token, int(revision or 0)
+        except ValueError:
+            return token, 0
+
+    def open_session(self, app, request):
+        value = request.cookies.get(self.get_cookie_name(app))
+        if not value:
+            return self.session_class()
+        token, revision = self._parse_cookie(value)
+        loaded = self.store.load(token, revision)
+        if loaded is None:
+            return self.session_class()
+        data, revision, expires = loaded
+        return self.session_class(data, token=token, revision=revision, expires=expires)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        self.store.maybe_sweep()
+
+        if not session:
+            # Cleared (logout): revoke on the server and drop the cookie
+            if session.modified and session.token:
+                self.store.revoke(session.token)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime
+        if session.new:
+            session.token, session.revision, session.expires = self.store.create(dict(session), lifetime)
+        else:
+            # Slide the expiry forward once less than half the lifetime is left
+            renew = session.expires - time.time() < lifetime.total_seconds() / 2
+            if not session.modified and not renew:
+                return
+            saved = self.store.save(session.token, dict(session), lifetime if renew else None)
+            if saved is None:
+                return
+            session.revision, session.expires = saved
+
+        response.set_cookie(
+            name,
+            f"{session.token}.{session.revision}",
+            expires=datetime.fromtimestamp(session.expires),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Return the process-wide session store"""
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore()
+    return _session_store
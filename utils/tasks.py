@@ -0,0 +1,65 @@
+"""Job tasks run by the background workers (see ``utils.jobs``).
+
+Public tasks can be queued by users through ``/api/jobs``; the others are
+queued by the export and upload subsystems, which keep their own status.
+"""
+from utils.jobs import task
+
+# Most at-risk customers listed by a rescore job
+MAX_RESCORE_TOP = 1000
+
+
+@task('rescore', public=True)
+def rescore(top=100):
+    """Score the whole book and summarize it by risk band"""
+    from utils.predictor import RISK_THRESHOLDS, get_predictor
+
+    top = int(top)
+    if not 1 <= top <= MAX_RESCORE_TOP:
+        raise ValueError(f"top must be between 1 and {MAX_RESCORE_TOP}")
+    scores = get_predictor().score_population()
+    probabilities = scores['probabilities']
+    order = probabilities.argsort()[::-1][:top]
+    return {
+        'customers': int(len(probabilities)),
+        'risk_levels': {label: int((scores['risk_levels'] == label).sum()) for _, label in RISK_THRESHOLDS},
+        'mean_churn_probability': round(float(probabilities.mean()), 4) if len(probabilities) else None,
+        'top_at_risk': [{'customer_id': str(scores['clientnums'][i]),
+                         'churn_probability': round(float(probabilities[i]), 4)} for i in order],
+        'elapsed_ms': round(scores['elapsed_ms'], 1),
+    }
+
+
+@task('refit_segments', priority=-5, public=True)
+def refit_segments():
+    """Full segmentation refit; every worker picks the new model up"""
+    from utils.segmentation import refit
+
+    model = refit()
+    return {'segments': {name: int(count) for name, count in zip(model.names, model.counts)}}
+
+
+@task('fee_sweep', public=True)
+def fee_sweep(**params):
+    """Maintenance fee Monte Carlo sweep over a custom grid"""
+    from utils.fee_simulator import get_fee_simulator
+
+    allowed = ('fees', 'thresholds', 'months', 'simulations', 'seed', 'top')
+    return get_fee_simulator().sweep(**{key: value for key, value in params.items() if key in allowed})
+
+
+@task('export', priority=5)
+def run_export(job):
+    """Write a background export file"""
+    from utils.export_utils import get_export_manager
+
+    return get_export_manager().run(job)
+
+
+# Event imports append to the log, so a retry could add them twice
+@task('import_upload', priority=5, max_attempts=1)
+def import_upload(upload_id):
+    """Validate and import a finished upload"""
+    from utils.uploads import get_upload_manager
+
+    return get_upload_manager().process(upload_id)
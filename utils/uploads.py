@@ -0,0 +1,405 @@
+"""Resumable chunked uploads of customer and event CSVs.
+
+The browser creates an upload with the file's kind and size, then sends the
+file in ``UPLOAD_CHUNK_SIZE`` pieces (each under ``MAX_CONTENT_LENGTH``) with
+``PUT /api/uploads/<id>?offset=N``.  Each piece is streamed straight to
+``UPLOAD_DATA_DIR/<id>.csv``; the size of that file is the upload's offset,
+so after a dropped connection the client asks for the offset and carries on
+from there.  The header row is checked as soon as it arrives so a wrong file
+fails before the rest of it is sent.
+
+Once the last byte is in, an ``import_upload`` job is queued (see
+``utils.jobs``) and a job worker reads the file in chunks of
+``UPLOAD_VALIDATE_ROWS`` rows and validates each chunk column by column:
+
+* customer files must have every column of the customer dataset
+  (``newone.csv``); rows with a missing or non-numeric CLIENTNUM or a
+  non-numeric value in a numeric column are rejected, and the rest are
+  upserted into the feature store by ``upsert_feature_store``,
+* event files must have the event log columns; valid events are appended
+  to the shared ingest log.
+
+Status, progress and a sample of the rejected rows are kept in a JSON file
+next to the upload, so any worker can answer polling requests.
+"""
+import csv
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from config import Config
+from utils.data_processor import COMPLAINT_TYPE_LABELS, ID_COLUMN, get_feature_store, reload_feature_store, \
+    resolve_path, upsert_feature_store
+from utils.event_store import EVENT_TYPES, append_events, get_event_log
+from utils.jobs import enqueue
+
+KINDS = ('customers', 'events')
+
+# Bytes read from the request per write
+COPY_BUFFER = 64 * 1024
+# Rejected rows kept as examples in the status
+MAX_ERROR_SAMPLES = 20
+# Seconds between status saves while processing
+PROGRESS_INTERVAL = 1.0
+
+# 0/1 customer flags
+FLAG_COLUMNS = (
+    'Churn', 'Inactive_90Days_Flag', 'Inactivity_Flag', 'High_Value_Customer', 'AI_Engagement_Trigger',
+    'Attrition_Flag_Encoded', 'Gender_Encoded', 'Surprise_Opaque_Fees', 'Security', 'Scheme_Personalization',
+    'Minimum_Required_Balance',
+)
+# Allowed values of coded integer columns; the dashboards count them with np.bincount
+CODED_VALUES = {'Complaint_Type': tuple(COMPLAINT_TYPE_LABELS), **{name: (0, 1) for name in FLAG_COLUMNS}}
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class UploadError(ValueError):
+    """Raised for an invalid upload or chunk"""
+
+
+class UploadConflict(Exception):
+    """Raised when a chunk does not start at the current upload offset"""
+
+    def __init__(self, offset):
+        super().__init__(f"Upload is at offset {offset}")
+        self.offset = offset
+
+
+# Schemas and validation
+
+def customer_schema(store=None):
+    """{column: 'category' | 'integer' | 'float'} for the customer dataset"""
+    store = store or get_feature_store()
+    schema = {}
+    for name in store.column_names:
+        if store.is_category(name):
+            schema[name] = 'category'
+        else:
+            schema[name] = 'float' if store.column(name).dtype.kind == 'f' else 'integer'
+    return schema
+
+
+def event_schema():
+    return {'timestamp': 'timestamp', 'UserID': 'integer', 'offer_id': 'category',
+            'event_type': 'event_type', 'tags': 'optional'}
+
+
+def check_header(header, schema):
+    """Raise UploadError if columns are missing; returns the ignored extra columns"""
+    missing = [name for name in schema if name not in header]
+    if missing:
+        shown = ', '.join(missing[:10]) + (' ...' if len(missing) > 10 else '')
+        raise UploadError(f"Missing {len(missing)} required column(s): {shown}")
+    return [name for name in header if name not in schema]
+
+
+def _utc_offset():
+    """Seconds the server's local time is ahead of UTC"""
+    return datetime.now().astimezone().utcoffset().total_seconds()
+
+
+def validate_chunk(df, schema, first_row):
+    """Coerce a chunk of string columns to the schema.
+
+    Returns (valid rows, rejected count, error samples); every check is a
+    whole-column operation.
+    """
+    import pandas as pd
+
+    rejected = np.zeros(len(df), dtype=bool)
+    samples = []
+    out = {}
+    for name, kind in schema.items():
+        raw = df[name]
+        # Blank cells are missing values, which only 'optional' columns allow
+        present = (raw.notna() & raw.astype(str).str.strip().ne('')).to_numpy()
+        if kind in ('integer', 'float'):
+            values = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64)
+            bad = np.isnan(values)
+            if kind == 'integer' or name == ID_COLUMN:
+                bad |= np.nan_to_num(values) != np.floor(np.nan_to_num(values))
+            if name in CODED_VALUES:
+                bad |= ~np.isin(values, CODED_VALUES[name])
+            out[name] = values
+        elif kind == 'timestamp':
+            parsed = pd.to_datetime(raw, errors='coerce', format='ISO8601', utc=True)
+            # Timestamps without an offset are local time, as in parse_event
+            naive = ~raw.str.strip().str.contains(r'(?:Z|[+-]\d\d:?\d\d)$', na=False).to_numpy()
+            epochs = parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[s]').astype(np.int64) - \
+                naive * _utc_offset()
+            bad = parsed.isna().to_numpy() | (epochs > time.time() + Config.EVENT_MAX_CLOCK_SKEW)
+            out[name] = raw
+        elif kind == 'event_type':
+            values = raw.str.strip().str.lower()
+            bad = ~values.isin(EVENT_TYPES).to_numpy()
+            out[name] = values
+        elif kind == 'optional':
+            bad = np.zeros(len(df), dtype=bool)
+            out[name] = raw.fillna('')
+        else:
+            bad = ~present
+            out[name] = raw
+
+        new_bad = bad & ~rejected
+        for row in np.flatnonzero(new_bad)[:max(0, MAX_ERROR_SAMPLES - len(samples))]:
+            value = raw.iloc[row]
+            samples.append({
+                'row': int(first_row + row),
+                'column': name,
+                'value': None if pd.isna(value) else str(value)[:100],
+            })
+        rejected |= bad
+
+    valid = pd.DataFrame(out)[~rejected]
+    return valid, int(rejected.sum()), samples
+
+
+# Uploads
+
+class UploadManager:
+    """Receives upload chunks and processes finished uploads in the background"""
+
+    def __init__(self, directory=None, ttl_hours=None):
+        self.directory = resolve_path(directory or Config.UPLOAD_DATA_DIR)
+        self.ttl = (Config.UPLOAD_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self._meta_lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def create(self, kind, filename, size, owner=None):
+        """Start an upload and return its status record"""
+        if kind not in KINDS:
+            raise UploadError(f"kind must be one of: {', '.join(KINDS)}")
+        size = int(size)
+        if not 0 < size <= Config.UPLOAD_MAX_SIZE:
+            raise UploadError(f"size must be between 1 and {Config.UPLOAD_MAX_SIZE} bytes")
+        self.sweep()
+
+        upload = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'filename': os.path.basename(str(filename or 'upload.csv'))[:200],
+            'size': size,
+            'offset': 0,
+            'owner': owner,
+            'status': 'uploading',
+            'progress': 0.0,
+            'rows_read': 0,
+            'rows_valid': 0,
+            'rows_rejected': 0,
+            'errors': [],
+            'warnings': [],
+            'result': None,
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None,
+        }
+        open(self.data_path(upload['id']), 'wb').close()
+        self._save(upload)
+        return upload
+
+    def get(self, upload_id):
+        """Status record by id, or None"""
+        if not _UPLOAD_ID.match(upload_id or ''):
+            return None
+        try:
+            with open(self._meta_path(upload_id), encoding='utf-8') as f:
+                upload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if upload['status'] == 'uploading':
+            try:
+                upload['offset'] = os.path.getsize(self.data_path(upload_id))
+            except OSError:
+                pass
+        return upload
+
+    def write_chunk(self, upload_id, offset, stream):
+        """Append a chunk read from stream at offset; returns the updated status"""
+        path = self.data_path(upload_id)
+        with open(path, 'r+b') as f:
+            # Serializes chunks for one upload across threads and workers
+            fcntl.flock(f, fcntl.LOCK_EX)
+            upload = self.get(upload_id)
+            if upload['status'] != 'uploading':
+                raise UploadError(f"Upload is {upload['status']}")
+            current = f.seek(0, os.SEEK_END)
+            if offset != current:
+                raise UploadConflict(current)
+
+            remaining = upload['size'] - current
+            written = 0
+            while True:
+                block = stream.read(COPY_BUFFER)
+                if not block:
+                    break
+                written += len(block)
+                if written > remaining:
+                    f.truncate(current)
+                    raise UploadError('Chunk runs past the declared upload size')
+                f.write(block)
+            f.flush()
+
+            upload['offset'] = current + written
+            if current == 0 and written:
+                self._check_header(upload, f)
+            if upload['offset'] == upload['size']:
+                upload['status'] = 'queued'
+                self._save(upload)
+                enqueue('import_upload', {'upload_id': upload['id']},
+                        idempotency_key=f"upload:{upload['id']}", owner=upload.get('owner'))
+            else:
+                self._save(upload)
+            return upload
+
+    def _check_header(self, upload, f):
+        f.seek(0)
+        line = f.readline()
+        if not line.endswith(b'\n') and upload['offset'] < upload['size']:
+            return
+        header = next(csv.reader([line.decode('utf-8-sig', errors='replace')]), [])
+        try:
+            extra = check_header([name.strip() for name in header], self._schema(upload['kind']))
+        except UploadError as e:
+            self._fail(upload, str(e))
+            raise
+        if extra:
+            upload['warnings'].append(f"Ignoring {len(extra)} unknown column(s): {', '.join(extra[:10])}")
+
+    @staticmethod
+    def _schema(kind):
+        return customer_schema() if kind == 'customers' else event_schema()
+
+    def data_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.csv")
+
+    def _meta_path(self, upload_id):
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def _save(self, upload):
+        with self._meta_lock:
+            path = self._meta_path(upload['id'])
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(upload, f)
+            os.replace(tmp, path)
+
+    def _fail(self, upload, error):
+        upload['status'] = 'failed'
+        upload['errors'].insert(0, {'row': None, 'column': None, 'value': error})
+        upload['finished_at'] = datetime.now().isoformat()
+        self._save(upload)
+
+    # Processing
+
+    def process(self, upload_id):
+        """Validate and import a finished upload (called by the job workers)"""
+        upload = self.get(upload_id)
+        if upload is None:
+            raise UploadError(f'Unknown upload: {upload_id}')
+        if upload['status'] != 'queued':
+            raise UploadError(f"Upload {upload_id} is {upload['status']}, not queued")
+        try:
+            if upload['kind'] == 'customers':
+                self._import_customers(upload)
+            else:
+                self._import_events(upload)
+            upload['status'] = 'done'
+            upload['progress'] = 1.0
+            upload['finished_at'] = datetime.now().isoformat()
+            self._save(upload)
+            # The raw file is no longer needed once its rows are in
+            os.remove(self.data_path(upload['id']))
+        except Exception as e:
+            self._fail(upload, str(e))
+            raise
+        return upload['result']
+
+    def _chunks(self, upload, schema, phase_start, phase_weight, collect):
+        """Validated DataFrames from the upload file, updating progress as it goes"""
+        import pandas as pd
+
+        last_save = time.monotonic()
+        first_row = 1
+        with open(self.data_path(upload['id']), 'rb') as f:
+            reader = pd.read_csv(f, chunksize=Config.UPLOAD_VALIDATE_ROWS, dtype=str,
+                                 usecols=lambda name: name.strip() in schema, encoding='utf-8-sig')
+            for df in reader:
+                df.columns = [name.strip() for name in df.columns]
+                valid, rejected, samples = validate_chunk(df, schema, first_row)
+                first_row += len(df)
+                if collect:
+                    upload['rows_read'] += len(df)
+                    upload['rows_valid'] += len(valid)
+                    upload['rows_rejected'] += rejected
+                    upload['errors'].extend(samples[:max(0, MAX_ERROR_SAMPLES - len(upload['errors']))])
+                upload['progress'] = round(phase_start + phase_weight * f.tell() / max(upload['size'], 1), 4)
+                if time.monotonic() - last_save >= PROGRESS_INTERVAL:
+                    self._save(upload)
+                    last_save = time.monotonic()
+                if len(valid):
+                    yield valid
+
+    def _import_customers(self, upload):
+        store = get_feature_store()
+        schema = customer_schema(store)
+        passes = []
+
+        def read_chunks():
+            # First pass validates and sizes, second writes
+            first = not passes
+            passes.append(True)
+            upload['status'] = 'validating' if first else 'importing'
+            self._save(upload)
+            return self._chunks(upload, schema, 0.0 if first else 0.5, 0.5, collect=first)
+
+        manifest = upsert_feature_store(read_chunks)
+        upload['result'] = {
+            'version': manifest['version'],
+            'customers': manifest['rows'],
+            'new_customers': manifest['rows'] - len(store),
+        }
+        reload_feature_store()
+
+    def _import_events(self, upload):
+        upload['status'] = 'importing'
+        self._save(upload)
+        accepted = 0
+        for valid in self._chunks(upload, event_schema(), 0.0, 1.0, collect=True):
+            events, _ = append_events(valid.astype({'UserID': np.int64}).to_dict('records'))
+            accepted += len(events)
+        if not upload['rows_valid']:
+            raise UploadError('No valid rows to import')
+        get_event_log().refresh(force=True)
+        upload['result'] = {'events': accepted}
+
+    def sweep(self):
+        """Remove uploads and status files older than the TTL"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_upload_manager():
+    """Return the process-wide upload manager"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = UploadManager()
+    return _manager
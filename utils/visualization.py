@@ -0,0 +1,335 @@
+"""Chart data for the feature pages, computed from the real book.
+
+Every chart is reduced on the server to a bounded number of points, so a
+payload is as large as its bins or categories, never as large as the
+customer base:
+
+* histograms and binned aggregates put each customer in a bin with
+  ``searchsorted`` and sum per bin with ``np.bincount``,
+* group-bys over text columns run ``np.bincount`` on the dictionary codes
+  of the memory-mapped feature store columns,
+* the event timeline is bucketed per hour, day or week from the event
+  log's in-memory hourly counters, clamped to at most ``CHART_MAX_BUCKETS``
+  buckets and then downsampled with largest-triangle-three-buckets
+  (``lttb_indices``) to at most ``CHART_MAX_POINTS`` points.
+
+``ChartData`` caches each payload per chart and parameters and drops the
+whole cache when the dashboard data version (feature store version plus
+event count) changes.  Payloads are plain lists of rounded numbers,
+``{'labels': [...], 'series': {name: [...]}}``, that map straight onto
+Chart.js datasets.
+"""
+import collections
+import threading
+import time
+
+import numpy as np
+
+from config import Config
+from utils.aggregates import group_counts, get_dashboard_aggregates
+from utils.data_processor import COMPLAINT_TYPE_LABELS, get_feature_store
+from utils.event_store import EVENT_TYPES, get_event_log
+from utils.fee_simulator import DEFAULT_THRESHOLDS, FEE_ELASTICITY_MEAN, get_fee_simulator
+from utils.predictor import RISK_THRESHOLDS, get_predictor
+
+DEFAULT_BINS = 20
+MAX_BINS = 100
+
+# Bucket widths of the event timeline, in seconds
+INTERVALS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+
+# Fee grid of the fee curve chart (monthly base fee in dollars)
+FEE_CURVE_FEES = np.arange(0.0, 26.0, 1.0)
+
+
+def _rounded(values, digits=2):
+    """Plain floats for JSON, with NaN (empty bins) as null"""
+    return [None if np.isnan(value) else round(float(value), digits)
+            for value in np.asarray(values, dtype=np.float64)]
+
+
+def _bin_count(bins):
+    bins = int(bins)
+    if not 1 <= bins <= MAX_BINS:
+        raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+    return bins
+
+
+def _numeric_column(store, name):
+    if not store.has_column(name) or store.is_category(name):
+        numeric = [column for column in store.column_names if not store.is_category(column)]
+        raise ValueError(f"column must be one of: {', '.join(numeric)}")
+    return np.asarray(store.column(name), dtype=np.float64)
+
+
+def _category_column(store, name):
+    if not store.has_column(name) or not store.is_category(name):
+        categories = [column for column in store.column_names if store.is_category(column)]
+        raise ValueError(f"column must be one of: {', '.join(categories)}")
+    return store.column(name), store.categories(name)
+
+
+# Vectorized reductions
+
+def bin_edges(values, bins, value_range=None):
+    """Equal-width bin edges over value_range (default: the data's min and max)"""
+    if value_range is None:
+        finite = values[np.isfinite(values)]
+        value_range = (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+    low, high = value_range
+    if high <= low:
+        high = low + 1.0
+    return np.linspace(low, high, bins + 1)
+
+
+def bin_index(values, edges):
+    """Bin of each value; the last bin includes its upper edge like np.histogram"""
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+def binned_aggregate(values, edges, weights=None):
+    """(counts, means of weights) per bin in two bincount passes"""
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    index = bin_index(values[finite], edges)
+    bins = len(edges) - 1
+    counts = np.bincount(index, minlength=bins)
+    if weights is None:
+        return counts, None
+    sums = np.bincount(index, weights=np.asarray(weights, dtype=np.float64)[finite], minlength=bins)
+    means = np.divide(sums, counts, out=np.full(bins, np.nan), where=counts > 0)
+    return counts, means
+
+
+def lttb_indices(x, y, threshold):
+    """Indexes of at most threshold points picked by largest-triangle-three-buckets.
+
+    The first and last points are always kept.  The points in between are
+    split into threshold - 2 buckets, and each bucket keeps the point that
+    forms the largest triangle with the previously kept point and the mean
+    of the next bucket, which preserves peaks and troughs.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    bounds = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = bounds[i], bounds[i + 1]
+        next_start, next_stop = (bounds[i + 1], bounds[i + 2]) if i + 2 < len(bounds) else (n - 1, n)
+        mean_x = x[next_start:next_stop].mean()
+        mean_y = y[next_start:next_stop].mean()
+        area = np.abs((x[a] - mean_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (mean_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+# Charts
+
+def risk_distribution():
+    """Customers per churn risk band"""
+    probabilities = get_predictor().predict_store(get_feature_store())
+    ascending = sorted(RISK_THRESHOLDS)
+    bands = np.digitize(probabilities, [threshold for threshold, _ in ascending[1:]])
+    counts = np.bincount(bands, minlength=len(ascending))[::-1]
+    return {'labels': [label for _, label in RISK_THRESHOLDS],
+            'series': {'customers': counts.tolist()}}
+
+
+def churn_probability(bins=DEFAULT_BINS):
+    """Histogram of predicted churn probabilities"""
+    probabilities = get_predictor().predict_store(get_feature_store())
+    edges = bin_edges(probabilities, _bin_count(bins), (0.0, 1.0))
+    counts, _ = binned_aggregate(probabilities, edges)
+    return {'labels': _rounded(edges[:-1], 3), 'edges': _rounded(edges, 3),
+            'series': {'customers': counts.tolist()}}
+
+
+def distribution(column='Credit_Limit', bins=DEFAULT_BINS):
+    """Histogram of a numeric column with the churn rate in each bin"""
+    store = get_feature_store()
+    values = _numeric_column(store, column)
+    edges = bin_edges(values, _bin_count(bins))
+    counts, churn = binned_aggregate(values, edges, store.column('Churn'))
+    return {'labels': _rounded(edges[:-1]), 'edges': _rounded(edges), 'column': column,
+            'series': {'customers': counts.tolist(), 'churn_rate': _rounded(churn * 100.0)}}
+
+
+def churn_by_category(column='Card_Category'):
+    """Customers and churn rate per value of a text column"""
+    store = get_feature_store()
+    codes, categories = _category_column(store, column)
+    counts, churned = group_counts(codes, categories, store.column('Churn'))
+    rates = np.divide(churned, counts, out=np.full(len(categories), np.nan), where=counts > 0)
+    return {'labels': list(categories), 'column': column,
+            'series': {'customers': counts.tolist(), 'churn_rate': _rounded(rates * 100.0)}}
+
+
+def complaints_by_type():
+    """Complaints per complaint type and their share of all complaints"""
+    store = get_feature_store()
+    counts, _ = group_counts(store.column('Complaint_Type'), range(max(COMPLAINT_TYPE_LABELS) + 1))
+    types = [code for code in sorted(COMPLAINT_TYPE_LABELS) if code != 0]
+    complaints = counts[types]
+    total = complaints.sum()
+    return {'labels': [COMPLAINT_TYPE_LABELS[code] for code in types],
+            'series': {'complaints': complaints.tolist(),
+                       'share': _rounded(complaints * 100.0 / total if total else complaints * 0.0)}}
+
+
+def complaints_by_category(column='Card_Category'):
+    """Customers with a complaint per value of a text column"""
+    store = get_feature_store()
+    codes, categories = _category_column(store, column)
+    _, complaints = group_counts(codes, categories, np.asarray(store.column('Complaint_Type')) != 0)
+    return {'labels': list(categories), 'column': column,
+            'series': {'complaints': complaints.astype(np.int64).tolist()}}
+
+
+def fee_curve(months=12, threshold=None):
+    """Expected revenue and customers per base fee at the mean fee elasticity.
+
+    The closed-form counterpart of the Monte Carlo sweep: each tier's payers
+    churn at a constant monthly hazard raised by the fee, so revenue over the
+    horizon is a geometric sum per (fee, tier).
+    """
+    months = int(months)
+    if not 1 <= months <= 120:
+        raise ValueError('months must be between 1 and 120')
+    # By default no balance is high enough to waive the fee
+    threshold = DEFAULT_THRESHOLDS['stop'] if threshold is None else float(threshold)
+    simulator = get_fee_simulator()
+    fees = FEE_CURVE_FEES
+
+    exempt = simulator.counts * simulator.exempt_share([threshold])[0]
+    payers = simulator.counts - exempt
+    tier_fees = fees[:, None] * simulator.multipliers[None, :]
+    payer_hazard = np.minimum(simulator.hazard[None, :] * np.exp(tier_fees * FEE_ELASTICITY_MEAN), 1.0)
+    survival = 1.0 - payer_hazard
+    # Expected months each payer is on the books: 1 + s + ... + s ** (months - 1)
+    paid_months = np.where(payer_hazard > 0, (1.0 - survival ** months) / np.maximum(payer_hazard, 1e-12), months)
+    tier_revenue = payers[None, :] * tier_fees * paid_months
+    customers = (payers[None, :] * survival ** months).sum(axis=1) + \
+        (exempt * (1.0 - simulator.hazard) ** months).sum()
+
+    series = {'revenue': _rounded(tier_revenue.sum(axis=1), 0), 'customers': _rounded(customers, 0)}
+    for t, name in enumerate(simulator.tier_names):
+        series[f"revenue_{name}"] = _rounded(tier_revenue[:, t], 0)
+    return {'labels': fees.tolist(), 'months': months, 'threshold': threshold,
+            'tiers': list(simulator.tier_names), 'series': series}
+
+
+def feature_importance(top=8):
+    """The churn model's most influential features"""
+    top = int(top)
+    if top < 1:
+        raise ValueError('top must be at least 1')
+    predictor = get_predictor()
+    importance = predictor.feature_importance(get_feature_store())
+    order = np.argsort(importance)[::-1][:top]
+    return {'labels': [predictor.feature_columns[i] for i in order],
+            'series': {'importance': _rounded(importance[order], 4)}}
+
+
+def event_timeline(interval='day', points=None):
+    """Events per bucket and type, downsampled to a bounded number of points"""
+    if interval not in INTERVALS:
+        raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+    points = Config.CHART_MAX_POINTS if points is None else int(points)
+    if not 3 <= points <= Config.CHART_MAX_POINTS:
+        raise ValueError(f"points must be between 3 and {Config.CHART_MAX_POINTS}")
+
+    hourly = get_event_log().hourly_counts()
+    if not hourly:
+        return {'labels': [], 'interval': interval, 'series': {event_type: [] for event_type in EVENT_TYPES}}
+    step = INTERVALS[interval]
+    hours = np.array([hour for hour, _ in hourly], dtype=np.int64)
+    counts = np.array([row for _, row in hourly], dtype=np.int64)
+    buckets = hours * 3600 // step
+    # Clamp stray timestamps (future clocks, epoch-zero defaults) into a bounded window
+    last = min(int(buckets.max()), int(time.time()) // step)
+    first = max(int(buckets.min()), last - Config.CHART_MAX_BUCKETS + 1)
+    span = last - first + 1
+    buckets = np.clip(buckets, first, last) - first
+    # One bincount over (bucket, type) pairs fills the whole bucket x type table
+    types = len(EVENT_TYPES)
+    table = np.bincount((buckets[:, None] * types + np.arange(types)).ravel(), weights=counts.ravel(),
+                        minlength=span * types).astype(np.int64).reshape(span, types)
+
+    keep = lttb_indices(np.arange(span), table.sum(axis=1), points)
+    starts = ((first + keep) * step).astype('datetime64[s]')
+    labels = np.datetime_as_string(starts, unit='h' if interval == 'hour' else 'D').tolist()
+    series = {event_type: table[keep, j].tolist() for j, event_type in enumerate(EVENT_TYPES)}
+    return {'labels': labels, 'interval': interval, 'buckets': span, 'series': series}
+
+
+# name -> (builder, accepted query parameters)
+CHARTS = {
+    'risk_distribution': (risk_distribution, ()),
+    'churn_probability': (churn_probability, ('bins',)),
+    'distribution': (distribution, ('column', 'bins')),
+    'churn_by_category': (churn_by_category, ('column',)),
+    'complaints_by_type': (complaints_by_type, ()),
+    'complaints_by_category': (complaints_by_category, ('column',)),
+    'fee_curve': (fee_curve, ('months', 'threshold')),
+    'feature_importance': (feature_importance, ('top',)),
+    'event_timeline': (event_timeline, ('interval', 'points')),
+}
+
+
+class ChartData:
+    """Chart payloads cached per chart, parameters and data version"""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or Config.CHART_CACHE_SIZE
+        self._entries = collections.OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, name, params=None):
+        """Payload of a chart, computed at most once per data version"""
+        if name not in CHARTS:
+            raise ValueError(f"Unknown chart: {name}")
+        builder, accepted = CHARTS[name]
+        params = {key: value for key, value in (params or {}).items() if key in accepted and value not in (None, '')}
+        key = (name, tuple(sorted(params.items())))
+        version = get_dashboard_aggregates().snapshot()['data_version']
+
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                return payload
+
+        payload = builder(**params)
+        payload['chart'] = name
+        payload['data_version'] = version
+        with self._lock:
+            if self._version == version:
+                self._entries[key] = payload
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+
+_charts = None
+_charts_lock = threading.Lock()
+
+
+def get_chart_data():
+    """Return the process-wide chart data cache"""
+    global _charts
+    if _charts is None:
+        with _charts_lock:
+            if _charts is None:
+                _charts = ChartData()
+    return _charts
@@ -0,0 +1,126 @@
+"""Write-behind buffer for per-row timestamp updates.
+
+Requests record updates such as ``users.last_login`` in memory instead of
+writing them.  Updates to the same row coalesce (the latest value wins), and
+a background thread writes everything pending in one transaction every
+``WRITE_BEHIND_FLUSH_INTERVAL`` seconds and at interpreter exit.  A login
+therefore never waits on the SQLite write lock; at most one flush interval of
+timestamps is lost if the process is killed outright.
+"""
+import atexit
+import os
+import threading
+
+from config import Config
+from database.connection import get_connection
+
+
+class WriteBehindBuffer:
+    """Coalesces UPDATEs of whitelisted columns keyed by row id"""
+
+    def __init__(self, table, key_column, columns, db_path=None, flush_interval=None):
+        self.table = table
+        self.key_column = key_column
+        self.columns = tuple(columns)
+        self.db_path = db_path
+        self.flush_interval = flush_interval or Config.WRITE_BEHIND_FLUSH_INTERVAL
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.flushed_rows = 0
+        self.coalesced = 0
+
+    def record(self, key, **values):
+        """Queue column updates for one row; later values replace earlier ones"""
+        unknown = set(values) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Not a write-behind column of {self.table}: {', '.join(sorted(unknown))}")
+        self._ensure_started()
+        with self._lock:
+            row = self._pending.get(key)
+            if row is None:
+                self._pending[key] = dict(values)
+            else:
+                self.coalesced += 1
+                row.update(values)
+
+    def pending_value(self, key, column):
+        """Value queued for a row but not yet written, or None"""
+        with self._lock:
+            return self._pending.get(key, {}).get(column)
+
+    def _ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name=f'write-behind-{self.table}',
+                                                daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every pending update in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            # One executemany per column set keeps the statements prepared
+            groups = {}
+            for key, values in pending.items():
+                columns = tuple(name for name in self.columns if name in values)
+                groups.setdefault(columns, []).append(tuple(values[name] for name in columns) + (key,))
+
+            try:
+                conn = get_connection(self.db_path)
+                try:
+                    with conn:
+                        for columns, rows in groups.items():
+                            assignments = ', '.join(f"{name} = ?" for name in columns)
+                            conn.executemany(
+                                f"UPDATE {self.table} SET {assignments} WHERE {self.key_column} = ?", rows)
+                finally:
+                    conn.close()
+            except Exception as e:
+                # Put the updates back unless newer values arrived meanwhile
+                with self._lock:
+                    for key, values in pending.items():
+                        merged = dict(values)
+                        merged.update(self._pending.get(key, {}))
+                        self._pending[key] = merged
+                print(f"Error flushing {self.table} updates: {e}")
+                return 0
+
+            self.flushed_rows += len(pending)
+            return len(pending)
+
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self._pending), 'flushed_rows': self.flushed_rows,
+                    'coalesced': self.coalesced}
+
+
+_user_updates = None
+_user_updates_lock = threading.Lock()
+
+
+def get_user_updates():
+    """Write-behind buffer for users.last_login"""
+    global _user_updates
+    if _user_updates is None:
+        with _user_updates_lock:
+            if _user_updates is None:
+                _user_updates = WriteBehindBuffer('users', 'id', ('last_login',))
+                atexit.register(_user_updates.flush)
+    return _user_updates